@@ -22,5 +22,7 @@ class Movimientos_Cartera(models.Model):
     venta = models.ForeignKey(Ventas, on_delete=models.CASCADE, blank=True, null=True)
     fecha_pago_instancia = models.ForeignKey('facturas.FacturasFechasDePago', on_delete=models.CASCADE, null=True, blank=True, related_name='movimientos')
     organizacion = models.ForeignKey('users.Organizacion', on_delete=models.CASCADE, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     
\ No newline at end of file
@@ -1,6 +1,8 @@
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from ..models import Movimientos_Cartera
+from core.services.cache_calendario import invalidar_calendario
+from core.services.cambios_datos import CREAR, ELIMINAR, cambio, registrar_cambios
 
 @transaction.atomic
 def crear_ajuste(monto, tipo_ajuste, descripcion=None, fecha=None, user=None):
@@ -34,7 +36,9 @@ def crear_ajuste(monto, tipo_ajuste, descripcion=None, fecha=None, user=None):
         movimiento_args['fecha'] = fecha
     
     movimiento = Movimientos_Cartera.objects.create(**movimiento_args)
-    
+    invalidar_calendario(user.organizacion, [movimiento.fecha])
+    registrar_cambios(user.organizacion, [cambio('movimiento', movimiento.pk, CREAR, movimiento.fecha)])
+
     return movimiento
 
 
@@ -42,4 +46,6 @@ def crear_ajuste(monto, tipo_ajuste, descripcion=None, fecha=None, user=None):
 def eliminar_ajuste(movimiento, user):
     if movimiento.organizacion != user.organizacion:
         raise ValidationError("No tienes permiso para eliminar este ajuste.")
+    invalidar_calendario(movimiento.organizacion, [movimiento.fecha])
+    registrar_cambios(movimiento.organizacion, [cambio('movimiento', movimiento.pk, ELIMINAR, movimiento.fecha)])
     movimiento.delete()
@@ -7,12 +7,24 @@ from django.db.models import Sum
 
 from cartera.models import Movimientos_Cartera
 from facturas.models import FacturasFechasDePago
+from facturas.services.busqueda_folio import filtrar_por_folio
 from cartera.services.movimiento_ajustes import eliminar_ajuste
+from core.services.cache_calendario import invalidar_calendario
+from core.services.cambios_datos import CREAR, EDITAR, ELIMINAR, cambio, registrar_cambios
 
 # ============================================================
 # SERVICIOS DE CÁLCULO (HELPERS)
 # ============================================================
 
+def _invalidar_calendario_pago(factura, fecha_pago):
+    """
+    Un pago cambia el estado de la factura (conteos de todas sus fechas de
+    pago en el calendario) y el total pagado del mes del pago.
+    """
+    fechas = list(factura.facturasfechasdepago_set.values_list('fecha_por_pagar', flat=True))
+    invalidar_calendario(factura.organizacion, fechas + [fecha_pago])
+
+
 def servicio_obtener_monto_restante_por_pagar_factura(factura):
     total_pagado = (
         Movimientos_Cartera.objects
@@ -69,7 +81,7 @@ def servicio_obtener_movimientos(filters=None, user=None):
             has_active_filters = True
 
         if filters.get('folio'):
-            queryset = queryset.filter(factura__folio__icontains=filters['folio'])
+            queryset = filtrar_por_folio(queryset, filters['folio'], relacion='factura__')
             has_active_filters = True
 
     # Si no se aplicó ningún filtro, limitamos a 20 resultados
@@ -123,7 +135,12 @@ def registrar_movimiento_pago_factura(data, user):
     else:
         factura.estado = "ABONADO"
 
-    factura.save(update_fields=['estado'])
+    factura.save(update_fields=['estado', 'updated_at'])
+    _invalidar_calendario_pago(factura, fecha_movimiento)
+    registrar_cambios(factura.organizacion, [
+        cambio('movimiento', movimiento.pk, CREAR, fecha_movimiento),
+        cambio('factura', factura.pk, EDITAR),
+    ])
 
     return movimiento
 
@@ -162,7 +179,12 @@ def servicio_editar_movimiento_pago_factura(movimiento, data, user):
 
     movimiento.monto = monto
     movimiento.save()
-    factura.save(update_fields=['estado'])
+    factura.save(update_fields=['estado', 'updated_at'])
+    _invalidar_calendario_pago(factura, movimiento.fecha)
+    registrar_cambios(factura.organizacion, [
+        cambio('movimiento', movimiento.pk, EDITAR, movimiento.fecha),
+        cambio('factura', factura.pk, EDITAR),
+    ])
 
 
 # ============================================================
@@ -186,6 +208,7 @@ def servicio_eliminar_movimiento_pago_factura(movimiento, user):
     if not Movimientos_Cartera.objects.filter(pk=movimiento.pk).exists():
         raise ValidationError('Movimiento no encontrado.')
 
+    movimiento_id = movimiento.pk
     movimiento.delete()
 
     monto_restante = servicio_obtener_monto_restante_por_pagar_factura(factura)
@@ -195,7 +218,12 @@ def servicio_eliminar_movimiento_pago_factura(movimiento, user):
     else:
         factura.estado = "ABONADO"
 
-    factura.save(update_fields=['estado'])
+    factura.save(update_fields=['estado', 'updated_at'])
+    _invalidar_calendario_pago(factura, movimiento.fecha)
+    registrar_cambios(factura.organizacion, [
+        cambio('movimiento', movimiento_id, ELIMINAR, movimiento.fecha),
+        cambio('factura', factura.pk, EDITAR),
+    ])
 
 
 # ============================================================
@@ -0,0 +1,241 @@
+import heapq
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from cartera.models import Movimientos_Cartera
+from cartera.services.saldo_cargo import obtener_saldo_global
+from facturas.models import FacturasFechasDePago
+from sucursales.models import Ventas
+
+DIAS_HISTORIAL_PROYECCION = 90
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def proyectar_ventas_diarias(organizacion, inicio, dias):
+    """
+    Proyección simple de ventas: promedio por día de la semana de los
+    últimos DIAS_HISTORIAL_PROYECCION días (todas las sucursales).
+    Retorna una lista de Decimal de longitud `dias` empezando en `inicio`.
+    """
+    hasta = inicio - timedelta(days=1)
+    desde = hasta - timedelta(days=DIAS_HISTORIAL_PROYECCION - 1)
+
+    totales = (Ventas.objects
+               .filter(sucursal__organizacion=organizacion, fecha__range=(desde, hasta))
+               .values('fecha')
+               .annotate(total=Sum('monto')))
+
+    suma_por_weekday = [Decimal('0')] * 7
+    for fila in totales:
+        suma_por_weekday[fila['fecha'].weekday()] += fila['total']
+
+    # Cuántas veces aparece cada día de la semana en la ventana
+    apariciones = [0] * 7
+    for i in range(DIAS_HISTORIAL_PROYECCION):
+        apariciones[(desde + timedelta(days=i)).weekday()] += 1
+
+    promedio = [
+        (suma_por_weekday[w] / apariciones[w]).quantize(Decimal('0.01')) if apariciones[w] else Decimal('0')
+        for w in range(7)
+    ]
+    return [promedio[(inicio + timedelta(days=i)).weekday()] for i in range(dias)]
+
+
+def _cuotas_pendientes(organizacion):
+    """
+    Fechas de pago con saldo pendiente de facturas no pagadas.
+
+    Los pagos ya registrados de una factura se aplican a sus cuotas en orden
+    de fecha (FIFO); solo las cuotas no cubiertas se consideran pendientes.
+    Retorna (cuotas, restante_por_factura).
+    """
+    cuotas_qs = (FacturasFechasDePago.objects
+                 .filter(factura__organizacion=organizacion)
+                 .exclude(factura__estado='PAGADO')
+                 .select_related('factura', 'factura__proveedor')
+                 .order_by('factura_id', 'fecha_por_pagar', 'id'))
+
+    pagado_por_factura = dict(
+        Movimientos_Cartera.objects
+        .filter(organizacion=organizacion, origen='PAGO', factura__isnull=False)
+        .exclude(factura__estado='PAGADO')
+        .values_list('factura_id')
+        .annotate(total=Sum('monto'))
+    )
+
+    cuotas = []
+    restante_por_factura = {}
+    acumulado = {}
+
+    for cuota in cuotas_qs:
+        factura = cuota.factura
+        pagado = pagado_por_factura.get(factura.id, Decimal('0'))
+        restante_por_factura.setdefault(factura.id, factura.monto - pagado)
+
+        acumulado[factura.id] = acumulado.get(factura.id, Decimal('0')) + cuota.monto_por_pagar
+        if acumulado[factura.id] <= pagado:
+            continue
+
+        cuotas.append(cuota)
+
+    return cuotas, restante_por_factura
+
+
+# ============================================================
+# OPTIMIZADOR
+# ============================================================
+
+def servicio_optimizar_pagos(user, saldo_minimo=Decimal('0.00'), dias=60, ventas_proyectadas=None,
+                             rellenar=True):
+    """
+    Calcula un plan de pagos que mantiene el saldo por encima de `saldo_minimo`
+    minimizando los días de atraso.
+
+    Recorre el horizonte día por día. Cada cuota entra a una cola de prioridad
+    (heap) el día que vence (las vencidas entran el primer día) y se paga en
+    orden de vencimiento (Earliest Due Date) mientras el saldo disponible lo
+    permita. Si la cuota más urgente no alcanza y `rellenar` es True, se pagan
+    las cuotas más pequeñas que sí caben (segundo heap por monto), para reducir
+    el número de cuotas atrasadas.
+
+    El plan se agrupa por fecha de pago con la misma forma que recibe
+    `servicio_pagar_facturas_masivas(fechas_ids, fecha_pago, user)`.
+    """
+    reporte = {
+        'saldo_inicial': Decimal('0.00'),
+        'saldo_minimo': saldo_minimo,
+        'plan': [],
+        'asignaciones': [],
+        'sin_programar': [],
+        'monto_total': Decimal('0.00'),
+        'dias_atraso_total': 0,
+        'cuotas_atrasadas': 0,
+    }
+
+    if not user or not user.organizacion:
+        return reporte
+
+    organizacion = user.organizacion
+    hoy = timezone.localtime().date()
+    saldo = obtener_saldo_global(user)
+    reporte['saldo_inicial'] = saldo
+
+    if ventas_proyectadas is None:
+        # Las ventas de hoy ya están en el saldo; proyectamos desde mañana
+        ventas_proyectadas = [Decimal('0')] + proyectar_ventas_diarias(
+            organizacion, hoy + timedelta(days=1), dias - 1
+        )
+
+    cuotas, restante_por_factura = _cuotas_pendientes(organizacion)
+
+    # Cuotas ordenadas por el día (relativo a hoy) en que entran a la cola
+    por_liberar = sorted(
+        cuotas,
+        key=lambda c: (c.fecha_por_pagar, c.monto_por_pagar, c.id),
+    )
+    siguiente = 0
+
+    heap_vencimiento = []   # (fecha_por_pagar, monto, id)
+    heap_monto = []         # (monto, fecha_por_pagar, id)
+    pendientes = {}         # id -> cuota (aún no asignada)
+
+    plan_por_dia = []
+    pagadas_hoy = []
+
+    def _monto_real(cuota):
+        return min(cuota.monto_por_pagar, restante_por_factura[cuota.factura_id])
+
+    def _pagar_desde(heap):
+        """Paga desde la cima del heap mientras el saldo no baje del mínimo."""
+        nonlocal saldo
+        while heap:
+            cuota = pendientes.get(heap[0][2])
+            if cuota is None:
+                heapq.heappop(heap)  # ya asignada desde el otro heap
+                continue
+            monto = _monto_real(cuota)
+            if saldo - monto < saldo_minimo:
+                return
+            heapq.heappop(heap)
+            del pendientes[cuota.id]
+            if monto <= 0:
+                continue
+            saldo -= monto
+            restante_por_factura[cuota.factura_id] -= monto
+            pagadas_hoy.append((cuota, monto))
+
+    for offset in range(dias):
+        fecha = hoy + timedelta(days=offset)
+        saldo += ventas_proyectadas[offset] if offset < len(ventas_proyectadas) else Decimal('0')
+
+        while siguiente < len(por_liberar) and por_liberar[siguiente].fecha_por_pagar <= fecha:
+            cuota = por_liberar[siguiente]
+            pendientes[cuota.id] = cuota
+            heapq.heappush(heap_vencimiento, (cuota.fecha_por_pagar, cuota.monto_por_pagar, cuota.id))
+            heapq.heappush(heap_monto, (cuota.monto_por_pagar, cuota.fecha_por_pagar, cuota.id))
+            siguiente += 1
+
+        pagadas_hoy.clear()
+
+        # 1. Earliest Due Date mientras alcance
+        _pagar_desde(heap_vencimiento)
+
+        # 2. Relleno con las cuotas más pequeñas que caben
+        if rellenar:
+            _pagar_desde(heap_monto)
+
+        if not pagadas_hoy:
+            continue
+
+        monto_dia = Decimal('0.00')
+        asignaciones_dia = []
+        for cuota, monto in pagadas_hoy:
+            atraso = max((fecha - cuota.fecha_por_pagar).days, 0)
+            monto_dia += monto
+            reporte['dias_atraso_total'] += atraso
+            if atraso:
+                reporte['cuotas_atrasadas'] += 1
+            asignaciones_dia.append({
+                'fecha_pago_id': cuota.id,
+                'factura_id': cuota.factura_id,
+                'folio': cuota.factura.folio,
+                'proveedor': cuota.factura.proveedor.nombre,
+                'vencimiento': cuota.fecha_por_pagar,
+                'fecha_pago': fecha,
+                'monto': monto,
+                'dias_atraso': atraso,
+            })
+
+        reporte['asignaciones'].extend(asignaciones_dia)
+        reporte['monto_total'] += monto_dia
+        plan_por_dia.append({
+            'fecha_pago': fecha,
+            'fechas_ids': [cuota.id for cuota, _ in pagadas_hoy],
+            'monto_total': monto_dia,
+            'saldo_final': saldo,
+            'cuotas': asignaciones_dia,
+        })
+
+    reporte['plan'] = plan_por_dia
+
+    # Cuotas que vencen dentro del horizonte y no alcanzaron saldo
+    for cuota in sorted(pendientes.values(), key=lambda c: (c.fecha_por_pagar, c.id)):
+        monto = _monto_real(cuota)
+        if monto <= 0:
+            continue
+        reporte['sin_programar'].append({
+            'fecha_pago_id': cuota.id,
+            'factura_id': cuota.factura_id,
+            'folio': cuota.factura.folio,
+            'proveedor': cuota.factura.proveedor.nombre,
+            'vencimiento': cuota.fecha_por_pagar,
+            'monto': monto,
+        })
+
+    return reporte
@@ -1,3 +1,105 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from users.models import Organizacion, User
+from proveedores.models import Proveedores
+from facturas.models import Facturas, FacturasFechasDePago
+from cartera.models import Movimientos_Cartera
+from .services.optimizador_pagos import servicio_optimizar_pagos
+from .services.movimientos import servicio_pagar_facturas_masivas
+
+
+class ServicioOptimizarPagosTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Optimizador")
+        self.user = User.objects.create_user(
+            email="opt@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        self.proveedor = Proveedores.objects.create(nombre="Prov", organizacion=self.org)
+        self.hoy = timezone.localtime().date()
+
+    def _factura(self, folio, cuotas):
+        factura = Facturas.objects.create(
+            proveedor=self.proveedor, folio=folio, organizacion=self.org,
+            monto=sum(m for _, m in cuotas),
+        )
+        for dias, monto in cuotas:
+            FacturasFechasDePago.objects.create(
+                factura=factura, fecha_por_pagar=self.hoy + timedelta(days=dias), monto_por_pagar=monto
+            )
+        return factura
+
+    def _saldo(self, monto):
+        Movimientos_Cartera.objects.create(
+            origen='AJUSTE_SUMA', monto=monto, fecha=self.hoy, organizacion=self.org
+        )
+
+    def test_respeta_saldo_minimo_y_atrasa_lo_que_no_cabe(self):
+        self._saldo(Decimal('1000.00'))
+        self._factura('A', [(0, Decimal('600.00'))])
+        self._factura('B', [(0, Decimal('600.00'))])
+
+        ventas = [Decimal('0')] * 2 + [Decimal('500.00')] + [Decimal('0')] * 7
+        reporte = servicio_optimizar_pagos(self.user, saldo_minimo=Decimal('100.00'), dias=10,
+                                           ventas_proyectadas=ventas)
+
+        self.assertEqual(len(reporte['plan']), 2)
+        self.assertEqual(reporte['plan'][0]['fecha_pago'], self.hoy)
+        self.assertEqual(reporte['plan'][1]['fecha_pago'], self.hoy + timedelta(days=2))
+        self.assertEqual(reporte['dias_atraso_total'], 2)
+        self.assertEqual(reporte['plan'][-1]['saldo_final'], Decimal('300.00'))
+        self.assertEqual(reporte['sin_programar'], [])
+
+    def test_relleno_con_cuotas_pequenas(self):
+        self._saldo(Decimal('300.00'))
+        self._factura('GRANDE', [(-1, Decimal('1000.00'))])
+        chica = self._factura('CHICA', [(0, Decimal('200.00'))])
+
+        reporte = servicio_optimizar_pagos(self.user, dias=1, ventas_proyectadas=[Decimal('0')])
+
+        self.assertEqual(reporte['plan'][0]['fechas_ids'],
+                         [chica.facturasfechasdepago_set.get().id])
+        self.assertEqual([c['folio'] for c in reporte['sin_programar']], ['GRANDE'])
+
+    def test_pagos_previos_cubren_primeras_cuotas(self):
+        self._saldo(Decimal('5000.00'))
+        factura = self._factura('ABONADA', [(-5, Decimal('500.00')), (5, Decimal('500.00'))])
+        Movimientos_Cartera.objects.create(
+            origen='PAGO', monto=Decimal('500.00'), factura=factura, fecha=self.hoy, organizacion=self.org
+        )
+        factura.estado = 'ABONADO'
+        factura.save()
+
+        reporte = servicio_optimizar_pagos(self.user, dias=10, ventas_proyectadas=[Decimal('0')] * 10)
+
+        self.assertEqual(len(reporte['asignaciones']), 1)
+        self.assertEqual(reporte['asignaciones'][0]['vencimiento'], self.hoy + timedelta(days=5))
+        self.assertEqual(reporte['asignaciones'][0]['dias_atraso'], 0)
+
+    def test_plan_se_puede_enviar_al_pago_masivo(self):
+        self._saldo(Decimal('1000.00'))
+        self._factura('X', [(0, Decimal('400.00'))])
+
+        reporte = servicio_optimizar_pagos(self.user, dias=1, ventas_proyectadas=[Decimal('0')])
+        dia = reporte['plan'][0]
+        resultado = servicio_pagar_facturas_masivas(dia['fechas_ids'], dia['fecha_pago'], user=self.user)
+
+        self.assertEqual(resultado['pagadas'], 1)
+        self.assertEqual(resultado['monto_total'], dia['monto_total'])
+
+    # Las pruebas no corren collectstatic: {% static %} sin el manifiesto de whitenoise
+    @override_settings(STORAGES={
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_vista_ignora_saldo_minimo_no_finito(self):
+        self._saldo(Decimal('1000.00'))
+        self._factura('N', [(0, Decimal('400.00'))])
+        self.client.force_login(self.user)
+        for valor in ('nan', 'sNaN', 'Infinity'):
+            respuesta = self.client.get('/movimientos/optimizar-pagos/', {'saldo_minimo': valor, 'dias': 5})
+            self.assertEqual(respuesta.status_code, 200)
@@ -9,5 +9,6 @@ urlpatterns = [
     path('editar/<int:movimiento_id>/', editar_pago_factura, name='editar-pago-factura'),
     path('eliminar/<int:movimiento_id>/', eliminar_pago_factura, name='eliminar-pago-factura'),
     path('pagar-masivo/', pagar_facturas_masivas, name='pagar-facturas-masivas'), 
+    path('optimizar-pagos/', optimizar_pagos, name='optimizar-pagos'),
     path('ajuste/', crear_ajuste_saldo, name='crear-ajuste-saldo'),
 ]
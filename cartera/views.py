@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from core.decorators import condicional_por_version
 from django.core.exceptions import ValidationError
 from .forms import *
 from .services.movimientos import *
@@ -9,6 +10,7 @@ from datetime import date, datetime
 from sucursales.models import Sucursales
 from decimal import Decimal, InvalidOperation
 from .services.movimiento_ajustes import crear_ajuste
+from .services.optimizador_pagos import servicio_optimizar_pagos
 
 @login_required
 def pagar_factura(request, factura_id, fecha_str):
@@ -75,6 +77,7 @@ def eliminar_pago_factura(request, movimiento_id):
     return redirect('lista-movimientos')
     
 @login_required
+@condicional_por_version
 def lista_movimientos(request):
     # Recopilar filtros del request
     filters = {
@@ -148,6 +151,31 @@ def pagar_facturas_masivas(request):
             
     return redirect(request.META.get('HTTP_REFERER', '/'))
 
+@login_required
+def optimizar_pagos(request):
+    """
+    Propone un plan de pagos que respeta un saldo mínimo.
+    Cada día del plan se puede enviar tal cual a pagar_facturas_masivas.
+    """
+    try:
+        saldo_minimo = Decimal(request.GET.get('saldo_minimo') or '0')
+    except InvalidOperation:
+        saldo_minimo = Decimal('0')
+    if not saldo_minimo.is_finite():  # "nan", "Infinity"
+        saldo_minimo = Decimal('0')
+
+    try:
+        dias = min(max(int(request.GET.get('dias', 60)), 1), 366)
+    except (ValueError, TypeError):
+        dias = 60
+
+    reporte = servicio_optimizar_pagos(request.user, saldo_minimo=saldo_minimo, dias=dias)
+
+    return render(request, 'movimientos/optimizar_pagos.html', {
+        **reporte,
+        'dias': dias,
+    })
+
 @login_required
 def crear_ajuste_saldo(request):
     if request.method == 'POST':
@@ -0,0 +1,80 @@
+"""
+Configuración de gunicorn para producción.
+
+    gunicorn -c config/gunicorn.conf.py
+
+Todo se ajusta con variables de entorno:
+  SERVIDOR            wsgi (gthread, por defecto) o asgi (workers de uvicorn)
+  PORT                puerto (8000)
+  WEB_WORKERS         procesos (por defecto 2 x CPUs + 1, máximo 8, con
+                      REDIS_URL y 1 sin él; más de uno requiere REDIS_URL)
+  WEB_THREADS         hilos por proceso con gthread (4)
+  WEB_TIMEOUT         segundos antes de reiniciar un worker colgado (60)
+  WEB_MAX_REQUESTS    requests antes de reciclar un worker (1000, 0 = nunca)
+  WEB_RELOAD          True solo en desarrollo (desactiva el preload)
+
+Los workers se reciclan con jitter para que no se reinicien todos a la vez,
+y la app se carga una sola vez en el master (preload) y se comparte con los
+workers por copy-on-write.
+"""
+
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+SERVIDOR = os.getenv('SERVIDOR', 'wsgi')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+if SERVIDOR == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+    # Hilos: las vistas pasan la mayor parte del tiempo esperando a la BD
+    worker_class = 'gthread'
+    threads = int(os.getenv('WEB_THREADS', '4'))
+
+# Calendario, sandbox, directorio de proveedores, reportes y cuotas guardan
+# su estado en el caché: con varios workers tiene que ser Redis, o cada uno
+# ve solo sus propias invalidaciones y sirve datos viejos. Sin REDIS_URL se
+# usa un solo worker, salvo que WEB_WORKERS pida más (eso es un error).
+if os.getenv('WEB_WORKERS'):
+    workers = int(os.getenv('WEB_WORKERS'))
+    if workers > 1 and not os.getenv('REDIS_URL'):
+        raise RuntimeError(f'WEB_WORKERS={workers} requiere REDIS_URL (caché compartido entre workers)')
+elif os.getenv('REDIS_URL'):
+    workers = min(multiprocessing.cpu_count() * 2 + 1, 8)
+else:
+    workers = 1
+    logging.getLogger('gunicorn.error').warning(
+        'Sin REDIS_URL se arranca un solo worker (el caché no se comparte entre procesos)'
+    )
+os.environ['WEB_WORKERS'] = str(workers)  # settings.WEB_WORKERS
+
+# Reinicio de workers
+timeout = int(os.getenv('WEB_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+
+# --reload y preload son incompatibles: el código ya cargado no se recarga
+reload = os.getenv('WEB_RELOAD', 'False') == 'True'
+preload_app = not reload
+
+accesslog = '-'
+errorlog = '-'
+# %(D)s: duración del request en microsegundos
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(D)sus'
+
+
+def post_fork(server, worker):
+    # Con preload, una conexión abierta en el master no debe compartirse
+    from django.db import connections
+    connections.close_all()
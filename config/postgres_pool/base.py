@@ -0,0 +1,68 @@
+"""
+Backend de Postgres con pool de conexiones de psycopg 3 (psycopg_pool).
+
+Django 5.0 no trae pool propio: cada worker abría y mantenía su conexión
+(CONN_MAX_AGE). Aquí cada proceso tiene un pool por alias de BD; Django
+pide una conexión al pool al empezar a consultar y la devuelve al cerrar
+(con CONN_MAX_AGE = 0, al terminar cada request). Los hilos de
+consultas_paralelo también toman y devuelven conexiones del mismo pool.
+
+    DATABASES['default']['ENGINE'] = 'config.postgres_pool'
+    DATABASES['default']['OPTIONS']['pool'] = {'min_size': 1, 'max_size': 8, 'timeout': 10}
+"""
+
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _reiniciar(conexion):
+    # El límite de tiempo de un request (core/services/limites_consultas.py)
+    # no pasa al siguiente que use la conexión
+    autocommit = conexion.autocommit
+    conexion.autocommit = True
+    conexion.execute('RESET statement_timeout')
+    conexion.autocommit = autocommit
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                opciones = self.settings_dict['OPTIONS'].get('pool', {})
+                pool = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    min_size=opciones.get('min_size', 1),
+                    max_size=opciones.get('max_size', 8),
+                    timeout=opciones.get('timeout', 10),
+                    reset=_reiniciar,
+                    name=f'django-{self.alias}',
+                    open=True,
+                )
+                _pools[self.alias] = pool
+            return pool
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        # El nivel de aislamiento lo deja el pool en el default del servidor
+        self.isolation_level = IsolationLevel.READ_COMMITTED
+        return self.pool.getconn()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # El pool hace rollback si quedó una transacción abierta y
+                # descarta la conexión si está rota
+                self.pool.putconn(self.connection)
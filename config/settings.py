@@ -37,6 +37,8 @@ if not DEBUG:
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
     # Redirige todo el tráfico HTTP a HTTPS
     SECURE_SSL_REDIRECT = True
+    # Los chequeos de salud llegan por HTTP directo al contenedor
+    SECURE_REDIRECT_EXEMPT = [r'^core/salud/']
     # Asegura que las cookies solo se envíen por conexiones cifradas
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
@@ -58,6 +60,7 @@ INSTALLED_APPS = [
     'proveedores',
     'suscripciones',
     'configuracion',
+    'tareas',
     'django.contrib.humanize',
 ]
 
@@ -96,7 +99,10 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.RuteoBDMiddleware',  # 📖 Lecturas de reportes en la réplica
     'suscripciones.middleware.SuscripcionMiddleware',  # 🔒 Bloqueo por suscripción vencida
+    'core.middleware.LimiteConsultasMiddleware',  # ⏱️ Límite de tiempo por consulta
+    'core.middleware.CuotasPeticionesMiddleware',  # 🚦 Cuota de peticiones por organización
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -105,13 +111,21 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Templates compilados una vez por proceso (en DEBUG el autoreload
+            # vacía el caché al editar un template). Comparativa de render:
+            # `python manage.py tiempo_render`.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -127,6 +141,119 @@ DATABASES = {
     )
 }
 
+# Réplica de solo lectura para reportes, calendario y exportaciones
+# (core/services/ruteo_bd.py). Sin DATABASE_REPLICA_URL todo va a 'default'
+# (las pruebas agregan una en config/settings_test.py).
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=600)
+
+DATABASE_ROUTERS = ['core.routers.RouterReplica']
+
+# Segundos que un usuario sigue leyendo de la primaria después de escribir,
+# para no ver datos viejos mientras la réplica se pone al día.
+REPLICA_RETRASO_S = int(os.getenv('REPLICA_RETRASO_S', '10'))
+
+# Pool de conexiones por worker (config/postgres_pool). El tamaño debe cubrir
+# los hilos de gunicorn más las consultas en paralelo de las vistas async.
+# DB_POOL_MAX=0 vuelve a las conexiones persistentes por hilo.
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '8'))
+for _bd in DATABASES.values():
+    if DB_POOL_MAX and _bd['ENGINE'] == 'django.db.backends.postgresql':
+        _bd['ENGINE'] = 'config.postgres_pool'
+        # La conexión vuelve al pool al terminar cada request
+        _bd['CONN_MAX_AGE'] = 0
+        _bd.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN', '1')),
+            'max_size': DB_POOL_MAX,
+            'timeout': float(os.getenv('DB_POOL_ESPERA', '10')),
+        }
+
+# Límite de tiempo por consulta (core/services/limites_consultas.py):
+# 'interactivo' para todas las vistas, 'reporte' para reportes y exportaciones.
+LIMITES_CONSULTAS_MS = {
+    'interactivo': int(os.getenv('LIMITE_CONSULTA_INTERACTIVO_MS', '5000')),
+    'reporte': int(os.getenv('LIMITE_CONSULTA_REPORTE_MS', '30000')),
+}
+
+# --- CACHÉ ---
+# Con REDIS_URL el caché se comparte entre todos los workers de gunicorn
+# (directorio de proveedores, calendario, sandbox, reportes, cuotas). Sin
+# ella, caché local por proceso: solo sirve con un proceso (runserver o
+# WEB_WORKERS=1); config/gunicorn.conf.py no arranca más workers sin Redis.
+REDIS_URL = os.getenv('REDIS_URL')
+CACHE_COMPARTIDO = bool(REDIS_URL)
+# Procesos web (gunicorn.conf.py lo fija al arrancar)
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', '1'))
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'controlzl',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# --- TAREAS EN SEGUNDO PLANO (tareas/) ---
+# Procesos para las tareas por organización (0 = en el proceso del
+# trabajador), organizaciones por lote, espera base entre reintentos y
+# segundos sin señales del trabajador antes de que otro retome su tarea.
+TAREAS_PROCESOS = int(os.getenv('TAREAS_PROCESOS', '2'))
+TAREAS_LOTE_ORGANIZACIONES = int(os.getenv('TAREAS_LOTE_ORGANIZACIONES', '50'))
+TAREAS_REINTENTO_S = int(os.getenv('TAREAS_REINTENTO_S', '60'))
+TAREAS_BLOQUEO_S = int(os.getenv('TAREAS_BLOQUEO_S', '600'))
+
+# --- RENDER DE PDFs (core/services/render_pdf.py) ---
+# Procesos del pool de ReportLab (0 = renderizar dentro del request) y
+# renders en curso/en espera por worker antes de responder 503.
+PDF_RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', '2'))
+PDF_RENDER_COLA = int(os.getenv('PDF_RENDER_COLA', '8'))
+PDF_RENDER_ESPERA = float(os.getenv('PDF_RENDER_ESPERA', '5'))
+
+# --- CONSULTAS EN PARALELO (core/services/consultas_paralelo.py) ---
+# Las vistas async lanzan sus consultas independientes en hilos a la vez.
+CONSULTAS_EN_PARALELO = os.getenv('CONSULTAS_EN_PARALELO', 'True') == 'True'
+
+# --- REPORTES COMPARTIDOS (core/services/reportes_compartidos.py) ---
+# Peticiones iguales a un reporte esperan hasta ESPERA segundos el cálculo
+# de la primera; el resultado se reutiliza TIMEOUT segundos (su llave cambia
+# con cada escritura de la organización). Solo con CACHE_COMPARTIDO (Redis).
+REPORTES_COMPARTIDOS_ESPERA = float(os.getenv('REPORTES_COMPARTIDOS_ESPERA', '10'))
+REPORTES_COMPARTIDOS_TIMEOUT = int(os.getenv('REPORTES_COMPARTIDOS_TIMEOUT', '300'))
+
+# --- CUOTAS DE PETICIONES (core/services/cuotas_peticiones.py) ---
+# Token bucket por organización y clase de vista (@cuota_peticiones):
+# (capacidad, fichas repuestas por minuto) según Suscripcion.plan. Sin plan
+# (periodo de prueba) aplica BASICO. Las cubetas viven en Redis; sin
+# REDIS_URL cada worker tiene la suya con 1/WEB_WORKERS del límite.
+CUOTAS_PETICIONES_ACTIVAS = os.getenv('CUOTAS_PETICIONES_ACTIVAS', 'True') == 'True'
+CUOTAS_PETICIONES = {
+    'BASICO': {
+        'interactivo': (120, 300),
+        'reporte': (10, 10),
+        'exportacion': (5, 2),
+        'pdf': (10, 20),
+        'webhook': (100, 300),
+    },
+    'PRO': {
+        'interactivo': (240, 600),
+        'reporte': (30, 30),
+        'exportacion': (15, 6),
+        'pdf': (30, 60),
+        'webhook': (100, 300),
+    },
+}
+
+# --- SALUD (core/services/salud.py) ---
+# Latencia máxima de BD o caché para que /core/salud/ responda 200.
+SALUD_LIMITE_MS = float(os.getenv('SALUD_LIMITE_MS', '1000'))
+
 # --- VALIDACIÓN DE CONTRASEÑAS ---
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -150,8 +277,23 @@ TIME_FORMAT = 'H:i'
 # --- ARCHIVOS ESTÁTICOS ---
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-# Usamos CompressedStaticFilesStorage por ser más robusto si faltan archivos
-STATICFILES_STORAGE = "whitenoise.storage.CompressedStaticFilesStorage"
+STATICFILES_DIRS = [BASE_DIR / 'static']
+# collectstatic agrega un hash del contenido al nombre de cada archivo
+# (base.3f2a9c1d.css) y guarda versiones .gz y .br. WhiteNoise sirve los
+# archivos con hash con caché "immutable" de un año: un cambio en el CSS/JS
+# genera otro nombre, así que nunca hay que invalidar nada.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+# Si una plantilla pide un archivo que no está en el manifiesto se usa el
+# nombre sin hash en lugar de fallar (igual que el storage anterior).
+WHITENOISE_MANIFEST_STRICT = False
+
+# Identifica el despliegue en los ETag de las páginas (core/services/version_datos.py):
+# tras un deploy ninguna página guardada por el navegador se sirve con 304,
+# porque apuntaría a estáticos con hash que ya no existen.
+VERSION_DESPLIEGUE = os.getenv('RAILWAY_GIT_COMMIT_SHA', '')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
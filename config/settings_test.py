@@ -0,0 +1,18 @@
+"""
+Settings de las pruebas: los de producción más una réplica de prueba.
+
+    python manage.py test            # manage.py usa este módulo para `test`
+    DJANGO_SETTINGS_MODULE=config.settings_test pytest
+
+La réplica es una segunda BD vacía (no un espejo de 'default') para que las
+pruebas de ruteo (core/tests.py, RuteoReplicaTest) comprueben qué lee de
+dónde.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, DATABASE_REPLICA_URL
+
+if not DATABASE_REPLICA_URL:
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {}}
+    if DATABASES['replica']['ENGINE'] != 'django.db.backends.sqlite3':
+        DATABASES['replica']['TEST'] = {'NAME': f"test_{DATABASES['default']['NAME']}_replica"}
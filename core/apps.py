@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core.services.limites_consultas import instalar_limite
+        connection_created.connect(instalar_limite, dispatch_uid='core_limite_consultas')
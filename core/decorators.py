@@ -0,0 +1,116 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.views import redirect_to_login
+
+from core.services.limites_consultas import perfil_consultas
+from core.services.ruteo_bd import lectura_replica as _lectura_replica
+from core.services.version_datos import agregar_validadores, respuesta_no_modificada, validadores
+
+
+def _cargar_usuario(request):
+    if not request.user.is_authenticated:
+        return False
+    request.user.organizacion  # cachea la FK para usarla en el event loop
+    return True
+
+
+def login_required_async(vista):
+    """
+    login_required para vistas async (el de Django 5.0 solo envuelve vistas
+    síncronas). Además deja request.user y su organización ya cargados: en
+    el event loop no se puede consultar la BD de forma perezosa.
+    """
+    @wraps(vista)
+    async def _vista(request, *args, **kwargs):
+        if not await sync_to_async(_cargar_usuario)(request):
+            return redirect_to_login(request.get_full_path())
+        return await vista(request, *args, **kwargs)
+    return _vista
+
+
+def limite_consultas(perfil):
+    """
+    Corre la vista (sync o async) con el límite de tiempo por consulta de
+    `perfil` en settings.LIMITES_CONSULTAS_MS, p. ej. 'reporte'.
+    """
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+            @wraps(vista)
+            async def _vista_async(request, *args, **kwargs):
+                with perfil_consultas(perfil):
+                    return await vista(request, *args, **kwargs)
+            return _vista_async
+
+        @wraps(vista)
+        def _vista(request, *args, **kwargs):
+            with perfil_consultas(perfil):
+                return vista(request, *args, **kwargs)
+        return _vista
+    return decorador
+
+
+def cuota_peticiones(clase):
+    """
+    Marca la clase de cuota de la vista ('reporte', 'exportacion', 'pdf',
+    'webhook'); sin marca es 'interactivo'. La aplica
+    CuotasPeticionesMiddleware (core/services/cuotas_peticiones.py). No
+    envuelve la vista: los decoradores de arriba copian la marca con @wraps.
+    """
+    def decorador(vista):
+        vista.clase_cuota = clase
+        return vista
+    return decorador
+
+
+def lectura_replica(vista):
+    """
+    La vista (sync o async) lee de la réplica si hay una configurada, hasta
+    que escriba algo (ver core/services/ruteo_bd.py).
+    """
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def _vista_async(request, *args, **kwargs):
+            with _lectura_replica():
+                return await vista(request, *args, **kwargs)
+        return _vista_async
+
+    @wraps(vista)
+    def _vista(request, *args, **kwargs):
+        with _lectura_replica():
+            return vista(request, *args, **kwargs)
+    return _vista
+
+
+def condicional_por_version(vista):
+    """
+    ETag y Last-Modified con la versión de datos de la organización para
+    vistas de lectura (sync o async): si el cliente ya tiene la versión
+    actual responde 304 sin ejecutar la vista (ver
+    core/services/version_datos.py). Va debajo de @lectura_replica para
+    leer la versión de la misma BD que los datos.
+    """
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def _vista_async(request, *args, **kwargs):
+            actuales = await sync_to_async(validadores)(request)
+            if actuales is None:
+                return await vista(request, *args, **kwargs)
+            etag, last_modified, _ = actuales
+            respuesta = respuesta_no_modificada(request, etag, last_modified)
+            if respuesta is None:
+                respuesta = await vista(request, *args, **kwargs)
+            return agregar_validadores(request, respuesta, *actuales)
+        return _vista_async
+
+    @wraps(vista)
+    def _vista(request, *args, **kwargs):
+        actuales = validadores(request)
+        if actuales is None:
+            return vista(request, *args, **kwargs)
+        etag, last_modified, _ = actuales
+        respuesta = respuesta_no_modificada(request, etag, last_modified)
+        if respuesta is None:
+            respuesta = vista(request, *args, **kwargs)
+        return agregar_validadores(request, respuesta, *actuales)
+    return _vista
@@ -0,0 +1,73 @@
+"""
+Benchmark del render de PDFs del corte de caja.
+
+Usa contenido sintético (no toca la BD) y mide PDFs por segundo:
+  - en línea (un solo proceso, como antes dentro del request),
+  - con el pool de procesos de render_pdf,
+  - sirviendo desde el caché por contenido.
+
+    python manage.py benchmark_pdf
+    python manage.py benchmark_pdf --documentos 200 --facturas 60 --workers 4
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from core.services.pdf_corte_caja import renderizar
+from core.services.render_pdf import llave_pdf, renderizar_pdf
+
+
+def _contenido(indice, facturas):
+    return {
+        'fecha': f'2026-01-{indice % 28 + 1:02d}',
+        'facturas': [
+            [f'CLABE 0121800{indice:04d}{i:06d}', f'Proveedor {i} de prueba', 1000.0 + i * 37.5]
+            for i in range(facturas)
+        ],
+        'error': None,
+        'filas': [[f'{d}', f'{indice % 9 + 1}', f'${d * (indice % 9 + 1):,.2f}'] for d in (1000, 500, 200, 100, 50, 20)],
+        'tabulacion_total': 12345.0 + indice,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Mide PDFs por segundo del corte de caja (en línea, pool de procesos y caché).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documentos', type=int, default=100)
+        parser.add_argument('--facturas', type=int, default=40)
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+
+    def _reportar(self, etiqueta, documentos, segundos):
+        self.stdout.write(f"  {etiqueta:<10} {documentos / segundos:8.1f} PDFs/s  ({segundos * 1000:.0f} ms)")
+
+    def handle(self, *args, **opts):
+        contenidos = [_contenido(i, opts['facturas']) for i in range(opts['documentos'])]
+        self.stdout.write(
+            f"{opts['documentos']} cortes de caja x {opts['facturas']} facturas, {opts['workers']} workers"
+        )
+
+        inicio = time.perf_counter()
+        tamano = sum(len(renderizar('corte_caja', c)) for c in contenidos)
+        self._reportar('en línea', len(contenidos), time.perf_counter() - inicio)
+
+        with ProcessPoolExecutor(max_workers=opts['workers'],
+                                 mp_context=multiprocessing.get_context('spawn')) as ejecutor:
+            # Calentar: arrancar procesos e importar ReportLab antes de medir
+            list(ejecutor.map(renderizar, ['corte_caja'] * opts['workers'], contenidos[:opts['workers']]))
+            inicio = time.perf_counter()
+            list(ejecutor.map(renderizar, ['corte_caja'] * len(contenidos), contenidos))
+            self._reportar('pool', len(contenidos), time.perf_counter() - inicio)
+
+        for c in contenidos:
+            cache.set(llave_pdf('corte_caja', c), renderizar('corte_caja', c))
+        inicio = time.perf_counter()
+        for c in contenidos:
+            renderizar_pdf('corte_caja', c)
+        self._reportar('caché', len(contenidos), time.perf_counter() - inicio)
+
+        self.stdout.write(f"  tamaño promedio: {tamano / len(contenidos) / 1024:.1f} KB")
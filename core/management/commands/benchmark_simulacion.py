@@ -0,0 +1,56 @@
+"""
+Benchmark del simulador Monte Carlo de liquidez.
+
+Usa datos sintéticos (no toca la BD) para medir solo el núcleo vectorizado:
+
+    python manage.py benchmark_simulacion
+    python manage.py benchmark_simulacion --trayectorias 10000 --dias 90 --sucursales 8
+"""
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from core.services.simulacion_liquidez import simular_trayectorias, resumir_trayectorias
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo del simulador de liquidez (trayectorias x días) con datos sintéticos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trayectorias', type=int, default=10000)
+        parser.add_argument('--dias', type=int, default=90)
+        parser.add_argument('--sucursales', type=int, default=5)
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **opts):
+        rng = np.random.default_rng(42)
+        dias_hist = 180
+
+        historial = []
+        for _ in range(opts['sucursales']):
+            montos = rng.gamma(shape=4.0, scale=5000.0, size=dias_hist)
+            weekdays = np.arange(dias_hist) % 7
+            historial.append((montos, weekdays))
+
+        dias_semana = np.arange(opts['dias']) % 7
+        flujo = -rng.gamma(shape=2.0, scale=20000.0, size=opts['dias'])
+
+        tiempos = []
+        for i in range(opts['repeticiones']):
+            inicio = time.perf_counter()
+            saldos = simular_trayectorias(
+                50000.0, historial, dias_semana, flujo,
+                n_trayectorias=opts['trayectorias'], semilla=i,
+            )
+            resumen = resumir_trayectorias(saldos)
+            tiempos.append(time.perf_counter() - inicio)
+
+        self.stdout.write(
+            f"{opts['trayectorias']} trayectorias x {opts['dias']} días x "
+            f"{opts['sucursales']} sucursales"
+        )
+        self.stdout.write(f"  mejor:    {min(tiempos) * 1000:.1f} ms")
+        self.stdout.write(f"  mediana:  {sorted(tiempos)[len(tiempos) // 2] * 1000:.1f} ms")
+        self.stdout.write(f"  P(saldo < 0) = {resumen['prob_faltante_horizonte'] * 100:.1f}%")
@@ -0,0 +1,151 @@
+"""
+Peso de las páginas principales: HTML, CSS/JS en línea y recursos estáticos.
+
+Renderiza cada página con el cliente de pruebas (sesión del usuario dado) y
+mide lo que descarga el navegador:
+  - primera visita: HTML + CSS/JS/fuentes locales,
+  - visitas siguientes: solo el HTML (los estáticos con hash quedan en la
+    caché del navegador, ver STORAGES en settings),
+todo en bytes sin comprimir y comprimidos (gzip / brotli, como los sirve
+WhiteNoise). Los recursos de otros dominios (CDN) se listan sin medir.
+
+    python manage.py peso_paginas --email admin@empresa.com
+    python manage.py peso_paginas /core/calendario/ /core/reportes_facturas/ --email admin@empresa.com
+"""
+
+import gzip
+import re
+from datetime import date
+from posixpath import dirname, join, normpath
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from facturas.models import Facturas
+from users.models import User
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: solo se reporta gzip
+    brotli = None
+
+RE_INLINE = re.compile(r'<(style|script)(?![^>]*\bsrc=)[^>]*>(.*?)</\1>', re.S)
+RE_RECURSO = re.compile(r'<(?:link[^>]*\brel="stylesheet"[^>]*\bhref|script[^>]*\bsrc)="([^"]+)"')
+RE_URL_CSS = re.compile(r'url\(["\']?([^"\')]+)["\']?\)')
+RE_HASH = re.compile(r'\.[0-9a-f]{12}(\.\w+)$')
+
+
+def _kb(n):
+    return f'{n / 1024:7.1f}'
+
+
+def _tamanos(contenido):
+    return (
+        len(contenido),
+        len(gzip.compress(contenido, 6)),
+        len(brotli.compress(contenido)) if brotli else 0,
+    )
+
+
+def _archivo_estatico(url):
+    if not url.startswith(settings.STATIC_URL):
+        return None
+    nombre = url[len(settings.STATIC_URL):].split('?')[0].split('#')[0]
+    ruta = finders.find(nombre) or finders.find(RE_HASH.sub(r'\1', nombre))
+    return (nombre, ruta) if ruta else None
+
+
+def _recursos(html):
+    """{url: bytes} de CSS/JS locales y de las fuentes que referencian; lista de externos."""
+    locales, externos = {}, []
+    pendientes = list(RE_RECURSO.findall(html))
+    while pendientes:
+        url = pendientes.pop()
+        if url in locales:
+            continue
+        encontrado = _archivo_estatico(url)
+        if encontrado is None:
+            externos.append(url)
+            continue
+        nombre, ruta = encontrado
+        with open(ruta, 'rb') as f:
+            locales[url] = f.read()
+        if nombre.endswith('.css'):
+            for referencia in RE_URL_CSS.findall(locales[url].decode('utf-8', 'ignore')):
+                if not referencia.startswith(('data:', 'http')):
+                    pendientes.append(normpath(join(dirname(url), referencia)))
+    return locales, externos
+
+
+class Command(BaseCommand):
+    help = 'Mide el peso (HTML, en línea, estáticos; con y sin compresión) de las páginas principales.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*')
+        parser.add_argument('--email', help='usuario con el que se abren las páginas (por defecto el primero)')
+
+    def _urls(self, usuario):
+        hoy = date.today().isoformat()
+        urls = [
+            reverse('calendario-financiero'),
+            reverse('detalle-dia', args=[hoy]),
+            reverse('crear-factura', args=[hoy]),
+        ]
+        factura = Facturas.objects.filter(organizacion=usuario.organizacion).first()
+        if factura:
+            urls.append(reverse('editar-factura', args=[factura.pk, hoy]))
+        urls.append(reverse('reporte-facturas'))
+        return urls
+
+    def handle(self, *args, **opts):
+        usuarios = User.objects.filter(is_active=True, organizacion__isnull=False)
+        usuario = usuarios.filter(email=opts['email']).first() if opts['email'] else usuarios.first()
+        if usuario is None:
+            raise CommandError('No hay un usuario con organización para abrir las páginas (--email).')
+
+        cliente = Client()
+        cliente.force_login(usuario)
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            self._medir(cliente, usuario, opts['urls'] or self._urls(usuario))
+
+    def _medir(self, cliente, usuario, urls):
+        columnas = 'sin comprimir / gzip / brotli (KB)' if brotli else 'sin comprimir / gzip (KB)'
+        self.stdout.write(f'Usuario {usuario.email} · {columnas}')
+
+        todos, total_html = {}, [0, 0, 0]
+        for url in urls:
+            respuesta = cliente.get(url, secure=True)
+            if respuesta.status_code != 200 or respuesta.streaming:
+                self.stdout.write(self.style.WARNING(f'  {url}: HTTP {respuesta.status_code}, se omite'))
+                continue
+            html = respuesta.content.decode('utf-8')
+            en_linea = {'style': 0, 'script': 0}
+            for etiqueta, cuerpo in RE_INLINE.findall(html):
+                en_linea[etiqueta] += len(cuerpo.encode())
+            locales, externos = _recursos(html)
+            todos.update(locales)
+
+            t_html = _tamanos(respuesta.content)
+            t_recursos = [sum(x) for x in zip(*(_tamanos(c) for c in locales.values()))] or [0, 0, 0]
+            total_html = [a + b for a, b in zip(total_html, t_html)]
+            self.stdout.write(
+                f'\n  {url}\n'
+                f'    HTML                 {" / ".join(_kb(x) for x in t_html[:2 + bool(brotli)])}'
+                f'   (CSS en línea {_kb(en_linea["style"]).strip()} KB, JS en línea {_kb(en_linea["script"]).strip()} KB)\n'
+                f'    Estáticos ({len(locales):2d})       {" / ".join(_kb(x) for x in t_recursos[:2 + bool(brotli)])}\n'
+                f'    Primera visita       {" / ".join(_kb(a + b) for a, b in list(zip(t_html, t_recursos))[:2 + bool(brotli)])}\n'
+                f'    Visitas siguientes   {" / ".join(_kb(x) for x in t_html[:2 + bool(brotli)])}'
+            )
+            for url_externa in externos:
+                self.stdout.write(f'    Externo (sin medir)  {url_externa}')
+
+        t_todos = [sum(x) for x in zip(*(_tamanos(c) for c in todos.values()))] or [0, 0, 0]
+        self.stdout.write(
+            f'\n  Recorrido por todas las páginas (cada estático se descarga una vez)\n'
+            f'    HTML                 {" / ".join(_kb(x) for x in total_html[:2 + bool(brotli)])}\n'
+            f'    Estáticos ({len(todos):2d})       {" / ".join(_kb(x) for x in t_todos[:2 + bool(brotli)])}\n'
+            f'    Total                {" / ".join(_kb(a + b) for a, b in list(zip(total_html, t_todos))[:2 + bool(brotli)])}'
+        )
@@ -0,0 +1,92 @@
+"""
+Peso de la sincronización de los celulares: carga completa contra
+sincronización incremental (core/api/v1/sincronizacion/).
+
+Recorre todas las páginas de la API con el cliente de pruebas, como lo haría
+la app, y suma bytes sin comprimir y con gzip (nginx comprime el JSON, ver
+nginx/default.conf). Las incrementales parten de los últimos N cambios de la
+bitácora de la organización; no se escribe nada.
+
+    python manage.py peso_sincronizacion --email gerente@empresa.com
+    python manage.py peso_sincronizacion --cambios 10 50 500 --limite 1000
+"""
+
+import gzip
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.models import CambioDatos
+from core.services.sincronizacion import LIMITE_PAGINA
+from users.models import User
+
+
+def _kb(n):
+    return f'{n / 1024:9.1f}'
+
+
+class Command(BaseCommand):
+    help = 'Compara el peso de la carga completa contra la sincronización incremental.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='usuario que sincroniza (por defecto el primero con organización)')
+        parser.add_argument('--cambios', type=int, nargs='+', default=[10, 100, 1000],
+                            help='incrementales desde los últimos N cambios')
+        parser.add_argument('--limite', type=int, default=LIMITE_PAGINA, help='filas/cambios por página')
+
+    def handle(self, *args, **opts):
+        usuarios = User.objects.filter(is_active=True, organizacion__isnull=False)
+        usuario = usuarios.filter(email=opts['email']).first() if opts['email'] else usuarios.first()
+        if usuario is None:
+            raise CommandError('No hay un usuario con organización (--email).')
+
+        cliente = Client()
+        cliente.force_login(usuario)
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            self._medir(cliente, usuario, opts['cambios'], opts['limite'])
+
+    def _sincronizar(self, cliente, cursor, limite):
+        """(páginas, registros, eliminados, bytes, bytes gzip) hasta que no haya más."""
+        url = reverse('api-sincronizacion')
+        paginas = registros = eliminados = crudo = comprimido = 0
+        while True:
+            parametros = {'limite': limite}
+            if cursor is not None:
+                parametros['cursor'] = cursor
+            respuesta = cliente.get(url, parametros, secure=True)
+            if respuesta.status_code != 200:
+                raise CommandError(f'HTTP {respuesta.status_code}: {respuesta.content[:200]!r}')
+            datos = json.loads(respuesta.content)
+            paginas += 1
+            registros += sum(len(bloque['filas']) for bloque in datos['registros'].values())
+            eliminados += sum(len(ids) for ids in datos['eliminados'].values())
+            crudo += len(respuesta.content)
+            comprimido += len(gzip.compress(respuesta.content, 6))
+            cursor = datos['siguiente']
+            if not datos['hay_mas']:
+                return paginas, registros, eliminados, crudo, comprimido
+
+    def _medir(self, cliente, usuario, cantidades, limite):
+        organizacion = usuario.organizacion
+        self.stdout.write(f'Organización {organizacion.nombre} · {limite} por página · KB sin comprimir / gzip\n')
+        self.stdout.write(f'  {"escenario":<28}{"páginas":>8}{"registros":>11}{"eliminados":>11}'
+                          f'{"KB":>10}{"KB gzip":>10}{"% completa":>12}')
+
+        completa = self._sincronizar(cliente, None, limite)
+        filas = [('carga completa', completa)]
+
+        ids = CambioDatos.objects.filter(organizacion=organizacion).order_by('-id').values_list('id', flat=True)
+        for n in sorted(cantidades):
+            desde = list(ids[n - 1:n])
+            if not desde:
+                self.stdout.write(self.style.WARNING(f'  La bitácora tiene menos de {n} cambios, se omite.'))
+                continue
+            filas.append((f'últimos {n} cambios', self._sincronizar(cliente, str(desde[0] - 1), limite)))
+        filas.append(('sin cambios', self._sincronizar(cliente, str(ids.first() or 0), limite)))
+
+        for nombre, (paginas, registros, eliminados, crudo, comprimido) in filas:
+            porcentaje = 100 * comprimido / completa[4] if completa[4] else 0
+            self.stdout.write(f'  {nombre:<28}{paginas:>8}{registros:>11}{eliminados:>11}'
+                              f'{_kb(crudo):>10}{_kb(comprimido):>10}{porcentaje:>11.1f}%')
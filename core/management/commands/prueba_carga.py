@@ -0,0 +1,111 @@
+"""
+Prueba de carga local: requests por segundo y latencia de una o varias URLs.
+
+Para comparar la configuración anterior con la de producción, levantar
+ambas contra la misma BD y medir la misma URL:
+
+    gunicorn config.wsgi:application --bind 127.0.0.1:8001 --reload
+    PORT=8002 gunicorn -c config/gunicorn.conf.py
+    python manage.py prueba_carga http://127.0.0.1:8001/core/salud/ http://127.0.0.1:8002/core/salud/
+
+Para páginas con login se pasa la cookie de sesión de un navegador:
+
+    python manage.py prueba_carga URL1 URL2 --cookie "sessionid=..." --concurrencia 32
+"""
+
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def _cliente(url, cookie, hasta, latencias, errores, lock):
+    partes = urlsplit(url)
+    ruta = partes.path + (f'?{partes.query}' if partes.query else '')
+    encabezados = {'Cookie': cookie} if cookie else {}
+    conexion = None
+    propias, fallidas = [], 0
+
+    while time.perf_counter() < hasta:
+        reutilizada = conexion is not None
+        if conexion is None:
+            conexion = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=30)
+        inicio = time.perf_counter()
+        try:
+            conexion.request('GET', ruta, headers=encabezados)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status >= 400:
+                fallidas += 1
+            else:
+                propias.append(time.perf_counter() - inicio)
+            if respuesta.getheader('Connection', '').lower() == 'close':
+                conexion.close()
+                conexion = None
+        except (OSError, http.client.HTTPException):
+            # Un keep-alive cerrado por el servidor (p. ej. al reciclar un
+            # worker) se reintenta con una conexión nueva, como un navegador
+            if not reutilizada:
+                fallidas += 1
+            conexion.close()
+            conexion = None
+
+    if conexion is not None:
+        conexion.close()
+    with lock:
+        latencias.extend(propias)
+        errores[0] += fallidas
+
+
+class Command(BaseCommand):
+    help = 'Mide requests/s y latencia (p50/p95/p99) de una o varias URLs con clientes concurrentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+')
+        parser.add_argument('--concurrencia', type=int, default=16)
+        parser.add_argument('--duracion', type=float, default=10, help='segundos por URL')
+        parser.add_argument('--cookie', default='')
+
+    def _medir(self, url, opts):
+        latencias, errores, lock = [], [0], threading.Lock()
+        inicio = time.perf_counter()
+        hasta = inicio + opts['duracion']
+        hilos = [
+            threading.Thread(target=_cliente, args=(url, opts['cookie'], hasta, latencias, errores, lock))
+            for _ in range(opts['concurrencia'])
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return latencias, errores[0], time.perf_counter() - inicio
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{opts['concurrencia']} clientes, {opts['duracion']:.0f} s por URL")
+        resultados = []
+        for url in opts['urls']:
+            latencias, errores, segundos = self._medir(url, opts)
+            latencias.sort()
+            por_segundo = len(latencias) / segundos
+            resultados.append(por_segundo)
+            self.stdout.write(
+                f"  {url}\n"
+                f"    {por_segundo:8.1f} req/s  ok {len(latencias)}  errores {errores}\n"
+                f"    p50 {_percentil(latencias, 0.50) * 1000:.0f} ms  "
+                f"p95 {_percentil(latencias, 0.95) * 1000:.0f} ms  "
+                f"p99 {_percentil(latencias, 0.99) * 1000:.0f} ms  "
+                f"media {(statistics.fmean(latencias) if latencias else 0) * 1000:.0f} ms"
+            )
+
+        if len(resultados) > 1 and resultados[0]:
+            for url, por_segundo in zip(opts['urls'][1:], resultados[1:]):
+                self.stdout.write(f"  {url}: {por_segundo / resultados[0]:.2f}x respecto a la primera URL")
@@ -0,0 +1,123 @@
+"""
+Genera el subconjunto de Font Awesome que usa el proyecto (self-hosted).
+
+Busca las clases fa-* en plantillas, JS y código Python, y escribe en
+static/vendor/fontawesome/:
+  - css/iconos.css: la hoja de Font Awesome solo con los íconos usados,
+  - webfonts/*.woff2: las fuentes recortadas a esos glifos.
+
+El resultado se versiona en el repo; solo hace falta volver a correrlo al
+usar un ícono nuevo. Necesita las dependencias de desarrollo:
+
+    pip install fonttools brotli fontawesomefree==6.0.0
+    python manage.py subsetear_iconos
+"""
+
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DESTINO = Path('static') / 'vendor' / 'fontawesome'
+FUENTES = ('fa-solid-900', 'fa-regular-400', 'fa-brands-400')
+# Caras de compatibilidad con FA 4/5: el proyecto solo usa clases de FA 6
+CARAS_FA6 = ("'Font Awesome 6 Free'", "'Font Awesome 6 Brands'")
+
+RE_CLASE = re.compile(r'\bfa-[a-z0-9]+(?:-[a-z0-9]+)*')
+RE_ICONO = re.compile(r'^\.(fa-[a-z0-9-]+)::?before$')
+
+
+def _reglas(css):
+    """Reglas de primer nivel (con sus @media / @keyframes completos)."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    reglas, profundidad, inicio = [], 0, 0
+    for i, c in enumerate(css):
+        if c == '{':
+            profundidad += 1
+        elif c == '}':
+            profundidad -= 1
+            if profundidad == 0:
+                reglas.append(css[inicio:i + 1].strip())
+                inicio = i + 1
+    return reglas
+
+
+def _minificar(regla):
+    regla = re.sub(r'\s*([{};,])\s*', r'\1', re.sub(r'\s+', ' ', regla)).replace(';}', '}')
+    encabezado, llave, cuerpo = regla.partition('{')
+    return encabezado + llave + re.sub(r':\s+', ':', cuerpo)
+
+
+def clases_usadas(raiz):
+    usadas = set()
+    for patron in ('templates/**/*.html', 'static/js/**/*.js', '*/**/*.py'):
+        for archivo in raiz.glob(patron):
+            if 'migrations' in archivo.parts or 'vendor' in archivo.parts or archivo.name == Path(__file__).name:
+                continue
+            usadas.update(RE_CLASE.findall(archivo.read_text(encoding='utf-8', errors='ignore')))
+    return usadas
+
+
+class Command(BaseCommand):
+    help = 'Recorta Font Awesome a los íconos usados y lo deja en static/vendor/fontawesome/.'
+
+    def handle(self, *args, **opts):
+        try:
+            import fontawesomefree
+            from fontTools import subset
+        except ImportError:
+            raise CommandError('Faltan dependencias: pip install fonttools brotli fontawesomefree==6.0.0')
+
+        origen = Path(fontawesomefree.__file__).parent / 'static' / 'fontawesomefree'
+        raiz = Path(settings.BASE_DIR)
+        usadas = clases_usadas(raiz)
+
+        reglas, codigos, conocidas = [], set(), set()
+        for regla in _reglas((origen / 'css' / 'all.css').read_text(encoding='utf-8')):
+            encabezado, _, cuerpo = regla.partition('{')
+            selectores = [s.strip() for s in encabezado.split(',')]
+            iconos = [RE_ICONO.match(s) for s in selectores]
+
+            if all(iconos) and 'content' in cuerpo:
+                conocidas.update(m.group(1) for m in iconos)
+                propios = [s for s, m in zip(selectores, iconos) if m.group(1) in usadas]
+                if not propios:
+                    continue
+                codigos.add(int(re.search(r'content:\s*"\\([0-9a-f]+)"', cuerpo).group(1), 16))
+                reglas.append(f"{','.join(propios)}{{{cuerpo}")
+            elif encabezado.strip() == '@font-face':
+                if not any(cara in cuerpo for cara in CARAS_FA6):
+                    continue
+                # Solo woff2: todos los navegadores que soporta el sitio lo leen
+                cuerpo = re.sub(r'src:[^;}]*', lambda m: m.group(0).split(', url(')[0], cuerpo)
+                reglas.append(f"@font-face{{{cuerpo}")
+            else:
+                conocidas.update(RE_CLASE.findall(encabezado))
+                reglas.append(regla)
+
+        (raiz / DESTINO / 'css').mkdir(parents=True, exist_ok=True)
+        (raiz / DESTINO / 'webfonts').mkdir(parents=True, exist_ok=True)
+        css = '\n'.join(_minificar(r) for r in reglas) + '\n'
+        (raiz / DESTINO / 'css' / 'iconos.css').write_text(
+            f'/* Font Awesome Free 6.0.0 (fontawesome.com/license/free), recortado por subsetear_iconos */\n{css}',
+            encoding='utf-8',
+        )
+
+        opciones = subset.Options()
+        opciones.flavor = 'woff2'
+        opciones.layout_features = []
+        for nombre in FUENTES:
+            fuente = subset.load_font(str(origen / 'webfonts' / f'{nombre}.ttf'), opciones)
+            recorte = subset.Subsetter(opciones)
+            recorte.populate(unicodes=codigos)
+            recorte.subset(fuente)
+            ruta = raiz / DESTINO / 'webfonts' / f'{nombre}.woff2'
+            subset.save_font(fuente, str(ruta), opciones)
+            original = (origen / 'webfonts' / f'{nombre}.woff2').stat().st_size
+            self.stdout.write(f'  {nombre}.woff2: {original / 1024:.0f} KB -> {ruta.stat().st_size / 1024:.1f} KB')
+
+        self.stdout.write(f'  iconos.css: {len(css) / 1024:.1f} KB, {len(codigos)} íconos')
+        desconocidas = sorted(usadas - conocidas)
+        if desconocidas:
+            self.stdout.write(self.style.WARNING(f"  Sin regla en Font Awesome 6.0.0: {', '.join(desconocidas)}"))
@@ -0,0 +1,161 @@
+"""
+Tiempo de render de los templates de las páginas más pesadas.
+
+Abre cada página con el cliente de pruebas (sesión del usuario dado), guarda
+su contexto y después solo mide el render del template, sin consultas, con
+tres configuraciones:
+  - sin caché de loaders: el template se lee y compila en cada request,
+  - loaders en caché: la configuración de settings.TEMPLATES,
+  - + fragmentos: además con el caché de fragmentos caliente (la cuadrícula
+    del calendario, ver core/calendario_cuadricula.html).
+Al final compara `floatformat|intcomma` con el filtro `moneda` en una tabla
+de --filas montos.
+
+Para medir con muchos datos conviene un día y un rango de reportes cargados:
+
+    python manage.py tiempo_render --email admin@empresa.com --fecha 2025-03-31 --desde 2024-01-01
+"""
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Template, Context
+from django.template.backends.django import DjangoTemplates
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from users.models import User
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+SIN_CACHE_FRAGMENTOS = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+TABLA_HUMANIZE = '{% load humanize %}{% for v in valores %}<td>${{ v|floatformat:2|intcomma }}</td>{% endfor %}'
+TABLA_MONEDA = '{% load formato %}{% for v in valores %}<td>${{ v|moneda:2 }}</td>{% endfor %}'
+
+
+def _motor(nombre, loaders):
+    config = settings.TEMPLATES[0]
+    return DjangoTemplates({
+        'NAME': nombre,
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {**config['OPTIONS'], 'loaders': loaders},
+    })
+
+
+def _mediana_ms(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Compara el tiempo de render (sin/con caché de loaders y de fragmentos) de calendario, detalle del día y reportes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='usuario con el que se abren las páginas (por defecto el primero)')
+        parser.add_argument('--fecha', type=date.fromisoformat, help='día del detalle y mes del calendario (hoy)')
+        parser.add_argument('--desde', type=date.fromisoformat, help='inicio del rango de los reportes (un año antes de --fecha)')
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--filas', type=int, default=5000, help='filas de la comparación de filtros')
+
+    def _paginas(self, fecha, desde):
+        rango = {'fecha_inicio': desde.isoformat(), 'fecha_fin': fecha.isoformat()}
+        return [
+            ('GET', f"{reverse('calendario-financiero')}?year={fecha.year}&month={fecha.month}", None),
+            ('GET', reverse('detalle-dia', args=[fecha.isoformat()]), None),
+            ('POST', reverse('reporte-ventas-sucursal'), rango),
+            ('POST', reverse('reporte-facturas'), rango),
+            ('POST', reverse('reporte-movimientos'), rango),
+        ]
+
+    def _contextos(self, usuario, paginas):
+        """[(url, nombre del template, contexto, request)] de cada página."""
+        cliente = Client()
+        cliente.force_login(usuario)
+        capturados = []
+        for metodo, url, datos in paginas:
+            if metodo == 'POST':
+                respuesta = cliente.post(url, datos, secure=True)
+            else:
+                respuesta = cliente.get(url, secure=True)
+            if respuesta.status_code != 200 or not respuesta.templates:
+                self.stdout.write(self.style.WARNING(f'  {url}: HTTP {respuesta.status_code}, se omite'))
+                continue
+            capturados.append((
+                url,
+                respuesta.templates[0].name,
+                respuesta.context[0].flatten(),
+                respuesta.wsgi_request,
+            ))
+        return capturados
+
+    def handle(self, *args, **opts):
+        usuarios = User.objects.filter(is_active=True, organizacion__isnull=False)
+        usuario = usuarios.filter(email=opts['email']).first() if opts['email'] else usuarios.first()
+        if usuario is None:
+            raise CommandError('No hay un usuario con organización para abrir las páginas (--email).')
+        fecha = opts['fecha'] or date.today()
+        desde = opts['desde'] or fecha - timedelta(days=365)
+        repeticiones = opts['repeticiones']
+
+        # Instrumenta el render para que el cliente devuelva los contextos
+        setup_test_environment()
+        try:
+            paginas = self._contextos(usuario, self._paginas(fecha, desde))
+        finally:
+            teardown_test_environment()
+
+        motores = {
+            'sin caché': _motor('sin_cache', LOADERS),
+            'en caché': _motor('en_cache', [('django.template.loaders.cached.Loader', LOADERS)]),
+        }
+        self.stdout.write(
+            f'Usuario {usuario.email} · mediana de {repeticiones} renders (ms)\n'
+            f"  {'':45} {'sin caché':>10} {'loaders':>10} {'+ fragm.':>10}"
+        )
+
+        for url, nombre, contexto, request in paginas:
+            def render(motor):
+                return lambda: motor.get_template(nombre).render(contexto, request)
+
+            with override_settings(CACHES=SIN_CACHE_FRAGMENTOS):
+                sin_cache = _mediana_ms(render(motores['sin caché']), repeticiones)
+                render(motores['en caché'])()  # compila y guarda en el caché del loader
+                en_cache = _mediana_ms(render(motores['en caché']), repeticiones)
+            render(motores['en caché'])()  # llena el caché de fragmentos
+            fragmentos = _mediana_ms(render(motores['en caché']), repeticiones)
+
+            html = render(motores['en caché'])()
+            self.stdout.write(
+                f'  {url[:45]:45} {sin_cache:10.2f} {en_cache:10.2f} {fragmentos:10.2f}'
+                f'   ({len(html) / 1024:.0f} KB)'
+            )
+
+        # Mismo contenido con los dos filtros (ver core/templatetags/formato.py)
+        aleatorio = random.Random(0)
+        valores = [Decimal(aleatorio.randint(-10 ** 8, 10 ** 8)) / 100 for _ in range(opts['filas'])]
+        contexto = Context({'valores': valores})
+        humanize = Template(TABLA_HUMANIZE)
+        moneda = Template(TABLA_MONEDA)
+        if humanize.render(contexto) != moneda.render(contexto):
+            raise CommandError('floatformat|intcomma y moneda no dan el mismo resultado.')
+        t_humanize = _mediana_ms(lambda: humanize.render(contexto), max(repeticiones // 4, 3))
+        t_moneda = _mediana_ms(lambda: moneda.render(contexto), max(repeticiones // 4, 3))
+        self.stdout.write(
+            f"\n  Tabla de {opts['filas']} montos\n"
+            f'    floatformat:2|intcomma {t_humanize:10.2f} ms\n'
+            f'    moneda:2               {t_moneda:10.2f} ms   ({t_humanize / t_moneda:.1f}x)'
+        )
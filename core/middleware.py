@@ -0,0 +1,119 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from core.services.cuotas_peticiones import consumir, cubetas_compartidas
+from core.services.limites_consultas import perfil_consultas
+from core.services.ruteo_bd import COOKIE_PRIMARIA, hay_replica, ruteo_request
+
+logger = logging.getLogger(__name__)
+
+
+class LimiteConsultasMiddleware:
+    """
+    Todas las vistas corren con el límite de tiempo por consulta del perfil
+    'interactivo'; las pesadas lo amplían con @limite_consultas('reporte').
+    Funciona igual con vistas síncronas y async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self._llamar_async(request)
+        with perfil_consultas('interactivo'):
+            return self.get_response(request)
+
+    async def _llamar_async(self, request):
+        with perfil_consultas('interactivo'):
+            return await self.get_response(request)
+
+
+class RuteoBDMiddleware:
+    """
+    Estado de ruteo a la réplica de cada request (core/services/ruteo_bd.py).
+    Si el request escribió, deja una cookie para que los siguientes
+    REPLICA_RETRASO_S segundos el usuario lea solo de la primaria.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self._llamar_async(request)
+        with ruteo_request(fijada=COOKIE_PRIMARIA in request.COOKIES) as estado:
+            response = self.get_response(request)
+        return self._fijar_primaria(estado, response)
+
+    async def _llamar_async(self, request):
+        with ruteo_request(fijada=COOKIE_PRIMARIA in request.COOKIES) as estado:
+            response = await self.get_response(request)
+        return self._fijar_primaria(estado, response)
+
+    def _fijar_primaria(self, estado, response):
+        if estado.escribio and hay_replica():
+            response.set_cookie(
+                COOKIE_PRIMARIA, '1', max_age=settings.REPLICA_RETRASO_S,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class CuotasPeticionesMiddleware:
+    """
+    Cuota por organización y clase de vista (@cuota_peticiones, por defecto
+    'interactivo'). Al agotarse responde 429 con Retry-After sin ejecutar la
+    vista. Sin organización solo cuentan los webhooks, en una cubeta común.
+    Va después de SuscripcionMiddleware, que ya cargó la suscripción.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+        if settings.CUOTAS_PETICIONES_ACTIVAS and not cubetas_compartidas():
+            logger.warning(
+                'Cuotas de peticiones sin Redis: cada uno de los %s workers usa 1/%s del límite del plan',
+                settings.WEB_WORKERS, settings.WEB_WORKERS,
+            )
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, vista, args, kwargs):
+        if not settings.CUOTAS_PETICIONES_ACTIVAS:
+            return None
+        clase = getattr(vista, 'clase_cuota', 'interactivo')
+        organizacion = request.user.organizacion if request.user.is_authenticated else None
+        if organizacion is None and clase != 'webhook':
+            return None
+
+        plan = getattr(getattr(organizacion, 'suscripcion', None), 'plan', None) if organizacion else None
+        espera = consumir(clase, organizacion.pk if organizacion else 'sin_organizacion', plan)
+        if not espera:
+            return None
+        response = JsonResponse(
+            {'error': 'Demasiadas solicitudes; intenta de nuevo en unos segundos.'}, status=429,
+        )
+        response['Retry-After'] = str(espera)
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 06:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0004_version_datos_organizacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioDatos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('movimiento', 'Movimiento de cartera'), ('factura', 'Factura'), ('fecha_pago', 'Fecha de pago'), ('venta', 'Venta'), ('proveedor', 'Proveedor'), ('sucursal', 'Sucursal')], max_length=20)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('operacion', models.CharField(choices=[('CREAR', 'Crear'), ('EDITAR', 'Editar'), ('ELIMINAR', 'Eliminar')], max_length=10)),
+                ('fecha', models.DateField(blank=True, null=True)),
+                ('fecha_anterior', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('organizacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cambios', to='users.organizacion')),
+            ],
+            options={
+                'verbose_name': 'Cambio de datos',
+                'verbose_name_plural': 'Cambios de datos',
+                'indexes': [models.Index(fields=['organizacion', 'id'], name='cambio_org_cursor_idx')],
+            },
+        ),
+    ]
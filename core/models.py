@@ -1,3 +1,45 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class CambioDatos(models.Model):
+    """
+    Bitácora de cambios (solo se agrega) de movimientos, facturas, fechas de
+    pago, ventas, proveedores y sucursales. La escriben los servicios en la
+    misma transacción que el cambio (core/services/cambios_datos.py); el id
+    sirve de cursor para ponerse al día con /core/api/v1/cambios/?since=.
+    """
+    MODELOS = [
+        ('movimiento', 'Movimiento de cartera'),
+        ('factura', 'Factura'),
+        ('fecha_pago', 'Fecha de pago'),
+        ('venta', 'Venta'),
+        ('proveedor', 'Proveedor'),
+        ('sucursal', 'Sucursal'),
+    ]
+    OPERACIONES = [
+        ('CREAR', 'Crear'),
+        ('EDITAR', 'Editar'),
+        ('ELIMINAR', 'Eliminar'),
+    ]
+
+    organizacion = models.ForeignKey('users.Organizacion', on_delete=models.CASCADE, related_name='cambios')
+    modelo = models.CharField(max_length=20, choices=MODELOS)
+    objeto_id = models.PositiveBigIntegerField()
+    operacion = models.CharField(max_length=10, choices=OPERACIONES)
+    # Fecha de negocio afectada (fecha del movimiento, de la venta o de la
+    # cuota) y la que tenía antes si una edición la movió
+    fecha = models.DateField(null=True, blank=True)
+    fecha_anterior = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Cambio de datos'
+        verbose_name_plural = 'Cambios de datos'
+        indexes = [
+            # Lectura por cursor: organización e id mayor al último visto
+            models.Index(fields=['organizacion', 'id'], name='cambio_org_cursor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.operacion} {self.modelo} #{self.objeto_id}"
@@ -0,0 +1,25 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from core.services.ruteo_bd import REPLICA, leer_de_replica, marcar_escritura
+
+
+class RouterReplica:
+    """
+    Lecturas de las vistas con @lectura_replica a la réplica, todo lo demás a
+    la primaria (ver core/services/ruteo_bd.py).
+
+    Siempre devuelve un alias explícito: si no, Django usaría la BD de la
+    instancia y un objeto leído de la réplica se guardaría en ella.
+    """
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if leer_de_replica() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        marcar_escritura()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Misma información en ambas: un objeto de la réplica puede
+        # relacionarse con uno de la primaria
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}
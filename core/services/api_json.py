@@ -0,0 +1,143 @@
+"""
+API JSON v1 del calendario y del detalle del día (core/api/v1/...).
+
+Expone los mismos datos que las páginas (obtener_datos_calendario y
+obtener_datos_detalle_dia) en una forma compacta: columnas por día en el
+calendario y filas como listas (con los nombres en 'campos') en el detalle
+y en la bitácora de cambios.
+Los montos van como texto con dos decimales para no perder centavos.
+
+El ETag y el 304 los pone @condicional_por_version en las vistas, con la
+versión de datos de la organización (services/version_datos.py): así un 304
+no necesita ni consultar ni serializar el mes.
+"""
+
+from decimal import Decimal
+
+import orjson
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+
+CENTAVOS = Decimal('0.01')
+
+
+def _monto(valor):
+    return str(Decimal(valor or 0).quantize(CENTAVOS))
+
+
+# ============================================================
+# CALENDARIO
+# ============================================================
+
+def datos_calendario_json(contexto):
+    """
+    'inicio' es el número de celdas vacías antes del día 1 (la semana empieza
+    en domingo); las listas de 'dias' tienen un valor por día del mes.
+    """
+    semanas = contexto['dias_del_mes']
+    dias = [dia for semana in semanas for dia in semana if dia]
+    return {
+        'anio': contexto['year'],
+        'mes': contexto['month'],
+        'nombre_mes': contexto['month_name'],
+        'hoy': contexto['today'],
+        'anterior': [contexto['anio_anterior'], contexto['mes_anterior']],
+        'siguiente': [contexto['anio_siguiente'], contexto['mes_siguiente']],
+        'totales': {
+            campo: _monto(contexto[campo])
+            for campo in (
+                'saldo_total', 'cargo_total', 'total_facturas_mes', 'total_ventas_mes',
+                'total_pagos_realizados_mes', 'cuota_diaria_necesaria',
+            )
+        },
+        'inicio': semanas[0].index(dias[0]),
+        'dias': {
+            'facturas': [_monto(dia['total_facturas']) for dia in dias],
+            'ventas': [_monto(dia['total_ventas']) for dia in dias],
+            'saldo': [_monto(dia['saldo_dia']) for dia in dias],
+            'pendientes': [dia['facturas_pendientes'] for dia in dias],
+        },
+    }
+
+
+# ============================================================
+# DETALLE DEL DÍA
+# ============================================================
+
+def datos_detalle_dia_json(contexto):
+    fechas_pago = contexto['fechas_pago_dia']
+    return {
+        'fecha': contexto['fecha'],
+        'hoy': contexto['hoy'],
+        'anterior': contexto['fecha_anterior'],
+        'siguiente': contexto['fecha_siguiente'],
+        'totales': {
+            'cargo_total_dia': _monto(contexto['cargo_total_dia']),
+            'cargo_total_tabulacion': _monto(contexto['cargo_total_tabulacion']),
+            'cargo_restante_total_dia': _monto(contexto['cargo_restante_total_dia']),
+            'monto_total_facturas_dia': _monto(contexto['monto_total_facturas_dia']),
+            'venta_total_dia': _monto(contexto['venta_total_dia']),
+            'total_pago_del_dia': _monto(contexto['total_pago_del_dia']),
+            'cantidad_pagos_del_dia': contexto['cantidad_pagos_del_dia'],
+            'promedio_ventas_diarias': _monto(contexto['promedio_ventas_diarias']),
+            'dias_restantes': contexto['dias_restantes'],
+        },
+        'fechas_pago': {
+            'campos': ['id', 'factura_id', 'folio', 'proveedor', 'tipo', 'estado',
+                       'monto_por_pagar', 'monto_restante', 'monto_factura'],
+            'filas': [
+                [fp.id, fp.factura_id, fp.factura.folio, fp.factura.proveedor.nombre,
+                 fp.factura.tipo, fp.factura.estado, _monto(fp.monto_por_pagar),
+                 _monto(fp.monto_restante), _monto(fp.factura.monto)]
+                for fp in fechas_pago
+            ],
+        },
+        'ventas': {
+            'campos': ['id', 'sucursal', 'monto'],
+            'filas': [[venta.id, venta.sucursal.nombre, _monto(venta.monto)] for venta in contexto['ventas']],
+        },
+        'ventas_por_sucursal': {
+            'campos': ['sucursal', 'total', 'cantidad'],
+            'filas': [
+                [fila['sucursal__nombre'], _monto(fila['total']), fila['cantidad']]
+                for fila in contexto['ventas_por_sucursal']
+            ],
+        },
+    }
+
+
+# ============================================================
+# SALDOS (tarjetas del inicio)
+# ============================================================
+
+def datos_saldos_json(saldo_total, cargo_total):
+    return {'saldo_total': _monto(saldo_total), 'cargo_total': _monto(cargo_total)}
+
+
+# ============================================================
+# BITÁCORA DE CAMBIOS
+# ============================================================
+
+def datos_cambios_json(pagina):
+    """
+    Página de cambios_desde (services/cambios_datos.py). El cliente guarda
+    'cursor' y lo manda como ?since= en la siguiente; si 'hay_mas' pide de
+    inmediato la que sigue.
+    """
+    return {
+        'cursor': pagina['cursor'],
+        'hay_mas': pagina['hay_mas'],
+        'campos': ['cursor', 'modelo', 'id', 'operacion', 'fecha', 'fecha_anterior'],
+        'filas': pagina['filas'],
+    }
+
+
+# ============================================================
+# RESPUESTA
+# ============================================================
+
+def respuesta_json(request, datos):
+    """JSON serializado con orjson; el navegador siempre revalida."""
+    respuesta = HttpResponse(orjson.dumps(datos), content_type='application/json')
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
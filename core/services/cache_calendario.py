@@ -0,0 +1,170 @@
+"""
+Caché versionado de los meses del calendario financiero.
+
+Cada mes calculado se guarda por (organización, año, mes) bajo una llave que
+incluye dos contadores:
+  - versión del mes: se incrementa con cualquier escritura que toque una
+    fecha de ese mes (ventas, fechas de pago, pagos, ajustes).
+  - generación de la organización: se incrementa en cambios masivos que no
+    se pueden acotar a fechas (p. ej. eliminar una sucursal o un proveedor
+    borra en cascada ventas o facturas).
+
+Invalidar es solo incrementar un contador; los snapshots viejos quedan
+huérfanos y expiran solos. Así un precálculo en segundo plano que termina
+después de una escritura guarda su resultado bajo la versión anterior y
+nunca se sirve.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+from core.services.cache_versiones import incrementar_version
+from core.services.eventos import publicar_cambios
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24  # 24 horas
+
+# Meses que se están precalculando ahora mismo en este proceso
+_precalculando = set()
+_precalculando_lock = threading.Lock()
+
+
+# ============================================================
+# LLAVES Y VERSIONES
+# ============================================================
+
+def _llave_version_mes(organizacion_id, year, month):
+    return f'calendario_mes_version_{organizacion_id}_{year}_{month}'
+
+
+def _llave_generacion(organizacion_id):
+    return f'calendario_generacion_{organizacion_id}'
+
+
+def llave_snapshot(organizacion_id, year, month):
+    """Llave del snapshot vigente para el mes (incluye versión y generación)."""
+    llave_version = _llave_version_mes(organizacion_id, year, month)
+    llave_generacion = _llave_generacion(organizacion_id)
+    valores = cache.get_many([llave_version, llave_generacion])
+    return (
+        f'calendario_mes_{organizacion_id}_{year}_{month}'
+        f'_g{valores.get(llave_generacion, 0)}_v{valores.get(llave_version, 0)}'
+    )
+
+
+# ============================================================
+# INVALIDACIÓN
+# ============================================================
+
+def _meses_de(fechas):
+    return {(f.year, f.month) for f in fechas if f}
+
+
+def invalidar_calendario(organizacion, fechas):
+    """
+    Invalida los meses que contienen alguna de `fechas`.
+    Se ejecuta al confirmar la transacción para que nadie recalcule el mes
+    con datos que aún no son visibles. Después avisa a las páginas abiertas
+    (eventos en vivo, services/eventos.py).
+    """
+    if not organizacion:
+        return
+    organizacion_id = organizacion.id
+    fechas = [f for f in fechas if f]
+    meses = _meses_de(fechas)
+    if not meses:
+        return
+
+    def _invalidar():
+        for year, month in meses:
+            incrementar_version(_llave_version_mes(organizacion_id, year, month))
+
+    transaction.on_commit(_invalidar)
+    publicar_cambios(organizacion, fechas)
+
+
+def invalidar_calendario_organizacion(organizacion):
+    """Invalida todos los meses de la organización."""
+    if not organizacion:
+        return
+    organizacion_id = organizacion.id
+    transaction.on_commit(lambda: incrementar_version(_llave_generacion(organizacion_id)))
+    publicar_cambios(organizacion)
+
+
+# ============================================================
+# LECTURA Y PRECÁLCULO
+# ============================================================
+
+def obtener_snapshot(organizacion, year, month, calcular):
+    """
+    Devuelve el snapshot del mes desde el caché o lo calcula con
+    `calcular(organizacion, year, month)` y lo guarda.
+    El resultado incluye 'llave', que identifica la versión del snapshot
+    (sirve para cachear lo que se derive de él, p. ej. el HTML del mes).
+    """
+    # La llave se lee ANTES de calcular: si llega una escritura mientras
+    # tanto, el resultado queda bajo la versión vieja.
+    llave = llave_snapshot(organizacion.id, year, month)
+    snapshot = cache.get(llave)
+    if snapshot is None:
+        snapshot = calcular(organizacion, year, month)
+        cache.set(llave, snapshot, timeout=SNAPSHOT_TIMEOUT)
+    return {**snapshot, 'llave': llave}
+
+
+def _mes_desplazado(year, month, delta):
+    indice = year * 12 + (month - 1) + delta
+    return indice // 12, indice % 12 + 1
+
+
+def _precalcular(organizacion, meses, calcular):
+    try:
+        for year, month in meses:
+            try:
+                obtener_snapshot(organizacion, year, month, calcular)
+            except Exception:
+                # Solo es un adelanto: el mes se calcula al pedirlo
+                logger.exception('No se pudo precalcular %s/%s de la organización %s', month, year, organizacion.id)
+            finally:
+                with _precalculando_lock:
+                    _precalculando.discard((organizacion.id, year, month))
+    finally:
+        close_old_connections()
+
+
+def precalentar_meses_adyacentes(organizacion, year, month, calcular):
+    """
+    Calcula en un hilo de fondo el mes anterior y el siguiente si no están
+    en caché, para que la navegación entre meses se sirva desde el caché.
+    """
+    if not getattr(settings, 'CALENDARIO_PRECALENTAR', True) or not organizacion:
+        return None
+
+    pendientes = []
+    for delta in (-1, 1):
+        y, m = _mes_desplazado(year, month, delta)
+        if cache.get(llave_snapshot(organizacion.id, y, m)) is not None:
+            continue
+        with _precalculando_lock:
+            if (organizacion.id, y, m) in _precalculando:
+                continue
+            _precalculando.add((organizacion.id, y, m))
+        pendientes.append((y, m))
+
+    if not pendientes:
+        return None
+
+    hilo = threading.Thread(
+        target=_precalcular,
+        args=(organizacion, pendientes, calcular),
+        name=f'precalentar-calendario-{organizacion.id}',
+        daemon=True,
+    )
+    hilo.start()
+    return hilo
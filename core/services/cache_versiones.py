@@ -0,0 +1,25 @@
+"""
+Contadores de versión en el caché compartido.
+
+Los cachés versionados guardan sus datos bajo una llave que incluye el
+contador; invalidar es incrementarlo. Los datos viejos quedan huérfanos y
+expiran solos, y cualquier proceso que lea el contador ve el cambio.
+"""
+
+from django.core.cache import cache
+
+VERSION_TIMEOUT = None  # los contadores no expiran
+
+
+def obtener_version(llave):
+    return cache.get(llave, 0)
+
+
+def incrementar_version(llave):
+    # add() no pisa un contador existente; incr() es atómico en Redis/Memcached
+    cache.add(llave, 0, timeout=VERSION_TIMEOUT)
+    try:
+        cache.incr(llave)
+    except ValueError:
+        # El contador expiró entre add() e incr()
+        cache.set(llave, 1, timeout=VERSION_TIMEOUT)
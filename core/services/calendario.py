@@ -1,201 +1,197 @@
-from datetime import date, timedelta
+from collections import defaultdict
+from datetime import date
 from django.utils import timezone
 import calendar
-from django.db.models import Sum
-from facturas.models import Facturas, FacturasFechasDePago
+from facturas.models import FacturasFechasDePago
 from sucursales.models import Ventas
 from cartera.services.saldo_cargo import obtener_saldo_global as svc_saldo_global, obtener_cargo_total as svc_cargo_total
 from cartera.models import Movimientos_Cartera
-from django.db.models import Sum, Q
+from django.db.models import Count, Prefetch, Sum, Q
+from facturas.services.busqueda_folio import buscar_facturas_por_folio
+from asgiref.sync import async_to_sync
+from .cache_calendario import obtener_snapshot, precalentar_meses_adyacentes
+from .consultas_paralelo import consultas_en_paralelo
+
+MESES_ESPANOL = [
+    'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+    'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
+]
+
+
+def calcular_snapshot_mes(organizacion, year, month):
+    """
+    Datos del mes que solo dependen de los registros con fecha dentro del mes.
+    Se guardan en caché (ver cache_calendario) y no incluyen nada que dependa
+    del día actual, del saldo previo ni de la búsqueda por folio.
+
+    'saldo_mes' es el acumulado de flujos desde el día 1; el saldo mostrado se
+    obtiene sumándole el saldo previo al mes.
+    """
+    first_day = date(year, month, 1)
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+
+    cargos_dia, ventas_dia, ajustes_dia = obtener_flujos_diarios(organizacion, first_day, last_day)
+
+    # Conteo de fechas de pago por día y estado de la factura (una consulta)
+    conteos_dia = {
+        fila['fecha_por_pagar']: fila
+        for fila in FacturasFechasDePago.objects
+        .filter(factura__organizacion=organizacion, fecha_por_pagar__range=[first_day, last_day])
+        .values('fecha_por_pagar')
+        .annotate(
+            total=Count('id'),
+            pendientes=Count('id', filter=Q(factura__estado='PENDIENTE')),
+            pagadas=Count('id', filter=Q(factura__estado='PAGADO')),
+        )
+        .order_by()
+    }
+
+    semanas = []
+    saldo_mes = 0
+    cal = calendar.Calendar(firstweekday=6)  # Empezar en domingo
+
+    for semana in cal.monthdatescalendar(year, month):
+        semana_dias = []
+        for dia_fecha in semana:
+            if dia_fecha.month != month:
+                semana_dias.append(None)
+                continue
+
+            total_facturas_dia = cargos_dia.get(dia_fecha, 0)
+            total_ventas_dia = ventas_dia.get(dia_fecha, 0)
+            conteo = conteos_dia.get(dia_fecha, {})
+
+            # Saldo Inicial del día + Ventas - Pagos + Ajustes
+            saldo_mes += total_ventas_dia - total_facturas_dia + ajustes_dia.get(dia_fecha, 0)
+
+            semana_dias.append({
+                'fecha': dia_fecha,
+                'dia': dia_fecha.day,
+                'total_facturas': total_facturas_dia,
+                'total_ventas': total_ventas_dia,
+                'saldo_mes': saldo_mes,
+                'facturas_pendientes': conteo.get('pendientes', 0),
+                'facturas_pagadas': conteo.get('pagadas', 0),
+                'fechas_pago_count': conteo.get('total', 0),
+                'total_movimientos': total_facturas_dia + total_ventas_dia,
+            })
+        semanas.append(semana_dias)
+
+    total_facturas_mes = sum(cargos_dia.values())
+    fechas_pago_pendientes = sum(c['pendientes'] for c in conteos_dia.values())
+
+    # Total Pagos Realizados en el mes (Movimientos tipo PAGO)
+    total_pagos_realizados_mes = Movimientos_Cartera.objects.filter(
+        organizacion=organizacion,
+        origen='PAGO',
+        fecha__range=[first_day, last_day]
+    ).aggregate(total=Sum('monto'))['total'] or 0
+
+    # Cuota Diaria (Total Cargo Mes / Dias del Mes)
+    num_dias_mes = (last_day - first_day).days + 1
+
+    return {
+        'semanas': semanas,
+        'total_facturas_mes': total_facturas_mes,
+        'total_pagos_realizados_mes': total_pagos_realizados_mes,
+        'cuota_diaria_necesaria': total_facturas_mes / num_dias_mes,
+        'total_ventas_mes': sum(ventas_dia.values()),
+        'fechas_pago_pendientes': fechas_pago_pendientes,
+    }
+
+
+def _buscar_folio(organizacion, folio_busqueda):
+    return list(
+        buscar_facturas_por_folio(organizacion, folio_busqueda)
+        .select_related('proveedor')
+        .prefetch_related(Prefetch(
+            'facturasfechasdepago_set',
+            queryset=FacturasFechasDePago.objects.order_by('fecha_por_pagar'),
+        ))
+    )
+
 
 def obtener_datos_calendario(year, month, user, folio_busqueda=''):
+    user.organizacion  # la FK se carga aquí: dentro del event loop no se puede consultar
+    return async_to_sync(aobtener_datos_calendario)(year, month, user, folio_busqueda)
+
+
+async def aobtener_datos_calendario(year, month, user, folio_busqueda=''):
     today = timezone.localtime().date()
     
     if year and month:
         try:
             year = int(year)
             month = int(month)
-            current_date = date(year, month, 1)
+            date(year, month, 1)
         except (ValueError, TypeError):
-            current_date = today
+            year, month = today.year, today.month
     else:
-        current_date = today
-        year = current_date.year
-        month = current_date.month
+        year = today.year
+        month = today.month
     
-    # Obtener el primer y último día del mes
     first_day = date(year, month, 1)
-    if month == 12:
-        last_day = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        last_day = date(year, month + 1, 1) - timedelta(days=1)
-    
-    # Obtener datos de Cartera (Globales de la organización)
-    saldo_total = svc_saldo_global(user)
-    cargo_total = svc_cargo_total(user)
+    organizacion = user.organizacion
 
-    # Base Querysets filtered by Organization
-    fecha_pago_base_qs = FacturasFechasDePago.objects.filter(
-        factura__organizacion=user.organizacion
-    )
-    ventas_base_qs = Ventas.objects.filter(
-        sucursal__organizacion=user.organizacion
-    )
-    movimientos_base_qs = Movimientos_Cartera.objects.filter(
-        organizacion=user.organizacion
-    )
-    facturas_base_qs = Facturas.objects.filter(
-        organizacion=user.organizacion
-    )
+    # Consultas independientes en paralelo (ver consultas_paralelo):
+    # - saldo y cargo globales de cartera
+    # - snapshot del mes (caché versionado por organización/año/mes)
+    # - saldo acumulado previo al mes (cambia con escrituras de meses anteriores)
+    # - búsqueda por folio (índice de trigramas / FTS5, ver busqueda_folio)
+    consultas = {
+        'saldo_total': lambda: svc_saldo_global(user),
+        'cargo_total': lambda: svc_cargo_total(user),
+        'snapshot': lambda: obtener_snapshot(organizacion, year, month, calcular_snapshot_mes),
+        'saldo_previo': lambda: obtener_saldo_acumulado_previo(organizacion, first_day),
+    }
+    if folio_busqueda:
+        consultas['facturas_filtradas'] = lambda: _buscar_folio(organizacion, folio_busqueda)
+    resultados = await consultas_en_paralelo(**consultas)
 
-    # Obtener FECHAS DE PAGO del mes (no facturas directamente)
-    fechas_pago_mes = fecha_pago_base_qs.filter(
-        fecha_por_pagar__range=[first_day, last_day]
-    ).select_related('factura', 'factura__proveedor')
-    
-    # Obtener ventas del mes
-    ventas_mes = ventas_base_qs.filter(
-        fecha__range=[first_day, last_day]
-    )
-    
-    # Inicializar variables para el filtro de folio
-    facturas_filtradas = None
+    saldo_total = resultados['saldo_total']
+    cargo_total = resultados['cargo_total']
+    snapshot = resultados['snapshot']
+    saldo_previo = resultados['saldo_previo']
+
+    facturas_filtradas = resultados.get('facturas_filtradas')
     fechas_factura_filtrada = []
-    
-    # Procesar búsqueda por folio
+    fechas_filtro_por_dia = defaultdict(list)
+
     if folio_busqueda:
-        # Buscar facturas por folio (búsqueda insensible a mayúsculas y parcial)
-        facturas_filtradas = facturas_base_qs.filter(
-            folio__icontains=folio_busqueda
-        ).prefetch_related('facturasfechasdepago_set')
-        
-        # Obtener todas las fechas de pago de las facturas encontradas
+        # Agrupar las fechas de pago encontradas por factura y por día
         for factura in facturas_filtradas:
-            # Obtener las fechas de pago de esta factura
-            fechas_pago_factura = factura.facturasfechasdepago_set.all()
-            for fecha_pago in fechas_pago_factura:
-                fechas_factura_filtrada.append({
+            factura.fechas_encontradas = []
+            for fecha_pago in factura.facturasfechasdepago_set.all():
+                item = {
                     'fecha': fecha_pago.fecha_por_pagar,
                     'factura_id': factura.id,
                     'folio': factura.folio or f"Sin folio (ID: {factura.id})",
                     'proveedor': factura.proveedor.nombre,
                     'monto_por_pagar': fecha_pago.monto_por_pagar
-                })
-    
-    # Calcular totales por día usando fechas de pago
-    dias_del_mes = []
-    
-    # Calcular saldo acumulado previo al mes actual
-    # Suma de todas las ventas anteriores al primer día del mes
-    ventas_anteriores = ventas_base_qs.filter(fecha__lt=first_day).aggregate(total=Sum('monto'))['total'] or 0
-    # Suma de todas las fechas de pago anteriores al primer día del mes
-    pagos_anteriores = fecha_pago_base_qs.filter(fecha_por_pagar__lt=first_day).aggregate(total=Sum('monto_por_pagar'))['total'] or 0
-    
-    # Calcular Ajustes anteriores
-    ajustes_anteriores = movimientos_base_qs.filter(fecha__lt=first_day).aggregate(
-        suma=Sum('monto', filter=Q(origen='AJUSTE_SUMA')),
-        resta=Sum('monto', filter=Q(origen='AJUSTE_RESTA'))
-    )
-    ajustes_suma_ant = ajustes_anteriores['suma'] or 0
-    ajustes_resta_ant = ajustes_anteriores['resta'] or 0
-    
-    saldo_acumulado = (ventas_anteriores + ajustes_suma_ant) - (pagos_anteriores + ajustes_resta_ant)
+                }
+                factura.fechas_encontradas.append(item)
+                fechas_factura_filtrada.append(item)
+                fechas_filtro_por_dia[fecha_pago.fecha_por_pagar].append(item)
 
-    # Crear calendario
-    cal = calendar.Calendar(firstweekday=6)  # Empezar en domingo
-    
-    for semana in cal.monthdatescalendar(year, month):
+    # Capa por request sobre el snapshot: saldo previo, día actual y folio
+    dias_del_mes = []
+    for semana in snapshot['semanas']:
         semana_dias = []
-        for dia_fecha in semana:
-            if dia_fecha.month == month:
-                # FECHAS DE PAGO del día (no facturas)
-                fechas_pago_dia = fechas_pago_mes.filter(fecha_por_pagar=dia_fecha)
-                
-                # Verificar si este día tiene fechas de pago de la factura buscada
-                fechas_filtro_en_dia = []
-                if folio_busqueda:
-                    for fecha_filtro in fechas_factura_filtrada:
-                        if fecha_filtro['fecha'] == dia_fecha:
-                            fechas_filtro_en_dia.append(fecha_filtro)
-                
-                # Sumar montos de las fechas de pago
-                total_facturas_dia = fechas_pago_dia.aggregate(
-                    total=Sum('monto_por_pagar')
-                )['total'] or 0
-                
-                # Ventas del día
-                ventas_dia = ventas_mes.filter(fecha=dia_fecha)
-                total_ventas_dia = ventas_dia.aggregate(
-                    total=Sum('monto')
-                )['total'] or 0
-                
-                # Calcular Ajustes del día
-                ajustes_dia = movimientos_base_qs.filter(fecha=dia_fecha).aggregate(
-                    suma=Sum('monto', filter=Q(origen='AJUSTE_SUMA')),
-                    resta=Sum('monto', filter=Q(origen='AJUSTE_RESTA'))
-                )
-                ajuste_suma_dia = ajustes_dia['suma'] or 0
-                ajuste_resta_dia = ajustes_dia['resta'] or 0
-                
-                # Actualizar saldo acumulado (Saldo Inicial del día + Ventas - Pagos + Ajustes)
-                saldo_acumulado += (total_ventas_dia - total_facturas_dia + ajuste_suma_dia - ajuste_resta_dia)
-                saldo_dia_mostrar = saldo_acumulado
-
-                # Contar facturas PENDIENTES del día
-                facturas_pendientes = fechas_pago_dia.filter(
-                    factura__estado='PENDIENTE'
-                ).count()
-                
-                # Contar facturas PAGADAS del día
-                facturas_pagadas = fechas_pago_dia.filter(
-                    factura__estado='PAGADO'
-                ).count()
-                
-                # Contar fechas de pago (no facturas)
-                cantidad_fechas_pago = fechas_pago_dia.count()
-                
-                semana_dias.append({
-                    'fecha': dia_fecha,
-                    'dia': dia_fecha.day,
-                    'es_hoy': dia_fecha == today,
-                    'total_facturas': total_facturas_dia,
-                    'total_ventas': total_ventas_dia,
-                    'saldo_dia': saldo_dia_mostrar,
-                    'facturas_pendientes': facturas_pendientes,
-                    'facturas_pagadas': facturas_pagadas,
-                    'fechas_pago_count': cantidad_fechas_pago,
-                    'total_movimientos': total_facturas_dia + total_ventas_dia,
-                    'tiene_factura_filtrada': len(fechas_filtro_en_dia) > 0,
-                    'fechas_filtro': fechas_filtro_en_dia,
-                })
-            else:
+        for dia in semana:
+            if dia is None:
                 semana_dias.append(None)
-        dias_del_mes.append(semana_dias)
-    
-    # Calcular resumen mensual basado en FECHAS DE PAGO
-    total_facturas_mes = fechas_pago_mes.aggregate(
-        total=Sum('monto_por_pagar')
-    )['total'] or 0
+                continue
 
-    # Total Pagos Realizados en el mes (Movimientos tipo PAGO)
-    total_pagos_realizados_mes = movimientos_base_qs.filter(
-        origen='PAGO',
-        fecha__range=[first_day, last_day]
-    ).aggregate(total=Sum('monto'))['total'] or 0
+            fechas_filtro_en_dia = fechas_filtro_por_dia.get(dia['fecha'], [])
+            semana_dias.append({
+                **dia,
+                'es_hoy': dia['fecha'] == today,
+                'saldo_dia': saldo_previo + dia['saldo_mes'],
+                'tiene_factura_filtrada': len(fechas_filtro_en_dia) > 0,
+                'fechas_filtro': fechas_filtro_en_dia,
+            })
+        dias_del_mes.append(semana_dias)
 
-    # Cuota Diaria (Total Cargo Mes / Dias del Mes)
-    num_dias_mes = (last_day - first_day).days + 1
-    cuota_diaria_necesaria = 0
-    if num_dias_mes > 0:
-        cuota_diaria_necesaria = total_facturas_mes / num_dias_mes
-    
-    total_ventas_mes = ventas_mes.aggregate(total=Sum('monto'))['total'] or 0
-    
-    # Contar fechas de pago pendientes del mes
-    fechas_pago_pendientes = fechas_pago_mes.filter(
-        factura__estado='PENDIENTE'
-    ).count()
-    
     # Navegación entre meses
     if month == 1:
         mes_anterior = 12
@@ -211,25 +207,22 @@ def obtener_datos_calendario(year, month, user, folio_busqueda=''):
         mes_siguiente = month + 1
         anio_siguiente = year
     
-    # Nombres de meses en español
-    meses_espanol = [
-        'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
-        'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
-    ]
-    
     return {
         'year': year,
         'month': month,
-        'month_name': meses_espanol[month - 1],
+        'month_name': MESES_ESPANOL[month - 1],
         'today': today,
         'dias_del_mes': dias_del_mes,
+        # Llave del fragmento en caché de la cuadrícula (ver calendario_cuadricula.html)
+        'llave_snapshot': snapshot['llave'],
+        'saldo_previo': saldo_previo,
         'saldo_total': saldo_total,
         'cargo_total': cargo_total,
-        'total_facturas_mes': total_facturas_mes,
-        'total_pagos_realizados_mes': total_pagos_realizados_mes,
-        'cuota_diaria_necesaria': cuota_diaria_necesaria,
-        'total_ventas_mes': total_ventas_mes,
-        'fechas_pago_pendientes': fechas_pago_pendientes,
+        'total_facturas_mes': snapshot['total_facturas_mes'],
+        'total_pagos_realizados_mes': snapshot['total_pagos_realizados_mes'],
+        'cuota_diaria_necesaria': snapshot['cuota_diaria_necesaria'],
+        'total_ventas_mes': snapshot['total_ventas_mes'],
+        'fechas_pago_pendientes': snapshot['fechas_pago_pendientes'],
         'mes_anterior': mes_anterior,
         'anio_anterior': anio_anterior,
         'mes_siguiente': mes_siguiente,
@@ -240,5 +233,75 @@ def obtener_datos_calendario(year, month, user, folio_busqueda=''):
         'fechas_factura_filtrada': fechas_factura_filtrada,
     }
 
+
+def precalentar_calendario(user, year, month):
+    """Precalcula en segundo plano el mes anterior y el siguiente."""
+    return precalentar_meses_adyacentes(user.organizacion, year, month, calcular_snapshot_mes)
+
+def obtener_saldo_acumulado_previo(organizacion, first_day):
+    """
+    Saldo proyectado del calendario al cierre del día anterior a `first_day`:
+    (Ventas + Ajustes Suma) - (Fechas de pago + Ajustes Resta).
+    """
+    # Suma de todas las ventas anteriores al primer día del mes
+    ventas_anteriores = Ventas.objects.filter(
+        sucursal__organizacion=organizacion, fecha__lt=first_day
+    ).aggregate(total=Sum('monto'))['total'] or 0
+    # Suma de todas las fechas de pago anteriores al primer día del mes
+    pagos_anteriores = FacturasFechasDePago.objects.filter(
+        factura__organizacion=organizacion, fecha_por_pagar__lt=first_day
+    ).aggregate(total=Sum('monto_por_pagar'))['total'] or 0
+
+    # Calcular Ajustes anteriores
+    ajustes_anteriores = Movimientos_Cartera.objects.filter(
+        organizacion=organizacion, fecha__lt=first_day
+    ).aggregate(
+        suma=Sum('monto', filter=Q(origen='AJUSTE_SUMA')),
+        resta=Sum('monto', filter=Q(origen='AJUSTE_RESTA'))
+    )
+    ajustes_suma_ant = ajustes_anteriores['suma'] or 0
+    ajustes_resta_ant = ajustes_anteriores['resta'] or 0
+
+    return (ventas_anteriores + ajustes_suma_ant) - (pagos_anteriores + ajustes_resta_ant)
+
+
+def obtener_flujos_diarios(organizacion, first_day, last_day):
+    """
+    Totales por día del rango con una consulta agrupada por tabla.
+    Retorna tres dicts {fecha: monto}: cargos (fechas de pago), ventas y
+    ajustes (suma - resta). Los días sin movimiento no aparecen.
+    """
+    cargos = dict(
+        FacturasFechasDePago.objects
+        .filter(factura__organizacion=organizacion, fecha_por_pagar__range=[first_day, last_day])
+        .values_list('fecha_por_pagar')
+        .annotate(total=Sum('monto_por_pagar'))
+        .order_by()
+    )
+    ventas = dict(
+        Ventas.objects
+        .filter(sucursal__organizacion=organizacion, fecha__range=[first_day, last_day])
+        .values_list('fecha')
+        .annotate(total=Sum('monto'))
+        .order_by()
+    )
+    ajustes = {}
+    filas_ajustes = (
+        Movimientos_Cartera.objects
+        .filter(organizacion=organizacion, fecha__range=[first_day, last_day],
+                origen__in=['AJUSTE_SUMA', 'AJUSTE_RESTA'])
+        .values('fecha')
+        .annotate(
+            suma=Sum('monto', filter=Q(origen='AJUSTE_SUMA')),
+            resta=Sum('monto', filter=Q(origen='AJUSTE_RESTA'))
+        )
+        .order_by()
+    )
+    for fila in filas_ajustes:
+        ajustes[fila['fecha']] = (fila['suma'] or 0) - (fila['resta'] or 0)
+
+    return cargos, ventas, ajustes
+
+
 def obtener_saldo_global(user):
     return svc_saldo_global(user)
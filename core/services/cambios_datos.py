@@ -0,0 +1,84 @@
+"""
+Bitácora de cambios (CambioDatos) para cachés, resúmenes y clientes que se
+actualizan de forma incremental.
+
+Los servicios de escritura llaman `registrar_cambios` al final de su
+transacción con lo que crearon, editaron o borraron. Primero sube la versión
+de datos de la organización (version_datos.py): ese UPDATE bloquea la fila
+de la organización hasta el commit, así dos escrituras de la misma
+organización no se cruzan y los ids de la bitácora quedan en el orden en que
+se confirmaron. Por eso el id sirve de cursor: quien leyó hasta N no se
+salta nada leyendo después los mayores a N.
+
+Cada cambio es una tupla (modelo, objeto_id, operacion, fecha, fecha_anterior)
+con los valores de CambioDatos.MODELOS y OPERACIONES.
+"""
+
+from core.models import CambioDatos
+
+from .version_datos import marcar_datos_modificados
+
+CREAR, EDITAR, ELIMINAR = 'CREAR', 'EDITAR', 'ELIMINAR'
+
+LIMITE_PAGINA = 500
+LIMITE_PAGINA_MAX = 2000
+
+
+def cambio(modelo, objeto_id, operacion, fecha=None, fecha_anterior=None):
+    return (modelo, objeto_id, operacion, fecha, fecha_anterior)
+
+
+def cambios_de(queryset, modelo, operacion, campo_fecha=None):
+    """
+    Cambios para todas las filas del queryset. Para borrados en bloque o en
+    cascada hay que leerlos antes de borrar.
+    """
+    if campo_fecha:
+        filas = queryset.values_list('pk', campo_fecha)
+    else:
+        filas = ((pk, None) for pk in queryset.values_list('pk', flat=True))
+    return [cambio(modelo, pk, operacion, fecha) for pk, fecha in filas]
+
+
+def registrar_cambios(organizacion, cambios):
+    """Sube la versión de datos y agrega los cambios a la bitácora."""
+    if not organizacion:
+        return
+    marcar_datos_modificados(organizacion)
+    CambioDatos.objects.bulk_create([
+        CambioDatos(
+            organizacion=organizacion,
+            modelo=modelo,
+            objeto_id=objeto_id,
+            operacion=operacion,
+            fecha=fecha,
+            fecha_anterior=fecha_anterior if fecha_anterior != fecha else None,
+        )
+        for modelo, objeto_id, operacion, fecha, fecha_anterior in cambios
+    ])
+
+
+# ============================================================
+# LECTURA POR CURSOR
+# ============================================================
+
+def cambios_desde(organizacion, cursor=0, limite=LIMITE_PAGINA):
+    """
+    Cambios de la organización con id mayor a `cursor`, en orden, hasta
+    `limite`. Usa el índice (organizacion, id): el costo depende de los
+    cambios nuevos, no del tamaño de las tablas.
+    """
+    limite = max(1, min(limite, LIMITE_PAGINA_MAX))
+    filas = list(
+        CambioDatos.objects
+        .filter(organizacion=organizacion, id__gt=cursor)
+        .order_by('id')
+        .values_list('id', 'modelo', 'objeto_id', 'operacion', 'fecha', 'fecha_anterior')[:limite + 1]
+    )
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    return {
+        'cursor': filas[-1][0] if filas else cursor,
+        'hay_mas': hay_mas,
+        'filas': filas,
+    }
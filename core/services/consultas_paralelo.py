@@ -0,0 +1,80 @@
+"""
+Consultas independientes en paralelo para las vistas async.
+
+Cada consulta es una función síncrona (ORM normal) que se ejecuta en un hilo
+del executor por defecto del event loop, con su propia conexión a la BD; la
+vista espera a todas a la vez, así que tarda lo que la más lenta y no la
+suma de todas.
+
+Si la conexión del hilo principal está dentro de una transacción (p. ej.
+TestCase o un `atomic()` del llamador), las conexiones de otros hilos no
+verían sus datos sin confirmar: en ese caso las consultas corren una tras
+otra en ese mismo hilo.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from core.services.limites_consultas import es_tiempo_agotado
+
+_AGOTADA = object()
+
+
+def _en_transaccion():
+    return connection.in_atomic_block
+
+
+def _en_hilo(consulta):
+    def ejecutar():
+        try:
+            return consulta()
+        finally:
+            # El hilo se reutiliza: respeta CONN_MAX_AGE igual que un request
+            close_old_connections()
+    return ejecutar
+
+
+async def consultas_en_paralelo(**consultas):
+    """
+    Ejecuta `consultas` (nombre -> función sin argumentos) y devuelve
+    {nombre: resultado}. Los querysets deben evaluarse dentro de la función
+    (list(), aggregate(), ...), no devolverse perezosos.
+    """
+    if not getattr(settings, 'CONSULTAS_EN_PARALELO', True) or await sync_to_async(_en_transaccion)():
+        return {nombre: await sync_to_async(consulta)() for nombre, consulta in consultas.items()}
+
+    resultados = await asyncio.gather(*(
+        sync_to_async(_en_hilo(consulta), thread_sensitive=False)()
+        for consulta in consultas.values()
+    ))
+    return dict(zip(consultas, resultados))
+
+
+def _tolerante(consulta):
+    def ejecutar():
+        try:
+            return consulta()
+        except Exception as e:
+            if es_tiempo_agotado(e):
+                return _AGOTADA
+            raise
+    return ejecutar
+
+
+async def consultas_parciales(respaldos, **consultas):
+    """
+    Como `consultas_en_paralelo`, pero si una consulta se cancela por el
+    límite de tiempo (ver limites_consultas) devuelve su valor de
+    `respaldos` en lugar de fallar todo el reporte.
+    Devuelve ({nombre: resultado}, [nombres de las consultas canceladas]).
+    """
+    resultados = await consultas_en_paralelo(**{
+        nombre: _tolerante(consulta) for nombre, consulta in consultas.items()
+    })
+    incompletas = [nombre for nombre, valor in resultados.items() if valor is _AGOTADA]
+    for nombre in incompletas:
+        resultados[nombre] = respaldos[nombre]
+    return resultados, incompletas
@@ -0,0 +1,119 @@
+"""
+Cuotas de peticiones por organización y clase de vista (token bucket).
+
+Cada organización tiene una cubeta por clase ('interactivo', 'reporte',
+'exportacion', 'pdf', 'webhook'): cada petición gasta una ficha y las fichas
+se reponen a ritmo constante hasta la capacidad. Así una organización que
+pide reportes de un año o exportaciones en bucle agota su propia cubeta y no
+los workers de todas. Capacidad y reposición por plan de la suscripción
+están en settings.CUOTAS_PETICIONES.
+
+Con REDIS_URL la cubeta vive en Redis y se actualiza en un script Lua
+(atómico entre todos los workers). Sin Redis vive en el caché local del
+proceso, protegida con un candado, y cada worker recibe su parte del límite
+(capacidad y reposición entre settings.WEB_WORKERS) para que la
+organización no obtenga el límite multiplicado por el número de workers. Si
+Redis no responde la petición pasa: la cuota protege la capacidad, no debe
+tumbar el servicio.
+"""
+
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import redis
+except ImportError:  # sin redis las cubetas son del proceso
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CLASES = ('interactivo', 'reporte', 'exportacion', 'pdf', 'webhook')
+PLAN_POR_DEFECTO = 'BASICO'
+
+_lock = threading.Lock()
+_script = None
+
+# KEYS[1] cubeta; ARGV: capacidad, fichas por segundo, ahora, expiración (s).
+# Devuelve {1, fichas} si pasa o {0, fichas} si no alcanza.
+_CONSUMIR_LUA = """
+local capacidad = tonumber(ARGV[1])
+local ritmo = tonumber(ARGV[2])
+local ahora = tonumber(ARGV[3])
+local cubeta = redis.call('HMGET', KEYS[1], 'fichas', 'ts')
+local fichas = tonumber(cubeta[1]) or capacidad
+local ts = tonumber(cubeta[2]) or ahora
+fichas = math.min(capacidad, fichas + math.max(0, ahora - ts) * ritmo)
+local pasa = 0
+if fichas >= 1 then
+    fichas = fichas - 1
+    pasa = 1
+end
+redis.call('HSET', KEYS[1], 'fichas', tostring(fichas), 'ts', tostring(ahora))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {pasa, tostring(fichas)}
+"""
+
+
+def cubetas_compartidas():
+    return redis is not None and bool(getattr(settings, 'REDIS_URL', None))
+
+
+def limites(plan, clase):
+    """(capacidad, fichas por minuto) de la clase para el plan."""
+    cuotas = settings.CUOTAS_PETICIONES
+    return cuotas.get(plan or PLAN_POR_DEFECTO, cuotas[PLAN_POR_DEFECTO])[clase]
+
+
+def _llave(clase, dueno):
+    return f'cuota_{clase}_{dueno}'
+
+
+def _consumir_local(llave, capacidad, ritmo, ahora, expira):
+    with _lock:
+        fichas, ts = cache.get(llave, (capacidad, ahora))
+        fichas = min(capacidad, fichas + max(0, ahora - ts) * ritmo)
+        pasa = fichas >= 1
+        if pasa:
+            fichas -= 1
+        cache.set(llave, (fichas, ahora), timeout=expira)
+    return pasa, fichas
+
+
+def _consumir_redis(llave, capacidad, ritmo, ahora, expira):
+    global _script
+    if _script is None:
+        _script = redis.Redis.from_url(settings.REDIS_URL).register_script(_CONSUMIR_LUA)
+    prefijo = settings.CACHES['default'].get('KEY_PREFIX', '')
+    pasa, fichas = _script(keys=[f'{prefijo}:{llave}'], args=[capacidad, ritmo, ahora, expira])
+    return bool(pasa), float(fichas)
+
+
+def consumir(clase, dueno, plan=None):
+    """
+    Gasta una ficha de la cubeta de `dueno` (id de organización) para
+    `clase`. Devuelve 0 si la petición pasa, o los segundos a esperar
+    (Retry-After) si la cubeta está vacía.
+    """
+    capacidad, por_minuto = limites(plan, clase)
+    compartidas = cubetas_compartidas()
+    if not compartidas:
+        capacidad = max(1, capacidad // settings.WEB_WORKERS)
+        por_minuto = por_minuto / settings.WEB_WORKERS
+    ritmo = por_minuto / 60
+    # Pasado este tiempo sin peticiones la cubeta ya estaría llena
+    expira = math.ceil(capacidad / ritmo) + 1
+    ahora = time.time()
+    if compartidas:
+        try:
+            pasa, fichas = _consumir_redis(_llave(clase, dueno), capacidad, ritmo, ahora, expira)
+        except redis.RedisError:
+            logger.warning('Sin Redis para la cuota %s de %s; la petición pasa', clase, dueno)
+            return 0
+    else:
+        pasa, fichas = _consumir_local(_llave(clase, dueno), capacidad, ritmo, ahora, expira)
+    return 0 if pasa else max(1, math.ceil((1 - fichas) / ritmo))
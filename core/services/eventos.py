@@ -0,0 +1,181 @@
+"""
+Eventos en vivo por organización (server-sent events en core/eventos/).
+
+Cuando una escritura se confirma, invalidar_calendario (cache_calendario.py)
+publica dos eventos pequeños para las páginas abiertas de la organización:
+  - 'dia':   {'fechas': ['2025-03-03', ...] o null si cambió todo, 'version'}
+  - 'saldo': {'version'}
+'version' es la versión de datos de la organización ya con la escritura
+(version_datos.py); la página la compara con el encabezado X-Version-Datos
+de lo que pide para no pintar datos de una réplica atrasada.
+
+El reparto es en memoria: cada conexión abierta tiene una cola en el event
+loop de su worker. Con REDIS_URL los eventos pasan por Redis (pub/sub) y un
+oyente por proceso los reparte a sus conexiones, así llegan sin importar qué
+worker (o el trabajador de tareas) hizo la escritura. Sin Redis solo llegan a
+las conexiones del mismo proceso (desarrollo o un solo worker).
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+import orjson
+from django.conf import settings
+from django.db import transaction
+
+from users.models import Organizacion
+
+try:
+    import redis
+except ImportError:  # sin redis solo hay reparto dentro del proceso
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Eventos que se guardan por conexión antes de descartar (cliente que no lee)
+COLA_MAX = 100
+
+_suscriptores = {}  # organizacion_id -> {(loop, cola)}
+_lock = threading.Lock()
+_redis = None
+_oyentes = {}  # loop -> tarea que escucha Redis en ese event loop
+
+
+def _canal(organizacion_id=None):
+    prefijo = f"{settings.CACHES['default'].get('KEY_PREFIX', '')}:eventos:"
+    return f'{prefijo}{organizacion_id}' if organizacion_id is not None else f'{prefijo}*'
+
+
+def _usa_redis():
+    return redis is not None and bool(getattr(settings, 'REDIS_URL', None))
+
+
+# ============================================================
+# PUBLICAR
+# ============================================================
+
+def publicar_cambios(organizacion, fechas=None):
+    """
+    Al confirmar la transacción avisa que cambiaron `fechas` (None = todas)
+    y el saldo de la organización.
+    """
+    if not organizacion:
+        return
+    organizacion_id = organizacion.id
+    fechas = sorted({f.isoformat()[:10] for f in fechas}) if fechas is not None else None
+
+    def _publicar():
+        if not _usa_redis() and organizacion_id not in _suscriptores:
+            return  # nadie escucha en este proceso
+        version = Organizacion.objects.filter(pk=organizacion_id).values_list('version_datos', flat=True).first()
+        publicar(organizacion_id, 'dia', {'fechas': fechas, 'version': version})
+        publicar(organizacion_id, 'saldo', {'version': version})
+
+    transaction.on_commit(_publicar)
+
+
+def publicar(organizacion_id, evento, datos):
+    mensaje = {'evento': evento, 'datos': datos}
+    if not _usa_redis():
+        _repartir(organizacion_id, mensaje)
+        return
+    global _redis
+    try:
+        if _redis is None:
+            _redis = redis.Redis.from_url(settings.REDIS_URL)
+        _redis.publish(_canal(organizacion_id), orjson.dumps(mensaje))
+    except redis.RedisError:
+        # Un evento perdido solo retrasa la actualización hasta la siguiente
+        logger.warning('No se pudo publicar el evento %s de la organización %s', evento, organizacion_id)
+
+
+def _repartir(organizacion_id, mensaje):
+    with _lock:
+        destinos = list(_suscriptores.get(organizacion_id, ()))
+    for loop, cola in destinos:
+        try:
+            loop.call_soon_threadsafe(_encolar, cola, mensaje)
+        except RuntimeError:  # el loop ya cerró
+            pass
+
+
+def _encolar(cola, mensaje):
+    try:
+        cola.put_nowait(mensaje)
+    except asyncio.QueueFull:
+        pass
+
+
+# ============================================================
+# SUSCRIBIR
+# ============================================================
+
+@asynccontextmanager
+async def suscribir(organizacion_id):
+    """Cola con los eventos de la organización mientras dure el bloque."""
+    loop = asyncio.get_running_loop()
+    entrada = (loop, asyncio.Queue(maxsize=COLA_MAX))
+    if _usa_redis():
+        _asegurar_oyente(loop)
+    with _lock:
+        _suscriptores.setdefault(organizacion_id, set()).add(entrada)
+    try:
+        yield entrada[1]
+    finally:
+        with _lock:
+            conjunto = _suscriptores.get(organizacion_id)
+            conjunto.discard(entrada)
+            if not conjunto:
+                del _suscriptores[organizacion_id]
+
+
+def _asegurar_oyente(loop):
+    tarea = _oyentes.get(loop)
+    if tarea is None or tarea.done():
+        _oyentes[loop] = loop.create_task(_escuchar_redis())
+
+
+async def _escuchar_redis():
+    from redis import asyncio as redis_async
+
+    prefijo = _canal('')
+    while True:
+        cliente = redis_async.Redis.from_url(settings.REDIS_URL)
+        try:
+            async with cliente.pubsub() as pubsub:
+                await pubsub.psubscribe(_canal())
+                async for mensaje in pubsub.listen():
+                    if mensaje['type'] != 'pmessage':
+                        continue
+                    organizacion_id = int(mensaje['channel'].decode()[len(prefijo):])
+                    _repartir(organizacion_id, orjson.loads(mensaje['data']))
+        except redis.RedisError:
+            logger.warning('Se perdió la conexión a Redis para eventos; reintentando')
+            await asyncio.sleep(1)
+        finally:
+            await cliente.aclose()
+
+
+# ============================================================
+# FLUJO SSE
+# ============================================================
+
+async def flujo_eventos(organizacion_id, latido=25, duracion=600):
+    """
+    Cuerpo text/event-stream: un comentario cada `latido` segundos para que
+    los proxies no corten la conexión, y fin a los `duracion` segundos (el
+    navegador reconecta solo) para que los workers se puedan reciclar.
+    """
+    loop = asyncio.get_running_loop()
+    fin = loop.time() + duracion
+    async with suscribir(organizacion_id) as cola:
+        yield 'retry: 5000\n\n'
+        while (restante := fin - loop.time()) > 0:
+            try:
+                mensaje = await asyncio.wait_for(cola.get(), timeout=min(latido, restante))
+            except asyncio.TimeoutError:
+                yield ': latido\n\n'
+                continue
+            yield f"event: {mensaje['evento']}\ndata: {orjson.dumps(mensaje['datos']).decode()}\n\n"
@@ -0,0 +1,121 @@
+"""
+Exportación por lote de cortes de caja (cierre de mes).
+
+Todas las fechas de pago del rango se leen en una sola consulta y se
+agrupan por día en memoria. Cada día se renderiza en el pool de procesos
+de render_pdf (en paralelo) y el ZIP se va enviando conforme salen los
+PDFs, sin armarlo completo en memoria.
+"""
+
+import zipfile
+from collections import defaultdict
+from datetime import date
+from itertools import chain
+
+from django.core.exceptions import ValidationError
+
+from core.services.detalle_dia import contenido_corte_caja, fechas_pago_corte_caja, fila_corte_caja
+from core.services.render_pdf import iterar_pdfs, renderizar_pdf
+
+MAX_DIAS_LOTE = 62
+
+
+# ============================================================
+# CONTENIDO
+# ============================================================
+
+def contenidos_cortes_caja(fecha_inicio, fecha_fin, user, tabulaciones=None):
+    """
+    [(fecha, contenido)] de los días del rango con fechas de pago o con una
+    tabulación capturada. `tabulaciones` es opcional:
+    {'2026-01-31': {'tabulacion_total': ..., 'filas': [...]}}.
+    """
+    if not user or not user.organizacion:
+        raise ValidationError("El usuario no pertenece a ninguna organización.")
+    if fecha_inicio > fecha_fin:
+        raise ValidationError('La fecha inicial no puede ser posterior a la final.')
+    if (fecha_fin - fecha_inicio).days + 1 > MAX_DIAS_LOTE:
+        raise ValidationError(f'El rango no puede ser mayor a {MAX_DIAS_LOTE} días.')
+
+    facturas_por_dia = defaultdict(list)
+    fechas_pago = (fechas_pago_corte_caja(user)
+                   .filter(fecha_por_pagar__range=[fecha_inicio, fecha_fin])
+                   .order_by('fecha_por_pagar', 'id'))
+    for fp in fechas_pago:
+        facturas_por_dia[fp.fecha_por_pagar].append(fila_corte_caja(fp))
+
+    tabulaciones_por_dia = {}
+    for fecha_str, tabulacion in (tabulaciones or {}).items():
+        try:
+            fecha = date.fromisoformat(fecha_str)
+        except ValueError:
+            raise ValidationError(f'Fecha de tabulación no válida: {fecha_str}')
+        if fecha_inicio <= fecha <= fecha_fin:
+            tabulaciones_por_dia[fecha] = tabulacion
+
+    fechas = sorted(set(facturas_por_dia) | set(tabulaciones_por_dia))
+    if not fechas:
+        raise ValidationError('No hay fechas de pago en el rango seleccionado.')
+
+    return [
+        (fecha, contenido_corte_caja(
+            {**tabulaciones_por_dia.get(fecha, {}), 'fecha': fecha.isoformat()},
+            user,
+            facturas=facturas_por_dia.get(fecha, []),
+        ))
+        for fecha in fechas
+    ]
+
+
+# ============================================================
+# SALIDA
+# ============================================================
+
+class _SalidaZip:
+    """Archivo de solo escritura (sin seek): zipfile usa descriptores de datos."""
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _escribir_zip(fechas, pdfs):
+    salida = _SalidaZip()
+    # Los PDFs ya van comprimidos: ZIP_STORED
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_STORED) as archivo:
+        for fecha, pdf in zip(fechas, pdfs):
+            archivo.writestr(f'Corte_Caja_{fecha.isoformat()}.pdf', pdf)
+            yield salida.vaciar()
+    yield salida.vaciar()
+
+
+def zip_cortes_caja(cortes):
+    """
+    Iterador de bytes del ZIP con un PDF por día. El primer PDF se pide
+    antes de devolver el iterador para que ColaPDFLlena se lance antes de
+    empezar la respuesta.
+    """
+    pdfs = iterar_pdfs('corte_caja', [contenido for _, contenido in cortes])
+    primero = next(pdfs)
+    return _escribir_zip([fecha for fecha, _ in cortes], chain([primero], pdfs))
+
+
+def pdf_cortes_caja_combinado(cortes):
+    """Un solo PDF con un corte por página."""
+    return renderizar_pdf('cortes_caja', {'cortes': [contenido for _, contenido in cortes]})
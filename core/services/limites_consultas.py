@@ -0,0 +1,118 @@
+"""
+Límite de tiempo por consulta según el tipo de vista.
+
+Cada request corre con el perfil 'interactivo' (core/middleware.py) y las
+vistas pesadas lo cambian con @limite_consultas('reporte')
+(core/decorators.py). Los límites en milisegundos están en
+settings.LIMITES_CONSULTAS_MS. Fuera de un request (comandos, migraciones)
+no hay límite.
+
+El perfil vive en un ContextVar, así que también aplica en los hilos de
+consultas_paralelo. Se aplica en un execute_wrapper de cada conexión:
+  - Postgres: SET statement_timeout, solo cuando cambia el valor de la
+    conexión (una vez por request como mucho). Un rollback de la
+    transacción o de un savepoint deshace un SET hecho dentro de ella, así
+    que cualquier rollback olvida el valor y se vuelve a aplicar.
+  - SQLite: un progress handler que interrumpe la consulta al pasar el
+    límite.
+
+Una consulta cancelada se reconoce con `es_tiempo_agotado`.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError
+
+_perfil = contextvars.ContextVar('perfil_limite_consultas', default=None)
+
+# SQLSTATE de Postgres para "canceling statement due to statement timeout"
+QUERY_CANCELED = '57014'
+
+
+def limite_actual_ms():
+    perfil = _perfil.get()
+    if perfil is None:
+        return None
+    return settings.LIMITES_CONSULTAS_MS.get(perfil)
+
+
+def es_tiempo_agotado(error):
+    """True si `error` es una consulta cancelada por el límite de tiempo."""
+    if not isinstance(error, OperationalError):
+        return False
+    causa = error.__cause__
+    if getattr(causa, 'sqlstate', None) == QUERY_CANCELED:
+        return True
+    return 'interrupted' in str(error)
+
+
+# ============================================================
+# APLICACIÓN POR CONEXIÓN
+# ============================================================
+
+def _aplicar_postgres(conexion, limite, execute, sql, params, many, context):
+    if getattr(conexion, '_limite_consultas_ms', None) != limite:
+        with conexion.connection.cursor() as cursor:
+            cursor.execute(f'SET statement_timeout = {int(limite or 0)}')
+        conexion._limite_consultas_ms = limite
+    return execute(sql, params, many, context)
+
+
+def _aplicar_sqlite(conexion, limite, execute, sql, params, many, context):
+    if limite is None:
+        return execute(sql, params, many, context)
+    vence = time.monotonic() + limite / 1000
+    conexion.connection.set_progress_handler(lambda: time.monotonic() > vence, 1000)
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        conexion.connection.set_progress_handler(None, 0)
+
+
+def _aplicar_limite(execute, sql, params, many, context):
+    conexion = context['connection']
+    limite = limite_actual_ms()
+    if conexion.vendor == 'postgresql':
+        return _aplicar_postgres(conexion, limite, execute, sql, params, many, context)
+    if conexion.vendor == 'sqlite':
+        return _aplicar_sqlite(conexion, limite, execute, sql, params, many, context)
+    return execute(sql, params, many, context)
+
+
+def _olvidar_limite_al_revertir(conexion):
+    # Cualquier rollback (transacción o savepoint, por el error que sea)
+    # puede deshacer el SET: la siguiente consulta lo vuelve a aplicar
+    for metodo in ('_rollback', '_savepoint_rollback'):
+        original = getattr(conexion, metodo)
+
+        def revertir(*args, _original=original, **kwargs):
+            conexion._limite_consultas_ms = None
+            return _original(*args, **kwargs)
+
+        setattr(conexion, metodo, revertir)
+
+
+def instalar_limite(sender, connection, **kwargs):
+    """Receptor de connection_created (ver core/apps.py)."""
+    # Conexión nueva (o recién sacada del pool, ya con RESET): sin SET propio
+    connection._limite_consultas_ms = None
+    if _aplicar_limite not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_aplicar_limite)
+        _olvidar_limite_al_revertir(connection)
+
+
+# ============================================================
+# PERFIL
+# ============================================================
+
+@contextmanager
+def perfil_consultas(perfil):
+    """Las consultas dentro del bloque (y de sus hilos) usan el límite de `perfil`."""
+    token = _perfil.set(perfil)
+    try:
+        yield
+    finally:
+        _perfil.reset(token)
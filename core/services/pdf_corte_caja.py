@@ -0,0 +1,167 @@
+"""
+Plantillas ReportLab del corte de caja y de la tabulación simple.
+
+Este módulo no toca la BD ni Django: recibe el contenido ya preparado
+(solo tipos básicos, ver `contenido_corte_caja` en detalle_dia.py) y
+devuelve los bytes del PDF, así que puede ejecutarse en un proceso aparte
+(ver render_pdf.py).
+
+Los estilos se crean una sola vez al importar el módulo y no se modifican
+nunca; cada documento los comparte.
+"""
+
+import io
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+# Se incrementa al cambiar el diseño para no servir PDFs viejos del caché
+VERSION_PLANTILLAS = 1
+
+GRIS_ENCABEZADO = colors.HexColor('#e2e8f0')
+GRIS_TOTAL = colors.HexColor('#f8f9fa')
+
+
+# ============================================================
+# ESTILOS (constantes, no modificar)
+# ============================================================
+
+ESTILO_TEXTO = ParagraphStyle('CorteCajaTexto', fontName='Helvetica', fontSize=10, leading=12)
+
+ESTILO_CELDA = ParagraphStyle(
+    'CorteCajaCelda', fontName='Helvetica', fontSize=8, leading=12, alignment=TA_RIGHT,
+)
+
+ESTILO_ENCABEZADO = TableStyle([
+    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+    ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+])
+
+ESTILO_FACTURAS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), GRIS_ENCABEZADO),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ALIGN', (1, -1), (1, -1), 'RIGHT'),
+    ('FONTNAME', (1, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, -1), (2, -1), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, -1), (-1, -1), GRIS_TOTAL),
+])
+
+ESTILO_TABULACION = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), GRIS_ENCABEZADO),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, 0), 0.5, colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+    ('GRID', (0, 1), (-1, -2), 0.5, colors.black),
+    ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+    ('FONTNAME', (2, -1), (2, -1), 'Helvetica-Bold'),
+    ('ALIGN', (2, -1), (2, -1), 'RIGHT'),
+])
+
+ESTILO_DIFERENCIA = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, 0), (0, 0), GRIS_ENCABEZADO),
+    ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+    ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+])
+
+
+# ============================================================
+# BLOQUES
+# ============================================================
+
+def _tabla(datos, col_widths, estilo, alineacion=None):
+    tabla = Table(datos, colWidths=col_widths)
+    tabla.setStyle(estilo)
+    if alineacion:
+        tabla.hAlign = alineacion
+    return tabla
+
+
+def _encabezado(fecha):
+    return _tabla([['Confidencial', f"{fecha}"]], [230, 230], ESTILO_ENCABEZADO)
+
+
+def _tabla_tabulacion(contenido, alineacion):
+    datos = [['DENOMINACION', 'CANTIDAD', 'TOTAL']]
+    datos.extend(list(fila) for fila in contenido['filas'])
+    datos.append(['', '', f"${contenido['tabulacion_total']:,.2f}"])
+    return _tabla(datos, [100, 100, 100], ESTILO_TABULACION, alineacion)
+
+
+def elementos_corte_caja(contenido):
+    """Flowables de un corte de caja (se reutilizan en documentos combinados)."""
+    elementos = [_encabezado(contenido['fecha']), Spacer(1, 10)]
+
+    cargo_total = 0.0
+    if contenido.get('error'):
+        elementos.append(Paragraph(escape(f"Error cargando facturas: {contenido['error']}"), ESTILO_TEXTO))
+    else:
+        datos = [['CTA', 'NOMBRE PROV', 'TOTAL']]
+        for cuenta, proveedor, monto in contenido['facturas']:
+            cargo_total += monto
+            datos.append([
+                Paragraph(escape(cuenta), ESTILO_CELDA),
+                Paragraph(escape(proveedor), ESTILO_CELDA),
+                f"${monto:,.2f}",
+            ])
+        datos.append(['', 'TOTAL', f"${cargo_total:,.2f}"])
+        elementos.append(_tabla(datos, [180, 200, 100], ESTILO_FACTURAS))
+
+    elementos.append(Spacer(1, 15))
+    elementos.append(_tabla_tabulacion(contenido, 'RIGHT'))
+    elementos.append(Spacer(1, 15))
+
+    diferencia = contenido['tabulacion_total'] - cargo_total
+    elementos.append(_tabla([['DIFERENCIA', f"${diferencia:,.2f}"]], [150, 150], ESTILO_DIFERENCIA, 'LEFT'))
+    return elementos
+
+
+def elementos_tabulacion_simple(contenido):
+    return [
+        _encabezado(contenido['fecha']),
+        Spacer(1, 20),
+        _tabla_tabulacion(contenido, 'CENTER'),
+    ]
+
+
+def elementos_cortes_caja(contenido):
+    """Varios cortes de caja en un solo documento, uno por página."""
+    elementos = []
+    for indice, corte in enumerate(contenido['cortes']):
+        if indice:
+            elementos.append(PageBreak())
+        elementos.extend(elementos_corte_caja(corte))
+    return elementos
+
+
+# ============================================================
+# RENDER
+# ============================================================
+
+PLANTILLAS = {
+    'corte_caja': elementos_corte_caja,
+    'cortes_caja': elementos_cortes_caja,
+    'tabulacion_simple': elementos_tabulacion_simple,
+}
+
+
+def renderizar(plantilla, contenido):
+    """Bytes del PDF. `invariant` quita fecha e id aleatorio: mismo contenido, mismos bytes."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, invariant=1)
+    doc.build(PLANTILLAS[plantilla](contenido))
+    return buffer.getvalue()
@@ -0,0 +1,186 @@
+"""
+Render de PDFs fuera del worker web.
+
+  - Caché por contenido: la llave es el hash del contenido ya preparado
+    (más la versión de las plantillas). Volver a descargar el mismo corte no
+    renderiza nada.
+  - Pool de procesos: ReportLab es CPU puro; se ejecuta en un
+    ProcessPoolExecutor (PDF_RENDER_WORKERS procesos) para no retener el
+    GIL del worker web. Con PDF_RENDER_WORKERS = 0 se renderiza en línea.
+  - Cola acotada: como máximo PDF_RENDER_COLA renders en curso o en espera
+    por proceso web. Si la cola no se libera en PDF_RENDER_ESPERA segundos
+    se lanza ColaPDFLlena y la vista responde 503 en lugar de acumular
+    peticiones.
+"""
+
+import atexit
+import hashlib
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.services import pdf_corte_caja
+from proveedores.services import pdf_estado_cuenta
+
+PDF_CACHE_TIMEOUT = 60 * 60 * 24  # 24 horas
+PDF_RENDER_TIMEOUT = 60           # segundos por documento
+
+# plantilla -> módulo sin Django con `renderizar(plantilla, contenido)` y
+# VERSION_PLANTILLAS; el proceso hijo solo importa ese módulo
+MODULOS_PLANTILLAS = {
+    'corte_caja': pdf_corte_caja,
+    'cortes_caja': pdf_corte_caja,
+    'tabulacion_simple': pdf_corte_caja,
+    'estado_cuenta': pdf_estado_cuenta,
+}
+
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+_cola = None
+
+
+class ColaPDFLlena(Exception):
+    """Hay demasiados PDFs en proceso; el cliente debe reintentar."""
+
+
+# ============================================================
+# POOL
+# ============================================================
+
+def _num_workers():
+    return getattr(settings, 'PDF_RENDER_WORKERS', 2)
+
+
+def _obtener_ejecutor():
+    global _ejecutor
+    if _num_workers() <= 0:
+        return None
+    with _ejecutor_lock:
+        if _ejecutor is None:
+            # spawn: los procesos hijos no heredan conexiones a BD ni hilos
+            _ejecutor = ProcessPoolExecutor(
+                max_workers=_num_workers(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _ejecutor
+
+
+def _reiniciar_ejecutor():
+    global _ejecutor
+    with _ejecutor_lock:
+        if _ejecutor is not None:
+            _ejecutor.shutdown(wait=False, cancel_futures=True)
+        _ejecutor = None
+
+
+def _obtener_cola():
+    global _cola
+    with _ejecutor_lock:
+        if _cola is None:
+            _cola = threading.BoundedSemaphore(getattr(settings, 'PDF_RENDER_COLA', 8))
+        return _cola
+
+
+@atexit.register
+def _cerrar_ejecutor():
+    if _ejecutor is not None:
+        _ejecutor.shutdown(wait=False, cancel_futures=True)
+
+
+# ============================================================
+# CACHÉ Y RENDER
+# ============================================================
+
+def llave_pdf(plantilla, contenido):
+    serializado = json.dumps(
+        [plantilla, MODULOS_PLANTILLAS[plantilla].VERSION_PLANTILLAS, contenido],
+        sort_keys=True, separators=(',', ':'), default=str,
+    )
+    return f'pdf_{plantilla}_{hashlib.sha256(serializado.encode()).hexdigest()}'
+
+
+def _renderizar_en_pool(plantilla, contenido):
+    renderizar = MODULOS_PLANTILLAS[plantilla].renderizar
+    ejecutor = _obtener_ejecutor()
+    if ejecutor is None:
+        return renderizar(plantilla, contenido)
+    try:
+        return ejecutor.submit(renderizar, plantilla, contenido).result(timeout=PDF_RENDER_TIMEOUT)
+    except BrokenProcessPool:
+        # Un proceso hijo murió (OOM, kill): se recrea el pool para la siguiente
+        _reiniciar_ejecutor()
+        return renderizar(plantilla, contenido)
+
+
+def renderizar_pdf(plantilla, contenido):
+    """
+    Bytes del PDF `plantilla` (ver MODULOS_PLANTILLAS) para
+    `contenido`. Lanza ColaPDFLlena si la cola de render está saturada.
+    """
+    llave = llave_pdf(plantilla, contenido)
+    pdf = cache.get(llave)
+    if pdf is not None:
+        return pdf
+
+    cola = _obtener_cola()
+    if not cola.acquire(timeout=getattr(settings, 'PDF_RENDER_ESPERA', 5)):
+        raise ColaPDFLlena('El servidor está generando demasiados PDFs, intenta de nuevo en unos segundos.')
+    try:
+        pdf = _renderizar_en_pool(plantilla, contenido)
+    finally:
+        cola.release()
+
+    cache.set(llave, pdf, timeout=PDF_CACHE_TIMEOUT)
+    return pdf
+
+
+def iterar_pdfs(plantilla, contenidos):
+    """
+    Genera los bytes de un PDF por contenido, en el mismo orden. Los que no
+    están en caché se envían todos al pool a la vez y se renderizan en
+    paralelo; el lote ocupa un solo lugar de la cola.
+    """
+    renderizar = MODULOS_PLANTILLAS[plantilla].renderizar
+    llaves = [llave_pdf(plantilla, contenido) for contenido in contenidos]
+    en_cache = cache.get_many(llaves)
+    if len(en_cache) == len(llaves):
+        yield from (en_cache[llave] for llave in llaves)
+        return
+
+    cola = _obtener_cola()
+    if not cola.acquire(timeout=getattr(settings, 'PDF_RENDER_ESPERA', 5)):
+        raise ColaPDFLlena('El servidor está generando demasiados PDFs, intenta de nuevo en unos segundos.')
+    pendientes = {}
+    try:
+        ejecutor = _obtener_ejecutor()
+        if ejecutor is not None:
+            pendientes = {
+                llave: ejecutor.submit(renderizar, plantilla, contenido)
+                for llave, contenido in zip(llaves, contenidos)
+                if llave not in en_cache
+            }
+
+        for llave, contenido in zip(llaves, contenidos):
+            pdf = en_cache.get(llave)
+            if pdf is None:
+                if llave in pendientes:
+                    try:
+                        pdf = pendientes[llave].result(timeout=PDF_RENDER_TIMEOUT)
+                    except BrokenProcessPool:
+                        _reiniciar_ejecutor()
+                        pendientes = {}
+                        pdf = renderizar(plantilla, contenido)
+                else:
+                    pdf = renderizar(plantilla, contenido)
+                cache.set(llave, pdf, timeout=PDF_CACHE_TIMEOUT)
+                en_cache[llave] = pdf
+            yield pdf
+    finally:
+        for futuro in pendientes.values():
+            futuro.cancel()
+        cola.release()
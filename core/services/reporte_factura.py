@@ -1,10 +1,29 @@
 from datetime import date
+from asgiref.sync import async_to_sync
 from django.db.models import Sum, Count, Q
 from django.db.models.functions import TruncMonth, TruncDay
 from facturas.models import FacturasFechasDePago, Facturas
 from proveedores.models import Proveedores
+from .consultas_paralelo import consultas_parciales
+# Valor de cada sección si su consulta se cancela por tiempo
+RESPALDOS = {
+    'total_deuda': 0,
+    'total_programado': 0,
+    'deuda_por_proveedor': [],
+    'distribucion_estado': [],
+    'timeline_pagos': [],
+    'detalles': [],
+    'proveedores': [],
+}
+
 
 def obtener_reporte_facturas(filtros, user):
+    if user:
+        user.organizacion  # la FK se carga aquí: dentro del event loop no se puede consultar
+    return async_to_sync(aobtener_reporte_facturas)(filtros, user)
+
+
+async def aobtener_reporte_facturas(filtros, user):
     """
     Genera los datos para el reporte de facturas usando FacturasFechasDePago 
     para análisis temporal y Facturas para análisis de estado.
@@ -40,46 +59,55 @@ def obtener_reporte_facturas(filtros, user):
         qs_fechas = qs_fechas.filter(factura__estado=estado)
         qs_facturas = qs_facturas.filter(estado=estado)
 
-    # 2. KPIs y Métricas Globales
-    total_deuda = qs_fechas.exclude(factura__estado='PAGADO').aggregate(total=Sum('monto_por_pagar'))['total'] or 0
-    total_programado = qs_fechas.aggregate(total=Sum('monto_por_pagar'))['total'] or 0
-    
-    # 3. Datos para Gráficas
-    
-    # A. Deuda por Proveedor (Top 5)
-    deuda_por_proveedor = (qs_fechas.exclude(factura__estado='PAGADO')
-                           .values('factura__proveedor__nombre')
-                           .annotate(total=Sum('monto_por_pagar'))
-                           .order_by('-total')[:10])
-    
+    # 2. Consultas independientes (KPIs, gráficas, detalle): en paralelo.
+    # Si alguna pasa el límite de tiempo se muestra vacía con un aviso.
+    resultados, incompletas = await consultas_parciales(
+        RESPALDOS,
+        total_deuda=lambda: qs_fechas.exclude(factura__estado='PAGADO').aggregate(total=Sum('monto_por_pagar'))['total'] or 0,
+        total_programado=lambda: qs_fechas.aggregate(total=Sum('monto_por_pagar'))['total'] or 0,
+        # A. Deuda por Proveedor (Top 10)
+        deuda_por_proveedor=lambda: list(
+            qs_fechas.exclude(factura__estado='PAGADO')
+            .values('factura__proveedor__nombre')
+            .annotate(total=Sum('monto_por_pagar'))
+            .order_by('-total')[:10]
+        ),
+        # B. Distribución por Estado
+        distribucion_estado=lambda: list(
+            qs_facturas.values('estado')
+            .annotate(cantidad=Count('id'), total=Sum('monto'))
+            .order_by('estado')
+        ),
+        # C. Calendario de Pagos (Agrupado por día)
+        timeline_pagos=lambda: list(
+            qs_fechas
+            .annotate(dia=TruncDay('fecha_por_pagar'))
+            .values('dia')
+            .annotate(total=Sum('monto_por_pagar'))
+            .order_by('dia')
+        ),
+        # 3. Tabla Detallada
+        detalles=lambda: list(qs_fechas.order_by('fecha_por_pagar')[:100]),
+        # Solo el proveedor seleccionado; el resto lo trae el autocompletado
+        proveedores=lambda: list(Proveedores.objects.filter(organizacion=user.organizacion, pk=proveedor_id)) if proveedor_id else [],
+    )
+
+    deuda_por_proveedor = resultados['deuda_por_proveedor']
     chart_proveedor_labels = [item['factura__proveedor__nombre'] for item in deuda_por_proveedor]
     chart_proveedor_data = [float(item['total']) for item in deuda_por_proveedor]
 
-    # B. Distribución por Estado
-    distribucion_estado = (qs_facturas.values('estado')
-                           .annotate(cantidad=Count('id'), total=Sum('monto'))
-                           .order_by('estado'))
-    
+    distribucion_estado = resultados['distribucion_estado']
     chart_estado_labels = [item['estado'] for item in distribucion_estado]
     chart_estado_data = [item['cantidad'] for item in distribucion_estado]
     chart_estado_montos = [float(item['total']) for item in distribucion_estado]
 
-    # C. Calendario de Pagos (Agrupado por día)
-    timeline_pagos = (qs_fechas
-                      .annotate(dia=TruncDay('fecha_por_pagar'))
-                      .values('dia')
-                      .annotate(total=Sum('monto_por_pagar'))
-                      .order_by('dia'))
-            
+    timeline_pagos = resultados['timeline_pagos']
     chart_timeline_labels = [item['dia'].strftime('%Y-%m-%d') for item in timeline_pagos]
     chart_timeline_data = [float(item['total']) for item in timeline_pagos]
-    
-    # 4. Tabla Detallada
-    detalles = qs_fechas.order_by('fecha_por_pagar')[:100]
 
     return {
-        'total_deuda': total_deuda,
-        'total_programado': total_programado,
+        'total_deuda': resultados['total_deuda'],
+        'total_programado': resultados['total_programado'],
         'chart_proveedor_labels': chart_proveedor_labels,
         'chart_proveedor_data': chart_proveedor_data,
         'chart_estado_labels': chart_estado_labels,
@@ -87,8 +115,9 @@ def obtener_reporte_facturas(filtros, user):
         'chart_estado_montos': chart_estado_montos,
         'chart_timeline_labels': chart_timeline_labels,
         'chart_timeline_data': chart_timeline_data,
-        'detalles': detalles,
+        'detalles': resultados['detalles'],
+        'consultas_incompletas': incompletas,
         # Filtros contextuales
-        'proveedores': Proveedores.objects.filter(organizacion=user.organizacion),
+        'proveedores': resultados['proveedores'],
         'estados': Facturas.ESTADOS
     }
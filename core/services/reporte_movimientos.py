@@ -1,12 +1,44 @@
+from asgiref.sync import async_to_sync
 from django.db.models import Sum, Count, Q
 from django.db.models.functions import TruncDay
 from cartera.models import Movimientos_Cartera
 from sucursales.models import Sucursales
 from proveedores.models import Proveedores
+from .consultas_paralelo import consultas_parciales
 
 from cartera.services.movimientos import servicio_obtener_monto_restante_por_pagar_factura
+# Valor de cada sección si su consulta se cancela por tiempo
+RESPALDOS = {
+    'kpis': {'ingresos': None, 'pagos': None, 'ajustes_suma': None, 'ajustes_resta': None, 'cargos': None},
+    'ingresos_sucursal': [],
+    'pagos_proveedor': [],
+    'cargos_proveedor': [],
+    'evolucion': [],
+    'detalles': [],
+    'sucursales': [],
+    'proveedores': [],
+}
+
+
+def _detalles(qs):
+    detalles = []
+    for mov in qs.order_by('fecha', 'id'):
+        monto_restante = None
+        if mov.factura:
+            monto_restante = servicio_obtener_monto_restante_por_pagar_factura(mov.factura)
+        
+        mov.monto_restante_factura = monto_restante
+        detalles.append(mov)
+    return detalles
+
 
 def obtener_reporte_movimientos(filtros, user):
+    if user:
+        user.organizacion  # la FK se carga aquí: dentro del event loop no se puede consultar
+    return async_to_sync(aobtener_reporte_movimientos)(filtros, user)
+
+
+async def aobtener_reporte_movimientos(filtros, user):
     """
     Genera los datos para el reporte de movimientos de cartera.
     """
@@ -39,73 +71,86 @@ def obtener_reporte_movimientos(filtros, user):
     if proveedor_id:
         qs = qs.filter(factura__proveedor_id=proveedor_id)
 
-    # 1. KPIs Globales
-    total_ingresos = qs.filter(origen='INGRESO').aggregate(t=Sum('monto'))['t'] or 0
-    total_pagos = qs.filter(origen='PAGO').aggregate(t=Sum('monto'))['t'] or 0
-    total_ajustes_suma = qs.filter(origen='AJUSTE_SUMA').aggregate(t=Sum('monto'))['t'] or 0
-    total_ajustes_resta = qs.filter(origen='AJUSTE_RESTA').aggregate(t=Sum('monto'))['t'] or 0
-    total_cargos = qs.filter(origen='CARGO').aggregate(t=Sum('monto'))['t'] or 0
+    # Consultas independientes (KPIs, gráficas, detalle): en paralelo.
+    # Si alguna pasa el límite de tiempo se muestra vacía con un aviso.
+    resultados, incompletas = await consultas_parciales(
+        RESPALDOS,
+        # 1. KPIs Globales
+        kpis=lambda: qs.order_by().aggregate(
+            ingresos=Sum('monto', filter=Q(origen='INGRESO')),
+            pagos=Sum('monto', filter=Q(origen='PAGO')),
+            ajustes_suma=Sum('monto', filter=Q(origen='AJUSTE_SUMA')),
+            ajustes_resta=Sum('monto', filter=Q(origen='AJUSTE_RESTA')),
+            cargos=Sum('monto', filter=Q(origen='CARGO')),
+        ),
+        # 2A. Ingresos por Sucursal
+        ingresos_sucursal=lambda: list(
+            qs.filter(origen='INGRESO')
+            .order_by()
+            .values('venta__sucursal__nombre')
+            .annotate(total=Sum('monto'))
+            .order_by('-total')
+        ),
+        # 2B. Pagos por Proveedor (Top 10)
+        pagos_proveedor=lambda: list(
+            qs.filter(origen='PAGO')
+            .order_by()
+            .values('factura__proveedor__nombre')
+            .annotate(total=Sum('monto'))
+            .order_by('-total')[:10]
+        ),
+        # 2C. Cargos por Proveedor (Top 10)
+        cargos_proveedor=lambda: list(
+            qs.filter(origen='CARGO')
+            .order_by()
+            .values('factura__proveedor__nombre')
+            .annotate(total=Sum('monto'))
+            .order_by('-total')[:10]
+        ),
+        # 2D. Evolución Diaria (Ingresos vs Pagos - Incluye Ajustes)
+        evolucion=lambda: list(
+            qs.annotate(dia=TruncDay('fecha'))
+            .order_by()
+            .values('dia')
+            .annotate(
+                ingresos=Sum('monto', filter=Q(origen='INGRESO') | Q(origen='AJUSTE_SUMA')),
+                pagos=Sum('monto', filter=Q(origen='PAGO') | Q(origen='AJUSTE_RESTA'))
+            )
+            .order_by('dia')
+        ),
+        # 3. Lista Detallada
+        detalles=lambda: _detalles(qs),
+        sucursales=lambda: list(Sucursales.objects.filter(organizacion=user.organizacion)),
+        # Solo el proveedor seleccionado; el resto lo trae el autocompletado
+        proveedores=lambda: list(Proveedores.objects.filter(organizacion=user.organizacion, pk=proveedor_id)) if proveedor_id else [],
+    )
+
+    kpis = resultados['kpis']
+    total_ingresos = kpis['ingresos'] or 0
+    total_pagos = kpis['pagos'] or 0
+    total_ajustes_suma = kpis['ajustes_suma'] or 0
+    total_ajustes_resta = kpis['ajustes_resta'] or 0
+    total_cargos = kpis['cargos'] or 0
     
     balance_neto = (total_ingresos + total_ajustes_suma) - (total_pagos + total_ajustes_resta)
 
-    # 2. Datos para Gráficas
-    
-    # A. Ingresos por Sucursal
-    ingresos_sucursal = (qs.filter(origen='INGRESO')
-                         .order_by()
-                         .values('venta__sucursal__nombre')
-                         .annotate(total=Sum('monto'))
-                         .order_by('-total'))
-    
+    ingresos_sucursal = resultados['ingresos_sucursal']
     chart_sucursal_labels = [item['venta__sucursal__nombre'] or 'Sin Sucursal' for item in ingresos_sucursal]
     chart_sucursal_data = [float(item['total']) for item in ingresos_sucursal]
 
-    # B. Pagos por Proveedor (Top 10)
-    pagos_proveedor = (qs.filter(origen='PAGO')
-                       .order_by()
-                       .values('factura__proveedor__nombre')
-                       .annotate(total=Sum('monto'))
-                       .order_by('-total')[:10])
-
+    pagos_proveedor = resultados['pagos_proveedor']
     chart_proveedor_labels = [item['factura__proveedor__nombre'] or 'Sin Proveedor' for item in pagos_proveedor]
     chart_proveedor_data = [float(item['total']) for item in pagos_proveedor]
-    
-    # C. Cargos por Proveedor (Top 10)
-    cargos_proveedor = (qs.filter(origen='CARGO')
-                       .order_by()
-                       .values('factura__proveedor__nombre')
-                       .annotate(total=Sum('monto'))
-                       .order_by('-total')[:10])
 
+    cargos_proveedor = resultados['cargos_proveedor']
     chart_cargos_labels = [item['factura__proveedor__nombre'] or 'Sin Proveedor' for item in cargos_proveedor]
     chart_cargos_data = [float(item['total']) for item in cargos_proveedor]
 
-    # D. Evolución Diaria (Ingresos vs Pagos - Incluye Ajustes)
-    evolucion = (qs.annotate(dia=TruncDay('fecha'))
-                 .order_by()
-                 .values('dia')
-                 .annotate(
-                     ingresos=Sum('monto', filter=Q(origen='INGRESO') | Q(origen='AJUSTE_SUMA')),
-                     pagos=Sum('monto', filter=Q(origen='PAGO') | Q(origen='AJUSTE_RESTA'))
-                 )
-                 .order_by('dia'))
-    
+    evolucion = resultados['evolucion']
     chart_timeline_labels = [item['dia'].strftime('%Y-%m-%d') for item in evolucion]
     chart_timeline_ingresos = [float(item['ingresos'] or 0) for item in evolucion]
     chart_timeline_pagos = [float(item['pagos'] or 0) for item in evolucion]
 
-    # 3. Lista Detallada
-    detalles_qs = qs.order_by('fecha', 'id')
-    detalles = []
-    
-    for mov in detalles_qs:
-        monto_restante = None
-        if mov.factura:
-            monto_restante = servicio_obtener_monto_restante_por_pagar_factura(mov.factura)
-        
-        mov.monto_restante_factura = monto_restante
-        detalles.append(mov)
-
     return {
         'total_ingresos': total_ingresos,
         'total_pagos': total_pagos,
@@ -120,9 +165,10 @@ def obtener_reporte_movimientos(filtros, user):
         'chart_timeline_labels': chart_timeline_labels,
         'chart_timeline_ingresos': chart_timeline_ingresos,
         'chart_timeline_pagos': chart_timeline_pagos,
-        'detalles': detalles,
+        'detalles': resultados['detalles'],
+        'consultas_incompletas': incompletas,
         # Contexto de filtros filtrado por ORG
-        'sucursales_list': Sucursales.objects.filter(organizacion=user.organizacion),
-        'proveedores_list': Proveedores.objects.filter(organizacion=user.organizacion),
+        'sucursales_list': resultados['sucursales'],
+        'proveedores_list': resultados['proveedores'],
         'origenes_list': Movimientos_Cartera.ORIGENES
     }
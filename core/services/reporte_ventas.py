@@ -3,7 +3,8 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.db.models import Sum, F
 from django.db.models.functions import TruncDay
-from sucursales.models import Ventas
+from sucursales.models import Sucursales, Ventas
+from .consultas_paralelo import consultas_parciales
 
 def reporte_ventas_por_sucursal(fecha_inicio, fecha_fin, user, sucursal_id=None):
     if not user or not user.organizacion:
@@ -62,4 +63,23 @@ def obtener_alertas_criticas(fecha_inicio, fecha_fin, user, sucursal_id=None, mo
                           .filter(total__lt=monto_critico)
                           .order_by('dia', 'sucursal__nombre'))
     
-    return list(daily_branch_sales)
\ No newline at end of file
+    return list(daily_branch_sales)
+
+RESPALDOS = {'reporte': [], 'reporte_diario': [], 'alertas': [], 'sucursales': []}
+
+
+async def aobtener_reporte_ventas(fecha_inicio, fecha_fin, user, sucursal_id=None, monto_critico=0):
+    """
+    Las tres consultas del reporte de ventas y las sucursales del filtro, en
+    paralelo. 'consultas_incompletas' lista las que pasaron el límite de
+    tiempo (se devuelven vacías).
+    """
+    resultados, incompletas = await consultas_parciales(
+        RESPALDOS,
+        reporte=lambda: reporte_ventas_por_sucursal(fecha_inicio, fecha_fin, user, sucursal_id),
+        reporte_diario=lambda: reporte_ventas_diarias(fecha_inicio, fecha_fin, user, sucursal_id),
+        alertas=lambda: obtener_alertas_criticas(fecha_inicio, fecha_fin, user, sucursal_id, monto_critico),
+        sucursales=lambda: list(Sucursales.objects.filter(organizacion=user.organizacion)) if user.organizacion else [],
+    )
+    resultados['consultas_incompletas'] = incompletas
+    return resultados
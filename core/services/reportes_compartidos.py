@@ -0,0 +1,109 @@
+"""
+Cálculo compartido de reportes pesados (reporte de movimientos y de
+facturas).
+
+Cuando se comparte la liga de un reporte, varios usuarios de la misma
+organización lo piden con los mismos filtros casi a la vez. La primera
+petición toma un candado en el caché compartido y calcula; las demás
+esperan su resultado en vez de repetir todas las consultas.
+
+La llave es (reporte, organización, filtros normalizados, versión de datos):
+cualquier escritura sube la versión (version_datos.py), así un resultado
+guardado nunca se sirve con datos viejos y no hace falta invalidarlo. La
+versión se lee antes de calcular; si llega una escritura mientras tanto el
+resultado queda bajo la versión anterior y nadie lo vuelve a pedir.
+
+La espera es acotada: si quien calcula no termina en
+REPORTES_COMPARTIDOS_ESPERA segundos (o murió con el candado tomado) cada
+petición calcula por su cuenta, como antes. Un reporte con consultas
+incompletas (límite de tiempo) no se guarda.
+
+Necesita el caché compartido (settings.CACHE_COMPARTIDO, Redis): con el
+caché local cada worker tendría su propio candado y nada se compartiría,
+así que sin él cada petición calcula por su cuenta.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from users.models import Organizacion
+
+logger = logging.getLogger(__name__)
+
+# Primera y máxima pausa entre revisiones mientras otro calcula (segundos)
+SONDEO_INICIAL = 0.05
+SONDEO_MAX = 0.5
+
+_aviso_sin_cache_compartido = False
+
+
+def _version(organizacion_id):
+    return Organizacion.objects.filter(pk=organizacion_id).values_list('version_datos', flat=True).first()
+
+
+def llave_reporte(nombre, organizacion_id, version, filtros):
+    """Llave del resultado; los filtros vacíos y None cuentan igual."""
+    normalizados = '|'.join(
+        f'{campo}={"" if valor is None else valor}' for campo, valor in sorted(filtros.items())
+    )
+    resumen = hashlib.blake2b(normalizados.encode(), digest_size=12).hexdigest()
+    return f'reporte_{nombre}_{organizacion_id}_v{version}_{resumen}'
+
+
+def _bloqueo_s():
+    # Quien calcula no tarda más que el límite de sus consultas ('reporte')
+    return math.ceil(settings.LIMITES_CONSULTAS_MS['reporte'] / 1000) + 5
+
+
+async def aobtener_reporte_compartido(nombre, filtros, user, calcular):
+    """
+    Resultado de `await calcular(filtros, user)`, compartido con las
+    peticiones iguales de la organización (ver el docstring del módulo).
+    """
+    global _aviso_sin_cache_compartido
+    if not settings.CACHE_COMPARTIDO:
+        if not _aviso_sin_cache_compartido:
+            _aviso_sin_cache_compartido = True
+            logger.warning('Sin caché compartido (REDIS_URL) los reportes no comparten cálculo entre workers')
+        return await calcular(filtros, user)
+
+    organizacion_id = getattr(user, 'organizacion_id', None)
+    version = await sync_to_async(_version)(organizacion_id) if organizacion_id else None
+    if version is None:
+        return await calcular(filtros, user)
+
+    llave = llave_reporte(nombre, organizacion_id, version, filtros)
+    llave_candado = f'{llave}_calculando'
+    fin_espera = time.monotonic() + settings.REPORTES_COMPARTIDOS_ESPERA
+    pausa = SONDEO_INICIAL
+    while True:
+        resultado = await cache.aget(llave)
+        if resultado is not None:
+            return resultado
+
+        propio = uuid.uuid4().hex
+        if await cache.aadd(llave_candado, propio, timeout=_bloqueo_s()):
+            try:
+                resultado = await calcular(filtros, user)
+                if not resultado.get('consultas_incompletas'):
+                    await cache.aset(llave, resultado, timeout=settings.REPORTES_COMPARTIDOS_TIMEOUT)
+                return resultado
+            finally:
+                # Si el candado expiró y lo tomó otra petición, no se le quita
+                if await cache.aget(llave_candado) == propio:
+                    await cache.adelete(llave_candado)
+
+        if time.monotonic() >= fin_espera:
+            logger.warning('Reporte %s de la organización %s: se agotó la espera, se calcula aparte',
+                           nombre, organizacion_id)
+            return await calcular(filtros, user)
+        await asyncio.sleep(pausa)
+        pausa = min(pausa * 2, SONDEO_MAX)
@@ -0,0 +1,85 @@
+"""
+Lecturas en la réplica para reportes, calendario y exportaciones.
+
+Las vistas marcadas con @lectura_replica (core/decorators.py) leen de la BD
+'replica' (settings.DATABASE_REPLICA_URL); el resto de las lecturas y todas
+las escrituras van a 'default' (router en core/routers.py).
+
+Para que nadie deje de ver lo que acaba de guardar:
+  - en cuanto un request escribe, el resto de sus lecturas van a la primaria;
+  - dentro de una transacción también;
+  - tras una escritura, RuteoBDMiddleware deja una cookie para que los
+    requests de los siguientes REPLICA_RETRASO_S segundos (p. ej. el
+    redirect después de un POST) tampoco lean de una réplica atrasada.
+
+El estado es un objeto por request en un ContextVar: lo comparten los hilos
+de consultas_paralelo, así que una escritura en cualquiera de ellos fija la
+primaria para todos.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+COOKIE_PRIMARIA = 'bd_primaria'
+
+
+class EstadoRuteo:
+    def __init__(self, fijada=False):
+        self.replica = False      # la vista pidió leer de la réplica
+        self.fijada = fijada      # escribió en un request reciente (cookie)
+        self.escribio = False     # escribió en este request
+
+
+_estado = contextvars.ContextVar('ruteo_bd', default=None)
+
+
+def hay_replica():
+    return REPLICA in settings.DATABASES
+
+
+def leer_de_replica():
+    estado = _estado.get()
+    if estado is None or not estado.replica or estado.fijada or estado.escribio:
+        return False
+    if not hay_replica():
+        return False
+    return not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+def marcar_escritura():
+    estado = _estado.get()
+    if estado is not None:
+        estado.escribio = True
+
+
+@contextmanager
+def ruteo_request(fijada=False):
+    """Estado de ruteo de un request (ver RuteoBDMiddleware)."""
+    estado = EstadoRuteo(fijada)
+    token = _estado.set(estado)
+    try:
+        yield estado
+    finally:
+        _estado.reset(token)
+
+
+@contextmanager
+def lectura_replica():
+    """Las lecturas dentro del bloque van a la réplica mientras no se escriba."""
+    estado = _estado.get()
+    if estado is None:
+        # Fuera de un request (comandos, pruebas)
+        with ruteo_request() as estado:
+            estado.replica = True
+            yield
+        return
+    anterior = estado.replica
+    estado.replica = True
+    try:
+        yield
+    finally:
+        estado.replica = anterior
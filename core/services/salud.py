@@ -0,0 +1,48 @@
+"""
+Chequeo de salud para el balanceador / orquestador.
+
+Mide la latencia de una consulta trivial a la BD y de una escritura y
+lectura en el caché. Si alguna falla o tarda más que SALUD_LIMITE_MS, la
+instancia no está lista para recibir tráfico.
+"""
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+
+def _medir(chequeo):
+    inicio = time.perf_counter()
+    try:
+        chequeo()
+    except Exception as e:
+        return {'ok': False, 'error': e.__class__.__name__}
+    return {'ok': True, 'ms': round((time.perf_counter() - inicio) * 1000, 2)}
+
+
+def _chequeo_bd():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def _chequeo_cache():
+    llave = 'salud_chequeo'
+    valor = uuid.uuid4().hex
+    cache.set(llave, valor, timeout=10)
+    if cache.get(llave) != valor:
+        raise RuntimeError('El caché no devolvió el valor escrito.')
+
+
+def verificar_salud():
+    """{'listo', 'bd', 'cache'}; `listo` es False si algo falla o está lento."""
+    limite = getattr(settings, 'SALUD_LIMITE_MS', 1000)
+    chequeos = {'bd': _medir(_chequeo_bd), 'cache': _medir(_chequeo_cache)}
+    for resultado in chequeos.values():
+        if resultado['ok'] and resultado['ms'] > limite:
+            resultado['ok'] = False
+            resultado['error'] = 'lento'
+    return {'listo': all(r['ok'] for r in chequeos.values()), **chequeos}
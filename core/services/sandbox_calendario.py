@@ -0,0 +1,387 @@
+"""
+Sandbox "¿y si...?" para reprogramar fechas de pago del calendario.
+
+El mes se carga una vez como arreglos de flujos diarios (cargos, ventas,
+ajustes) más el saldo acumulado por día. Cada cambio hipotético sobre una
+`FacturasFechasDePago` (nueva fecha y/o nuevo monto) solo ajusta los flujos
+de los días involucrados y recalcula el saldo desde el primer día afectado
+hasta fin de mes. Nada se escribe en la BD hasta `aplicar_sandbox`, que
+aplica todos los cambios y sus movimientos CARGO con operaciones de conjunto.
+
+El estado vive en el caché, por usuario y mes.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from cartera.models import Movimientos_Cartera
+from facturas.models import FacturasFechasDePago
+from .calendario import obtener_saldo_acumulado_previo, obtener_flujos_diarios
+from .cache_calendario import invalidar_calendario
+from .cambios_datos import EDITAR, cambio as cambio_datos, cambios_de, registrar_cambios
+
+SANDBOX_TIMEOUT = 60 * 60  # 1 hora
+
+
+class SandboxMes:
+    """
+    Estado en memoria de un mes del calendario con cambios hipotéticos.
+    """
+
+    def __init__(self, organizacion_id, year, month, saldo_previo, cargos, ventas, ajustes, cuotas):
+        self.organizacion_id = organizacion_id
+        self.year = year
+        self.month = month
+        self.first_day = date(year, month, 1)
+        self.num_dias = calendar.monthrange(year, month)[1]
+        self.saldo_previo = saldo_previo
+
+        # Arreglos indexados por día del mes (0 = día 1)
+        self.cargos = cargos
+        self.ventas = ventas
+        self.ajustes = ajustes
+        self.saldo = [Decimal('0')] * self.num_dias
+
+        # id -> dict con fecha/monto originales y datos de despliegue
+        self.cuotas = cuotas
+        # id -> {'fecha': date, 'monto': Decimal}
+        self.cambios = {}
+
+        self._recalcular_desde(0)
+
+    # ── Helpers ───────────────────────────────────────────────────────────
+    def _indice(self, fecha):
+        idx = (fecha - self.first_day).days
+        return idx if 0 <= idx < self.num_dias else None
+
+    def _recalcular_desde(self, idx):
+        """Recalcula solo el sufijo [idx, fin de mes] del saldo acumulado."""
+        acumulado = self.saldo[idx - 1] if idx > 0 else self.saldo_previo
+        for i in range(idx, self.num_dias):
+            acumulado += self.ventas[i] - self.cargos[i] + self.ajustes[i]
+            self.saldo[i] = acumulado
+
+    def _estado_actual(self, cuota_id):
+        cambio = self.cambios.get(cuota_id)
+        if cambio:
+            return cambio['fecha'], cambio['monto']
+        original = self.cuotas[cuota_id]
+        return original['fecha'], original['monto']
+
+    def _reubicar(self, cuota_id, fecha_nueva, monto_nuevo):
+        """
+        Mueve el cargo de una cuota de su estado actual al nuevo y devuelve el
+        primer índice cuyo saldo cambió (o None si nada cambió dentro del mes).
+        """
+        fecha_actual, monto_actual = self._estado_actual(cuota_id)
+        afectados = []
+
+        idx_actual = self._indice(fecha_actual)
+        if idx_actual is not None:
+            self.cargos[idx_actual] -= monto_actual
+            afectados.append(idx_actual)
+
+        idx_nuevo = self._indice(fecha_nueva)
+        if idx_nuevo is not None:
+            self.cargos[idx_nuevo] += monto_nuevo
+            afectados.append(idx_nuevo)
+
+        original = self.cuotas[cuota_id]
+        if fecha_nueva == original['fecha'] and monto_nuevo == original['monto']:
+            self.cambios.pop(cuota_id, None)
+        else:
+            self.cambios[cuota_id] = {'fecha': fecha_nueva, 'monto': monto_nuevo}
+
+        if not afectados:
+            return None
+        desde = min(afectados)
+        self._recalcular_desde(desde)
+        return desde
+
+    # ── Operaciones públicas ───────────────────────────────────────────────
+    def mover(self, cuota_id, fecha=None, monto=None):
+        if cuota_id not in self.cuotas:
+            raise ValidationError('La fecha de pago no pertenece a este mes.')
+
+        fecha_actual, monto_actual = self._estado_actual(cuota_id)
+        fecha_nueva = fecha or fecha_actual
+        monto_nuevo = monto if monto is not None else monto_actual
+
+        if monto_nuevo <= 0:
+            raise ValidationError('El monto debe ser mayor a cero.')
+
+        return self._reubicar(cuota_id, fecha_nueva, monto_nuevo)
+
+    def deshacer(self, cuota_id):
+        if cuota_id not in self.cambios:
+            return None
+        original = self.cuotas[cuota_id]
+        return self._reubicar(cuota_id, original['fecha'], original['monto'])
+
+    def dias(self, desde=0):
+        return [
+            {
+                'fecha': (self.first_day + timedelta(days=i)).isoformat(),
+                'total_facturas': str(self.cargos[i]),
+                'total_ventas': str(self.ventas[i]),
+                'saldo_dia': str(self.saldo[i]),
+            }
+            for i in range(desde, self.num_dias)
+        ]
+
+    def serializar_cambios(self):
+        resultado = []
+        for cuota_id, cambio in self.cambios.items():
+            original = self.cuotas[cuota_id]
+            resultado.append({
+                'fecha_pago_id': cuota_id,
+                'folio': original['folio'],
+                'proveedor': original['proveedor'],
+                'fecha_original': original['fecha'].isoformat(),
+                'monto_original': str(original['monto']),
+                'fecha': cambio['fecha'].isoformat(),
+                'monto': str(cambio['monto']),
+            })
+        return resultado
+
+    def serializar_cuotas(self):
+        resultado = []
+        for cuota_id, original in self.cuotas.items():
+            fecha, monto = self._estado_actual(cuota_id)
+            resultado.append({
+                'fecha_pago_id': cuota_id,
+                'folio': original['folio'],
+                'proveedor': original['proveedor'],
+                'estado': original['estado'],
+                'fecha': fecha.isoformat(),
+                'monto': str(monto),
+                'modificada': cuota_id in self.cambios,
+            })
+        return sorted(resultado, key=lambda c: (c['fecha'], c['fecha_pago_id']))
+
+
+# ============================================================
+# CARGA / CACHÉ
+# ============================================================
+
+def _cache_key(user, year, month):
+    return f'sandbox_calendario_{user.organizacion_id}_{user.id}_{year}_{month}'
+
+
+def _construir_sandbox(user, year, month):
+    organizacion = user.organizacion
+    first_day = date(year, month, 1)
+    num_dias = calendar.monthrange(year, month)[1]
+    last_day = first_day + timedelta(days=num_dias - 1)
+
+    cargos_dia, ventas_dia, ajustes_dia = obtener_flujos_diarios(organizacion, first_day, last_day)
+
+    def _arreglo(por_fecha):
+        return [
+            Decimal(por_fecha.get(first_day + timedelta(days=i), 0))
+            for i in range(num_dias)
+        ]
+
+    cuotas = {}
+    filas = (FacturasFechasDePago.objects
+             .filter(factura__organizacion=organizacion, fecha_por_pagar__range=[first_day, last_day])
+             .values('id', 'fecha_por_pagar', 'monto_por_pagar', 'factura__folio',
+                     'factura__estado', 'factura__proveedor__nombre'))
+    for fila in filas:
+        cuotas[fila['id']] = {
+            'fecha': fila['fecha_por_pagar'],
+            'monto': fila['monto_por_pagar'],
+            'folio': fila['factura__folio'],
+            'estado': fila['factura__estado'],
+            'proveedor': fila['factura__proveedor__nombre'],
+        }
+
+    return SandboxMes(
+        organizacion_id=organizacion.id,
+        year=year,
+        month=month,
+        saldo_previo=Decimal(obtener_saldo_acumulado_previo(organizacion, first_day)),
+        cargos=_arreglo(cargos_dia),
+        ventas=_arreglo(ventas_dia),
+        ajustes=_arreglo(ajustes_dia),
+        cuotas=cuotas,
+    )
+
+
+def obtener_sandbox(user, year, month, reiniciar=False):
+    """
+    Devuelve el sandbox del usuario para el mes (lo construye si no existe).
+    """
+    if not user or not user.organizacion:
+        raise ValidationError('El usuario no pertenece a ninguna organización.')
+
+    key = _cache_key(user, year, month)
+    sandbox = None if reiniciar else cache.get(key)
+    if sandbox is None:
+        sandbox = _construir_sandbox(user, year, month)
+        cache.set(key, sandbox, timeout=SANDBOX_TIMEOUT)
+    return sandbox
+
+
+def _guardar(user, sandbox):
+    cache.set(_cache_key(user, sandbox.year, sandbox.month), sandbox, timeout=SANDBOX_TIMEOUT)
+
+
+def descartar_sandbox(user, year, month):
+    cache.delete(_cache_key(user, year, month))
+
+
+def _parse_fecha(valor):
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValidationError(f'Fecha inválida: {valor}')
+
+
+def _parse_monto(valor):
+    if valor in (None, ''):
+        return None
+    try:
+        monto = Decimal(str(valor)).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValidationError(f'Monto inválido: {valor}')
+    # 'nan' pasa por quantize y luego falla al compararse con 0
+    if not monto.is_finite():
+        raise ValidationError(f'Monto inválido: {valor}')
+    return monto
+
+
+def mover_cuota_sandbox(user, year, month, data):
+    """
+    Aplica un cambio hipotético y devuelve solo los días recalculados.
+    data: {'fecha_pago_id', 'fecha'?, 'monto'?}
+    """
+    sandbox = obtener_sandbox(user, year, month)
+    try:
+        cuota_id = int(data.get('fecha_pago_id'))
+    except (TypeError, ValueError):
+        raise ValidationError('fecha_pago_id requerido.')
+
+    desde = sandbox.mover(cuota_id, fecha=_parse_fecha(data.get('fecha')), monto=_parse_monto(data.get('monto')))
+    _guardar(user, sandbox)
+    return {
+        'dias': sandbox.dias(desde) if desde is not None else [],
+        'cambios': sandbox.serializar_cambios(),
+    }
+
+
+def deshacer_cuota_sandbox(user, year, month, cuota_id):
+    sandbox = obtener_sandbox(user, year, month)
+    desde = sandbox.deshacer(int(cuota_id))
+    _guardar(user, sandbox)
+    return {
+        'dias': sandbox.dias(desde) if desde is not None else [],
+        'cambios': sandbox.serializar_cambios(),
+    }
+
+
+# ============================================================
+# APLICAR CAMBIOS
+# ============================================================
+
+@transaction.atomic
+def aplicar_sandbox(user, year, month):
+    """
+    Aplica todos los cambios del sandbox en un solo paso:
+      1. UPDATE de FacturasFechasDePago (bulk_update de fecha y monto).
+      2. UPDATE de los CARGO ligados, copiando fecha y monto de su cuota.
+
+    Valida que las cuotas no hayan cambiado desde que se cargó el sandbox,
+    que solo se modifiquen montos de facturas PENDIENTES y que la suma de
+    cuotas de cada factura siga coincidiendo con su total.
+    """
+    sandbox = obtener_sandbox(user, year, month)
+    if not sandbox.cambios:
+        return {'actualizadas': 0, 'movimientos': 0}
+
+    ids = list(sandbox.cambios)
+    cuotas_bd = {
+        c.id: c for c in FacturasFechasDePago.objects
+        .select_for_update()
+        .filter(id__in=ids, factura__organizacion=user.organizacion)
+        .select_related('factura')
+    }
+
+    facturas_con_monto = set()
+    for cuota_id, cambio in sandbox.cambios.items():
+        cuota = cuotas_bd.get(cuota_id)
+        original = sandbox.cuotas[cuota_id]
+        if cuota is None:
+            raise ValidationError('Una de las fechas de pago ya no existe. Reinicia la simulación.')
+        if cuota.fecha_por_pagar != original['fecha'] or cuota.monto_por_pagar != original['monto']:
+            raise ValidationError(
+                f'La factura {cuota.factura.folio} cambió mientras simulabas. Reinicia la simulación.'
+            )
+        if cambio['monto'] != original['monto']:
+            if cuota.factura.estado != 'PENDIENTE':
+                raise ValidationError(
+                    f'No se puede cambiar el monto de la factura {cuota.factura.folio} porque ya tiene pagos.'
+                )
+            facturas_con_monto.add(cuota.factura_id)
+
+        cuota.fecha_por_pagar = cambio['fecha']
+        cuota.monto_por_pagar = cambio['monto']
+
+    if facturas_con_monto:
+        # Suma de cuotas por factura con los montos nuevos
+        sumas = dict(
+            FacturasFechasDePago.objects
+            .filter(factura_id__in=facturas_con_monto)
+            .exclude(id__in=ids)
+            .values_list('factura_id')
+            .annotate(total=Sum('monto_por_pagar'))
+            .order_by()
+        )
+        for cuota in cuotas_bd.values():
+            if cuota.factura_id in facturas_con_monto:
+                sumas[cuota.factura_id] = sumas.get(cuota.factura_id, Decimal('0')) + cuota.monto_por_pagar
+        for cuota in cuotas_bd.values():
+            factura = cuota.factura
+            if factura.id in facturas_con_monto and abs(sumas[factura.id] - factura.monto) > Decimal('0.01'):
+                raise ValidationError(
+                    f'La suma de los pagos ({sumas[factura.id]:.2f}) de la factura {factura.folio} '
+                    f'no coincide con el total de la factura ({factura.monto:.2f}).'
+                )
+
+    ahora = timezone.now()  # bulk_update() y update() no tocan auto_now
+    for cuota in cuotas_bd.values():
+        cuota.updated_at = ahora
+    FacturasFechasDePago.objects.bulk_update(
+        list(cuotas_bd.values()), ['fecha_por_pagar', 'monto_por_pagar', 'updated_at']
+    )
+
+    cuota_qs = FacturasFechasDePago.objects.filter(pk=OuterRef('fecha_pago_instancia_id'))
+    cargos = Movimientos_Cartera.objects.filter(origen='CARGO', fecha_pago_instancia_id__in=ids)
+    movimientos = cargos.update(
+        fecha=Subquery(cuota_qs.values('fecha_por_pagar')[:1]),
+        monto=Subquery(cuota_qs.values('monto_por_pagar')[:1]),
+        updated_at=ahora,
+    )
+
+    invalidar_calendario(
+        user.organizacion,
+        [sandbox.cuotas[i]['fecha'] for i in ids] + [c['fecha'] for c in sandbox.cambios.values()]
+    )
+    registrar_cambios(
+        user.organizacion,
+        [
+            cambio_datos('fecha_pago', cuota.id, EDITAR, cuota.fecha_por_pagar, sandbox.cuotas[cuota.id]['fecha'])
+            for cuota in cuotas_bd.values()
+        ] + cambios_de(cargos, 'movimiento', EDITAR, 'fecha'),
+    )
+    descartar_sandbox(user, year, month)
+    return {'actualizadas': len(cuotas_bd), 'movimientos': movimientos}
@@ -0,0 +1,253 @@
+"""
+Simulador Monte Carlo de liquidez.
+
+Estima la probabilidad de que el saldo de la organización quede en negativo
+durante los próximos días. Las ventas diarias de cada sucursal se generan por
+bootstrap (remuestreo con reemplazo) de su historial en `Ventas`, separado por
+día de la semana; las fechas de pago programadas (`FacturasFechasDePago`) y los
+ajustes ya registrados a futuro se reproducen como flujos fijos.
+
+Todas las trayectorias se calculan a la vez con NumPy: una matriz
+(trayectorias x días) de ventas simuladas, un `cumsum` por fila y percentiles
+por columna.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Sum, Q
+from django.utils import timezone
+
+from cartera.models import Movimientos_Cartera
+from facturas.models import FacturasFechasDePago
+from sucursales.models import Ventas
+
+
+PERCENTILES = (5, 25, 50, 75, 95)
+DIAS_HISTORIAL = 180
+MAX_TRAYECTORIAS = 50000
+MAX_DIAS = 366
+
+
+def simular_trayectorias(saldo_inicial, historial_por_sucursal, dias_semana, flujo_fijo,
+                         n_trayectorias=10000, semilla=None):
+    """
+    Núcleo numérico del simulador (no toca la BD).
+
+    saldo_inicial          -- float, saldo al cierre del día anterior al horizonte.
+    historial_por_sucursal -- lista de tuplas (ventas, dias_semana_hist), arrays 1D
+                              con el monto diario histórico y su weekday (0=lunes).
+    dias_semana            -- array (dias,) con el weekday de cada día del horizonte.
+    flujo_fijo             -- array (dias,) con el flujo determinista del día
+                              (ajustes - fechas de pago).
+
+    Retorna la matriz de saldos (trayectorias x días) en float64.
+    """
+    rng = np.random.default_rng(semilla)
+    dias_semana = np.asarray(dias_semana)
+    flujo_fijo = np.asarray(flujo_fijo, dtype=np.float64)
+    n_dias = dias_semana.shape[0]
+
+    ventas = np.zeros((n_trayectorias, n_dias), dtype=np.float64)
+
+    for montos_hist, weekday_hist in historial_por_sucursal:
+        montos_hist = np.asarray(montos_hist, dtype=np.float64)
+        weekday_hist = np.asarray(weekday_hist)
+        if montos_hist.size == 0:
+            continue
+
+        for weekday in range(7):
+            columnas = np.flatnonzero(dias_semana == weekday)
+            if columnas.size == 0:
+                continue
+
+            pool = montos_hist[weekday_hist == weekday]
+            if pool.size == 0:
+                # Sin historia para ese día de la semana: usamos todo el historial
+                pool = montos_hist
+
+            indices = rng.integers(0, pool.size, size=(n_trayectorias, columnas.size))
+            ventas[:, columnas] += pool[indices]
+
+    ventas += flujo_fijo
+    np.cumsum(ventas, axis=1, out=ventas)
+    ventas += saldo_inicial
+    return ventas
+
+
+def resumir_trayectorias(saldos, percentiles=PERCENTILES):
+    """
+    Reduce la matriz de saldos a bandas por día y probabilidades de faltante.
+    """
+    bandas = np.percentile(saldos, percentiles, axis=0)
+    negativos = saldos < 0
+
+    return {
+        'bandas': {p: bandas[i] for i, p in enumerate(percentiles)},
+        'prob_faltante_dia': negativos.mean(axis=0),
+        'prob_faltante_horizonte': float(negativos.any(axis=1).mean()),
+        'saldo_minimo_esperado': float(saldos.min(axis=1).mean()),
+    }
+
+
+def _historial_ventas(organizacion, desde, hasta):
+    """
+    Ventas diarias por sucursal en [desde, hasta].
+    Los días sin venta de una sucursal cuentan como 0 dentro de su rango activo.
+    """
+    filas = (Ventas.objects
+             .filter(sucursal__organizacion=organizacion, fecha__range=(desde, hasta))
+             .values('sucursal_id', 'fecha')
+             .annotate(total=Sum('monto'))
+             .order_by('sucursal_id', 'fecha'))
+
+    por_sucursal = {}
+    for fila in filas:
+        por_sucursal.setdefault(fila['sucursal_id'], {})[fila['fecha']] = float(fila['total'])
+
+    historial = []
+    for ventas_dia in por_sucursal.values():
+        primer_dia = min(ventas_dia)
+        n = (hasta - primer_dia).days + 1
+        fechas = [primer_dia + timedelta(days=i) for i in range(n)]
+        montos = np.fromiter((ventas_dia.get(f, 0.0) for f in fechas), dtype=np.float64, count=n)
+        weekdays = np.fromiter((f.weekday() for f in fechas), dtype=np.int8, count=n)
+        historial.append((montos, weekdays))
+
+    return historial
+
+
+def _flujo_fijo(organizacion, inicio, fin, incluir_vencidas):
+    """
+    Flujo determinista por día del horizonte: ajustes registrados menos
+    lo que falta pagar de las fechas de pago de facturas no pagadas.
+    """
+    n_dias = (fin - inicio).days + 1
+    flujo = np.zeros(n_dias, dtype=np.float64)
+
+    cuotas = FacturasFechasDePago.objects.filter(factura__organizacion=organizacion, fecha_por_pagar__lte=fin)
+
+    def cargar(fecha, monto):
+        # Las cuotas vencidas sin pagar se cargan el primer día del horizonte
+        if incluir_vencidas or fecha >= inicio:
+            flujo[max((fecha - inicio).days, 0)] -= float(monto)
+
+    pendientes = cuotas.filter(factura__estado='PENDIENTE')
+    if not incluir_vencidas:
+        pendientes = pendientes.filter(fecha_por_pagar__gte=inicio)
+    for fila in pendientes.values('fecha_por_pagar').annotate(total=Sum('monto_por_pagar')):
+        cargar(fila['fecha_por_pagar'], fila['total'])
+
+    # Facturas abonadas: lo ya pagado (sus PAGO, como en monto_restante)
+    # cubre sus cuotas en orden de fecha y solo se proyecta lo que falta
+    pagado = dict(Movimientos_Cartera.objects
+                  .filter(factura__organizacion=organizacion, factura__estado='ABONADO', origen='PAGO')
+                  .order_by()
+                  .values_list('factura_id')
+                  .annotate(total=Sum('monto')))
+    abonadas = (cuotas.filter(factura__estado='ABONADO')
+                .order_by('factura_id', 'fecha_por_pagar', 'id')
+                .values_list('factura_id', 'fecha_por_pagar', 'monto_por_pagar'))
+    for factura_id, fecha, monto in abonadas:
+        cubierto = min(monto, pagado.get(factura_id, 0))
+        pagado[factura_id] = pagado.get(factura_id, 0) - cubierto
+        if monto > cubierto:
+            cargar(fecha, monto - cubierto)
+
+    ajustes = (Movimientos_Cartera.objects
+               .filter(organizacion=organizacion, fecha__range=(inicio, fin))
+               .values('fecha')
+               .annotate(
+                   suma=Sum('monto', filter=Q(origen='AJUSTE_SUMA')),
+                   resta=Sum('monto', filter=Q(origen='AJUSTE_RESTA')),
+               ))
+    for fila in ajustes:
+        idx = (fila['fecha'] - inicio).days
+        flujo[idx] += float(fila['suma'] or 0) - float(fila['resta'] or 0)
+
+    return flujo
+
+
+def _saldo_al_cierre(organizacion, fecha):
+    """
+    Saldo real (ingresos + ajustes - pagos) con movimientos hasta `fecha` inclusive.
+    """
+    resultado = Movimientos_Cartera.objects.filter(
+        organizacion=organizacion,
+        fecha__lte=fecha,
+    ).aggregate(
+        ingresos=Sum('monto', filter=Q(origen='INGRESO')),
+        pagos=Sum('monto', filter=Q(origen='PAGO')),
+        ajuste_suma=Sum('monto', filter=Q(origen='AJUSTE_SUMA')),
+        ajuste_resta=Sum('monto', filter=Q(origen='AJUSTE_RESTA')),
+    )
+    return (
+        (resultado['ingresos'] or Decimal('0')) + (resultado['ajuste_suma'] or Decimal('0'))
+        - (resultado['pagos'] or Decimal('0')) - (resultado['ajuste_resta'] or Decimal('0'))
+    )
+
+
+def obtener_simulacion_liquidez(user, dias=90, n_trayectorias=10000, semilla=None,
+                                incluir_vencidas=True):
+    """
+    Ejecuta la simulación para la organización del usuario a partir de mañana.
+    """
+    if not user or not user.organizacion:
+        return {}
+
+    organizacion = user.organizacion
+    dias = max(1, min(int(dias), MAX_DIAS))
+    n_trayectorias = max(100, min(int(n_trayectorias), MAX_TRAYECTORIAS))
+
+    hoy = timezone.localtime().date()
+    inicio = hoy + timedelta(days=1)
+    fin = hoy + timedelta(days=dias)
+
+    saldo_inicial = _saldo_al_cierre(organizacion, hoy)
+    historial = _historial_ventas(organizacion, hoy - timedelta(days=DIAS_HISTORIAL - 1), hoy)
+    flujo = _flujo_fijo(organizacion, inicio, fin, incluir_vencidas)
+
+    fechas = [inicio + timedelta(days=i) for i in range(dias)]
+    dias_semana = np.array([f.weekday() for f in fechas], dtype=np.int8)
+
+    saldos = simular_trayectorias(
+        float(saldo_inicial), historial, dias_semana, flujo,
+        n_trayectorias=n_trayectorias, semilla=semilla,
+    )
+    resumen = resumir_trayectorias(saldos)
+
+    bandas = resumen['bandas']
+    prob_dia = resumen['prob_faltante_dia']
+    filas = [
+        {
+            'fecha': fecha,
+            'p5': bandas[5][i],
+            'p25': bandas[25][i],
+            'p50': bandas[50][i],
+            'p75': bandas[75][i],
+            'p95': bandas[95][i],
+            'prob_faltante': prob_dia[i] * 100,
+            'flujo_fijo': flujo[i],
+        }
+        for i, fecha in enumerate(fechas)
+    ]
+
+    return {
+        'dias': dias,
+        'n_trayectorias': n_trayectorias,
+        'fecha_inicio': inicio,
+        'fecha_fin': fin,
+        'saldo_inicial': saldo_inicial,
+        'sucursales_con_historial': len(historial),
+        'prob_faltante_horizonte': resumen['prob_faltante_horizonte'] * 100,
+        'saldo_minimo_esperado': resumen['saldo_minimo_esperado'],
+        'filas': filas,
+        'chart_labels': [f.strftime('%Y-%m-%d') for f in fechas],
+        'chart_p5': [round(float(v), 2) for v in bandas[5]],
+        'chart_p25': [round(float(v), 2) for v in bandas[25]],
+        'chart_p50': [round(float(v), 2) for v in bandas[50]],
+        'chart_p75': [round(float(v), 2) for v in bandas[75]],
+        'chart_p95': [round(float(v), 2) for v in bandas[95]],
+        'chart_prob': [round(float(v) * 100, 2) for v in prob_dia],
+    }
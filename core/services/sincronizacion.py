@@ -0,0 +1,180 @@
+"""
+Sincronización incremental para clientes móviles y sin conexión
+(core/api/v1/sincronizacion/).
+
+El cliente guarda el token 'siguiente' de cada respuesta y lo manda como
+?cursor= en la próxima; mientras 'hay_mas' sea verdadero pide otra página.
+
+  - Sin cursor empieza una carga completa: todas las filas de la
+    organización, modelo por modelo y en orden de id. Al terminar el token
+    es el cursor de la bitácora tomado al empezar, así lo que cambió durante
+    la carga llega otra vez en la primera sincronización incremental.
+  - Con un cursor numérico lee la bitácora (core/services/cambios_datos.py)
+    desde ahí y manda el estado actual de cada registro que cambió, o su id
+    en 'eliminados' si ya no existe. Aplicar las páginas en orden (upsert y
+    borrado por id) deja al cliente igual que el servidor.
+
+Una factura editada (su estado cambia con cada pago) vuelve a mandar sus
+fechas de pago, que es donde el cliente ve el estado.
+"""
+
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Max
+
+from cartera.models import Movimientos_Cartera
+from core.models import CambioDatos
+from facturas.models import FacturasFechasDePago
+from proveedores.models import Proveedores
+from sucursales.models import Sucursales, Ventas
+
+LIMITE_PAGINA = 500
+LIMITE_PAGINA_MAX = 2000
+
+# modelo de la bitácora -> (filas de la organización, [(columna, campo)]).
+# La primera columna siempre es el id; el orden es el de la carga completa.
+MODELOS = {
+    'proveedor': (
+        lambda org: Proveedores.objects.filter(organizacion=org),
+        [('id', 'id'), ('nombre', 'nombre'), ('cuenta', 'cuenta'), ('telefono', 'telefono'), ('email', 'email')],
+    ),
+    'sucursal': (
+        lambda org: Sucursales.objects.filter(organizacion=org),
+        [('id', 'id'), ('nombre', 'nombre')],
+    ),
+    'fecha_pago': (
+        lambda org: FacturasFechasDePago.objects.filter(factura__organizacion=org),
+        [('id', 'id'), ('factura_id', 'factura_id'), ('proveedor_id', 'factura__proveedor_id'),
+         ('folio', 'factura__folio'), ('estado', 'factura__estado'),
+         ('fecha', 'fecha_por_pagar'), ('monto', 'monto_por_pagar')],
+    ),
+    'venta': (
+        lambda org: Ventas.objects.filter(sucursal__organizacion=org),
+        [('id', 'id'), ('sucursal_id', 'sucursal_id'), ('fecha', 'fecha'), ('monto', 'monto')],
+    ),
+    'movimiento': (
+        lambda org: Movimientos_Cartera.objects.filter(organizacion=org),
+        [('id', 'id'), ('origen', 'origen'), ('fecha', 'fecha'), ('monto', 'monto'),
+         ('factura_id', 'factura_id'), ('venta_id', 'venta_id')],
+    ),
+}
+ORDEN = list(MODELOS)
+
+
+def _filas(organizacion, modelo, **filtro):
+    queryset, columnas = MODELOS[modelo]
+    return queryset(organizacion).filter(**filtro).order_by('pk').values_list(*(campo for _, campo in columnas))
+
+
+def _bloque(modelo, filas):
+    # Los montos van como texto (el JSON no tiene decimales exactos)
+    return {
+        'campos': [columna for columna, _ in MODELOS[modelo][1]],
+        'filas': [[str(v) if isinstance(v, Decimal) else v for v in fila] for fila in filas],
+    }
+
+
+def _limite(limite):
+    return max(1, min(limite or LIMITE_PAGINA, LIMITE_PAGINA_MAX))
+
+
+# ============================================================
+# TOKENS
+# ============================================================
+# "c<cursor>.<modelo>.<id>": carga completa en curso (índice en ORDEN y
+# último id enviado); "<cursor>": incremental desde ese id de la bitácora.
+
+def _leer_token(token):
+    if not token:
+        return None
+    try:
+        if token.startswith('c'):
+            cursor, indice, ultimo = (int(parte) for parte in token[1:].split('.'))
+            if not 0 <= indice < len(ORDEN):
+                raise ValueError(token)
+            return cursor, indice, ultimo
+        return int(token)
+    except ValueError:
+        raise ValidationError('Cursor de sincronización inválido.')
+
+
+# ============================================================
+# PÁGINAS
+# ============================================================
+
+def _pagina_completa(organizacion, cursor, indice, ultimo, limite):
+    modelo = ORDEN[indice]
+    filas = list(_filas(organizacion, modelo, pk__gt=ultimo)[:limite + 1])
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = f'c{cursor}.{indice}.{filas[-1][0]}'
+    elif indice + 1 < len(ORDEN):
+        siguiente = f'c{cursor}.{indice + 1}.0'
+    else:
+        siguiente = str(cursor)
+    return {
+        'siguiente': siguiente,
+        'hay_mas': siguiente.startswith('c'),
+        'completa': True,
+        'registros': {modelo: _bloque(modelo, filas)} if filas else {},
+        'eliminados': {},
+    }
+
+
+def _pagina_incremental(organizacion, cursor, limite):
+    cambios = list(
+        CambioDatos.objects
+        .filter(organizacion=organizacion, id__gt=cursor, modelo__in=ORDEN + ['factura'])
+        .order_by('id')
+        .values_list('id', 'modelo', 'objeto_id')[:limite + 1]
+    )
+    hay_mas = len(cambios) > limite
+    cambios = cambios[:limite]
+
+    ids = {modelo: set() for modelo in ORDEN}
+    facturas = set()
+    for _, modelo, objeto_id in cambios:
+        if modelo == 'factura':
+            facturas.add(objeto_id)
+        else:
+            ids[modelo].add(objeto_id)
+
+    registros, eliminados = {}, {}
+    for modelo in ORDEN:
+        extra = {'factura_id__in': facturas} if modelo == 'fecha_pago' and facturas else None
+        if not ids[modelo] and not extra:
+            continue
+        filas = list(_filas(organizacion, modelo, pk__in=ids[modelo]))
+        if extra:
+            vistos = {fila[0] for fila in filas}
+            filas += [fila for fila in _filas(organizacion, modelo, **extra) if fila[0] not in vistos]
+        if filas:
+            registros[modelo] = _bloque(modelo, filas)
+        faltan = ids[modelo] - {fila[0] for fila in filas}
+        if faltan:
+            eliminados[modelo] = sorted(faltan)
+
+    return {
+        'siguiente': str(cambios[-1][0] if cambios else cursor),
+        'hay_mas': hay_mas,
+        'completa': False,
+        'registros': registros,
+        'eliminados': eliminados,
+    }
+
+
+def pagina_sincronizacion(organizacion, token=None, limite=LIMITE_PAGINA):
+    """
+    Una página de sincronización para el token del cliente (ver el
+    docstring del módulo). `limite` es el máximo de filas en una carga
+    completa o de cambios leídos de la bitácora en una incremental.
+    """
+    limite = _limite(limite)
+    leido = _leer_token(token)
+    if leido is None:
+        cursor = CambioDatos.objects.filter(organizacion=organizacion).aggregate(m=Max('id'))['m'] or 0
+        return _pagina_completa(organizacion, cursor, 0, 0, limite)
+    if isinstance(leido, tuple):
+        return _pagina_completa(organizacion, *leido, limite)
+    return _pagina_incremental(organizacion, leido, limite)
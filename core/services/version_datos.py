@@ -0,0 +1,100 @@
+"""
+Versión de los datos de cada organización para las respuestas condicionales.
+
+Organizacion.version_datos sube en uno con cada servicio de escritura de
+cartera, facturas, sucursales y proveedores (`marcar_datos_modificados`, en
+la misma transacción que la escritura; casi siempre a través de
+cambios_datos.registrar_cambios) y datos_modificados guarda cuándo.
+
+Con ella @condicional_por_version (core/decorators.py) arma el ETag y el
+Last-Modified de las vistas de lectura, y responde 304 sin ejecutar la vista
+cuando la copia del cliente está al día. El ETag también incluye lo que
+cambia la página sin tocar los datos: el despliegue, el usuario y su sesión
+(menú, token CSRF) y el día actual.
+"""
+
+import hashlib
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from users.models import Organizacion
+
+
+def marcar_datos_modificados(organizacion):
+    """Incrementa la versión de datos de la organización."""
+    if not organizacion:
+        return
+    Organizacion.objects.filter(pk=organizacion.pk).update(
+        version_datos=F('version_datos') + 1,
+        datos_modificados=timezone.now(),
+    )
+
+
+# ============================================================
+# VALIDADORES HTTP
+# ============================================================
+
+def _mensajes_pendientes(request):
+    mensajes = getattr(request, '_messages', None)
+    return mensajes is not None and len(mensajes) > 0
+
+
+def validadores(request):
+    """
+    (etag, last_modified, version) para la petición, o None si no aplica (no es
+    GET/HEAD, es el sandbox, el usuario no tiene organización o hay mensajes
+    por mostrar).
+    La versión se lee de la BD que usará la vista (la réplica si aplica),
+    así nunca es más nueva que los datos que se muestran.
+    """
+    if request.method not in ('GET', 'HEAD') or _mensajes_pendientes(request):
+        return None
+    # El sandbox del calendario vive en caché, fuera de la versión
+    if request.GET.get('sandbox') == '1':
+        return None
+    organizacion_id = getattr(request.user, 'organizacion_id', None)
+    if not organizacion_id:
+        return None
+    fila = Organizacion.objects.filter(pk=organizacion_id).values_list(
+        'version_datos', 'datos_modificados'
+    ).first()
+    if fila is None:
+        return None
+    version, modificados = fila
+
+    hoy = timezone.localdate()
+    partes = (
+        settings.VERSION_DESPLIEGUE, request.user.pk, request.session.session_key or '',
+        hoy.isoformat(), version,
+    )
+    etag = '"%s"' % hashlib.blake2b('|'.join(map(str, partes)).encode(), digest_size=12).hexdigest()
+    # Las páginas dependen del día actual: nunca más viejas que su inicio
+    inicio_dia = timezone.make_aware(datetime.combine(hoy, time.min))
+    return etag, int(max(modificados, inicio_dia).timestamp()), version
+
+
+def respuesta_no_modificada(request, etag, last_modified):
+    """304 (o 412) si la copia del cliente sigue vigente; None si hay que ejecutar la vista."""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def agregar_validadores(request, respuesta, etag, last_modified, version):
+    # Una página que mostró mensajes no se debe volver a servir con un 304
+    mensajes = getattr(request, '_messages', None)
+    if respuesta.status_code not in (200, 304) or respuesta.streaming or (mensajes is not None and mensajes.used):
+        return respuesta
+    # Con réplica, quien actualiza la página por un evento en vivo compara
+    # contra la versión del evento para saber si ya ve el cambio
+    respuesta['X-Version-Datos'] = str(version)
+    if respuesta.status_code == 304:
+        return respuesta
+    respuesta['ETag'] = etag
+    respuesta['Last-Modified'] = http_date(last_modified)
+    # El navegador guarda la página pero la revalida en cada visita
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
@@ -1,3 +1,993 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+import asyncio
+import io
+import json
+import zipfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connections, transaction
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from users.models import Organizacion, User
+from sucursales.models import Sucursales, Ventas
+from proveedores.models import Proveedores
+from facturas.models import Facturas, FacturasFechasDePago
+from cartera.models import Movimientos_Cartera
+from .services.simulacion_liquidez import (
+    simular_trayectorias,
+    resumir_trayectorias,
+    obtener_simulacion_liquidez,
+)
+from sucursales.services.sucursales import servicio_crear_sucursal, servicio_eliminar_sucursal
+from sucursales.services.ventas import servicio_crear_venta, servicio_editar_venta, servicio_eliminar_venta
+from cartera.services.movimientos import registrar_movimiento_pago_factura
+from .services.calendario import obtener_datos_calendario
+from .services.consultas_paralelo import consultas_en_paralelo
+from .services.cache_calendario import llave_snapshot, precalentar_meses_adyacentes
+from .services import render_pdf
+from .services.cuotas_peticiones import consumir
+from .services.reportes_compartidos import aobtener_reporte_compartido, llave_reporte
+from .services.eventos import flujo_eventos, publicar, suscribir
+from .services.detalle_dia import contenido_corte_caja, tabulacion_pdf
+from .services.exportar_cortes import contenidos_cortes_caja
+from .services.pdf_corte_caja import ESTILO_CELDA
+from .services.sandbox_calendario import (
+    obtener_sandbox,
+    mover_cuota_sandbox,
+    aplicar_sandbox,
+)
+
+
+# Las pruebas no corren collectstatic: {% static %} sin el manifiesto de whitenoise
+ESTATICOS_SIN_MANIFIESTO = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+class SimularTrayectoriasTest(TestCase):
+    def test_sin_ventas_el_saldo_es_determinista(self):
+        flujo = np.array([-100.0, 0.0, -50.0])
+        saldos = simular_trayectorias(120.0, [], np.array([0, 1, 2]), flujo, n_trayectorias=200, semilla=1)
+
+        self.assertEqual(saldos.shape, (200, 3))
+        np.testing.assert_allclose(saldos[0], [20.0, 20.0, -30.0])
+
+        resumen = resumir_trayectorias(saldos)
+        self.assertEqual(resumen['prob_faltante_horizonte'], 1.0)
+        np.testing.assert_allclose(resumen['prob_faltante_dia'], [0.0, 0.0, 1.0])
+
+    def test_bootstrap_respeta_dia_de_la_semana(self):
+        # Lunes siempre vende 10, martes siempre 1000
+        historial = [(np.array([10.0, 1000.0] * 4), np.array([0, 1] * 4))]
+        saldos = simular_trayectorias(0.0, historial, np.array([0, 1]), np.zeros(2), n_trayectorias=50, semilla=3)
+
+        np.testing.assert_allclose(saldos[:, 0], 10.0)
+        np.testing.assert_allclose(saldos[:, 1], 1010.0)
+
+    def test_semilla_reproducible(self):
+        historial = [(np.arange(1, 15, dtype=float), np.arange(14) % 7)]
+        a = simular_trayectorias(0.0, historial, np.arange(10) % 7, np.zeros(10), n_trayectorias=100, semilla=7)
+        b = simular_trayectorias(0.0, historial, np.arange(10) % 7, np.zeros(10), n_trayectorias=100, semilla=7)
+        np.testing.assert_array_equal(a, b)
+
+
+class ObtenerSimulacionLiquidezTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Simulacion")
+        self.user = User.objects.create_user(
+            email="sim@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        self.hoy = timezone.localtime().date()
+
+    def test_cuota_mayor_al_saldo_produce_faltante(self):
+        Movimientos_Cartera.objects.create(
+            origen='AJUSTE_SUMA', monto=Decimal('500.00'), fecha=self.hoy, organizacion=self.org
+        )
+        proveedor = Proveedores.objects.create(nombre="Prov", organizacion=self.org)
+        factura = Facturas.objects.create(
+            proveedor=proveedor, folio="SIM-1", monto=Decimal('1000.00'), organizacion=self.org
+        )
+        FacturasFechasDePago.objects.create(
+            factura=factura, fecha_por_pagar=self.hoy + timedelta(days=3), monto_por_pagar=Decimal('1000.00')
+        )
+
+        datos = obtener_simulacion_liquidez(self.user, dias=10, n_trayectorias=500, semilla=0)
+
+        self.assertEqual(datos['saldo_inicial'], Decimal('500.00'))
+        self.assertEqual(len(datos['filas']), 10)
+        self.assertEqual(datos['prob_faltante_horizonte'], 100.0)
+        self.assertEqual(datos['filas'][1]['prob_faltante'], 0.0)
+        self.assertEqual(datos['filas'][2]['prob_faltante'], 100.0)
+
+    def test_factura_abonada_proyecta_solo_lo_que_falta(self):
+        Movimientos_Cartera.objects.create(
+            origen='AJUSTE_SUMA', monto=Decimal('500.00'), fecha=self.hoy, organizacion=self.org
+        )
+        proveedor = Proveedores.objects.create(nombre="Prov", organizacion=self.org)
+        factura = Facturas.objects.create(
+            proveedor=proveedor, folio="SIM-2", monto=Decimal('1000.00'), estado='ABONADO', organizacion=self.org
+        )
+        for dias in (2, 5):
+            FacturasFechasDePago.objects.create(
+                factura=factura, fecha_por_pagar=self.hoy + timedelta(days=dias), monto_por_pagar=Decimal('500.00')
+            )
+        # El abono cubre la primera cuota y 200 de la segunda
+        Movimientos_Cartera.objects.create(
+            origen='PAGO', monto=Decimal('700.00'), fecha=self.hoy - timedelta(days=1),
+            factura=factura, organizacion=self.org
+        )
+
+        datos = obtener_simulacion_liquidez(self.user, dias=10, n_trayectorias=500, semilla=0)
+
+        self.assertEqual(datos['saldo_inicial'], Decimal('-200.00'))
+        self.assertEqual(datos['filas'][1]['p50'], datos['filas'][0]['p50'])
+        self.assertEqual(datos['filas'][4]['p50'] - datos['filas'][3]['p50'], -300.0)
+
+    def test_historial_de_ventas_por_sucursal(self):
+        sucursal = Sucursales.objects.create(nombre="Centro", organizacion=self.org)
+        for i in range(14):
+            Ventas.objects.create(fecha=self.hoy - timedelta(days=i), monto=Decimal('100.00'), sucursal=sucursal)
+
+        datos = obtener_simulacion_liquidez(self.user, dias=7, n_trayectorias=200, semilla=0)
+
+        self.assertEqual(datos['sucursales_con_historial'], 1)
+        self.assertAlmostEqual(datos['filas'][-1]['p50'], 700.0)
+        self.assertEqual(datos['prob_faltante_horizonte'], 0.0)
+
+
+class SandboxCalendarioTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Sandbox")
+        self.user = User.objects.create_user(
+            email="sandbox@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        self.proveedor = Proveedores.objects.create(nombre="Prov", organizacion=self.org)
+        self.factura = Facturas.objects.create(
+            proveedor=self.proveedor, folio="SB-1", monto=Decimal('300.00'), organizacion=self.org
+        )
+        self.cuota_1 = FacturasFechasDePago.objects.create(
+            factura=self.factura, fecha_por_pagar=date(2025, 3, 5), monto_por_pagar=Decimal('100.00')
+        )
+        self.cuota_2 = FacturasFechasDePago.objects.create(
+            factura=self.factura, fecha_por_pagar=date(2025, 3, 20), monto_por_pagar=Decimal('200.00')
+        )
+        for cuota in (self.cuota_1, self.cuota_2):
+            Movimientos_Cartera.objects.create(
+                origen='CARGO', monto=cuota.monto_por_pagar, fecha=cuota.fecha_por_pagar,
+                factura=self.factura, fecha_pago_instancia=cuota, organizacion=self.org
+            )
+        Movimientos_Cartera.objects.create(
+            origen='AJUSTE_SUMA', monto=Decimal('1000.00'), fecha=date(2025, 2, 1), organizacion=self.org
+        )
+
+    def test_mover_recalcula_solo_desde_el_primer_dia_afectado(self):
+        sandbox = obtener_sandbox(self.user, 2025, 3, reiniciar=True)
+        self.assertEqual(sandbox.saldo[9], Decimal('900.00'))
+
+        resultado = mover_cuota_sandbox(self.user, 2025, 3, {
+            'fecha_pago_id': self.cuota_1.id, 'fecha': '2025-03-10'
+        })
+
+        self.assertEqual(resultado['dias'][0]['fecha'], '2025-03-05')
+        self.assertEqual(resultado['dias'][0]['saldo_dia'], '1000.00')
+        self.assertEqual(resultado['dias'][5]['saldo_dia'], '900.00')
+        self.assertEqual(len(resultado['cambios']), 1)
+
+        # Volver a la fecha original elimina el cambio
+        mover_cuota_sandbox(self.user, 2025, 3, {'fecha_pago_id': self.cuota_1.id, 'fecha': '2025-03-05'})
+        self.assertEqual(obtener_sandbox(self.user, 2025, 3).cambios, {})
+
+    def test_mover_rechaza_monto_no_finito(self):
+        obtener_sandbox(self.user, 2025, 3, reiniciar=True)
+        for monto in ('nan', 'sNaN', 'Infinity'):
+            with self.assertRaises(ValidationError):
+                mover_cuota_sandbox(self.user, 2025, 3, {'fecha_pago_id': self.cuota_1.id, 'monto': monto})
+        self.assertEqual(obtener_sandbox(self.user, 2025, 3).cambios, {})
+
+    def test_aplicar_actualiza_cuotas_y_cargos(self):
+        obtener_sandbox(self.user, 2025, 3, reiniciar=True)
+        mover_cuota_sandbox(self.user, 2025, 3, {
+            'fecha_pago_id': self.cuota_1.id, 'fecha': '2025-03-08', 'monto': '150.00'
+        })
+        mover_cuota_sandbox(self.user, 2025, 3, {'fecha_pago_id': self.cuota_2.id, 'monto': '150.00'})
+
+        resultado = aplicar_sandbox(self.user, 2025, 3)
+
+        self.assertEqual(resultado, {'actualizadas': 2, 'movimientos': 2})
+        self.cuota_1.refresh_from_db()
+        self.assertEqual(self.cuota_1.fecha_por_pagar, date(2025, 3, 8))
+        cargo = Movimientos_Cartera.objects.get(fecha_pago_instancia=self.cuota_1)
+        self.assertEqual((cargo.fecha, cargo.monto), (date(2025, 3, 8), Decimal('150.00')))
+
+    def test_aplicar_rechaza_suma_distinta_al_total(self):
+        obtener_sandbox(self.user, 2025, 3, reiniciar=True)
+        mover_cuota_sandbox(self.user, 2025, 3, {'fecha_pago_id': self.cuota_1.id, 'monto': '50.00'})
+
+        with self.assertRaises(ValidationError):
+            aplicar_sandbox(self.user, 2025, 3)
+        self.cuota_1.refresh_from_db()
+        self.assertEqual(self.cuota_1.monto_por_pagar, Decimal('100.00'))
+
+    def test_aplicar_rechaza_cuota_modificada_fuera_del_sandbox(self):
+        obtener_sandbox(self.user, 2025, 3, reiniciar=True)
+        mover_cuota_sandbox(self.user, 2025, 3, {'fecha_pago_id': self.cuota_1.id, 'fecha': '2025-03-09'})
+        FacturasFechasDePago.objects.filter(id=self.cuota_1.id).update(fecha_por_pagar=date(2025, 3, 6))
+
+        with self.assertRaises(ValidationError):
+            aplicar_sandbox(self.user, 2025, 3)
+
+
+class CacheCalendarioTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Cache")
+        self.user = User.objects.create_user(
+            email="cache@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        self.sucursal = Sucursales.objects.create(nombre="Centro", organizacion=self.org)
+
+    def _dia(self, datos, fecha):
+        for semana in datos['dias_del_mes']:
+            for dia in semana:
+                if dia and dia['fecha'] == fecha:
+                    return dia
+
+    def test_mes_se_sirve_de_cache_hasta_que_una_escritura_lo_invalida(self):
+        Ventas.objects.create(fecha=date(2025, 3, 3), monto=Decimal('100.00'), sucursal=self.sucursal)
+        self.assertEqual(obtener_datos_calendario(2025, 3, self.user)['total_ventas_mes'], Decimal('100.00'))
+
+        # Escritura directa (sin servicio): el snapshot sigue vigente
+        Ventas.objects.create(fecha=date(2025, 3, 4), monto=Decimal('50.00'), sucursal=self.sucursal)
+        self.assertEqual(obtener_datos_calendario(2025, 3, self.user)['total_ventas_mes'], Decimal('100.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            servicio_crear_venta(
+                {'fecha': date(2025, 3, 5), 'monto': Decimal('25.00'), 'sucursal': self.sucursal}, self.user
+            )
+
+        datos = obtener_datos_calendario(2025, 3, self.user)
+        self.assertEqual(datos['total_ventas_mes'], Decimal('175.00'))
+        self.assertEqual(self._dia(datos, date(2025, 3, 5))['saldo_dia'], Decimal('175.00'))
+
+    def test_saldo_previo_no_depende_del_snapshot(self):
+        obtener_datos_calendario(2025, 3, self.user)
+        Ventas.objects.create(fecha=date(2025, 2, 10), monto=Decimal('300.00'), sucursal=self.sucursal)
+
+        datos = obtener_datos_calendario(2025, 3, self.user)
+        self.assertEqual(self._dia(datos, date(2025, 3, 1))['saldo_dia'], Decimal('300.00'))
+
+    def test_precalienta_meses_adyacentes(self):
+        calculados = []
+
+        def calcular(organizacion, year, month):
+            calculados.append((year, month))
+            return {'mes': (year, month)}
+
+        hilo = precalentar_meses_adyacentes(self.org, 2025, 1, calcular)
+        hilo.join(timeout=5)
+
+        self.assertEqual(sorted(calculados), [(2024, 12), (2025, 2)])
+        self.assertEqual(cache.get(llave_snapshot(self.org.id, 2024, 12)), {'mes': (2024, 12)})
+        # Ya en caché: no se vuelve a lanzar el hilo
+        self.assertIsNone(precalentar_meses_adyacentes(self.org, 2025, 1, calcular))
+
+    def test_error_al_precalentar_se_registra(self):
+        def calcular(organizacion, year, month):
+            raise RuntimeError('sin BD')
+
+        with self.assertLogs('core.services.cache_calendario', 'ERROR') as registro:
+            precalentar_meses_adyacentes(self.org, 2025, 1, calcular).join(timeout=5)
+        self.assertEqual(len(registro.records), 2)
+        # Se puede volver a intentar
+        with self.assertLogs('core.services.cache_calendario', 'ERROR'):
+            precalentar_meses_adyacentes(self.org, 2025, 1, calcular).join(timeout=5)
+
+    @override_settings(CALENDARIO_PRECALENTAR=False, STORAGES=ESTATICOS_SIN_MANIFIESTO)
+    def test_cuadricula_en_cache_se_renueva_con_la_version_del_mes(self):
+        self.client.force_login(self.user)
+        url = '/core/calendario/?year=2025&month=3'
+        Ventas.objects.create(fecha=date(2025, 3, 3), monto=Decimal('1234.50'), sucursal=self.sucursal)
+        self.assertContains(self.client.get(url), '<span class="item-amount">$1,235</span>', html=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            servicio_crear_venta(
+                {'fecha': date(2025, 3, 5), 'monto': Decimal('25.00'), 'sucursal': self.sucursal}, self.user
+            )
+
+        respuesta = self.client.get(url)
+        self.assertContains(respuesta, '<span class="item-amount">$25</span>', html=True)
+        self.assertContains(respuesta, '<span class="item-amount saldo-dia">$1,259.50</span>', html=True)
+
+    def test_busqueda_folio_agrupa_por_dia_sobre_el_snapshot(self):
+        proveedor = Proveedores.objects.create(nombre="Prov", organizacion=self.org)
+        factura = Facturas.objects.create(
+            proveedor=proveedor, folio="ABC-1", monto=Decimal('200.00'), organizacion=self.org
+        )
+        for dia in (3, 17):
+            FacturasFechasDePago.objects.create(
+                factura=factura, fecha_por_pagar=date(2025, 3, dia), monto_por_pagar=Decimal('100.00')
+            )
+
+        obtener_datos_calendario(2025, 3, self.user)
+        datos = obtener_datos_calendario(2025, 3, self.user, folio_busqueda='abc')
+
+        self.assertEqual(len(datos['fechas_factura_filtrada']), 2)
+        self.assertTrue(self._dia(datos, date(2025, 3, 17))['tiene_factura_filtrada'])
+        self.assertFalse(self._dia(datos, date(2025, 3, 4))['tiene_factura_filtrada'])
+        self.assertEqual(len(datos['facturas_filtradas'][0].fechas_encontradas), 2)
+
+
+@override_settings(PDF_RENDER_WORKERS=0)
+class RenderPdfTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org PDF")
+        self.user = User.objects.create_user(
+            email="pdf@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        proveedor = Proveedores.objects.create(nombre="Aceros & Co", cuenta="CLABE 123", organizacion=self.org)
+        factura = Facturas.objects.create(proveedor=proveedor, folio="F-1", monto=Decimal('150.00'), organizacion=self.org)
+        FacturasFechasDePago.objects.create(
+            factura=factura, fecha_por_pagar=date(2026, 1, 15), monto_por_pagar=Decimal('150.00')
+        )
+        self.data = {
+            'fecha': '2026-01-15',
+            'tabulacion_total': 200,
+            'filas': [{'denom': 100, 'cantidad': 2, 'total': 200}],
+        }
+
+    def test_contenido_y_cache_por_hash(self):
+        contenido = contenido_corte_caja(self.data, self.user)
+        self.assertEqual(contenido['facturas'], [['CLABE 123', 'Aceros & Co', 150.0]])
+
+        with mock.patch.object(render_pdf, '_renderizar_en_pool', wraps=render_pdf._renderizar_en_pool) as render:
+            primero = tabulacion_pdf(self.data, self.user).getvalue()
+            segundo = tabulacion_pdf(self.data, self.user).getvalue()
+
+        self.assertTrue(primero.startswith(b'%PDF'))
+        self.assertEqual(primero, segundo)
+        self.assertEqual(render.call_count, 1)
+        # Los estilos compartidos no se modifican al renderizar
+        self.assertEqual((ESTILO_CELDA.fontSize, ESTILO_CELDA.leading), (8, 12))
+
+    @override_settings(PDF_RENDER_ESPERA=0)
+    def test_cola_llena_responde_503(self):
+        self.client.force_login(self.user)
+        with mock.patch.object(render_pdf, '_obtener_cola', return_value=threading.BoundedSemaphore(1)) as cola:
+            cola.return_value.acquire()
+            respuesta = self.client.post(
+                '/core/exportar_tabulacion/', json.dumps(self.data), content_type='application/json'
+            )
+
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual(respuesta['Retry-After'], '5')
+
+
+@override_settings(PDF_RENDER_WORKERS=0)
+class ExportarCortesCajaTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Cortes")
+        self.user = User.objects.create_user(
+            email="cortes@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        proveedor = Proveedores.objects.create(nombre="Prov", organizacion=self.org)
+        factura = Facturas.objects.create(proveedor=proveedor, folio="F-1", monto=Decimal('300.00'), organizacion=self.org)
+        for dia in (2, 2, 20):
+            FacturasFechasDePago.objects.create(
+                factura=factura, fecha_por_pagar=date(2026, 1, dia), monto_por_pagar=Decimal('100.00')
+            )
+        mp = Facturas.objects.create(proveedor=proveedor, folio="MP", tipo='MERCADO PAGO',
+                                     monto=Decimal('50.00'), organizacion=self.org)
+        FacturasFechasDePago.objects.create(factura=mp, fecha_por_pagar=date(2026, 1, 5), monto_por_pagar=Decimal('50.00'))
+
+    def test_agrupa_por_dia_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            cortes = contenidos_cortes_caja(date(2026, 1, 1), date(2026, 1, 31), self.user)
+
+        self.assertEqual([fecha for fecha, _ in cortes], [date(2026, 1, 2), date(2026, 1, 20)])
+        self.assertEqual(len(cortes[0][1]['facturas']), 2)
+
+    def test_rango_invalido(self):
+        with self.assertRaises(ValidationError):
+            contenidos_cortes_caja(date(2026, 1, 1), date(2026, 4, 1), self.user)
+
+    def test_zip_con_un_pdf_por_dia(self):
+        self.client.force_login(self.user)
+        respuesta = self.client.post('/core/herramientas/cortes-caja/', {
+            'fecha_inicio': '2026-01-01', 'fecha_fin': '2026-01-31', 'formato': 'zip',
+        })
+
+        self.assertEqual(respuesta.status_code, 200)
+        archivo = zipfile.ZipFile(io.BytesIO(b''.join(respuesta.streaming_content)))
+        self.assertEqual(archivo.namelist(), ['Corte_Caja_2026-01-02.pdf', 'Corte_Caja_2026-01-20.pdf'])
+        self.assertTrue(archivo.read('Corte_Caja_2026-01-20.pdf').startswith(b'%PDF'))
+
+
+class ConsultasEnParaleloTest(TransactionTestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Paralelo")
+        self.user = User.objects.create_user(
+            email="paralelo@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        sucursal = Sucursales.objects.create(nombre="Centro", organizacion=self.org)
+        Ventas.objects.create(sucursal=sucursal, fecha=date(2026, 1, 5), monto=Decimal('50.00'))
+
+    def test_cada_consulta_en_su_hilo(self):
+        hilos = []
+
+        def consulta(resultado):
+            def ejecutar():
+                hilos.append(threading.get_ident())
+                return resultado()
+            return ejecutar
+
+        resultados = async_to_sync(consultas_en_paralelo)(
+            ventas=consulta(lambda: Ventas.objects.count()),
+            sucursales=consulta(lambda: list(Sucursales.objects.values_list('nombre', flat=True))),
+        )
+
+        self.assertEqual(resultados, {'ventas': 1, 'sucursales': ["Centro"]})
+        self.assertEqual(len(hilos), 2)
+        self.assertNotIn(threading.get_ident(), hilos)
+
+
+class FiltroMonedaTest(SimpleTestCase):
+    def test_equivale_a_floatformat_intcomma(self):
+        humanize = Template('{% load humanize %}{{ v|floatformat:2|intcomma }}|{{ v|floatformat:0|intcomma }}')
+        formato = Template('{% load formato %}{{ v|moneda:2 }}|{{ v|moneda:0 }}')
+        for valor in (0, 12, 1234567.891, Decimal('-1234.5'), Decimal('999.995'), -0.001, None, '', 'abc'):
+            with self.subTest(valor=valor):
+                contexto = Context({'v': valor})
+                self.assertEqual(formato.render(contexto), humanize.render(contexto))
+
+
+@override_settings(CALENDARIO_PRECALENTAR=False, STORAGES=ESTATICOS_SIN_MANIFIESTO)
+class VistasAsyncTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Async")
+        self.user = User.objects.create_user(
+            email="async@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        proveedor = Proveedores.objects.create(nombre="Prov Async", organizacion=self.org)
+        factura = Facturas.objects.create(proveedor=proveedor, folio="F-A", monto=Decimal('80.00'), organizacion=self.org)
+        FacturasFechasDePago.objects.create(factura=factura, fecha_por_pagar=date(2026, 1, 5), monto_por_pagar=Decimal('80.00'))
+
+    def test_dentro_de_una_transaccion_corren_en_el_mismo_hilo(self):
+        hilos = []
+        async_to_sync(consultas_en_paralelo)(
+            a=lambda: hilos.append(threading.get_ident()),
+            b=lambda: hilos.append(threading.get_ident()),
+        )
+        self.assertEqual(hilos, [threading.get_ident()] * 2)
+
+    def test_detalle_dia_y_reportes(self):
+        self.client.force_login(self.user)
+
+        respuesta = self.client.get('/core/calendario/dia/2026-01-05/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.context['cargo_total_dia'], Decimal('80.00'))
+        self.assertEqual(len(respuesta.context['fechas_pago_dia']), 1)
+
+        for url in ('/core/reportes_facturas/', '/core/reportes/movimientos/', '/core/reporte_ventas_sucursal/'):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_login_requerido(self):
+        respuesta = self.client.get('/core/calendario/')
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertIn('/login/', respuesta['Location'])
+
+
+@override_settings(CALENDARIO_PRECALENTAR=False)
+class ApiJsonTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org API")
+        self.user = User.objects.create_user(
+            email="api@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        sucursal = Sucursales.objects.create(nombre="Centro", organizacion=self.org)
+        Ventas.objects.create(fecha=date(2025, 3, 3), monto=Decimal('150.50'), sucursal=sucursal)
+        proveedor = Proveedores.objects.create(nombre="Prov API", organizacion=self.org)
+        factura = Facturas.objects.create(proveedor=proveedor, folio="API-1", monto=Decimal('80.00'), organizacion=self.org)
+        FacturasFechasDePago.objects.create(factura=factura, fecha_por_pagar=date(2025, 3, 3), monto_por_pagar=Decimal('80.00'))
+        self.client.force_login(self.user)
+
+    def test_calendario_por_columnas_con_etag(self):
+        respuesta = self.client.get('/core/api/v1/calendario/?year=2025&month=3')
+        self.assertEqual(respuesta.status_code, 200)
+        datos = json.loads(respuesta.content)
+
+        self.assertEqual(datos['inicio'], 6)  # el 1 de marzo de 2025 es sábado
+        self.assertEqual(len(datos['dias']['saldo']), 31)
+        self.assertEqual(datos['dias']['ventas'][2], '150.50')
+        self.assertEqual(datos['dias']['saldo'][2], '70.50')
+        self.assertEqual(datos['dias']['pendientes'][2], 1)
+        self.assertEqual(datos['totales']['cuota_diaria_necesaria'], '2.58')
+
+        no_modificado = self.client.get('/core/api/v1/calendario/?year=2025&month=3', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(no_modificado.status_code, 304)
+        self.assertEqual(no_modificado.content, b'')
+
+    def test_detalle_dia_en_filas(self):
+        datos = json.loads(self.client.get('/core/api/v1/calendario/dia/2025-03-03/').content)
+
+        fila = dict(zip(datos['fechas_pago']['campos'], datos['fechas_pago']['filas'][0]))
+        self.assertEqual((fila['folio'], fila['proveedor'], fila['monto_por_pagar']), ('API-1', 'Prov API', '80.00'))
+        self.assertEqual(datos['ventas']['filas'][0][1:], ['Centro', '150.50'])
+        self.assertEqual(datos['totales']['venta_total_dia'], '150.50')
+
+
+@override_settings(CALENDARIO_PRECALENTAR=False, STORAGES=ESTATICOS_SIN_MANIFIESTO)
+class RespuestasCondicionalesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org ETag")
+        self.user = User.objects.create_user(
+            email="etag@test.com", password="x", first_name="E", last_name="T", organizacion=self.org
+        )
+        self.client.force_login(self.user)
+
+    def test_304_sin_ejecutar_la_vista(self):
+        for url in ('/core/calendario/?year=2025&month=3', '/sucursales/sucursales/'):
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertIn('no-cache', respuesta['Cache-Control'])
+            self.assertIn('Last-Modified', respuesta)
+
+            # Sesión, usuario, organización y suscripción (middleware) y la versión
+            with self.assertNumQueries(5):
+                no_modificado = self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+            self.assertEqual(no_modificado.status_code, 304)
+
+    def test_escritura_cambia_el_etag(self):
+        url = '/core/calendario/?year=2025&month=3'
+        etag = self.client.get(url)['ETag']
+
+        sucursal = Sucursales.objects.create(nombre="Centro", organizacion=self.org)
+        servicio_crear_venta({'sucursal': sucursal, 'fecha': date(2025, 3, 3), 'monto': Decimal('10')}, self.user)
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.version_datos, 1)
+
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_sandbox_sin_validadores(self):
+        respuesta = self.client.get('/core/calendario/?year=2025&month=3&sandbox=1')
+        self.assertNotIn('ETag', respuesta)
+
+
+class CambiosDatosTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Cambios")
+        self.user = User.objects.create_user(
+            email="cambios@test.com", password="x", first_name="C", last_name="D", organizacion=self.org
+        )
+        self.sucursal = servicio_crear_sucursal({'nombre': 'Centro'}, self.user)
+        self.client.force_login(self.user)
+
+    def _cambios(self, since=0, **extra):
+        return json.loads(self.client.get('/core/api/v1/cambios/', {'since': since, **extra}).content)
+
+    def test_venta_y_su_ingreso_en_la_bitacora(self):
+        cursor = self._cambios()['cursor']
+        venta = servicio_crear_venta({'sucursal': self.sucursal, 'fecha': date(2025, 3, 3), 'monto': Decimal('10')}, self.user)
+        servicio_editar_venta(venta, {'sucursal': self.sucursal, 'fecha': date(2025, 3, 5), 'monto': Decimal('12')}, self.user)
+
+        datos = self._cambios(cursor)
+        filas = [dict(zip(datos['campos'], fila)) for fila in datos['filas']]
+        self.assertEqual(
+            [(f['modelo'], f['operacion'], f['fecha'], f['fecha_anterior']) for f in filas],
+            [('venta', 'CREAR', '2025-03-03', None), ('movimiento', 'CREAR', '2025-03-03', None),
+             ('venta', 'EDITAR', '2025-03-05', '2025-03-03'), ('movimiento', 'EDITAR', '2025-03-05', '2025-03-03')],
+        )
+        self.assertEqual(datos['cursor'], filas[-1]['cursor'])
+        self.assertEqual(self._cambios(datos['cursor'])['filas'], [])
+
+        venta.refresh_from_db()
+        self.assertGreater(venta.updated_at, venta.created_at)
+
+    def test_borrado_en_cascada_queda_anotado(self):
+        venta = servicio_crear_venta({'sucursal': self.sucursal, 'fecha': date(2025, 3, 3), 'monto': Decimal('10')}, self.user)
+        ingreso = Movimientos_Cartera.objects.get(venta=venta)
+        esperados = {('sucursal', self.sucursal.pk), ('venta', venta.pk), ('movimiento', ingreso.pk)}
+        cursor = self._cambios()['cursor']
+        servicio_eliminar_sucursal(self.sucursal, self.user)
+
+        filas = self._cambios(cursor)['filas']
+        self.assertEqual({(f[1], f[2]) for f in filas}, esperados)
+        self.assertEqual({f[3] for f in filas}, {'ELIMINAR'})
+
+    def test_paginas_con_cursor(self):
+        for dia in range(1, 6):
+            servicio_crear_venta({'sucursal': self.sucursal, 'fecha': date(2025, 3, dia), 'monto': Decimal('1')}, self.user)
+        primera = self._cambios(limite=4)
+        self.assertTrue(primera['hay_mas'])
+        segunda = self._cambios(primera['cursor'], limite=100)
+        self.assertFalse(segunda['hay_mas'])
+        self.assertEqual(len(primera['filas']) + len(segunda['filas']), 11)  # sucursal + 5 ventas con su ingreso
+
+        self.assertEqual(self.client.get('/core/api/v1/cambios/', {'since': 'x'}).status_code, 400)
+
+
+class SincronizacionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Sync")
+        self.user = User.objects.create_user(
+            email="sync@test.com", password="x", first_name="S", last_name="Y", organizacion=self.org
+        )
+        self.sucursal = servicio_crear_sucursal({'nombre': 'Centro'}, self.user)
+        self.ventas = [
+            servicio_crear_venta({'sucursal': self.sucursal, 'fecha': date(2025, 3, dia), 'monto': Decimal('10')}, self.user)
+            for dia in (1, 2, 3)
+        ]
+        self.client.force_login(self.user)
+
+    def _sincronizar(self, cursor=None, limite=2):
+        """Todas las páginas desde el cursor: ({modelo: {id: fila}}, {modelo: ids}, siguiente)."""
+        registros, eliminados = {}, {}
+        while True:
+            parametros = {'limite': limite, **({'cursor': cursor} if cursor is not None else {})}
+            datos = json.loads(self.client.get('/core/api/v1/sincronizacion/', parametros).content)
+            for modelo, bloque in datos['registros'].items():
+                registros.setdefault(modelo, {}).update(
+                    {fila[0]: dict(zip(bloque['campos'], fila)) for fila in bloque['filas']}
+                )
+            for modelo, ids in datos['eliminados'].items():
+                eliminados.setdefault(modelo, set()).update(ids)
+            cursor = datos['siguiente']
+            if not datos['hay_mas']:
+                return registros, eliminados, cursor
+
+    def test_carga_completa_y_luego_incremental(self):
+        registros, _, cursor = self._sincronizar()
+        self.assertEqual(set(registros['venta']), {v.pk for v in self.ventas})
+        self.assertEqual(len(registros['movimiento']), 3)
+        self.assertEqual(registros['venta'][self.ventas[0].pk]['monto'], '10.00')
+
+        self.assertEqual(self._sincronizar(cursor)[0], {})
+
+        servicio_editar_venta(self.ventas[0], {'sucursal': self.sucursal, 'fecha': date(2025, 3, 9), 'monto': Decimal('15')}, self.user)
+        venta_borrada = self.ventas[1].pk
+        ingreso_borrado = Movimientos_Cartera.objects.get(venta=self.ventas[1]).pk
+        servicio_eliminar_venta(self.ventas[1], self.user)
+
+        registros, eliminados, _ = self._sincronizar(cursor)
+        self.assertEqual(registros['venta'][self.ventas[0].pk]['fecha'], '2025-03-09')
+        self.assertEqual(eliminados, {'venta': {venta_borrada}, 'movimiento': {ingreso_borrado}})
+
+    def test_pago_reenvia_las_cuotas_con_su_estado(self):
+        proveedor = Proveedores.objects.create(nombre="Prov Sync", organizacion=self.org)
+        factura = Facturas.objects.create(proveedor=proveedor, folio="S-1", monto=Decimal('80.00'), organizacion=self.org)
+        cuota = FacturasFechasDePago.objects.create(factura=factura, fecha_por_pagar=date(2025, 3, 3), monto_por_pagar=Decimal('80.00'))
+        _, _, cursor = self._sincronizar()
+
+        registrar_movimiento_pago_factura({'factura': factura, 'monto': Decimal('80.00'), 'fecha': date(2025, 3, 3)}, self.user)
+
+        registros, _, _ = self._sincronizar(cursor)
+        self.assertEqual(registros['fecha_pago'][cuota.pk]['estado'], 'PAGADO')
+        self.assertEqual(self.client.get('/core/api/v1/sincronizacion/', {'cursor': 'c1.x'}).status_code, 400)
+
+
+class EventosEnVivoTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Eventos")
+        self.user = User.objects.create_user(
+            email="eventos@test.com", password="x", first_name="E", last_name="V", organizacion=self.org
+        )
+        self.sucursal = servicio_crear_sucursal({'nombre': 'Centro'}, self.user)
+        self.client.force_login(self.user)
+
+    def test_escritura_publica_dia_y_saldo_al_confirmar(self):
+        async def escuchar():
+            async with suscribir(self.org.pk) as cola:
+                await sync_to_async(self._crear_venta)()
+                return [await asyncio.wait_for(cola.get(), 1) for _ in range(2)]
+
+        dia, saldo = async_to_sync(escuchar)()
+        self.org.refresh_from_db()
+        self.assertEqual(dia, {'evento': 'dia', 'datos': {'fechas': ['2025-03-03'], 'version': self.org.version_datos}})
+        self.assertEqual(saldo, {'evento': 'saldo', 'datos': {'version': self.org.version_datos}})
+
+    def _crear_venta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            servicio_crear_venta({'sucursal': self.sucursal, 'fecha': date(2025, 3, 3), 'monto': Decimal('10')}, self.user)
+
+    def test_flujo_sse(self):
+        async def leer():
+            flujo = flujo_eventos(self.org.pk, latido=0.01)
+            inicio = await anext(flujo)
+            latido = await anext(flujo)
+            publicar(self.org.pk, 'saldo', {'version': 3})
+            evento = await anext(flujo)
+            await flujo.aclose()
+            return inicio, latido, evento
+
+        inicio, latido, evento = async_to_sync(leer)()
+        self.assertEqual(inicio, 'retry: 5000\n\n')
+        self.assertEqual(latido, ': latido\n\n')
+        self.assertEqual(evento, 'event: saldo\ndata: {"version":3}\n\n')
+
+    def test_sin_asgi_no_abre_la_conexion(self):
+        self.assertEqual(self.client.get('/core/eventos/').status_code, 204)
+
+    def test_api_saldos_con_version(self):
+        self._crear_venta()
+        respuesta = self.client.get('/core/api/v1/saldos/')
+        self.org.refresh_from_db()
+        self.assertEqual(respuesta['X-Version-Datos'], str(self.org.version_datos))
+        self.assertEqual(json.loads(respuesta.content)['saldo_total'], '10.00')
+
+        no_modificado = self.client.get('/core/api/v1/saldos/', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(no_modificado.status_code, 304)
+        self.assertEqual(no_modificado['X-Version-Datos'], respuesta['X-Version-Datos'])
+
+
+@override_settings(CACHE_COMPARTIDO=True)
+class ReportesCompartidosTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Reportes")
+        self.user = User.objects.create_user(
+            email="reportes@test.com", password="x", first_name="R", last_name="C", organizacion=self.org
+        )
+        self.llamadas = 0
+
+    async def _calcular(self, filtros, user):
+        self.llamadas += 1
+        await asyncio.sleep(0.05)
+        return {'total': self.llamadas, 'consultas_incompletas': []}
+
+    def _pedir(self, veces, filtros=None):
+        filtros = filtros or {'fecha_inicio': date(2025, 3, 1), 'proveedor': None}
+
+        async def pedir():
+            return await asyncio.gather(*(
+                aobtener_reporte_compartido('prueba', filtros, self.user, self._calcular) for _ in range(veces)
+            ))
+        return async_to_sync(pedir)()
+
+    def test_peticiones_iguales_calculan_una_vez(self):
+        self.assertEqual(self._pedir(4), [{'total': 1, 'consultas_incompletas': []}] * 4)
+        self.assertEqual(self.llamadas, 1)
+
+        # Otros filtros u otra versión de datos: otro cálculo
+        self._pedir(1, {'fecha_inicio': date(2025, 4, 1), 'proveedor': None})
+        sucursal = Sucursales.objects.create(nombre="Centro", organizacion=self.org)
+        servicio_crear_venta({'sucursal': sucursal, 'fecha': date(2025, 3, 3), 'monto': Decimal('10')}, self.user)
+        self.assertEqual(self._pedir(1), [{'total': 3, 'consultas_incompletas': []}])
+
+    @override_settings(REPORTES_COMPARTIDOS_ESPERA=0.1)
+    def test_candado_abandonado_calcula_aparte(self):
+        llave = llave_reporte('prueba', self.org.pk, 0, {'fecha_inicio': date(2025, 3, 1), 'proveedor': None})
+        cache.set(f'{llave}_calculando', 'otro', timeout=60)
+        self.assertEqual(self._pedir(1), [{'total': 1, 'consultas_incompletas': []}])
+
+    @override_settings(CACHE_COMPARTIDO=False)
+    def test_sin_cache_compartido_calcula_cada_peticion(self):
+        self._pedir(3)
+        self.assertEqual(self.llamadas, 3)
+
+    def test_resultado_parcial_no_se_guarda(self):
+        async def parcial(filtros, user):
+            self.llamadas += 1
+            return {'consultas_incompletas': ['detalles']}
+
+        for _ in range(2):
+            async_to_sync(aobtener_reporte_compartido)('prueba', {}, self.user, parcial)
+        self.assertEqual(self.llamadas, 2)
+
+
+CUOTAS_PRUEBA = {
+    'BASICO': {'interactivo': (100, 60), 'reporte': (2, 1), 'exportacion': (1, 1), 'pdf': (1, 1), 'webhook': (1, 1)},
+    'PRO': {'interactivo': (100, 60), 'reporte': (4, 1), 'exportacion': (1, 1), 'pdf': (1, 1), 'webhook': (1, 1)},
+}
+
+
+@override_settings(
+    CUOTAS_PETICIONES=CUOTAS_PRUEBA, CALENDARIO_PRECALENTAR=False, STORAGES=ESTATICOS_SIN_MANIFIESTO,
+)
+class CuotasPeticionesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Cuotas")
+        self.user = User.objects.create_user(
+            email="cuotas@test.com", password="x", first_name="C", last_name="P", organizacion=self.org
+        )
+        self.client.force_login(self.user)
+
+    def _estados(self, url, veces):
+        return [self.client.get(url).status_code for _ in range(veces)]
+
+    def test_reportes_agotan_su_cubeta_sin_tocar_las_demas(self):
+        self.assertEqual(self._estados('/core/reportes_facturas/', 3), [200, 200, 429])
+        respuesta = self.client.get('/core/reportes/movimientos/')
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertEqual(respuesta['Retry-After'], '60')
+
+        # Otra clase y otra organización siguen pasando
+        self.assertEqual(self.client.get('/core/calendario/?year=2025&month=3').status_code, 200)
+        otra = Organizacion.objects.create(nombre="Org Cuotas 2")
+        self.client.force_login(User.objects.create_user(
+            email="cuotas2@test.com", password="x", first_name="C", last_name="Q", organizacion=otra
+        ))
+        self.assertEqual(self.client.get('/core/reportes_facturas/').status_code, 200)
+
+    def test_plan_pro_tiene_mas_capacidad(self):
+        self.org.suscripcion.plan = 'PRO'
+        self.org.suscripcion.save()
+        self.assertEqual(self._estados('/core/reportes_facturas/', 5), [200, 200, 200, 200, 429])
+
+    def test_webhook_sin_organizacion_usa_cubeta_comun(self):
+        self.client.logout()
+        primera = self.client.post('/suscripciones/webhook/', data='{}', content_type='application/json')
+        self.assertNotEqual(primera.status_code, 429)
+        segunda = self.client.post('/suscripciones/webhook/', data='{}', content_type='application/json')
+        self.assertEqual(segunda.status_code, 429)
+
+    @override_settings(WEB_WORKERS=2)
+    def test_sin_redis_cada_worker_recibe_su_parte(self):
+        respuestas = [self.client.get('/core/reportes_facturas/') for _ in range(2)]
+        self.assertEqual([r.status_code for r in respuestas], [200, 429])
+        self.assertEqual(respuestas[1]['Retry-After'], '120')
+
+    def test_las_fichas_se_reponen(self):
+        with mock.patch('core.services.cuotas_peticiones.time.time', return_value=1000.0):
+            self.assertEqual(consumir('reporte', self.org.pk), 0)
+            self.assertEqual(consumir('reporte', self.org.pk), 0)
+            self.assertEqual(consumir('reporte', self.org.pk), 60)
+        with mock.patch('core.services.cuotas_peticiones.time.time', return_value=1061.0):
+            self.assertEqual(consumir('reporte', self.org.pk), 0)
+
+
+class SaludTest(TestCase):
+    def test_listo_sin_login(self):
+        respuesta = self.client.get('/core/salud/')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.json()['listo'])
+        self.assertIn('ms', respuesta.json()['bd'])
+        self.assertEqual(respuesta['Cache-Control'], 'no-store')
+
+    def test_cache_caido_responde_503(self):
+        with mock.patch('core.services.salud.cache.set', side_effect=ConnectionError):
+            respuesta = self.client.get('/core/salud/')
+
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual(respuesta.json()['cache'], {'ok': False, 'error': 'ConnectionError'})
+
+
+@override_settings(STORAGES=ESTATICOS_SIN_MANIFIESTO)
+class LimitesConsultasTest(TransactionTestCase):
+    # El reporte lee de la réplica
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Limites")
+        self.user = User.objects.create_user(
+            email="limites@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        Suscripcion = self.org.suscripcion.__class__
+        Suscripcion.objects.filter(organizacion=self.org).update(estado='ACTIVA')
+
+    def _consulta_lenta(self):
+        from django.db import connection
+        with connection.cursor() as cursor:
+            # Cuenta hasta 10^8: tarda varios segundos en SQLite
+            cursor.execute(
+                'WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 100000000) '
+                'SELECT count(*) FROM n'
+            )
+            return cursor.fetchone()[0]
+
+    @override_settings(LIMITES_CONSULTAS_MS={'reporte': 50})
+    def test_consulta_lenta_se_cancela_y_el_reporte_sale_parcial(self):
+        from .services.consultas_paralelo import consultas_parciales
+        from .services.limites_consultas import perfil_consultas
+
+        with perfil_consultas('reporte'):
+            resultados, incompletas = async_to_sync(consultas_parciales)(
+                {'lenta': 'respaldo', 'rapida': None},
+                lenta=self._consulta_lenta,
+                rapida=lambda: Organizacion.objects.filter(pk=self.org.pk).count(),
+            )
+
+        self.assertEqual(resultados, {'lenta': 'respaldo', 'rapida': 1})
+        self.assertEqual(incompletas, ['lenta'])
+
+    def test_rollback_olvida_el_limite_aplicado(self):
+        conexion = connections['default']
+        with transaction.atomic():
+            conexion._limite_consultas_ms = 50
+            # Un savepoint revertido por cualquier error deshace el SET
+            with self.assertRaises(ValueError), transaction.atomic():
+                Organizacion.objects.create(nombre="Org Revertida")
+                raise ValueError
+            self.assertIsNone(conexion._limite_consultas_ms)
+
+            conexion._limite_consultas_ms = 50
+            transaction.set_rollback(True)
+        self.assertIsNone(conexion._limite_consultas_ms)
+
+    @override_settings(LIMITES_CONSULTAS_MS={'interactivo': 60000, 'reporte': 60000})
+    def test_reporte_completo_sin_aviso(self):
+        self.client.force_login(self.user)
+        respuesta = self.client.get('/core/reportes_facturas/')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.context['consultas_incompletas'], [])
+        self.assertNotContains(respuesta, 'Reporte parcial')
+
+
+@override_settings(STORAGES=ESTATICOS_SIN_MANIFIESTO)
+class RuteoReplicaTest(TransactionTestCase):
+    """Dos BD distintas: lo que se escribe en 'default' no aparece en 'replica'."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.org = Organizacion.objects.create(nombre="Org Replica")
+        self.user = User.objects.create_user(
+            email="replica@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        Suscripcion = self.org.suscripcion.__class__
+        Suscripcion.objects.filter(organizacion=self.org).update(estado='ACTIVA')
+        Sucursales.objects.create(nombre="Centro", organizacion=self.org)
+
+    def test_lecturas_van_a_la_replica_hasta_que_se_escribe(self):
+        from .services.ruteo_bd import lectura_replica
+
+        self.assertTrue(Sucursales.objects.filter(nombre="Centro").exists())
+        with lectura_replica():
+            self.assertFalse(Sucursales.objects.filter(nombre="Centro").exists())
+
+            Sucursales.objects.create(nombre="Norte", organizacion=self.org)
+            # Lee lo que acaba de escribir
+            self.assertEqual(Sucursales.objects.filter(organizacion=self.org).count(), 2)
+        self.assertFalse(Sucursales.objects.using('replica').exists())
+
+    @override_settings(CONSULTAS_EN_PARALELO=False)  # todas en la conexión de este hilo
+    def test_vista_de_reporte_lee_de_replica_salvo_tras_escribir(self):
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.assertEqual(self.client.get('/core/reportes/movimientos/').status_code, 200)
+        self.assertTrue(replica.captured_queries)
+
+        # Cookie que deja RuteoBDMiddleware tras un request que escribió
+        self.client.cookies['bd_primaria'] = '1'
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.assertEqual(self.client.get('/core/reportes/movimientos/').status_code, 200)
+        self.assertFalse(replica.captured_queries)
+
+    def test_request_que_escribe_deja_cookie_de_primaria(self):
+        from .middleware import RuteoBDMiddleware
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        def vista(request):
+            Sucursales.objects.create(nombre="Sur", organizacion=self.org)
+            return HttpResponse()
+
+        respuesta = RuteoBDMiddleware(vista)(RequestFactory().get('/'))
+        self.assertIn('bd_primaria', respuesta.cookies)
+
+        respuesta = RuteoBDMiddleware(lambda request: HttpResponse())(RequestFactory().get('/'))
+        self.assertNotIn('bd_primaria', respuesta.cookies)
@@ -5,6 +5,17 @@ from django.views.generic import RedirectView, TemplateView
 urlpatterns = [
     path('calendario/', calendario_financiero, name='calendario-financiero'),
     path('calendario/dia/<str:fecha_str>/', detalle_dia, name='detalle-dia'),
+    path('calendario/sandbox/<int:year>/<int:month>/', sandbox_calendario, name='sandbox-calendario'),
+    path('calendario/simulacion/', simulacion_liquidez, name='simulacion-liquidez'),
+
+    # API JSON v1
+    path('api/v1/calendario/', api_calendario, name='api-calendario'),
+    path('api/v1/calendario/dia/<str:fecha_str>/', api_detalle_dia, name='api-detalle-dia'),
+    path('api/v1/cambios/', api_cambios, name='api-cambios'),
+    path('api/v1/sincronizacion/', api_sincronizacion, name='api-sincronizacion'),
+    path('api/v1/saldos/', api_saldos, name='api-saldos'),
+    path('eventos/', eventos, name='eventos'),
+
     path('reporte_ventas_sucursal/', ventas_por_sucursal, name='reporte-ventas-sucursal'),
     path('reportes_facturas/', reporte_facturas, name='reporte-facturas'),
     path('reportes/movimientos/', reporte_movimientos, name='reporte-movimientos'),
@@ -13,6 +24,11 @@ urlpatterns = [
     # Herramientas
     path('herramientas/tabulador/', herramienta_tabulador, name='herramienta-tabulador'),
     path('herramientas/tabulador/exportar/', exportar_tabulacion_simple, name='exportar-tabulacion-simple'),
+    path('herramientas/cortes-caja/', exportar_cortes_caja, name='exportar-cortes-caja'),
+
+    # Salud
+    path('salud/', salud, name='salud'),
+    path('salud/vivo/', vivo, name='salud-vivo'),
     
     # Legales
     path('terminos-y-condiciones/', TemplateView.as_view(template_name='core/terminos_condiciones.html'), name='terminos_condiciones'),
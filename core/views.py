@@ -1,44 +1,202 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from asgiref.sync import sync_to_async
+from .decorators import (
+    condicional_por_version, cuota_peticiones, lectura_replica, limite_consultas, login_required_async,
+)
 from datetime import datetime, timedelta
 from django.utils import timezone
-from sucursales.models import Sucursales
 
 # Import Swapped Services
-from .services.calendario import obtener_datos_calendario
-from .services.detalle_dia import obtener_datos_detalle_dia, tabulacion_pdf, tabulacion_simple_pdf
-from .services.reporte_ventas import (
-    reporte_ventas_por_sucursal, 
-    reporte_ventas_diarias,
-    obtener_alertas_criticas
+from .services.calendario import aobtener_datos_calendario, precalentar_calendario
+from .services.detalle_dia import aobtener_datos_detalle_dia, tabulacion_pdf, tabulacion_simple_pdf
+from .services.render_pdf import ColaPDFLlena
+from .services.salud import verificar_salud
+from .services.exportar_cortes import contenidos_cortes_caja, zip_cortes_caja, pdf_cortes_caja_combinado
+from .services.reporte_ventas import aobtener_reporte_ventas
+from .services.reporte_factura import aobtener_reporte_facturas
+from .services.reporte_movimientos import aobtener_reporte_movimientos
+from .services.reportes_compartidos import aobtener_reporte_compartido
+from .services.simulacion_liquidez import obtener_simulacion_liquidez
+from .services.api_json import (
+    datos_calendario_json, datos_cambios_json, datos_detalle_dia_json, datos_saldos_json, respuesta_json,
+)
+from .services.eventos import flujo_eventos
+from cartera.services.saldo_cargo import obtener_cargo_total, obtener_saldo_global
+from .services.cambios_datos import LIMITE_PAGINA, cambios_desde
+from .services.sincronizacion import pagina_sincronizacion
+from .services.sandbox_calendario import (
+    obtener_sandbox,
+    mover_cuota_sandbox,
+    deshacer_cuota_sandbox,
+    descartar_sandbox,
+    aplicar_sandbox,
 )
-from .services.reporte_factura import obtener_reporte_facturas
-from .services.reporte_movimientos import obtener_reporte_movimientos
+from django.core.exceptions import ValidationError
 import json
-from django.http import HttpResponse, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 
-@login_required
-def calendario_financiero(request):
+# Las vistas async (calendario, detalle del día y reportes) lanzan sus
+# consultas en paralelo (services/consultas_paralelo.py); el template se
+# renderiza en un hilo síncrono.
+
+@login_required_async
+@lectura_replica
+@condicional_por_version
+async def calendario_financiero(request):
     year = request.GET.get('year')
     month = request.GET.get('month')
     folio_busqueda = request.GET.get('folio', '').strip()
     
     # Pasamos request.user al servicio
-    context = obtener_datos_calendario(year, month, request.user, folio_busqueda)
+    context = await aobtener_datos_calendario(year, month, request.user, folio_busqueda)
+    context['modo_sandbox'] = request.GET.get('sandbox') == '1'
     
-    return render(request, 'core/calendario.html', context)
+    response = await sync_to_async(render)(request, 'core/calendario.html', context)
 
+    # Meses vecinos listos en caché para la navegación
+    await sync_to_async(precalentar_calendario)(request.user, context['year'], context['month'])
+    return response
+
+
+@login_required_async
+@lectura_replica
+@condicional_por_version
+async def detalle_dia(request, fecha_str):
+    context = await aobtener_datos_detalle_dia(fecha_str, request.user)
+    return await sync_to_async(render)(request, 'core/detalle_dia.html', context)
+
+
+# ============================================================
+# API JSON v1 (services/api_json.py)
+# ============================================================
+
+@login_required_async
+@lectura_replica
+@condicional_por_version
+async def api_calendario(request):
+    context = await aobtener_datos_calendario(request.GET.get('year'), request.GET.get('month'), request.user)
+    response = respuesta_json(request, datos_calendario_json(context))
+    await sync_to_async(precalentar_calendario)(request.user, context['year'], context['month'])
+    return response
+
+
+@login_required_async
+@lectura_replica
+@condicional_por_version
+async def api_detalle_dia(request, fecha_str):
+    context = await aobtener_datos_detalle_dia(fecha_str, request.user)
+    if not context:
+        return JsonResponse({'error': 'El usuario no tiene organización'}, status=403)
+    return respuesta_json(request, datos_detalle_dia_json(context))
+
+
+@login_required_async
+@lectura_replica
+@condicional_por_version
+async def api_saldos(request):
+    saldo_total = await sync_to_async(obtener_saldo_global)(request.user)
+    cargo_total = await sync_to_async(obtener_cargo_total)(request.user)
+    return respuesta_json(request, datos_saldos_json(saldo_total, cargo_total))
 
-@login_required
-def detalle_dia(request, fecha_str):
-    context = obtener_datos_detalle_dia(fecha_str, request.user)
-    return render(request, 'core/detalle_dia.html', context)
 
+@login_required_async
+@lectura_replica
+@condicional_por_version
+async def api_cambios(request):
+    if not request.user.organizacion_id:
+        return JsonResponse({'error': 'El usuario no tiene organización'}, status=403)
+    try:
+        cursor = int(request.GET.get('since') or 0)
+        limite = int(request.GET.get('limite') or LIMITE_PAGINA)
+    except ValueError:
+        return JsonResponse({'error': 'since y limite deben ser enteros'}, status=400)
+    pagina = await sync_to_async(cambios_desde)(request.user.organizacion_id, cursor, limite)
+    return respuesta_json(request, datos_cambios_json(pagina))
 
 
+@login_required_async
+@lectura_replica
+@condicional_por_version
+async def api_sincronizacion(request):
+    if not request.user.organizacion_id:
+        return JsonResponse({'error': 'El usuario no tiene organización'}, status=403)
+    try:
+        limite = int(request.GET.get('limite') or LIMITE_PAGINA)
+    except ValueError:
+        return JsonResponse({'error': 'limite debe ser entero'}, status=400)
+    try:
+        pagina = await sync_to_async(pagina_sincronizacion)(
+            request.user.organizacion_id, request.GET.get('cursor'), limite
+        )
+    except ValidationError as e:
+        return JsonResponse({'error': e.messages[0]}, status=400)
+    return respuesta_json(request, pagina)
+
+
+
+
+@login_required
+def simulacion_liquidez(request):
+    try:
+        dias = int(request.GET.get('dias', 90))
+        trayectorias = int(request.GET.get('trayectorias', 10000))
+    except (ValueError, TypeError):
+        dias, trayectorias = 90, 10000
+
+    context = obtener_simulacion_liquidez(request.user, dias=dias, n_trayectorias=trayectorias)
+    return render(request, 'core/simulacion_liquidez.html', context)
+
 
 @login_required
-def ventas_por_sucursal(request):
+def sandbox_calendario(request, year, month):
+    """
+    API JSON del modo "¿y si...?" del calendario.
+    GET: estado completo del mes. POST {accion, ...}: mover, deshacer,
+    reiniciar, descartar o aplicar. Solo se devuelven los días recalculados.
+    """
+    try:
+        if request.method == 'GET':
+            sandbox = obtener_sandbox(request.user, year, month)
+            return JsonResponse({
+                'dias': sandbox.dias(),
+                'cuotas': sandbox.serializar_cuotas(),
+                'cambios': sandbox.serializar_cambios(),
+            })
+
+        if request.method != 'POST':
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+        data = json.loads(request.body or '{}')
+        accion = data.get('accion')
+
+        if accion == 'mover':
+            return JsonResponse(mover_cuota_sandbox(request.user, year, month, data))
+        if accion == 'deshacer':
+            return JsonResponse(deshacer_cuota_sandbox(request.user, year, month, data.get('fecha_pago_id')))
+        if accion == 'reiniciar':
+            sandbox = obtener_sandbox(request.user, year, month, reiniciar=True)
+            return JsonResponse({'dias': sandbox.dias(), 'cuotas': sandbox.serializar_cuotas(), 'cambios': []})
+        if accion == 'descartar':
+            descartar_sandbox(request.user, year, month)
+            return JsonResponse({'ok': True})
+        if accion == 'aplicar':
+            return JsonResponse(aplicar_sandbox(request.user, year, month))
+
+        return JsonResponse({'error': 'Acción no válida'}, status=400)
+    except ValidationError as e:
+        return JsonResponse({'error': e.messages[0]}, status=400)
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@login_required_async
+@cuota_peticiones('reporte')
+@limite_consultas('reporte')
+@lectura_replica
+@condicional_por_version
+async def ventas_por_sucursal(request):
     # 1. Valores por defecto
     hoy = timezone.now().date()
     fecha_inicio = hoy.replace(day=1) 
@@ -56,12 +214,11 @@ def ventas_por_sucursal(request):
         except (ValueError, TypeError):
             pass 
 
-    # 3. Obtener datos (Pasando user)
-    reporte = reporte_ventas_por_sucursal(fecha_inicio, fecha_fin, request.user, sucursal_id)
-    reporte_diario = reporte_ventas_diarias(fecha_inicio, fecha_fin, request.user, sucursal_id)
-    
-    # Obtener alertas si hay un monto crítico definido
-    alertas = obtener_alertas_criticas(fecha_inicio, fecha_fin, request.user, sucursal_id, monto_critico)
+    # 3. Obtener datos (Pasando user); alertas solo si hay un monto crítico definido
+    datos = await aobtener_reporte_ventas(fecha_inicio, fecha_fin, request.user, sucursal_id, monto_critico)
+    reporte = datos['reporte']
+    reporte_diario = datos['reporte_diario']
+    alertas = datos['alertas']
     
     total_general = sum(item['total_ventas'] for item in reporte)
 
@@ -77,9 +234,7 @@ def ventas_por_sucursal(request):
         item['porcentaje'] = (item['total_ventas'] / total_general * 100) if total_general > 0 else 0
 
     # Filtramos la lista de sucursales en el contexto también
-    sucursales_list = Sucursales.objects.none()
-    if request.user.organizacion:
-        sucursales_list = Sucursales.objects.filter(organizacion=request.user.organizacion)
+    sucursales_list = datos['sucursales']
 
     context = {
         'fecha_inicio': fecha_inicio,
@@ -94,13 +249,18 @@ def ventas_por_sucursal(request):
         'daily_labels': daily_labels,
         'daily_data': daily_data,
         'alertas': alertas, 
+        'consultas_incompletas': datos['consultas_incompletas'],
     }
 
-    return render(request, 'core/reportes/ventas/reporte_ventas_sucursal.html', context)
+    return await sync_to_async(render)(request, 'core/reportes/ventas/reporte_ventas_sucursal.html', context)
 
 
-@login_required
-def reporte_facturas(request):
+@login_required_async
+@cuota_peticiones('reporte')
+@limite_consultas('reporte')
+@lectura_replica
+@condicional_por_version
+async def reporte_facturas(request):
     # Valores por defecto: Mes actual
     hoy = timezone.now().date()
     fecha_inicio = hoy.replace(day=1)
@@ -124,8 +284,8 @@ def reporte_facturas(request):
         'estado': estado
     }
 
-    # Pasamos user
-    context = obtener_reporte_facturas(filtros, request.user)
+    # Peticiones iguales de la organización comparten un solo cálculo
+    context = await aobtener_reporte_compartido('facturas', filtros, request.user, aobtener_reporte_facturas)
     
     # Agregar filtros al contexto para mantener el estado del formulario
     context.update({
@@ -135,11 +295,15 @@ def reporte_facturas(request):
         'estado_actual': estado
     })
 
-    return render(request, 'core/reportes/facturas/reporte_facturas.html', context)
+    return await sync_to_async(render)(request, 'core/reportes/facturas/reporte_facturas.html', context)
 
 
-@login_required
-def reporte_movimientos(request):
+@login_required_async
+@cuota_peticiones('reporte')
+@limite_consultas('reporte')
+@lectura_replica
+@condicional_por_version
+async def reporte_movimientos(request):
     hoy = timezone.now().date()
     fecha_inicio = hoy.replace(day=1)
     # Default: Todo el mes actual (incluyendo futuro cercano)
@@ -173,8 +337,8 @@ def reporte_movimientos(request):
         'proveedor': proveedor_id
     }
     
-    # Pasamos user
-    context = obtener_reporte_movimientos(filtros, request.user)
+    # Peticiones iguales de la organización comparten un solo cálculo
+    context = await aobtener_reporte_compartido('movimientos', filtros, request.user, aobtener_reporte_movimientos)
     
     # Mantener filtros en el contexto
     context.update({
@@ -185,9 +349,16 @@ def reporte_movimientos(request):
         'proveedor_actual': int(proveedor_id) if proveedor_id else None
     })
 
-    return render(request, 'core/reportes/movimientos/reporte_movimientos.html', context)
+    return await sync_to_async(render)(request, 'core/reportes/movimientos/reporte_movimientos.html', context)
+
+def _respuesta_cola_pdf_llena(error):
+    response = JsonResponse({'error': str(error)}, status=503)
+    response['Retry-After'] = '5'
+    return response
+
 
 @login_required
+@cuota_peticiones('pdf')
 def exportar_tabulacion(request):
     if request.method == 'POST':
         try:
@@ -198,16 +369,67 @@ def exportar_tabulacion(request):
             response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="Corte_Caja_{data.get("fecha")}.pdf"'
             return response
+        except ColaPDFLlena as e:
+            return _respuesta_cola_pdf_llena(e)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     return JsonResponse({'error': 'Method not allowed'}, status=405)
 
+@login_required
+@cuota_peticiones('exportacion')
+@limite_consultas('reporte')
+@lectura_replica
+def exportar_cortes_caja(request):
+    """
+    Cortes de caja de un rango de fechas: ZIP con un PDF por día o un solo
+    PDF combinado. Acepta el formulario de la página o JSON con
+    `tabulaciones` por día (mismo formato que exportar_tabulacion).
+    """
+    hoy = timezone.now().date()
+    context = {'fecha_inicio': hoy.replace(day=1), 'fecha_fin': hoy, 'formato': 'zip'}
+    if request.method != 'POST':
+        return render(request, 'core/exportar_cortes.html', context)
+
+    es_json = request.content_type == 'application/json'
+    try:
+        datos = json.loads(request.body) if es_json else request.POST
+        context['formato'] = datos.get('formato') or 'zip'
+        try:
+            context['fecha_inicio'] = datetime.strptime(datos.get('fecha_inicio') or '', '%Y-%m-%d').date()
+            context['fecha_fin'] = datetime.strptime(datos.get('fecha_fin') or '', '%Y-%m-%d').date()
+        except ValueError:
+            raise ValidationError('Fechas no válidas.')
+
+        cortes = contenidos_cortes_caja(
+            context['fecha_inicio'], context['fecha_fin'], request.user,
+            tabulaciones=datos.get('tabulaciones') if es_json else None,
+        )
+        nombre = f"Cortes_Caja_{context['fecha_inicio']:%Y-%m-%d}_{context['fecha_fin']:%Y-%m-%d}"
+
+        if context['formato'] == 'pdf':
+            response = HttpResponse(pdf_cortes_caja_combinado(cortes), content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="{nombre}.pdf"'
+        else:
+            response = StreamingHttpResponse(zip_cortes_caja(cortes), content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="{nombre}.zip"'
+        return response
+    except ColaPDFLlena as e:
+        return _respuesta_cola_pdf_llena(e)
+    except (ValidationError, ValueError) as e:
+        error = e.messages[0] if isinstance(e, ValidationError) else 'Solicitud no válida.'
+        if es_json:
+            return JsonResponse({'error': error}, status=400)
+        context['error'] = error
+        return render(request, 'core/exportar_cortes.html', context, status=400)
+
+
 @login_required
 def herramienta_tabulador(request):
     hoy = timezone.now().date()
     return render(request, 'core/tabulador.html', {'hoy': hoy})
 
 @login_required
+@cuota_peticiones('pdf')
 def exportar_tabulacion_simple(request):
     """
     Vista específica para exportar el PDF desde la herramienta de tabulador (sin comparativas).
@@ -221,6 +443,43 @@ def exportar_tabulacion_simple(request):
             response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="Tabulacion_{data.get("fecha")}.pdf"'
             return response
+        except ColaPDFLlena as e:
+            return _respuesta_cola_pdf_llena(e)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
\ No newline at end of file
+    return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+
+# -----------------------------------------------------------------------------
+# EVENTOS EN VIVO (services/eventos.py)
+# -----------------------------------------------------------------------------
+
+@login_required_async
+async def eventos(request):
+    # Con workers WSGI una conexión abierta ocupa un hilo: 204 hace que el
+    # navegador deje de reconectar y las páginas siguen sin vivo
+    if not isinstance(request, ASGIRequest) or not request.user.organizacion_id:
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(flujo_eventos(request.user.organizacion_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx entrega cada evento al momento
+    return response
+
+
+# -----------------------------------------------------------------------------
+# SALUD (sin login: la consultan el balanceador y el orquestador)
+# -----------------------------------------------------------------------------
+
+def vivo(request):
+    """El proceso responde; no toca BD ni caché."""
+    response = JsonResponse({'vivo': True})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def salud(request):
+    """Listo para recibir tráfico: BD y caché responden dentro del límite."""
+    resultado = verificar_salud()
+    response = JsonResponse(resultado, status=200 if resultado['listo'] else 503)
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class FacturasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'facturas'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        post_migrate.connect(asegurar_indice_folio, sender=self)
+
+
+def asegurar_indice_folio(sender, using='default', **kwargs):
+    """
+    Recrea el índice de folios si falta. En SQLite, las migraciones que
+    reconstruyen facturas_facturas eliminan los triggers de la tabla FTS5.
+    """
+    from django.db import connections
+    from facturas.services.busqueda_folio import crear_indice_folio
+    crear_indice_folio(connections[using])
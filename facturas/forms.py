@@ -4,6 +4,7 @@ from decimal import Decimal
 from datetime import datetime
 from .models import Facturas
 from proveedores.models import Proveedores
+from proveedores.widgets import AutocompletarSelect
 
 class BaseFacturaForm(forms.ModelForm):
     """
@@ -28,6 +29,9 @@ class BaseFacturaForm(forms.ModelForm):
     class Meta:
         model = Facturas
         fields = ['proveedor', 'folio', 'tipo', 'monto', 'notas', 'cuenta_override']
+        widgets = {
+            'proveedor': AutocompletarSelect('autocompletar-proveedores', placeholder='Buscar proveedor...'),
+        }
         
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
@@ -117,3 +121,70 @@ class FacturaEditForm(BaseFacturaForm):
     Hereda toda la validación de formatos de BaseFacturaForm.
     """
     pass
+
+
+class ReprogramacionMasivaForm(forms.Form):
+    """
+    Filtro + regla para reprogramar fechas de pago en bloque.
+    Los días de la semana usan date.weekday() (0 = lunes).
+    """
+    DIAS_SEMANA = [
+        (0, 'Lunes'), (1, 'Martes'), (2, 'Miércoles'), (3, 'Jueves'),
+        (4, 'Viernes'), (5, 'Sábado'), (6, 'Domingo'),
+    ]
+    REGLAS = [
+        ('DIAS', 'Mover N días'),
+        ('DIA_SEMANA', 'Cambiar día de la semana'),
+    ]
+    DIRECCIONES = [
+        ('SIGUIENTE', 'Siguiente'),
+        ('ANTERIOR', 'Anterior'),
+    ]
+
+    proveedor = forms.ModelChoiceField(
+        queryset=Proveedores.objects.none(), required=False, empty_label='Todos',
+        widget=AutocompletarSelect('autocompletar-proveedores', placeholder='Todos los proveedores'),
+    )
+    estado = forms.ChoiceField(choices=[('', 'Todos')] + Facturas.ESTADOS, required=False)
+    fecha_desde = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    fecha_hasta = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+
+    regla = forms.ChoiceField(choices=REGLAS, initial='DIA_SEMANA')
+    dias = forms.IntegerField(required=False, min_value=-365, max_value=365)
+    dia_origen = forms.TypedChoiceField(choices=DIAS_SEMANA, coerce=int, required=False, initial=4)
+    dia_destino = forms.TypedChoiceField(choices=DIAS_SEMANA, coerce=int, required=False, initial=0)
+    direccion = forms.ChoiceField(choices=DIRECCIONES, required=False, initial='SIGUIENTE')
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if user and user.organizacion:
+            self.fields['proveedor'].queryset = Proveedores.objects.filter(organizacion=user.organizacion)
+
+    def clean(self):
+        cleaned = super().clean()
+        desde, hasta = cleaned.get('fecha_desde'), cleaned.get('fecha_hasta')
+        if desde and hasta and desde > hasta:
+            raise ValidationError('La fecha inicial no puede ser posterior a la final.')
+
+        if cleaned.get('regla') == 'DIAS' and not cleaned.get('dias'):
+            self.add_error('dias', 'Indica cuántos días mover (distinto de cero).')
+        if cleaned.get('regla') == 'DIA_SEMANA':
+            if cleaned.get('dia_origen') is None or cleaned.get('dia_destino') is None:
+                raise ValidationError('Selecciona el día de origen y el de destino.')
+            if cleaned['dia_origen'] == cleaned['dia_destino']:
+                raise ValidationError('El día de origen y el de destino deben ser distintos.')
+        return cleaned
+
+    def filtros(self):
+        return {k: self.cleaned_data.get(k) for k in ('proveedor', 'estado', 'fecha_desde', 'fecha_hasta')}
+
+    def regla_desplazamiento(self):
+        data = self.cleaned_data
+        return {
+            'tipo': data['regla'],
+            'dias': data.get('dias'),
+            'dia_origen': data.get('dia_origen'),
+            'dia_destino': data.get('dia_destino'),
+            'direccion': data.get('direccion') or 'SIGUIENTE',
+        }
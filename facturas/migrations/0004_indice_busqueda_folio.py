@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def crear_indice(apps, schema_editor):
+    from facturas.services.busqueda_folio import crear_indice_folio
+    crear_indice_folio(schema_editor.connection)
+
+
+def eliminar_indice(apps, schema_editor):
+    from facturas.services.busqueda_folio import eliminar_indice_folio
+    eliminar_indice_folio(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Índice de búsqueda de folios: GIN de trigramas en PostgreSQL y tabla
+    FTS5 (tokenizador trigram) en SQLite. Ver facturas/services/busqueda_folio.py.
+    """
+
+    dependencies = [
+        ('facturas', '0003_cuenta_override_remove_auto_default_proveedor'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
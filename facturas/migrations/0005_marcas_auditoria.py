@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-19 06:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturas', '0004_indice_busqueda_folio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facturas',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='facturas',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='facturasfechasdepago',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='facturasfechasdepago',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -24,6 +24,8 @@ class Facturas(models.Model):
     estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
     tipo = models.CharField(max_length=20, choices=TIPOS, default='FACTURA')
     organizacion = models.ForeignKey('users.Organizacion', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Selección manual de la cuenta a mostrar en PDF y detalle día
     cuenta_override = models.CharField(
@@ -60,3 +62,5 @@ class FacturasFechasDePago(models.Model):
     factura = models.ForeignKey(Facturas, on_delete=models.CASCADE)
     fecha_por_pagar = models.DateField()
     monto_por_pagar = models.DecimalField(max_digits=15, decimal_places=2)#monto por pagar en esa fecha
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,160 @@
+"""
+Búsqueda de facturas por folio (subcadena, sin distinguir mayúsculas).
+
+`folio__icontains` recorre todas las facturas de la organización. Aquí la
+búsqueda se apoya en un índice según el motor de base de datos:
+
+  - PostgreSQL: índice GIN con `gin_trgm_ops` (extensión pg_trgm) sobre
+    `UPPER(folio)`. Django compila `icontains` a
+    `UPPER("folio"::text) LIKE UPPER('%texto%')`, así que el índice tiene
+    que ser de esa misma expresión (uno sobre `folio` no se usaría) y el
+    queryset no cambia.
+  - SQLite: tabla virtual FTS5 con tokenizador `trigram` (contenido externo
+    sobre facturas_facturas, sincronizada con triggers). Se consulta con
+    MATCH y se une por rowid = id.
+
+Los índices de trigramas solo sirven para textos de 3+ caracteres; con menos
+(o si el índice no existe) se usa `icontains` normal.
+"""
+
+from functools import lru_cache
+
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+
+from facturas.models import Facturas
+
+MIN_CARACTERES_INDICE = 3
+FTS_TABLA = 'facturas_folio_fts'
+
+_SQLITE_CREAR = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLA} USING fts5(
+        folio, content='facturas_facturas', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLA}_ai AFTER INSERT ON facturas_facturas BEGIN
+        INSERT INTO {FTS_TABLA}(rowid, folio) VALUES (new.id, new.folio);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLA}_ad AFTER DELETE ON facturas_facturas BEGIN
+        INSERT INTO {FTS_TABLA}({FTS_TABLA}, rowid, folio) VALUES ('delete', old.id, old.folio);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLA}_au AFTER UPDATE OF folio ON facturas_facturas BEGIN
+        INSERT INTO {FTS_TABLA}({FTS_TABLA}, rowid, folio) VALUES ('delete', old.id, old.folio);
+        INSERT INTO {FTS_TABLA}(rowid, folio) VALUES (new.id, new.folio);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLA}({FTS_TABLA}) VALUES ('rebuild')",
+]
+
+_SQLITE_ELIMINAR = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLA}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLA}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLA}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLA}',
+]
+
+_POSTGRES_CREAR = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    # Índice anterior sobre `folio` sin UPPER: icontains no lo usaba
+    'DROP INDEX IF EXISTS facturas_folio_trgm_idx',
+    'CREATE INDEX IF NOT EXISTS facturas_folio_upper_trgm_idx '
+    'ON facturas_facturas USING gin (UPPER(folio) gin_trgm_ops)',
+]
+
+_POSTGRES_ELIMINAR = [
+    'DROP INDEX IF EXISTS facturas_folio_trgm_idx',
+    'DROP INDEX IF EXISTS facturas_folio_upper_trgm_idx',
+]
+
+
+# ============================================================
+# ÍNDICE
+# ============================================================
+
+def crear_indice_folio(conexion):
+    """Crea (idempotente) el índice de búsqueda de folios para el motor."""
+    sentencias = {'sqlite': _SQLITE_CREAR, 'postgresql': _POSTGRES_CREAR}.get(conexion.vendor, [])
+    with conexion.cursor() as cursor:
+        for sql in sentencias:
+            cursor.execute(sql)
+    _fts_disponible.cache_clear()
+
+
+def eliminar_indice_folio(conexion):
+    sentencias = {'sqlite': _SQLITE_ELIMINAR, 'postgresql': _POSTGRES_ELIMINAR}.get(conexion.vendor, [])
+    with conexion.cursor() as cursor:
+        for sql in sentencias:
+            cursor.execute(sql)
+    _fts_disponible.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _fts_disponible(alias, nombre_bd):
+    # Una vez por proceso y BD: la tabla solo cambia con la migración (que
+    # limpia este caché), y la búsqueda es el endpoint del type-ahead
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLA])
+        return cursor.fetchone() is not None
+
+
+def _frase_fts(texto):
+    # Frase FTS5 literal: las comillas dobles se escapan duplicándolas
+    return '"' + texto.replace('"', '""') + '"'
+
+
+# ============================================================
+# BÚSQUEDA
+# ============================================================
+
+def filtrar_por_folio(queryset, texto, relacion=''):
+    """
+    Filtra `queryset` a las facturas cuyo folio contiene `texto`. Para
+    modelos relacionados se indica el camino a la factura, p. ej.
+    relacion='factura__'.
+    """
+    texto = (texto or '').strip()
+    if not texto:
+        return queryset
+
+    usa_indice = len(texto) >= MIN_CARACTERES_INDICE
+    if (usa_indice and connection.vendor == 'sqlite'
+            and _fts_disponible(connection.alias, connection.settings_dict['NAME'])):
+        return queryset.filter(**{
+            f'{relacion}id__in': RawSQL(
+                f'SELECT rowid FROM {FTS_TABLA} WHERE {FTS_TABLA} MATCH %s',
+                [_frase_fts(texto)],
+            )
+        })
+
+    # PostgreSQL: UPPER(folio) LIKE usa el índice de trigramas
+    return queryset.filter(**{f'{relacion}folio__icontains': texto})
+
+
+def buscar_facturas_por_folio(organizacion, texto):
+    """Facturas de la organización cuyo folio contiene `texto`."""
+    if not organizacion:
+        return Facturas.objects.none()
+    return filtrar_por_folio(Facturas.objects.filter(organizacion=organizacion), texto)
+
+
+def sugerencias_folio(organizacion, texto, limite=10):
+    """Datos para el autocompletado (type-ahead) de folios."""
+    facturas = (buscar_facturas_por_folio(organizacion, texto)
+                .select_related('proveedor')
+                .order_by('folio')[:limite])
+    return [
+        {
+            'id': factura.id,
+            'folio': factura.folio,
+            'proveedor': factura.proveedor.nombre,
+            'monto': str(factura.monto),
+            'estado': factura.estado,
+        }
+        for factura in facturas
+    ]
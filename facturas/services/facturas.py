@@ -3,9 +3,22 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 from facturas.models import Facturas, FacturasFechasDePago
 from cartera.services.movimientos_cargo import registrar_movimiento_crear_factura, actualizar_movimiento_factura, eliminar_movimientos_factura
+from core.services.cache_calendario import invalidar_calendario
+from core.services.cambios_datos import CREAR, EDITAR, ELIMINAR, cambio, cambios_de, registrar_cambios
+from cartera.models import Movimientos_Cartera
+from facturas.services.busqueda_folio import filtrar_por_folio
 from datetime import datetime
 from decimal import Decimal
 
+def _cambios_factura(factura, operacion):
+    """La factura con sus cuotas y todos sus movimientos."""
+    return (
+        [cambio('factura', factura.pk, operacion)]
+        + cambios_de(factura.facturasfechasdepago_set.all(), 'fecha_pago', operacion, 'fecha_por_pagar')
+        + cambios_de(Movimientos_Cartera.objects.filter(factura=factura), 'movimiento', operacion, 'fecha')
+    )
+
+
 @transaction.atomic
 def servicio_crear_factura_con_fechas(data, user):
     """
@@ -71,6 +84,8 @@ def servicio_crear_factura_con_fechas(data, user):
     ])
 
     registrar_movimiento_crear_factura(factura)
+    invalidar_calendario(organizacion, [p['fecha'] for p in pagos_data])
+    registrar_cambios(organizacion, _cambios_factura(factura, CREAR))
 
     return factura
 
@@ -82,6 +97,13 @@ def servicio_editar_factura(factura, data, user):
 
     # Obtener la instancia original de la BD 
     factura_orig = Facturas.objects.get(pk=factura.pk)
+    fechas_originales = list(
+        FacturasFechasDePago.objects.filter(factura=factura).values_list('fecha_por_pagar', flat=True)
+    )
+    # Los CARGO se recrean siempre; las cuotas solo si llegan nuevas
+    cambios = [cambio('factura', factura.pk, EDITAR)] + cambios_de(
+        Movimientos_Cartera.objects.filter(factura=factura, origen='CARGO'), 'movimiento', ELIMINAR, 'fecha'
+    )
     
     # Validamos proveedor
     proveedor = data['proveedor']
@@ -115,6 +137,9 @@ def servicio_editar_factura(factura, data, user):
                 f'no coincide con el total de la factura ({monto_total:.2f}).'
             )
 
+        cambios += cambios_de(
+            FacturasFechasDePago.objects.filter(factura=factura), 'fecha_pago', ELIMINAR, 'fecha_por_pagar'
+        )
         FacturasFechasDePago.objects.filter(factura=factura).delete()
         
         FacturasFechasDePago.objects.bulk_create([
@@ -125,8 +150,16 @@ def servicio_editar_factura(factura, data, user):
             )
             for fecha, monto in zip(fechas, montos)
         ])
+        cambios += cambios_de(
+            FacturasFechasDePago.objects.filter(factura=factura), 'fecha_pago', CREAR, 'fecha_por_pagar'
+        )
 
     actualizar_movimiento_factura(factura)
+    invalidar_calendario(factura.organizacion, fechas_originales + list(data.get('fechas_pago') or []))
+    cambios += cambios_de(
+        Movimientos_Cartera.objects.filter(factura=factura, origen='CARGO'), 'movimiento', CREAR, 'fecha'
+    )
+    registrar_cambios(factura.organizacion, cambios)
     return factura
     
 
@@ -136,6 +169,11 @@ def servicio_eliminar_factura(factura, user):
     if factura.organizacion != user.organizacion:
         raise ValidationError("No tienes permiso para eliminar esta factura.")
         
+    invalidar_calendario(
+        factura.organizacion,
+        FacturasFechasDePago.objects.filter(factura=factura).values_list('fecha_por_pagar', flat=True)
+    )
+    registrar_cambios(factura.organizacion, _cambios_factura(factura, ELIMINAR))
     eliminar_movimientos_factura(factura)
     factura.delete()
 
@@ -151,7 +189,7 @@ def servicio_obtener_facturas(filters=None, user=None):
 
     if filters:
         if filters.get('folio'):
-            queryset = queryset.filter(folio__icontains=filters['folio'])
+            queryset = filtrar_por_folio(queryset, filters['folio'])
         
         if filters.get('proveedor'):
             queryset = queryset.filter(proveedor_id=filters['proveedor'])
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import DateField, ExpressionWrapper, F, OuterRef, Subquery
+
+from cartera.models import Movimientos_Cartera
+from core.services.cache_calendario import invalidar_calendario
+from core.services.cambios_datos import EDITAR, cambio, cambios_de, registrar_cambios
+from facturas.models import FacturasFechasDePago
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def calcular_desplazamiento(regla):
+    """
+    Traduce la regla de reprogramación a (dias, dia_semana_filtro).
+
+    regla:
+      {'tipo': 'DIAS', 'dias': n}                      -> mueve todas n días
+      {'tipo': 'DIA_SEMANA', 'dia_origen': 4,
+       'dia_destino': 0, 'direccion': 'SIGUIENTE'}     -> viernes al lunes siguiente
+    Los días de la semana usan date.weekday() (0 = lunes).
+    """
+    tipo = regla.get('tipo')
+
+    if tipo == 'DIAS':
+        dias = int(regla.get('dias') or 0)
+        if dias == 0:
+            raise ValidationError('El desplazamiento debe ser distinto de cero días.')
+        return dias, None
+
+    if tipo == 'DIA_SEMANA':
+        origen = int(regla['dia_origen'])
+        destino = int(regla['dia_destino'])
+        if origen == destino:
+            raise ValidationError('El día de origen y el de destino deben ser distintos.')
+        dias = (destino - origen) % 7
+        if regla.get('direccion') == 'ANTERIOR':
+            dias -= 7
+        return dias, origen
+
+    raise ValidationError('Regla de reprogramación no válida.')
+
+
+def _filtrar_fechas(filtros, organizacion, dia_semana):
+    queryset = FacturasFechasDePago.objects.filter(
+        factura__organizacion=organizacion,
+        fecha_por_pagar__range=[filtros['fecha_desde'], filtros['fecha_hasta']],
+    )
+    if filtros.get('proveedor'):
+        queryset = queryset.filter(factura__proveedor=filtros['proveedor'])
+    if filtros.get('estado'):
+        queryset = queryset.filter(factura__estado=filtros['estado'])
+    if dia_semana is not None:
+        # __week_day: 1 = domingo ... 7 = sábado
+        queryset = queryset.filter(fecha_por_pagar__week_day=(dia_semana + 1) % 7 + 1)
+    return queryset
+
+
+def _validar_choques(filas, dias):
+    """
+    Una factura no puede tener dos pagos el mismo día (misma regla que el
+    formulario de facturas). Revisa las fechas de pago que NO se mueven.
+    """
+    ids = [f['id'] for f in filas]
+    facturas_ids = {f['factura_id'] for f in filas}
+    ocupadas = set(
+        FacturasFechasDePago.objects
+        .filter(factura_id__in=facturas_ids)
+        .exclude(id__in=ids)
+        .values_list('factura_id', 'fecha_por_pagar')
+    )
+    delta = timedelta(days=dias)
+    for fila in filas:
+        if (fila['factura_id'], fila['fecha_por_pagar'] + delta) in ocupadas:
+            raise ValidationError(
+                f"La factura {fila['factura__folio'] or fila['factura_id']} ya tiene un pago el "
+                f"{(fila['fecha_por_pagar'] + delta):%d/%m/%Y}."
+            )
+
+
+# ============================================================
+# SERVICIO
+# ============================================================
+
+@transaction.atomic
+def servicio_reprogramar_fechas_masivo(filtros, regla, user, aplicar=True):
+    """
+    Reprograma en bloque las fechas de pago que cumplen `filtros`
+    (fecha_desde, fecha_hasta, proveedor?, estado?) según `regla`.
+
+    A diferencia de `servicio_editar_factura` no borra ni recrea nada:
+      1. UPDATE de FacturasFechasDePago.fecha_por_pagar (+ n días).
+      2. UPDATE de los CARGO ligados copiando la nueva fecha de su cuota.
+
+    Con aplicar=False solo devuelve el resumen (previsualización).
+    """
+    organizacion = user.organizacion
+    if not organizacion:
+        raise ValidationError("El usuario no pertenece a ninguna organización.")
+
+    if filtros['fecha_desde'] > filtros['fecha_hasta']:
+        raise ValidationError('La fecha inicial no puede ser posterior a la final.')
+
+    proveedor = filtros.get('proveedor')
+    if proveedor and proveedor.organizacion_id != organizacion.id:
+        raise ValidationError("El proveedor seleccionado no pertenece a tu organización.")
+
+    dias, dia_semana = calcular_desplazamiento(regla)
+    queryset = _filtrar_fechas(filtros, organizacion, dia_semana)
+
+    filas = list(
+        queryset
+        .select_for_update(of=('self',))
+        .values('id', 'factura_id', 'fecha_por_pagar', 'monto_por_pagar',
+                'factura__folio', 'factura__proveedor__nombre')
+        .order_by('fecha_por_pagar', 'id')
+    )
+
+    resumen = {
+        'dias': dias,
+        'fechas_pago': len(filas),
+        'facturas': len({f['factura_id'] for f in filas}),
+        'monto_total': sum((f['monto_por_pagar'] for f in filas), Decimal('0.00')),
+        'movimientos': 0,
+        'detalle': [
+            {
+                'folio': f['factura__folio'],
+                'proveedor': f['factura__proveedor__nombre'],
+                'monto': f['monto_por_pagar'],
+                'fecha_anterior': f['fecha_por_pagar'],
+                'fecha_nueva': f['fecha_por_pagar'] + timedelta(days=dias),
+            }
+            for f in filas
+        ],
+        'aplicado': False,
+    }
+
+    if not filas:
+        return resumen
+
+    _validar_choques(filas, dias)
+
+    if not aplicar:
+        return resumen
+
+    ids = [f['id'] for f in filas]
+
+    ahora = timezone.now()  # update() no toca auto_now
+    FacturasFechasDePago.objects.filter(id__in=ids).update(
+        fecha_por_pagar=ExpressionWrapper(
+            F('fecha_por_pagar') + timedelta(days=dias), output_field=DateField()
+        ),
+        updated_at=ahora,
+    )
+
+    cargos = Movimientos_Cartera.objects.filter(origen='CARGO', fecha_pago_instancia_id__in=ids)
+    resumen['movimientos'] = cargos.update(
+        fecha=Subquery(
+            FacturasFechasDePago.objects
+            .filter(pk=OuterRef('fecha_pago_instancia_id'))
+            .values('fecha_por_pagar')[:1]
+        ),
+        updated_at=ahora,
+    )
+    invalidar_calendario(
+        organizacion,
+        [d['fecha_anterior'] for d in resumen['detalle']] + [d['fecha_nueva'] for d in resumen['detalle']]
+    )
+    registrar_cambios(
+        organizacion,
+        [
+            cambio('fecha_pago', f['id'], EDITAR, f['fecha_por_pagar'] + timedelta(days=dias), f['fecha_por_pagar'])
+            for f in filas
+        ] + cambios_de(cargos, 'movimiento', EDITAR, 'fecha'),
+    )
+    resumen['aplicado'] = True
+    return resumen
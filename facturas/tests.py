@@ -1,12 +1,18 @@
-from django.test import TestCase
+from django.conf import settings
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
+from django.db import connection
 from decimal import Decimal
 from datetime import date
+from unittest import mock
 
 
 from proveedores.models import Proveedores
 from facturas.models import Facturas, FacturasFechasDePago
+from users.models import Organizacion, User
+from .services.busqueda_folio import buscar_facturas_por_folio, FTS_TABLA
 from .services.facturas import servicio_crear_factura_con_fechas
+from .services.reprogramacion import servicio_reprogramar_fechas_masivo
 class ServicioCrearFacturaConFechasTest(TestCase):
     def setUp(self):
         self.proveedor = Proveedores.objects.create(
@@ -114,3 +120,147 @@ class ServicioEditarFacturaTest(TestCase):
         self.assertEqual(schedules.count(), 2)
         self.assertEqual(schedules[0].fecha_por_pagar, date(2026, 2, 1))
         self.assertEqual(schedules[0].monto_por_pagar, Decimal("750.00"))
+
+
+class ServicioReprogramarFechasMasivoTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Reprogramar")
+        self.user = User.objects.create_user(
+            email="reprog@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        self.proveedor = Proveedores.objects.create(nombre="Prov Viernes", organizacion=self.org)
+        self.otro = Proveedores.objects.create(nombre="Otro", organizacion=self.org)
+
+    def _factura(self, proveedor, folio, fechas):
+        factura = Facturas.objects.create(
+            proveedor=proveedor, folio=folio, monto=Decimal("100.00") * len(fechas), organizacion=self.org
+        )
+        for fecha in fechas:
+            cuota = FacturasFechasDePago.objects.create(
+                factura=factura, fecha_por_pagar=fecha, monto_por_pagar=Decimal("100.00")
+            )
+            Movimientos_Cartera.objects.create(
+                origen='CARGO', monto=cuota.monto_por_pagar, fecha=fecha, factura=factura,
+                fecha_pago_instancia=cuota, organizacion=self.org
+            )
+        return factura
+
+    def _filtros(self, **extra):
+        filtros = {'fecha_desde': date(2025, 3, 1), 'fecha_hasta': date(2025, 3, 31)}
+        filtros.update(extra)
+        return filtros
+
+    def test_viernes_a_lunes_de_un_proveedor(self):
+        # 2025-03-07 y 2025-03-14 son viernes; 2025-03-11 es martes
+        factura = self._factura(self.proveedor, "V-1", [date(2025, 3, 7), date(2025, 3, 11), date(2025, 3, 14)])
+        ajena = self._factura(self.otro, "O-1", [date(2025, 3, 7)])
+
+        regla = {'tipo': 'DIA_SEMANA', 'dia_origen': 4, 'dia_destino': 0, 'direccion': 'SIGUIENTE'}
+        resumen = servicio_reprogramar_fechas_masivo(self._filtros(proveedor=self.proveedor), regla, self.user)
+
+        self.assertEqual((resumen['dias'], resumen['fechas_pago'], resumen['movimientos']), (3, 2, 2))
+        self.assertEqual(
+            sorted(factura.facturasfechasdepago_set.values_list('fecha_por_pagar', flat=True)),
+            [date(2025, 3, 10), date(2025, 3, 11), date(2025, 3, 17)],
+        )
+        self.assertEqual(
+            sorted(Movimientos_Cartera.objects.filter(factura=factura).values_list('fecha', flat=True)),
+            [date(2025, 3, 10), date(2025, 3, 11), date(2025, 3, 17)],
+        )
+        self.assertEqual(ajena.facturasfechasdepago_set.get().fecha_por_pagar, date(2025, 3, 7))
+
+    def test_previsualizar_no_modifica(self):
+        self._factura(self.proveedor, "P-1", [date(2025, 3, 5)])
+
+        resumen = servicio_reprogramar_fechas_masivo(
+            self._filtros(), {'tipo': 'DIAS', 'dias': -2}, self.user, aplicar=False
+        )
+
+        self.assertEqual(resumen['detalle'][0]['fecha_nueva'], date(2025, 3, 3))
+        self.assertFalse(resumen['aplicado'])
+        self.assertTrue(FacturasFechasDePago.objects.filter(fecha_por_pagar=date(2025, 3, 5)).exists())
+
+    def test_rechaza_dos_pagos_el_mismo_dia(self):
+        self._factura(self.proveedor, "C-1", [date(2025, 3, 7), date(2025, 3, 10)])
+        regla = {'tipo': 'DIA_SEMANA', 'dia_origen': 4, 'dia_destino': 0, 'direccion': 'SIGUIENTE'}
+
+        with self.assertRaises(ValidationError):
+            servicio_reprogramar_fechas_masivo(self._filtros(), regla, self.user)
+        self.assertTrue(FacturasFechasDePago.objects.filter(fecha_por_pagar=date(2025, 3, 7)).exists())
+
+    # Las pruebas no corren collectstatic: {% static %} sin el manifiesto de whitenoise
+    @override_settings(STORAGES={
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_vista_propone_hasta_el_fin_de_mes(self):
+        self.client.force_login(self.user)
+        with mock.patch('facturas.views.date') as fecha:
+            fecha.today.return_value = date(2024, 2, 10)
+            respuesta = self.client.get('/facturas/reprogramar/')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.context['form'].initial['fecha_hasta'], date(2024, 2, 29))
+
+
+class BusquedaFolioTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Folios")
+        self.user = User.objects.create_user(
+            email="folios@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        proveedor = Proveedores.objects.create(nombre="Prov", organizacion=self.org)
+        for folio in ["FAC-00123", "fac-00999", "REM-123", None]:
+            Facturas.objects.create(proveedor=proveedor, folio=folio, monto=Decimal("1.00"), organizacion=self.org)
+
+        otra_org = Organizacion.objects.create(nombre="Otra")
+        Facturas.objects.create(
+            proveedor=Proveedores.objects.create(nombre="P2", organizacion=otra_org),
+            folio="FAC-00123", monto=Decimal("1.00"), organizacion=otra_org,
+        )
+
+    def _folios(self, texto):
+        return sorted(buscar_facturas_por_folio(self.org, texto).values_list('folio', flat=True))
+
+    def test_subcadena_sin_distinguir_mayusculas(self):
+        self.assertEqual(self._folios("fac-00"), ["FAC-00123", "fac-00999"])
+        self.assertEqual(self._folios("123"), ["FAC-00123", "REM-123"])
+        self.assertEqual(self._folios('"x'), [])
+
+    def test_indice_sigue_a_ediciones_y_borrados(self):
+        factura = Facturas.objects.get(folio="REM-123")
+        factura.folio = "REM-777"
+        factura.save()
+        Facturas.objects.filter(folio="fac-00999").delete()
+
+        self.assertEqual(self._folios("123"), ["FAC-00123"])
+        self.assertEqual(self._folios("m-777"), ["REM-777"])
+        self.assertEqual(self._folios("fac"), ["FAC-00123"])
+
+    def test_textos_cortos_usan_icontains(self):
+        self.assertEqual(self._folios("re"), ["REM-123"])
+
+    def test_sqlite_usa_fts5(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Solo aplica a SQLite')
+        sql = str(buscar_facturas_por_folio(self.org, "fac-00").query)
+        self.assertIn(FTS_TABLA, sql)
+
+        # La existencia de la tabla FTS se consulta una vez, no en cada búsqueda
+        with self.assertNumQueries(1):
+            list(buscar_facturas_por_folio(self.org, "fac-00"))
+
+    def test_postgres_usa_indice_de_trigramas(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Solo aplica a PostgreSQL')
+        with connection.cursor() as cursor:
+            # Con pocas filas el planificador prefiere recorrer la tabla
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = buscar_facturas_por_folio(self.org, "fac-00").explain()
+        self.assertIn('facturas_folio_upper_trgm_idx', plan)
+
+    def test_endpoint_type_ahead(self):
+        self.client.force_login(self.user)
+        respuesta = self.client.get('/facturas/buscar-folio/', {'q': 'fac-001'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([r['folio'] for r in respuesta.json()['resultados']], ["FAC-00123"])
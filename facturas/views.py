@@ -1,11 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from core.decorators import condicional_por_version
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 from facturas.models import *
-from .forms import FacturaCreateForm, FacturaEditForm
+from .forms import FacturaCreateForm, FacturaEditForm, ReprogramacionMasivaForm
 from .services.facturas import *
+from .services.reprogramacion import servicio_reprogramar_fechas_masivo
+from .services.busqueda_folio import sugerencias_folio
+from django.http import JsonResponse
+import calendar
 from datetime import date, datetime
 from proveedores.models import Proveedores
 
@@ -132,6 +137,7 @@ def eliminar_factura(request, factura_id, fecha_str):
 
 
 @login_required
+@condicional_por_version
 def lista_facturas(request):
     filters = {
         'folio':     request.GET.get('folio'),
@@ -143,8 +149,11 @@ def lista_facturas(request):
 
     facturas = servicio_obtener_facturas(filters, user=request.user)
 
-    if request.user.organizacion:
-        proveedores = Proveedores.objects.filter(organizacion=request.user.organizacion)
+    # Solo el proveedor filtrado; el resto lo trae el autocompletado
+    if request.user.organizacion and filters.get('proveedor', '').isdigit():
+        proveedores = Proveedores.objects.filter(
+            organizacion=request.user.organizacion, pk=filters['proveedor']
+        )
     else:
         proveedores = Proveedores.objects.none()
 
@@ -164,3 +173,49 @@ def lista_facturas(request):
         'fecha_hoy':  fecha_hoy,
         'lista_url':  lista_url,    # se usa en los links del template
     })
+
+
+@login_required
+def reprogramar_fechas(request):
+    """
+    Reprogramación masiva de fechas de pago. El botón "Previsualizar" solo
+    muestra qué cambiaría; "Aplicar" ejecuta los UPDATE.
+    """
+    resumen = None
+
+    if request.method == 'POST':
+        form = ReprogramacionMasivaForm(request.POST, user=request.user)
+        if form.is_valid():
+            aplicar = request.POST.get('accion') == 'aplicar'
+            try:
+                resumen = servicio_reprogramar_fechas_masivo(
+                    form.filtros(), form.regla_desplazamiento(), user=request.user, aplicar=aplicar
+                )
+                if aplicar:
+                    messages.success(
+                        request,
+                        f"Se reprogramaron {resumen['fechas_pago']} fecha(s) de pago "
+                        f"de {resumen['facturas']} factura(s)."
+                    )
+            except ValidationError as e:
+                form.add_error(None, e.message)
+    else:
+        hoy = date.today()
+        form = ReprogramacionMasivaForm(user=request.user, initial={
+            'fecha_desde': hoy,
+            'fecha_hasta': hoy.replace(day=calendar.monthrange(hoy.year, hoy.month)[1]),
+            'estado': 'PENDIENTE',
+        })
+
+    return render(request, 'facturas/reprogramar_fechas.html', {
+        'form': form,
+        'resumen': resumen,
+    })
+
+
+@login_required
+def buscar_folio(request):
+    """Autocompletado de folios (JSON) para los buscadores."""
+    texto = request.GET.get('q', '').strip()
+    resultados = sugerencias_folio(request.user.organizacion, texto) if len(texto) >= 2 else []
+    return JsonResponse({'resultados': resultados})
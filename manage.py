@@ -6,7 +6,10 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    # Las pruebas usan sus propios settings (réplica de prueba); --settings
+    # o DJANGO_SETTINGS_MODULE siguen mandando
+    es_prueba = sys.argv[1:2] == ['test']
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings_test' if es_prueba else 'config.settings')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
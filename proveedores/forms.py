@@ -1,5 +1,6 @@
 from django import forms
 from .models import Proveedores, Cuenta_Maestra
+from .widgets import AutocompletarSelect
 
 class ProveedorForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
@@ -31,9 +32,11 @@ class ProveedorForm(forms.ModelForm):
                 'class': 'form-input',
                 'placeholder': 'correo@ejemplo.com'
             }),
-            'cuenta_maestra': forms.Select(attrs={
-                'class': 'form-input',
-            })
+            'cuenta_maestra': AutocompletarSelect(
+                'autocompletar-cuentas-maestras',
+                placeholder='Buscar cuenta maestra...',
+                attrs={'class': 'form-input'},
+            )
         }
         labels = {
             'nombre': 'Nombre completo',
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.14 on 2026-10-19 05:58
+
+from django.db import migrations, models
+
+
+def crear_indices_trigramas(apps, schema_editor):
+    # Búsqueda por subcadena (ILIKE '%texto%') del autocompletado; solo PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS proveedor_nombre_trgm_idx '
+        'ON proveedores_proveedores USING gin (nombre gin_trgm_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS cuenta_maestra_nombre_trgm_idx '
+        'ON proveedores_cuenta_maestra USING gin (nombre gin_trgm_ops)'
+    )
+
+
+def eliminar_indices_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS proveedor_nombre_trgm_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS cuenta_maestra_nombre_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedores', '0002_initial'),
+        ('users', '0003_add_backup_codes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cuenta_maestra',
+            index=models.Index(fields=['organizacion', 'nombre'], name='cuenta_maestra_org_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proveedores',
+            index=models.Index(fields=['organizacion', 'nombre'], name='proveedor_org_nombre_idx'),
+        ),
+        migrations.RunPython(crear_indices_trigramas, eliminar_indices_trigramas),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 06:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedores', '0003_indices_autocompletado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proveedores',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='proveedores',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
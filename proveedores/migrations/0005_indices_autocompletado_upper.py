@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# Django compila nombre__icontains / nombre__istartswith a
+# UPPER("nombre"::text) LIKE UPPER(...): los índices tienen que ser de esa
+# misma expresión. Solo PostgreSQL.
+_INDICES = [
+    ('proveedores_proveedores', 'proveedor'),
+    ('proveedores_cuenta_maestra', 'cuenta_maestra'),
+]
+
+
+def crear_indices_upper(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for tabla, prefijo in _INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {prefijo}_nombre_trgm_idx')
+        # Subcadena (icontains)
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {prefijo}_nombre_upper_trgm_idx '
+            f'ON {tabla} USING gin (UPPER(nombre) gin_trgm_ops)'
+        )
+        # Prefijo (istartswith) dentro de la organización
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {prefijo}_org_nombre_upper_idx '
+            f'ON {tabla} (organizacion_id, UPPER(nombre) text_pattern_ops)'
+        )
+
+
+def eliminar_indices_upper(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for tabla, prefijo in _INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {prefijo}_nombre_upper_trgm_idx')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {prefijo}_org_nombre_upper_idx')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {prefijo}_nombre_trgm_idx '
+            f'ON {tabla} USING gin (nombre gin_trgm_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedores', '0004_marcas_auditoria'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices_upper, eliminar_indices_upper),
+    ]
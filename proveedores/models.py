@@ -8,6 +8,14 @@ class Proveedores(models.Model):
     email = models.EmailField(blank=True, null=True)
     cuenta_maestra = models.ForeignKey('Cuenta_Maestra', on_delete=models.PROTECT, blank=True, null=True)
     organizacion = models.ForeignKey('users.Organizacion', on_delete=models.CASCADE, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Autocompletado: filtra por organización y ordena por nombre
+            models.Index(fields=['organizacion', 'nombre'], name='proveedor_org_nombre_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -19,5 +27,10 @@ class Cuenta_Maestra(models.Model):
     email = models.EmailField(blank=True, null=True)
     organizacion = models.ForeignKey('users.Organizacion', on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organizacion', 'nombre'], name='cuenta_maestra_org_nombre_idx'),
+        ]
+
     def __str__(self):
         return self.nombre
\ No newline at end of file
@@ -0,0 +1,51 @@
+from django.db.models import Case, IntegerField, Value, When
+
+from proveedores.models import Proveedores, Cuenta_Maestra
+
+POR_PAGINA = 20
+MAX_POR_PAGINA = 50
+
+
+def _autocompletar(queryset, texto, pagina, por_pagina):
+    """
+    Página de resultados {id, texto} de `queryset` cuyo nombre contiene
+    `texto`. Los que empiezan con el texto van primero. Se pide un registro
+    extra para saber si hay más páginas sin hacer COUNT(*).
+    """
+    por_pagina = max(1, min(int(por_pagina or POR_PAGINA), MAX_POR_PAGINA))
+    pagina = max(1, int(pagina or 1))
+    texto = (texto or '').strip()
+
+    if texto:
+        queryset = queryset.filter(nombre__icontains=texto).annotate(
+            es_prefijo=Case(
+                When(nombre__istartswith=texto, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by('es_prefijo', 'nombre', 'id')
+    else:
+        queryset = queryset.order_by('nombre', 'id')
+
+    inicio = (pagina - 1) * por_pagina
+    filas = list(queryset.values_list('id', 'nombre')[inicio:inicio + por_pagina + 1])
+
+    return {
+        'resultados': [{'id': pk, 'texto': nombre} for pk, nombre in filas[:por_pagina]],
+        'pagina': pagina,
+        'mas': len(filas) > por_pagina,
+    }
+
+
+def servicio_autocompletar_proveedores(user, texto='', pagina=1, por_pagina=POR_PAGINA):
+    if not user or not user.organizacion:
+        return {'resultados': [], 'pagina': 1, 'mas': False}
+    queryset = Proveedores.objects.filter(organizacion=user.organizacion)
+    return _autocompletar(queryset, texto, pagina, por_pagina)
+
+
+def servicio_autocompletar_cuentas_maestras(user, texto='', pagina=1, por_pagina=POR_PAGINA):
+    if not user or not user.organizacion:
+        return {'resultados': [], 'pagina': 1, 'mas': False}
+    queryset = Cuenta_Maestra.objects.filter(organizacion=user.organizacion)
+    return _autocompletar(queryset, texto, pagina, por_pagina)
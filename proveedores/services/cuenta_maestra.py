@@ -1,6 +1,7 @@
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from ..models import Cuenta_Maestra
+from core.services.version_datos import marcar_datos_modificados
 
 @transaction.atomic
 def servicio_crear_cuenta_maestra(data, user):
@@ -27,6 +28,7 @@ def servicio_crear_cuenta_maestra(data, user):
     payload['organizacion'] = organizacion
 
     cuenta = Cuenta_Maestra.objects.create(**payload)
+    marcar_datos_modificados(organizacion)
     return cuenta
 
 
@@ -47,6 +49,7 @@ def servicio_editar_cuenta_maestra(cuenta, data, user):
             setattr(cuenta, campo, data[campo])
 
     cuenta.save()
+    marcar_datos_modificados(cuenta.organizacion)
     return cuenta
 
 
@@ -0,0 +1,179 @@
+"""
+Directorio compacto de proveedores por organización.
+
+En el caché compartido (Redis en producción) se guarda solo una tupla de
+filas con los campos que muestra la lista de proveedores, no instancias del
+modelo. La llave incluye un contador de versión que se incrementa al
+guardar o eliminar un proveedor o la cuenta maestra, así que todos los
+workers ven el cambio con una sola lectura del contador.
+
+Cada proceso arma a partir de esas filas un `DirectorioProveedores` con las
+llaves de búsqueda ya en minúsculas y un índice de trigramas por campo, y
+lo conserva mientras la versión no cambie.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.services.cache_versiones import incrementar_version, obtener_version
+from proveedores.models import Proveedores
+
+DIRECTORIO_TIMEOUT = 60 * 60 * 24  # 24 horas
+TAMANO_NGRAMA = 3
+CAMPOS_BUSQUEDA = ('nombre', 'telefono', 'email')
+MAX_DIRECTORIOS_LOCALES = 64
+
+# org_id -> (version, DirectorioProveedores) ya armados en este proceso
+_directorios = OrderedDict()
+_directorios_lock = threading.Lock()
+
+
+# ============================================================
+# REGISTROS E ÍNDICE
+# ============================================================
+
+class ProveedorResumen:
+    """Lo que la lista de proveedores muestra de cada uno."""
+
+    __slots__ = ('id', 'nombre', 'cuenta', 'telefono', 'email', 'cuenta_maestra_nombre')
+
+    def __init__(self, id, nombre, cuenta, telefono, email, cuenta_maestra_nombre):
+        self.id = id
+        self.nombre = nombre
+        self.cuenta = cuenta
+        self.telefono = telefono
+        self.email = email
+        self.cuenta_maestra_nombre = cuenta_maestra_nombre
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f'<ProveedorResumen {self.id}: {self.nombre}>'
+
+
+def _ngramas(texto):
+    return {texto[i:i + TAMANO_NGRAMA] for i in range(len(texto) - TAMANO_NGRAMA + 1)}
+
+
+def _indexar(llaves):
+    """Trigrama -> posiciones (ascendentes) de las llaves que lo contienen."""
+    indice = {}
+    for posicion, llave in enumerate(llaves):
+        for ngrama in _ngramas(llave):
+            indice.setdefault(ngrama, []).append(posicion)
+    return {ngrama: tuple(posiciones) for ngrama, posiciones in indice.items()}
+
+
+class DirectorioProveedores:
+    __slots__ = ('proveedores', '_llaves', '_indices')
+
+    def __init__(self, filas):
+        self.proveedores = tuple(ProveedorResumen(*fila) for fila in filas)
+        self._llaves = {
+            campo: tuple((getattr(p, campo) or '').lower() for p in self.proveedores)
+            for campo in CAMPOS_BUSQUEDA
+        }
+        self._indices = {campo: _indexar(llaves) for campo, llaves in self._llaves.items()}
+
+    def __len__(self):
+        return len(self.proveedores)
+
+    def _posibles(self, campo, texto):
+        """Posiciones que pueden contener `texto` según el índice (superconjunto)."""
+        if len(texto) < TAMANO_NGRAMA:
+            return None
+        indice = self._indices[campo]
+        listas = []
+        for ngrama in _ngramas(texto):
+            posiciones = indice.get(ngrama)
+            if posiciones is None:
+                return set()
+            listas.append(posiciones)
+        listas.sort(key=len)
+        posibles = set(listas[0])
+        for posiciones in listas[1:]:
+            posibles.intersection_update(posiciones)
+            if not posibles:
+                break
+        return posibles
+
+    def buscar(self, filtros=None):
+        """
+        Proveedores cuyo nombre/telefono/email contienen el texto del filtro
+        (sin distinguir mayúsculas), en el orden del directorio.
+        """
+        candidatos = None
+        for campo in CAMPOS_BUSQUEDA:
+            texto = ((filtros or {}).get(campo) or '').lower()
+            if not texto:
+                continue
+
+            posibles = self._posibles(campo, texto)
+            if candidatos is not None:
+                posibles = candidatos if posibles is None else candidatos & posibles
+            elif posibles is None:
+                posibles = range(len(self.proveedores))
+
+            llaves = self._llaves[campo]
+            candidatos = {i for i in posibles if texto in llaves[i]}
+            if not candidatos:
+                return []
+
+        if candidatos is None:
+            return list(self.proveedores)
+        return [self.proveedores[i] for i in sorted(candidatos)]
+
+
+# ============================================================
+# CACHÉ
+# ============================================================
+
+def _llave_version(organizacion_id):
+    return f'directorio_proveedores_version_{organizacion_id}'
+
+
+def _cargar_filas(organizacion_id):
+    return tuple(
+        Proveedores.objects
+        .filter(organizacion_id=organizacion_id)
+        .order_by('nombre', 'id')
+        .values_list('id', 'nombre', 'cuenta', 'telefono', 'email', 'cuenta_maestra__nombre')
+    )
+
+
+def obtener_directorio(organizacion):
+    """Directorio vigente de la organización (caché local → compartido → BD)."""
+    organizacion_id = organizacion.id
+    version = obtener_version(_llave_version(organizacion_id))
+
+    with _directorios_lock:
+        local = _directorios.get(organizacion_id)
+        if local is not None and local[0] == version:
+            _directorios.move_to_end(organizacion_id)
+            return local[1]
+
+    llave = f'directorio_proveedores_{organizacion_id}_v{version}'
+    filas = cache.get(llave)
+    if filas is None:
+        filas = _cargar_filas(organizacion_id)
+        cache.set(llave, filas, timeout=DIRECTORIO_TIMEOUT)
+
+    directorio = DirectorioProveedores(filas)
+    with _directorios_lock:
+        _directorios[organizacion_id] = (version, directorio)
+        _directorios.move_to_end(organizacion_id)
+        while len(_directorios) > MAX_DIRECTORIOS_LOCALES:
+            _directorios.popitem(last=False)
+    return directorio
+
+
+def invalidar_directorio_proveedores(organizacion_id):
+    """Publica una nueva versión del directorio al confirmar la transacción."""
+    if not organizacion_id:
+        return
+    transaction.on_commit(lambda: incrementar_version(_llave_version(organizacion_id)))
@@ -0,0 +1,245 @@
+"""
+Estado de cuenta por proveedor: CARGO y PAGO en orden cronológico con
+saldo corrido.
+
+El saldo se calcula en la misma consulta que trae los movimientos con
+SUM(...) OVER (ORDER BY fecha, id); para todos los proveedores la ventana
+se particiona por proveedor. Lo anterior a la página (o a `desde`) se
+suma aparte en un solo agregado y se agrega como saldo inicial.
+
+La paginación es por llave (fecha, id) del último movimiento mostrado, no
+por OFFSET.
+"""
+
+import csv
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
+
+from cartera.models import Movimientos_Cartera
+from facturas.models import Facturas
+
+ORIGENES_ESTADO_CUENTA = ('CARGO', 'PAGO')
+POR_PAGINA = 100
+
+CAMPOS = ('id', 'fecha', 'origen', 'monto', 'descripcion', 'factura_id', 'factura__folio')
+ORDEN = (F('fecha').asc(), F('id').asc())
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _importe():
+    # CARGO aumenta lo que se le debe al proveedor; PAGO lo reduce
+    return Case(
+        When(origen='PAGO', then=-F('monto')),
+        default=F('monto'),
+        output_field=DecimalField(max_digits=15, decimal_places=2),
+    )
+
+
+def _movimientos(organizacion, hasta=None):
+    queryset = Movimientos_Cartera.objects.filter(
+        organizacion=organizacion,
+        origen__in=ORIGENES_ESTADO_CUENTA,
+        factura__isnull=False,
+    )
+    if hasta:
+        # Quitar lo posterior no cambia el saldo de lo anterior
+        queryset = queryset.filter(fecha__lte=hasta)
+    return queryset
+
+
+def _saldo(queryset):
+    return queryset.aggregate(total=Sum(_importe()))['total'] or Decimal('0.00')
+
+
+def codificar_cursor(fila):
+    return f"{fila['fecha']:%Y-%m-%d}_{fila['id']}"
+
+
+def decodificar_cursor(cursor):
+    try:
+        fecha, pk = cursor.split('_')
+        return date.fromisoformat(fecha), int(pk)
+    except (AttributeError, ValueError):
+        raise ValidationError('Cursor de paginación no válido.')
+
+
+def _validar(proveedor, user):
+    if not user or not user.organizacion:
+        raise ValidationError("El usuario no pertenece a ninguna organización.")
+    if proveedor is not None and proveedor.organizacion_id != user.organizacion.id:
+        raise ValidationError("No tienes permiso para ver este proveedor.")
+
+
+def _anotar(queryset, particion=None):
+    return queryset.annotate(
+        importe=_importe(),
+        saldo=Window(Sum(_importe()), partition_by=particion, order_by=ORDEN),
+    )
+
+
+# ============================================================
+# SERVICIOS
+# ============================================================
+
+def servicio_estado_cuenta_proveedor(proveedor, user, desde=None, hasta=None, cursor=None, limite=POR_PAGINA):
+    """
+    Una página del estado de cuenta de `proveedor`.
+    `cursor` es el valor de 'siguiente' de la página anterior.
+    """
+    _validar(proveedor, user)
+    base = _movimientos(user.organizacion, hasta).filter(factura__proveedor=proveedor)
+
+    if cursor:
+        fecha_cursor, id_cursor = decodificar_cursor(cursor)
+        anteriores = Q(fecha__lt=fecha_cursor) | Q(fecha=fecha_cursor, id__lte=id_cursor)
+    elif desde:
+        anteriores = Q(fecha__lt=desde)
+    else:
+        anteriores = None
+
+    saldo_inicial = Decimal('0.00')
+    pagina = base
+    if anteriores is not None:
+        saldo_inicial = _saldo(base.filter(anteriores))
+        pagina = base.exclude(anteriores)
+
+    filas = list(_anotar(pagina).order_by(*ORDEN).values(*CAMPOS, 'importe', 'saldo')[:limite + 1])
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    for fila in filas:
+        fila['saldo'] += saldo_inicial
+
+    return {
+        'proveedor': proveedor,
+        'saldo_inicial': saldo_inicial,
+        'saldo_final': filas[-1]['saldo'] if filas else saldo_inicial,
+        'movimientos': filas,
+        'siguiente': codificar_cursor(filas[-1]) if hay_mas else None,
+    }
+
+
+def iterar_estados_cuenta(user, proveedor=None, desde=None, hasta=None):
+    """
+    Movimientos con saldo corrido de un proveedor o de todos los de la
+    organización (una sola consulta, ventana particionada por proveedor),
+    ordenados por proveedor, fecha e id. Pensado para exportar: recorre el
+    cursor de la BD sin cargar todo en memoria.
+    """
+    _validar(proveedor, user)
+    base = _movimientos(user.organizacion, hasta)
+    if proveedor is not None:
+        base = base.filter(factura__proveedor=proveedor)
+
+    saldos_iniciales = {}
+    if desde:
+        saldos_iniciales = dict(
+            base.filter(fecha__lt=desde)
+            .values('factura__proveedor_id')
+            .annotate(total=Sum(_importe()))
+            .values_list('factura__proveedor_id', 'total')
+        )
+        base = base.filter(fecha__gte=desde)
+
+    filas = (
+        _anotar(base, particion=[F('factura__proveedor_id')])
+        .annotate(proveedor_id=F('factura__proveedor_id'), proveedor_nombre=F('factura__proveedor__nombre'))
+        .order_by('factura__proveedor__nombre', 'factura__proveedor_id', *ORDEN)
+        .values(*CAMPOS, 'importe', 'saldo', 'proveedor_id', 'proveedor_nombre')
+    )
+    # La validación y el saldo inicial corren al llamar; las filas, al recorrer
+    # (ya fuera de la vista): la BD de lectura (réplica o no) se fija ahora
+    filas = filas.using(filas.db)
+    return _con_saldo_inicial(filas.iterator(chunk_size=2000), saldos_iniciales)
+
+
+def _con_saldo_inicial(filas, saldos_iniciales):
+    for fila in filas:
+        fila['saldo_inicial'] = saldos_iniciales.get(fila['proveedor_id']) or Decimal('0.00')
+        fila['saldo'] += fila['saldo_inicial']
+        yield fila
+
+
+def servicio_facturas_con_saldo(proveedor, user):
+    """Facturas del proveedor con saldo pendiente (monto - pagos)."""
+    _validar(proveedor, user)
+    return (
+        Facturas.objects
+        .filter(proveedor=proveedor, organizacion=user.organizacion)
+        .annotate(
+            pagado=Coalesce(
+                Sum('movimientos_cartera__monto', filter=Q(movimientos_cartera__origen='PAGO')),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=15, decimal_places=2),
+            ),
+        )
+        .annotate(saldo=F('monto') - F('pagado'))
+        .filter(saldo__gt=0)
+        .order_by('id')
+    )
+
+
+# ============================================================
+# EXPORTACIÓN
+# ============================================================
+
+class _Eco:
+    """Destino de csv.writer que devuelve la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def csv_estados_cuenta(filas):
+    """Líneas CSV (para StreamingHttpResponse) a partir de `iterar_estados_cuenta`."""
+    escritor = csv.writer(_Eco())
+    yield '\ufeff'  # BOM para que Excel abra bien los acentos
+    yield escritor.writerow(['Proveedor', 'Fecha', 'Folio', 'Tipo', 'Descripción', 'Cargo', 'Pago', 'Saldo'])
+    proveedor_actual = None
+    for fila in filas:
+        if fila['proveedor_id'] != proveedor_actual:
+            proveedor_actual = fila['proveedor_id']
+            yield escritor.writerow([fila['proveedor_nombre'], '', '', 'SALDO INICIAL', '', '', '', fila['saldo_inicial']])
+        yield escritor.writerow([
+            fila['proveedor_nombre'],
+            fila['fecha'].isoformat(),
+            fila['factura__folio'] or '',
+            fila['origen'],
+            fila['descripcion'] or '',
+            fila['monto'] if fila['origen'] == 'CARGO' else '',
+            fila['monto'] if fila['origen'] == 'PAGO' else '',
+            fila['saldo'],
+        ])
+
+
+def contenido_pdf_estado_cuenta(filas, desde=None, hasta=None):
+    """Contenido (tipos básicos) para la plantilla 'estado_cuenta' de render_pdf."""
+    secciones = {}
+    for fila in filas:
+        seccion = secciones.setdefault(fila['proveedor_id'], {
+            'proveedor': fila['proveedor_nombre'],
+            'saldo_inicial': f"${fila['saldo_inicial']:,.2f}",
+            'saldo_final': '',
+            'filas': [],
+        })
+        seccion['filas'].append([
+            fila['fecha'].strftime('%d/%m/%Y'),
+            fila['factura__folio'] or '',
+            fila['origen'],
+            f"${fila['monto']:,.2f}" if fila['origen'] == 'CARGO' else '',
+            f"${fila['monto']:,.2f}" if fila['origen'] == 'PAGO' else '',
+            f"${fila['saldo']:,.2f}",
+        ])
+        seccion['saldo_final'] = f"${fila['saldo']:,.2f}"
+
+    periodo = 'Estado de cuenta'
+    if desde or hasta:
+        periodo += f" del {desde:%d/%m/%Y}" if desde else ''
+        periodo += f" al {hasta:%d/%m/%Y}" if hasta else ''
+    return {'periodo': periodo, 'secciones': list(secciones.values())}
@@ -0,0 +1,64 @@
+"""
+Plantilla ReportLab del estado de cuenta de proveedores.
+
+Igual que core/services/pdf_corte_caja.py: sin BD ni Django, recibe el
+contenido ya formateado (ver `contenido_pdf_estado_cuenta` en
+estado_cuenta.py) y se ejecuta en el pool de core/services/render_pdf.py.
+"""
+
+import io
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+VERSION_PLANTILLAS = 1
+
+ESTILO_TITULO = ParagraphStyle('EstadoCuentaTitulo', fontName='Helvetica-Bold', fontSize=13, leading=16)
+ESTILO_SUBTITULO = ParagraphStyle('EstadoCuentaSubtitulo', fontName='Helvetica', fontSize=9, leading=12,
+                                  textColor=colors.HexColor('#475569'))
+
+ESTILO_MOVIMIENTOS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e2e8f0')),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Oblique'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f8f9fa')),
+])
+
+COLUMNAS = ['FECHA', 'FOLIO', 'TIPO', 'CARGO', 'PAGO', 'SALDO']
+ANCHOS = [60, 100, 48, 80, 80, 100]
+
+
+def _seccion(seccion):
+    datos = [COLUMNAS, ['', 'Saldo inicial', '', '', '', seccion['saldo_inicial']]]
+    datos.extend(list(fila) for fila in seccion['filas'])
+    datos.append(['', 'Saldo final', '', '', '', seccion['saldo_final']])
+    return [
+        Paragraph(escape(seccion['proveedor']), ESTILO_TITULO),
+        Spacer(1, 6),
+        Table(datos, colWidths=ANCHOS, style=ESTILO_MOVIMIENTOS, repeatRows=1),
+    ]
+
+
+def elementos_estado_cuenta(contenido):
+    """Un proveedor por página; `contenido['secciones']` ya viene formateado."""
+    elementos = [Paragraph(escape(contenido['periodo']), ESTILO_SUBTITULO), Spacer(1, 8)]
+    for indice, seccion in enumerate(contenido['secciones']):
+        if indice:
+            elementos.append(PageBreak())
+        elementos.extend(_seccion(seccion))
+    return elementos
+
+
+def renderizar(plantilla, contenido):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, invariant=1, title='Estado de cuenta')
+    doc.build(elementos_estado_cuenta(contenido))
+    return buffer.getvalue()
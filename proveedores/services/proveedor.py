@@ -1,12 +1,14 @@
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from ..models import Proveedores
-from django.core.cache import cache
+from cartera.models import Movimientos_Cartera
+from facturas.models import Facturas, FacturasFechasDePago
+from core.services.cache_calendario import invalidar_calendario_organizacion
+from core.services.cambios_datos import CREAR, EDITAR, ELIMINAR, cambio, cambios_de, registrar_cambios
+from .directorio import obtener_directorio
 
-
-def _invalidar_cache_proveedores(organizacion):
-    """Invalida el caché de la lista de proveedores para la organzación dada."""
-    cache.delete(f'lista_proveedores_org_{organizacion.id}')
+# El directorio de proveedores se invalida con las señales de
+# proveedores/signals/handlers.py (post_save / post_delete).
 
 
 @transaction.atomic
@@ -41,7 +43,7 @@ def servicio_crear_proveedor(data, user):
     payload['organizacion'] = organizacion
 
     proveedor = Proveedores.objects.create(**payload)
-    _invalidar_cache_proveedores(organizacion)   # <-- invalida caché
+    registrar_cambios(organizacion, [cambio('proveedor', proveedor.pk, CREAR)])
     return proveedor
 
 
@@ -71,46 +73,19 @@ def servicio_editar_proveedor(proveedor, data, user):
             setattr(proveedor, campo, data[campo])
 
     proveedor.save()
-    _invalidar_cache_proveedores(user.organizacion)  # <-- invalida caché
+    registrar_cambios(proveedor.organizacion, [cambio('proveedor', proveedor.pk, EDITAR)])
     return proveedor
 
 
 def servicio_obtener_proveedores(filters=None, user=None):
     """
     Punto único de obtención de proveedores por organización.
+    Devuelve registros `ProveedorResumen` del directorio en caché.
     """
     if not user or not user.organizacion:
         return []
 
-    org_id = user.organizacion.id
-    CACHE_KEY = f'lista_proveedores_org_{org_id}'
-
-    # 1. Intentar obtener la lista completa del caché
-    todos_proveedores = cache.get(CACHE_KEY)
-
-    if todos_proveedores is None:
-        # Si no está en caché, consultar DB filtrando por organización
-        todos_proveedores = list(Proveedores.objects.filter(organizacion=user.organizacion).order_by('nombre'))
-        # Guardamos en caché por 24 horas
-        cache.set(CACHE_KEY, todos_proveedores, timeout=60*60*24)
-
-    # 2. Filtrado en Memoria
-    resultado = todos_proveedores
-    
-    if filters:
-        if filters.get('nombre'):
-            val = filters['nombre'].lower()
-            resultado = [p for p in resultado if val in p.nombre.lower()]
-        
-        if filters.get('telefono'):
-            val = filters['telefono'].lower()
-            resultado = [p for p in resultado if p.telefono and val in p.telefono.lower()]
-            
-        if filters.get('email'):
-            val = filters['email'].lower()
-            resultado = [p for p in resultado if p.email and val in p.email.lower()]
-            
-    return resultado
+    return obtener_directorio(user.organizacion).buscar(filters)
 
 
 @transaction.atomic
@@ -118,5 +93,17 @@ def servicio_eliminar_proveedor(proveedor, user):
     if proveedor.organizacion != user.organizacion:
         raise ValidationError("No tienes permiso para eliminar este proveedor.")
     organizacion = proveedor.organizacion
+    # Sus facturas, cuotas y movimientos se borran en cascada: se anotan antes
+    cambios = (
+        [cambio('proveedor', proveedor.pk, ELIMINAR)]
+        + cambios_de(Facturas.objects.filter(proveedor=proveedor), 'factura', ELIMINAR)
+        + cambios_de(
+            FacturasFechasDePago.objects.filter(factura__proveedor=proveedor), 'fecha_pago', ELIMINAR, 'fecha_por_pagar'
+        )
+        + cambios_de(
+            Movimientos_Cartera.objects.filter(factura__proveedor=proveedor), 'movimiento', ELIMINAR, 'fecha'
+        )
+    )
     proveedor.delete()
-    _invalidar_cache_proveedores(organizacion)   # <-- invalida caché
+    invalidar_calendario_organizacion(organizacion)  # borra sus facturas en cascada
+    registrar_cambios(organizacion, cambios)
@@ -1,15 +1,17 @@
 from django.dispatch import receiver
 from django.db.models.signals import post_save, post_delete
-from django.core.cache import cache
-from proveedores.models import Proveedores
+from proveedores.models import Proveedores, Cuenta_Maestra
+from proveedores.services.directorio import invalidar_directorio_proveedores
 
-CACHE_KEY_PROVEEDORES = 'lista_todos_proveedores'
 
 @receiver(post_save, sender=Proveedores)
 @receiver(post_delete, sender=Proveedores)
+@receiver(post_save, sender=Cuenta_Maestra)
+@receiver(post_delete, sender=Cuenta_Maestra)
 def invalidar_cache_proveedores(sender, instance, **kwargs):
     """
-    Invalida el caché de la lista de proveedores cuando se crea, actualiza
-    o elimina un proveedor.
+    Invalida el directorio de proveedores de la organización cuando se crea,
+    actualiza o elimina un proveedor o la cuenta maestra (su nombre aparece
+    en la lista).
     """
-    cache.delete(CACHE_KEY_PROVEEDORES)
+    invalidar_directorio_proveedores(instance.organizacion_id)
@@ -1,3 +1,179 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from cartera.models import Movimientos_Cartera
+from facturas.models import Facturas
+
+from users.models import Organizacion, User
+from .forms import ProveedorForm
+from .models import Proveedores, Cuenta_Maestra
+from .services.autocompletado import servicio_autocompletar_proveedores
+from .services.directorio import DirectorioProveedores
+from .services.estado_cuenta import iterar_estados_cuenta, servicio_estado_cuenta_proveedor
+from .services.proveedor import servicio_obtener_proveedores
+
+
+class AutocompletarProveedoresTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Autocompletar")
+        self.user = User.objects.create_user(
+            email="autocompletar@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        for nombre in ["Distribuidora Acme", "Acme Norte", "Papelería Central", "Acme Sur"]:
+            Proveedores.objects.create(nombre=nombre, organizacion=self.org)
+        otra_org = Organizacion.objects.create(nombre="Otra")
+        Proveedores.objects.create(nombre="Acme Ajeno", organizacion=otra_org)
+
+    def test_prefijos_primero_y_solo_la_organizacion(self):
+        datos = servicio_autocompletar_proveedores(self.user, 'acme')
+
+        textos = [r['texto'] for r in datos['resultados']]
+        self.assertEqual(textos, ["Acme Norte", "Acme Sur", "Distribuidora Acme"])
+        self.assertFalse(datos['mas'])
+
+    def test_paginacion(self):
+        primera = servicio_autocompletar_proveedores(self.user, '', pagina=1, por_pagina=3)
+        segunda = servicio_autocompletar_proveedores(self.user, '', pagina=2, por_pagina=3)
+
+        self.assertEqual(len(primera['resultados']), 3)
+        self.assertTrue(primera['mas'])
+        self.assertEqual([r['texto'] for r in segunda['resultados']], ["Papelería Central"])
+        self.assertFalse(segunda['mas'])
+
+    def test_endpoint_json(self):
+        self.client.force_login(self.user)
+        respuesta = self.client.get('/proveedores/api/autocompletar/', {'q': 'papel'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([r['texto'] for r in respuesta.json()['resultados']], ["Papelería Central"])
+
+    def test_widget_solo_renderiza_la_opcion_seleccionada(self):
+        cuentas = [Cuenta_Maestra.objects.create(nombre=f"Cuenta {i}", organizacion=self.org) for i in range(5)]
+        proveedor = Proveedores.objects.filter(organizacion=self.org).first()
+        proveedor.cuenta_maestra = cuentas[2]
+        proveedor.save()
+
+        html = str(ProveedorForm(instance=proveedor, user=self.user)['cuenta_maestra'])
+
+        self.assertIn('data-autocompletar-url="/proveedores/api/autocompletar/cuentas-maestras/"', html)
+        self.assertIn("Cuenta 2", html)
+        self.assertNotIn("Cuenta 0", html)
+        self.assertEqual(html.count('<option'), 2)
+
+    def test_widget_con_valor_no_numerico(self):
+        form = ProveedorForm(data={'nombre': 'Nuevo', 'cuenta_maestra': 'abc'}, user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn('cuenta_maestra', form.errors)
+        self.assertEqual(str(form['cuenta_maestra']).count('<option'), 1)
+
+
+class DirectorioProveedoresTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Directorio")
+        self.user = User.objects.create_user(
+            email="directorio@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        self.cuenta = Cuenta_Maestra.objects.create(nombre="Maestra", organizacion=self.org)
+        Proveedores.objects.create(nombre="Aceros del Norte", telefono="4431112233",
+                                   email="ventas@aceros.mx", organizacion=self.org, cuenta_maestra=self.cuenta)
+        Proveedores.objects.create(nombre="Papelera Sur", telefono="5559998877", organizacion=self.org)
+
+    def test_busqueda_por_trigramas_y_subcadenas_cortas(self):
+        directorio = DirectorioProveedores([
+            (1, "Aceros del Norte", None, "4431112233", "ventas@aceros.mx", None),
+            (2, "Papelera Sur", None, "5559998877", None, None),
+            (3, "Norteña", None, None, None, None),
+        ])
+
+        self.assertEqual([p.id for p in directorio.buscar({'nombre': 'NORTE'})], [1, 3])
+        self.assertEqual([p.id for p in directorio.buscar({'nombre': 'su'})], [2])
+        self.assertEqual([p.id for p in directorio.buscar({'nombre': 'norte', 'email': 'aceros'})], [1])
+        self.assertEqual(directorio.buscar({'telefono': '000'}), [])
+        self.assertEqual(len(directorio.buscar({})), 3)
+
+    def test_edicion_de_cuenta_maestra_invalida_el_directorio(self):
+        self.assertEqual(servicio_obtener_proveedores({'nombre': 'aceros'}, self.user)[0].cuenta_maestra_nombre, "Maestra")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cuenta.nombre = "Maestra Nueva"
+            self.cuenta.save()
+
+        proveedores = servicio_obtener_proveedores({'nombre': 'aceros'}, self.user)
+        self.assertEqual(proveedores[0].cuenta_maestra_nombre, "Maestra Nueva")
+
+    def test_alta_de_proveedor_invalida_el_directorio(self):
+        self.assertEqual(len(servicio_obtener_proveedores(None, self.user)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Proveedores.objects.create(nombre="Nuevo", organizacion=self.org)
+
+        self.assertEqual(len(servicio_obtener_proveedores(None, self.user)), 3)
+
+
+
+class EstadoCuentaProveedorTest(TestCase):
+    def setUp(self):
+        self.org = Organizacion.objects.create(nombre="Org Estado Cuenta")
+        self.user = User.objects.create_user(
+            email="estado@test.com", password="x", first_name="A", last_name="B", organizacion=self.org
+        )
+        self.acme = Proveedores.objects.create(nombre="Acme", organizacion=self.org)
+        self.beta = Proveedores.objects.create(nombre="Beta", organizacion=self.org)
+        self._movimientos(self.acme, [
+            ('CARGO', '100.00', date(2026, 1, 5)),
+            ('PAGO', '30.00', date(2026, 1, 10)),
+            ('CARGO', '50.00', date(2026, 2, 1)),
+            ('PAGO', '20.00', date(2026, 2, 1)),
+        ])
+        self._movimientos(self.beta, [('CARGO', '500.00', date(2026, 1, 20))])
+
+    def _movimientos(self, proveedor, movimientos):
+        factura = Facturas.objects.create(proveedor=proveedor, folio=f"F-{proveedor.nombre}",
+                                          monto=Decimal('150.00'), organizacion=self.org)
+        for origen, monto, fecha in movimientos:
+            Movimientos_Cartera.objects.create(origen=origen, monto=Decimal(monto), fecha=fecha,
+                                               factura=factura, organizacion=self.org)
+        # Un ajuste no forma parte del estado de cuenta
+        Movimientos_Cartera.objects.create(origen='AJUSTE_SUMA', monto=Decimal('999.00'), fecha=date(2026, 1, 6),
+                                           factura=factura, organizacion=self.org)
+
+    def test_saldo_corrido_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            estado = servicio_estado_cuenta_proveedor(self.acme, self.user)
+
+        self.assertEqual([m['saldo'] for m in estado['movimientos']],
+                         [Decimal('100.00'), Decimal('70.00'), Decimal('120.00'), Decimal('100.00')])
+        self.assertEqual(estado['saldo_final'], Decimal('100.00'))
+        self.assertIsNone(estado['siguiente'])
+
+    def test_paginacion_por_llave_conserva_el_saldo(self):
+        primera = servicio_estado_cuenta_proveedor(self.acme, self.user, limite=3)
+        segunda = servicio_estado_cuenta_proveedor(self.acme, self.user, cursor=primera['siguiente'], limite=3)
+
+        self.assertEqual(len(primera['movimientos']), 3)
+        self.assertEqual(segunda['saldo_inicial'], Decimal('120.00'))
+        self.assertEqual([m['saldo'] for m in segunda['movimientos']], [Decimal('100.00')])
+
+        desde_febrero = servicio_estado_cuenta_proveedor(self.acme, self.user, desde=date(2026, 2, 1))
+        self.assertEqual(desde_febrero['saldo_inicial'], Decimal('70.00'))
+
+    def test_todos_los_proveedores_particiona_el_saldo(self):
+        filas = list(iterar_estados_cuenta(self.user, desde=date(2026, 1, 10)))
+
+        self.assertEqual([(f['proveedor_nombre'], f['saldo']) for f in filas], [
+            ("Acme", Decimal('70.00')),
+            ("Acme", Decimal('120.00')),
+            ("Acme", Decimal('100.00')),
+            ("Beta", Decimal('500.00')),
+        ])
+
+    def test_exportacion_csv(self):
+        self.client.force_login(self.user)
+        respuesta = self.client.get(f'/proveedores/estado-cuenta/{self.acme.pk}/', {'formato': 'csv'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        lineas = b''.join(respuesta.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lineas[1], 'Acme,,,SALDO INICIAL,,,,0.00')
+        self.assertEqual(lineas[-1], 'Acme,2026-02-01,F-Acme,PAGO,,,20.00,100.00')
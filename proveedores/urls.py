@@ -7,9 +7,17 @@ urlpatterns = [
     path('crear/', crear_proveedor, name='crear-proveedor'),
     path('editar/<int:pk>/', editar_proveedor, name='editar-proveedor'),
     path('eliminar/<int:pk>/', eliminarProveedor, name='eliminar-proveedor'),
+
+    # Estado de cuenta
+    path('estado-cuenta/', estados_cuenta_proveedores, name='estados-cuenta-proveedores'),
+    path('estado-cuenta/<int:pk>/', estado_cuenta_proveedor, name='estado-cuenta-proveedor'),
     
     # Cuenta Maestra
     path('cuenta-maestra/', ver_cuenta_maestra, name='ver-cuenta-maestra'),
     path('cuenta-maestra/crear/', crear_cuenta_maestra, name='crear-cuenta-maestra'),
     path('cuenta-maestra/editar/', editar_cuenta_maestra, name='editar-cuenta-maestra'),
+
+    # Autocompletado (JSON paginado)
+    path('api/autocompletar/', autocompletar_proveedores, name='autocompletar-proveedores'),
+    path('api/autocompletar/cuentas-maestras/', autocompletar_cuentas_maestras, name='autocompletar-cuentas-maestras'),
 ]
\ No newline at end of file
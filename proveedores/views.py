@@ -9,7 +9,23 @@ from .forms import ProveedorForm, CuentaMaestraForm
 from django.core.exceptions import ValidationError
 from .services.proveedor import *
 from .services.cuenta_maestra import *
+from .services.autocompletado import (
+    servicio_autocompletar_proveedores,
+    servicio_autocompletar_cuentas_maestras,
+)
+from .services.estado_cuenta import (
+    servicio_estado_cuenta_proveedor,
+    servicio_facturas_con_saldo,
+    iterar_estados_cuenta,
+    csv_estados_cuenta,
+    contenido_pdf_estado_cuenta,
+)
+from core.decorators import condicional_por_version, cuota_peticiones, lectura_replica, limite_consultas
+from core.services.render_pdf import ColaPDFLlena, renderizar_pdf
+from datetime import date
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 @login_required
+@condicional_por_version
 def lista_proveedores(request):
     filters = {
         'nombre': request.GET.get('nombre'),
@@ -161,3 +177,101 @@ def editar_cuenta_maestra(request):
         form = CuentaMaestraForm(instance=cuenta)
 
     return render(request, 'proveedores/cuenta_maestra/editar_cuenta_maestra.html', {'form': form, 'cuenta': cuenta})
+
+
+def _parametros_autocompletar(request):
+    try:
+        pagina = int(request.GET.get('pagina', 1))
+    except (TypeError, ValueError):
+        pagina = 1
+    return request.GET.get('q', ''), pagina
+
+
+@login_required
+def autocompletar_proveedores(request):
+    texto, pagina = _parametros_autocompletar(request)
+    return JsonResponse(servicio_autocompletar_proveedores(request.user, texto, pagina))
+
+
+@login_required
+def autocompletar_cuentas_maestras(request):
+    texto, pagina = _parametros_autocompletar(request)
+    return JsonResponse(servicio_autocompletar_cuentas_maestras(request.user, texto, pagina))
+
+
+# -----------------------------------------------------------------------------
+# ESTADO DE CUENTA
+# -----------------------------------------------------------------------------
+
+def _fechas_estado_cuenta(request):
+    fechas = []
+    for campo in ('desde', 'hasta'):
+        try:
+            fechas.append(date.fromisoformat(request.GET.get(campo) or ''))
+        except ValueError:
+            fechas.append(None)
+    return fechas
+
+
+def _exportar_estado_cuenta(request, proveedor, desde, hasta, formato, nombre):
+    try:
+        filas = iterar_estados_cuenta(request.user, proveedor, desde, hasta)
+        if formato == 'pdf':
+            # El PDF necesita el documento completo (tabla xref): se arma en el pool
+            pdf = renderizar_pdf('estado_cuenta', contenido_pdf_estado_cuenta(filas, desde, hasta))
+            response = HttpResponse(pdf, content_type='application/pdf')
+        else:
+            response = StreamingHttpResponse(csv_estados_cuenta(filas), content_type='text/csv; charset=utf-8')
+    except ColaPDFLlena as e:
+        response = JsonResponse({'error': str(e)}, status=503)
+        response['Retry-After'] = '5'
+        return response
+    except ValidationError as e:
+        return JsonResponse({'error': e.messages[0]}, status=400)
+
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
+
+
+@login_required
+@cuota_peticiones('reporte')
+@limite_consultas('reporte')
+@lectura_replica
+def estado_cuenta_proveedor(request, pk):
+    proveedor = get_object_or_404(Proveedores, pk=pk, organizacion=request.user.organizacion)
+    desde, hasta = _fechas_estado_cuenta(request)
+
+    formato = request.GET.get('formato')
+    if formato in ('csv', 'pdf'):
+        return _exportar_estado_cuenta(request, proveedor, desde, hasta, formato, f'Estado_Cuenta_{proveedor.pk}')
+
+    try:
+        estado = servicio_estado_cuenta_proveedor(
+            proveedor, request.user, desde, hasta, cursor=request.GET.get('despues'),
+        )
+    except ValidationError as e:
+        messages.error(request, e.messages[0])
+        return redirect('estado-cuenta-proveedor', pk=proveedor.pk)
+
+    return render(
+        request,
+        'proveedores/estado_cuenta.html',
+        {
+            'estado': estado,
+            'proveedor': proveedor,
+            'facturas': servicio_facturas_con_saldo(proveedor, request.user),
+            'desde': desde,
+            'hasta': hasta,
+        }
+    )
+
+
+@login_required
+@cuota_peticiones('exportacion')
+@limite_consultas('reporte')
+@lectura_replica
+def estados_cuenta_proveedores(request):
+    """Estado de cuenta de todos los proveedores (CSV o PDF)."""
+    desde, hasta = _fechas_estado_cuenta(request)
+    formato = 'pdf' if request.GET.get('formato') == 'pdf' else 'csv'
+    return _exportar_estado_cuenta(request, None, desde, hasta, formato, 'Estados_Cuenta_Proveedores')
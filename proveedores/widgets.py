@@ -0,0 +1,43 @@
+from django import forms
+from django.urls import reverse
+
+
+class AutocompletarSelect(forms.Select):
+    """
+    <select> que solo renderiza la opción seleccionada. Las demás se piden
+    al endpoint `url_name` mientras el usuario escribe (ver el script de
+    autocompletado en base.html).
+
+    La validación no cambia: ModelChoiceField hace un solo
+    `queryset.get(pk=valor)` sobre el queryset ya filtrado por organización.
+    """
+
+    def __init__(self, url_name, placeholder='Buscar...', attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.placeholder = placeholder
+
+    def optgroups(self, name, value, attrs=None):
+        valores = [str(v) for v in value if v not in (None, '')]
+        # Un valor enviado que no es un id no se busca: el campo ya muestra
+        # su error de validación y el select queda sin opción elegida
+        pks = [v for v in valores if v.isdigit()]
+        opciones = [('', '')]
+        queryset = getattr(self.choices, 'queryset', None)
+        if queryset is not None and pks:
+            opciones.extend(
+                (str(obj.pk), str(obj)) for obj in queryset.filter(pk__in=pks)
+            )
+
+        grupos = []
+        for index, (valor_opcion, etiqueta) in enumerate(opciones):
+            grupos.append((None, [
+                self.create_option(name, valor_opcion, etiqueta, valor_opcion in valores, index, attrs=attrs)
+            ], index))
+        return grupos
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocompletar-url'] = reverse(self.url_name)
+        context['widget']['attrs']['data-placeholder'] = self.placeholder
+        return context
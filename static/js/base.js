@@ -0,0 +1,226 @@
+// Auto-dismiss toasts after 4 seconds
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.global-toast').forEach(function(toast, i) {
+        setTimeout(function() {
+            toast.style.transition = 'opacity 0.4s ease, transform 0.4s ease';
+            toast.style.opacity = '0';
+            toast.style.transform = 'translateX(100%)';
+            setTimeout(function() { toast.remove(); }, 400);
+        }, 4000 + i * 300);
+    });
+});
+
+// Mobile Menu Toggle
+const hamburger = document.getElementById('hamburger');
+const navMenu = document.getElementById('navMenu');
+
+hamburger.addEventListener('click', () => {
+    hamburger.classList.toggle('active');
+    navMenu.classList.toggle('active');
+
+    // Animate hamburger to X
+    const spans = hamburger.querySelectorAll('span');
+    if (hamburger.classList.contains('active')) {
+        spans[0].style.transform = 'rotate(45deg) translate(6px, 6px)';
+        spans[1].style.opacity = '0';
+        spans[2].style.transform = 'rotate(-45deg) translate(6px, -6px)';
+    } else {
+        spans[0].style.transform = 'none';
+        spans[1].style.opacity = '1';
+        spans[2].style.transform = 'none';
+    }
+});
+
+// Close menu when clicking outside on mobile
+document.addEventListener('click', (e) => {
+    if (window.innerWidth <= 768) {
+        if (!hamburger.contains(e.target) && !navMenu.contains(e.target)) {
+            hamburger.classList.remove('active');
+            navMenu.classList.remove('active');
+            const spans = hamburger.querySelectorAll('span');
+            spans[0].style.transform = 'none';
+            spans[1].style.opacity = '1';
+            spans[2].style.transform = 'none';
+        }
+    }
+});
+
+// Update active nav link
+document.addEventListener('DOMContentLoaded', () => {
+    const currentPath = window.location.pathname;
+    const navLinks = document.querySelectorAll('.nav-link');
+
+    navLinks.forEach(link => {
+        if (link.getAttribute('href') === currentPath) {
+            link.classList.add('active');
+        } else {
+            link.classList.remove('active');
+        }
+    });
+});
+
+// Dropdown menu on mobile
+if (window.innerWidth <= 768) {
+    const dropdownToggles = document.querySelectorAll('.dropdown-toggle');
+
+    dropdownToggles.forEach(toggle => {
+        toggle.addEventListener('click', (e) => {
+            e.preventDefault();
+            const dropdown = toggle.closest('.dropdown');
+            const menu = dropdown.querySelector('.dropdown-menu');
+
+            menu.style.display = menu.style.display === 'block' ? 'none' : 'block';
+        });
+    });
+}
+
+function openAjusteModal() {
+    document.getElementById("ajusteModal").style.display = "flex";
+    // Default to today
+    const today = new Date().toISOString().split('T')[0];
+    document.getElementById("ajusteFecha").value = today;
+}
+function closeAjusteModal() {
+    document.getElementById("ajusteModal").style.display = "none";
+}
+window.onclick = function(event) {
+    var modal = document.getElementById("ajusteModal");
+    if (event.target == modal) {
+        modal.style.display = "none";
+    }
+}
+
+// Selects con autocompletado: <select data-autocompletar-url="..."> solo trae
+// la opción seleccionada; el resto se pide al servidor mientras se escribe.
+function initAutocompletarSelect(selectElement) {
+    const url = selectElement.dataset.autocompletarUrl;
+
+    selectElement.style.display = 'none';
+    const wrapper = selectElement.closest('.select-wrapper');
+    if (wrapper) {
+        const arrow = wrapper.querySelector('.select-arrow');
+        if (arrow) arrow.style.display = 'none';
+    }
+
+    const container = document.createElement('div');
+    container.className = 'searchable-select-container';
+
+    const searchInput = document.createElement('input');
+    searchInput.type = 'text';
+    searchInput.className = 'search-input';
+    searchInput.autocomplete = 'off';
+    searchInput.placeholder = selectElement.dataset.placeholder || 'Buscar...';
+
+    const icon = document.createElement('i');
+    icon.className = 'fas fa-search search-icon';
+
+    const optionsList = document.createElement('div');
+    optionsList.className = 'options-dropdown';
+
+    selectElement.parentNode.insertBefore(container, selectElement);
+    container.appendChild(searchInput);
+    container.appendChild(icon);
+    container.appendChild(optionsList);
+    container.appendChild(selectElement);
+
+    const textoSeleccionado = () => {
+        const opt = selectElement.options[selectElement.selectedIndex];
+        return opt && opt.value ? opt.text : '';
+    };
+    searchInput.value = textoSeleccionado();
+
+    let temporizador = null;
+    let peticion = 0;
+    let primero = null;
+
+    function seleccionar(id, texto) {
+        let opt = Array.from(selectElement.options).find(o => o.value === String(id));
+        if (!opt) {
+            opt = new Option(texto, id);
+            selectElement.appendChild(opt);
+        }
+        selectElement.value = String(id);
+        selectElement.dispatchEvent(new Event('change'));
+        searchInput.value = texto;
+        optionsList.classList.remove('show');
+    }
+
+    function cargar(texto, pagina) {
+        const actual = ++peticion;
+        const params = new URLSearchParams({q: texto, pagina: pagina});
+        fetch(url + '?' + params.toString(), {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            .then(r => r.json())
+            .then(data => {
+                if (actual !== peticion) return;  // respuesta vieja
+                if (pagina === 1) {
+                    optionsList.innerHTML = '';
+                    primero = data.resultados[0] || null;
+                }
+                const previo = optionsList.querySelector('.cargar-mas');
+                if (previo) previo.remove();
+
+                data.resultados.forEach(r => {
+                    const item = document.createElement('div');
+                    item.className = 'option-item';
+                    if (String(r.id) === selectElement.value) item.classList.add('selected');
+                    const span = document.createElement('span');
+                    span.textContent = r.texto;
+                    item.appendChild(span);
+                    item.insertAdjacentHTML('beforeend', '<i class="fas fa-check check-icon"></i>');
+                    item.addEventListener('click', () => seleccionar(r.id, r.texto));
+                    optionsList.appendChild(item);
+                });
+
+                if (pagina === 1 && !data.resultados.length) {
+                    const noResults = document.createElement('div');
+                    noResults.className = 'no-results';
+                    noResults.textContent = 'Sin resultados';
+                    optionsList.appendChild(noResults);
+                }
+                if (data.mas) {
+                    const mas = document.createElement('div');
+                    mas.className = 'option-item cargar-mas';
+                    mas.textContent = 'Cargar más...';
+                    mas.addEventListener('click', (e) => {
+                        e.stopPropagation();
+                        cargar(texto, pagina + 1);
+                    });
+                    optionsList.appendChild(mas);
+                }
+                optionsList.classList.add('show');
+            });
+    }
+
+    function buscar() {
+        clearTimeout(temporizador);
+        const texto = searchInput.value === textoSeleccionado() ? '' : searchInput.value.trim();
+        temporizador = setTimeout(() => cargar(texto, 1), 250);
+    }
+
+    searchInput.addEventListener('input', buscar);
+    searchInput.addEventListener('focus', buscar);
+    searchInput.addEventListener('keydown', (e) => {
+        if (e.key === 'Enter') {
+            e.preventDefault();
+            if (primero) seleccionar(primero.id, primero.texto);
+        }
+    });
+
+    document.addEventListener('click', (e) => {
+        if (container.contains(e.target)) return;
+        optionsList.classList.remove('show');
+        if (!searchInput.value.trim() && !selectElement.required) {
+            // Vaciar el texto limpia la selección (filtros "Todos")
+            if (selectElement.value) {
+                selectElement.value = '';
+                selectElement.dispatchEvent(new Event('change'));
+            }
+        } else {
+            searchInput.value = textoSeleccionado();
+        }
+    });
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('select[data-autocompletar-url]').forEach(initAutocompletarSelect);
+});
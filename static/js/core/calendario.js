@@ -0,0 +1,112 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const urls = document.getElementById('calendario-urls').dataset;
+
+    // Sin recargar la página si está la navegación por API (calendario_api.js)
+    const irA = destino => window.calendarioApi
+        ? window.calendarioApi.navegar(destino)
+        : (window.location.href = destino);
+
+    // Tooltips para los días (delegado: los días se repintan al cambiar de mes)
+    const calendarDays = document.querySelector('.calendar-days');
+    calendarDays.addEventListener('mouseover', function(e) {
+        const day = e.target.closest('.calendar-day:not(.empty)');
+        if (!day || day.contains(e.relatedTarget)) return;
+        day.style.cursor = 'pointer';
+        day.style.boxShadow = '0 5px 15px rgba(0, 0, 0, 0.3)';
+    });
+    calendarDays.addEventListener('mouseout', function(e) {
+        const day = e.target.closest('.calendar-day:not(.empty)');
+        if (!day || day.contains(e.relatedTarget)) return;
+        day.style.boxShadow = 'none';
+    });
+
+    // Animación para stats
+    const statsCards = document.querySelectorAll('.stat-card');
+    statsCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+
+        setTimeout(() => {
+            card.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 100);
+    });
+
+    // Auto-enfocar el campo de búsqueda si hay folio_busqueda
+    const searchInput = document.querySelector('input[name="folio"]');
+    if (searchInput && searchInput.value) {
+        searchInput.focus();
+        searchInput.select();
+    }
+
+    // Type-ahead de folios (espera 250 ms entre teclas)
+    if (searchInput) {
+        const datalist = document.getElementById('sugerencias-folio');
+        let temporizador = null;
+        searchInput.addEventListener('input', function() {
+            clearTimeout(temporizador);
+            const texto = this.value.trim();
+            if (texto.length < 2) {
+                datalist.innerHTML = '';
+                return;
+            }
+            temporizador = setTimeout(() => {
+                fetch(`${searchInput.dataset.urlSugerencias}?q=${encodeURIComponent(texto)}`)
+                    .then(r => r.json())
+                    .then(data => {
+                        datalist.innerHTML = '';
+                        data.resultados.forEach(f => {
+                            const opcion = document.createElement('option');
+                            opcion.value = f.folio || '';
+                            opcion.label = `${f.proveedor} · $${f.monto}`;
+                            datalist.appendChild(opcion);
+                        });
+                    });
+            }, 250);
+        });
+    }
+
+    // Shortcut para teclado
+    document.addEventListener('keydown', function(e) {
+        // Ctrl + F: enfocar campo de búsqueda
+        if (e.ctrlKey && e.key === 'f') {
+            e.preventDefault();
+            if (searchInput) {
+                searchInput.focus();
+                searchInput.select();
+            }
+        }
+        // Ctrl + flecha izquierda: mes anterior
+        if (e.ctrlKey && e.key === 'ArrowLeft') {
+            irA(urls.anterior);
+        }
+        // Ctrl + flecha derecha: mes siguiente
+        if (e.ctrlKey && e.key === 'ArrowRight') {
+            irA(urls.siguiente);
+        }
+        // Hoy: Ctrl + T
+        if (e.ctrlKey && e.key === 't') {
+            irA(urls.hoy);
+        }
+        // Escape: limpiar búsqueda si está activa
+        if (e.key === 'Escape' && searchInput && searchInput.value) {
+            window.location.href = urls.mes;
+        }
+    });
+
+    // Mostrar mensaje de shortcuts
+    console.log('🎯 Shortcuts del calendario:');
+    console.log('Ctrl + F : Buscar factura');
+    console.log('Ctrl + ← : Mes anterior');
+    console.log('Ctrl + → : Mes siguiente');
+    console.log('Ctrl + T : Ir al mes actual');
+    console.log('ESC      : Limpiar búsqueda');
+
+    // Mostrar ayuda si hay búsqueda activa
+    if (urls.folio) {
+        console.log(`🔍 Búsqueda activa: Folio "${urls.folio}"`);
+        console.log('   • Días resaltados: Días que contienen fechas de pago de la factura buscada');
+        console.log('   • Pulsa ESC para limpiar la búsqueda');
+    }
+});
@@ -0,0 +1,158 @@
+// Navegación entre meses con la API JSON (core/api/v1/calendario/): se
+// piden solo los datos del mes y se repintan título, totales y días, sin
+// recargar la página. Cada mes visto se guarda con su ETag; al volver se
+// revalida con If-None-Match y un 304 reutiliza lo guardado.
+// Si algo falla se navega a la página completa.
+(function() {
+    const urls = document.getElementById('calendario-urls').dataset;
+    const contenedor = document.querySelector('.calendar-days');
+    const enteros = new Intl.NumberFormat('es-MX', { maximumFractionDigits: 0 });
+    const centavos = new Intl.NumberFormat('es-MX', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+    const meses = new Map();  // "año-mes" -> {etag, datos}
+
+    const dos = n => String(n).padStart(2, '0');
+    const consulta = (anio, mes) => `?year=${anio}&month=${mes}`;
+
+    async function obtener(anio, mes) {
+        const url = new URL(urls.api, window.location.href);
+        const guardado = anio && mes ? meses.get(`${anio}-${mes}`) : null;
+        if (anio && mes) {
+            url.searchParams.set('year', anio);
+            url.searchParams.set('month', mes);
+        }
+        const respuesta = await fetch(url, {
+            headers: guardado ? { 'If-None-Match': guardado.etag } : {},
+            credentials: 'same-origin',
+        });
+        if (respuesta.status === 304 && guardado) return guardado.datos;
+        const tipo = respuesta.headers.get('Content-Type') || '';
+        if (!respuesta.ok || !tipo.startsWith('application/json')) {
+            throw new Error(`HTTP ${respuesta.status}`);
+        }
+        const datos = await respuesta.json();
+        meses.set(`${datos.anio}-${datos.mes}`, { etag: respuesta.headers.get('ETag'), datos });
+        return datos;
+    }
+
+    function celda(datos, i) {
+        const fecha = `${datos.anio}-${dos(datos.mes)}-${dos(i + 1)}`;
+        const dias = datos.dias;
+        const facturas = parseFloat(dias.facturas[i]);
+        const ventas = parseFloat(dias.ventas[i]);
+        const pendientes = dias.pendientes[i];
+        const url = urls.urlDia.replace('0000-00-00', fecha);
+        return `
+            <div class="calendar-day ${fecha === datos.hoy ? 'today' : ''}" data-fecha="${fecha}"
+                 onclick="window.location.href='${url}'">
+                <div class="day-number">${i + 1}</div>
+                ${pendientes > 0 ? `
+                <div class="day-badge"><i class="fas fa-exclamation-circle"></i> ${pendientes}</div>` : ''}
+                <div class="day-content">
+                    ${facturas > 0 ? `
+                    <div class="day-item facturas">
+                        <i class="fas fa-calendar-check item-icon"></i>
+                        <span>Cargos por Factura</span>
+                        <span class="item-amount">$${enteros.format(facturas)}</span>
+                    </div>` : ''}
+                    ${ventas > 0 ? `
+                    <div class="day-item ventas">
+                        <i class="fas fa-cash-register item-icon"></i>
+                        <span>Ventas</span>
+                        <span class="item-amount">$${enteros.format(ventas)}</span>
+                    </div>` : ''}
+                    <div class="day-item saldo-inicial" title="Saldo Inicial">
+                        <i class="fas fa-wallet item-icon"></i>
+                        <span>Saldo Inicial</span>
+                        <span class="item-amount saldo-dia">$${centavos.format(parseFloat(dias.saldo[i]))}</span>
+                    </div>
+                </div>
+            </div>`;
+    }
+
+    function pintarTotales(datos) {
+        Object.entries(datos.totales).forEach(([campo, valor]) => {
+            const elemento = document.querySelector(`[data-total="${campo}"]`);
+            if (elemento) elemento.textContent = '$' + centavos.format(parseFloat(valor));
+        });
+    }
+
+    function pintar(datos) {
+        const vacia = '<div class="calendar-day empty"></div>';
+        const total = datos.dias.saldo.length;
+        const html = [vacia.repeat(datos.inicio)];
+        for (let i = 0; i < total; i++) html.push(celda(datos, i));
+        html.push(vacia.repeat((7 - (datos.inicio + total) % 7) % 7));
+        contenedor.innerHTML = html.join('');
+
+        document.querySelector('.current-month').textContent = `${datos.nombre_mes} ${datos.anio}`;
+        pintarTotales(datos);
+
+        // Enlaces y atajos apuntan al nuevo mes
+        const anterior = consulta(...datos.anterior);
+        const siguiente = consulta(...datos.siguiente);
+        const actual = consulta(datos.anio, datos.mes);
+        document.querySelector('[data-nav="anterior"]').href = anterior;
+        document.querySelector('[data-nav="siguiente"]').href = siguiente;
+        const sandbox = document.querySelector('[data-nav="sandbox"]');
+        if (sandbox) sandbox.href = `${actual}&sandbox=1`;
+        document.querySelector('.filter-form input[name="year"]').value = datos.anio;
+        document.querySelector('.filter-form input[name="month"]').value = datos.mes;
+        urls.anterior = anterior;
+        urls.siguiente = siguiente;
+        urls.mes = actual;
+        return actual;
+    }
+
+    async function navegar(destino, agregarHistorial = true) {
+        const parametros = new URL(destino, window.location.href).searchParams;
+        try {
+            const datos = await obtener(parametros.get('year'), parametros.get('month'));
+            const actual = pintar(datos);
+            if (agregarHistorial) history.pushState({ calendario: true }, '', actual);
+        } catch (error) {
+            window.location.href = destino;
+        }
+    }
+
+    document.querySelectorAll('[data-nav="anterior"], [data-nav="siguiente"], [data-nav="hoy"]').forEach(enlace => {
+        enlace.addEventListener('click', evento => {
+            evento.preventDefault();
+            navegar(enlace.getAttribute('href'));
+        });
+    });
+    window.addEventListener('popstate', () => navegar(window.location.href, false));
+
+    // Eventos en vivo (eventos.js): un cambio en un día del mes o anterior
+    // mueve el saldo desde ese día, así que se repintan esas celdas y los
+    // totales. Los meses guardados pueden haber cambiado y se descartan.
+    if (window.eventosEnVivo) {
+        window.eventosEnVivo.escuchar('dia', async cambio => {
+            meses.clear();
+            const mes = new URLSearchParams(urls.mes);
+            const anio = parseInt(mes.get('year'), 10);
+            const numero = parseInt(mes.get('month'), 10);
+            const ultimo = `${anio}-${dos(numero)}-31`;
+            const primero = `${anio}-${dos(numero)}-01`;
+            const fechas = cambio.fechas ? cambio.fechas.filter(fecha => fecha <= ultimo).sort() : null;
+            if (fechas && !fechas.length) return;
+            const desde = fechas && fechas[0] > primero ? parseInt(fechas[0].slice(8), 10) - 1 : 0;
+            const destino = new URL(urls.api, window.location.href);
+            destino.searchParams.set('year', anio);
+            destino.searchParams.set('month', numero);
+            try {
+                const datos = await window.eventosEnVivo.obtenerVigente(destino, cambio.version);
+                if (datos.anio !== anio || datos.mes !== numero) return;  // ya se navegó a otro mes
+                for (let i = desde; i < datos.dias.saldo.length; i++) {
+                    const fecha = `${anio}-${dos(numero)}-${dos(i + 1)}`;
+                    const actual = contenedor.querySelector(`[data-fecha="${fecha}"]`);
+                    if (actual) actual.outerHTML = celda(datos, i);
+                }
+                pintarTotales(datos);
+            } catch (error) {
+                // Se ve al navegar o recargar
+            }
+        });
+    }
+
+    window.calendarioApi = { navegar };
+})();
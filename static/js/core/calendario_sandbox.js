@@ -0,0 +1,84 @@
+(function() {
+    const urls = document.getElementById('calendario-urls').dataset;
+    const url = urls.sandbox;
+    const csrftoken = document.cookie.split('; ').find(c => c.startsWith('csrftoken='))?.split('=')[1];
+    const tbody = document.getElementById('sandbox-cuotas');
+    const formato = new Intl.NumberFormat('es-MX', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+
+    // En modo sandbox los días no navegan al detalle
+    document.querySelectorAll('.calendar-day[data-fecha]').forEach(d => d.onclick = null);
+
+    function pintarDias(dias) {
+        dias.forEach(dia => {
+            const celda = document.querySelector(`.calendar-day[data-fecha="${dia.fecha}"]`);
+            if (!celda) return;
+            const saldo = celda.querySelector('.saldo-dia');
+            const valor = parseFloat(dia.saldo_dia);
+            saldo.textContent = '$' + formato.format(valor);
+            saldo.classList.toggle('negativo', valor < 0);
+            celda.classList.add('sandbox-cambio');
+        });
+    }
+
+    function pintarCuotas(cuotas) {
+        tbody.innerHTML = '';
+        cuotas.forEach(c => {
+            const tr = document.createElement('tr');
+            tr.className = c.modificada ? 'modificada' : '';
+            tr.innerHTML = `
+                <td>${c.folio || 'Sin folio'}</td>
+                <td>${c.proveedor}</td>
+                <td>${c.estado}</td>
+                <td><input type="date" value="${c.fecha}" data-campo="fecha"></td>
+                <td><input type="number" step="0.01" min="0.01" value="${c.monto}" data-campo="monto" ${c.estado !== 'PENDIENTE' ? 'disabled' : ''}></td>
+                <td><button type="button" class="btn-clear" data-deshacer ${c.modificada ? '' : 'hidden'}><i class="fas fa-undo"></i></button></td>`;
+            tr.querySelectorAll('input').forEach(input => {
+                input.addEventListener('change', () => enviar({
+                    accion: 'mover', fecha_pago_id: c.fecha_pago_id, [input.dataset.campo]: input.value
+                }).then(() => {
+                    tr.className = 'modificada';
+                    tr.querySelector('[data-deshacer]').hidden = false;
+                }));
+            });
+            tr.querySelector('[data-deshacer]').addEventListener('click', () => enviar({
+                accion: 'deshacer', fecha_pago_id: c.fecha_pago_id
+            }).then(cargar));
+            tbody.appendChild(tr);
+        });
+    }
+
+    function enviar(payload) {
+        return fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrftoken },
+            body: JSON.stringify(payload),
+        }).then(r => r.json().then(data => {
+            if (!r.ok) {
+                alert(data.error || 'Error en la simulación');
+                throw new Error(data.error);
+            }
+            if (data.dias) pintarDias(data.dias);
+            return data;
+        }));
+    }
+
+    function cargar() {
+        return fetch(url).then(r => r.json()).then(data => {
+            pintarDias(data.dias);
+            pintarCuotas(data.cuotas);
+        });
+    }
+
+    document.getElementById('sandbox-reiniciar').addEventListener('click', () =>
+        enviar({ accion: 'reiniciar' }).then(data => pintarCuotas(data.cuotas))
+    );
+    document.getElementById('sandbox-aplicar').addEventListener('click', () => {
+        if (!confirm('¿Guardar todas las fechas y montos modificados?')) return;
+        enviar({ accion: 'aplicar' }).then(data => {
+            alert(`${data.actualizadas} fecha(s) de pago actualizadas.`);
+            window.location.href = urls.mes;
+        });
+    });
+
+    cargar();
+})();
@@ -0,0 +1,305 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const datos = document.getElementById('detalle-dia-datos').dataset;
+
+    // Animación para las tarjetas de resumen
+    const summaryCards = document.querySelectorAll('.summary-card');
+    summaryCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+
+        setTimeout(() => {
+            card.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+
+    // Efecto hover para las filas de la tabla
+    const tableRows = document.querySelectorAll('.items-table tbody tr');
+    tableRows.forEach(row => {
+        row.addEventListener('mouseenter', function() {
+            this.style.backgroundColor = 'rgba(59, 130, 246, 0.05)';
+        });
+
+        row.addEventListener('mouseleave', function() {
+            this.style.backgroundColor = '';
+        });
+    });
+
+
+
+    // Función para calcular ventas necesarias
+    function calcularVentasNecesarias() {
+        // Solo días futuros con cargos
+        if (!datos.diasRestantes) return;
+        const cargoTotal = parseFloat(datos.cargoTotal);
+        const diasRestantes = parseInt(datos.diasRestantes, 10);
+
+        if (diasRestantes > 0) {
+            const promedioDiario = cargoTotal / diasRestantes;
+
+            // Crear una alerta más detallada
+            const alerta = `
+                <div style="padding: 1rem; background: rgba(15, 23, 42, 0.9); border-radius: 10px; margin-top: 1rem;">
+                    <h4 style="color: #f59e0b; margin-bottom: 0.5rem;">
+                        <i class="fas fa-calculator"></i> Planificación de Fechas de Pago
+                    </h4>
+                    <p style="margin-bottom: 0.5rem;">
+                        <strong>Fechas de pago por cubrir:</strong> $${cargoTotal.toFixed(2)}<br>
+                        <strong>Días restantes:</strong> ${diasRestantes} días<br>
+                        <strong>Ventas diarias necesarias:</strong> $${promedioDiario.toFixed(2)}<br>
+                        <strong>Meta total de ventas:</strong> $${(promedioDiario * diasRestantes).toFixed(2)}
+                    </p>
+                    <small style="color: #94a3b8;">
+                        Esta estimación considera todas las fechas de pago programadas para este día.
+                    </small>
+                </div>
+            `;
+
+            console.log('Ventas necesarias calculadas:', promedioDiario);
+        }
+    }
+
+    // Función para mostrar el modal de eliminación
+    window.mostrarModalEliminar = function(facturaId, proveedorNombre, facturaFolio) {
+        const modal = document.getElementById('confirmModal');
+        const proveedorElement = document.getElementById('proveedorNombre');
+        const folioElement = document.getElementById('facturaFolio');
+        const deleteForm = document.getElementById('deleteForm');
+
+        // Configurar los datos en el modal
+        proveedorElement.textContent = proveedorNombre;
+        folioElement.textContent = facturaFolio;
+
+        // Configurar la acción del formulario
+        const urlTemplate = datos.urlEliminar;
+        deleteForm.action = urlTemplate.replace('0', facturaId);
+
+        // Mostrar el modal
+        modal.style.display = 'flex';
+
+        // Configurar botón de cancelar
+        document.getElementById('cancelDelete').addEventListener('click', function() {
+            modal.style.display = 'none';
+        });
+
+         // Configurar botón de confirmar (submit form)
+        document.getElementById('confirmDelete').onclick = function() {
+             deleteForm.submit();
+        };
+
+        // Cerrar modal al hacer clic fuera del contenido
+        modal.addEventListener('click', function(e) {
+            if (e.target === modal) {
+                modal.style.display = 'none';
+            }
+        });
+    };
+
+    // Cerrar modal con Escape
+    document.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            const modal = document.getElementById('confirmModal');
+            if (modal.style.display === 'flex') {
+                modal.style.display = 'none';
+            }
+        }
+    });
+
+    // Ejecutar cálculo al cargar
+    calcularVentasNecesarias();
+
+    // TABULACIÓN LOGIC
+    const denomBody = document.getElementById('denominacionesBody');
+    const tabTotalEl = document.getElementById('tabTotal');
+    const diffTotalEl = document.getElementById('diffTotal');
+    const targetTotalString = datos.cargoTabulacion; // Get raw float string (excluding Mercado Pago)
+    const targetTotal = parseFloat(targetTotalString) || 0;
+
+    // Toggle UI
+    window.toggleTabulation = function() {
+        const body = document.getElementById('tabBody');
+        const arrow = document.getElementById('tabArrow');
+        if (body.style.display === 'none') {
+            body.style.display = 'block';
+            arrow.classList.add('expanded');
+            // Inicializar con una fila vacía si no hay nada
+            if (denomBody.children.length === 0) {
+                addRow();
+            }
+        } else {
+            body.style.display = 'none';
+            arrow.classList.remove('expanded');
+        }
+    };
+
+    window.addRow = function(denomVal = '', countVal = '') {
+        const tr = document.createElement('tr');
+        tr.className = 'denominacion-row';
+        const id = Date.now() + Math.random(); 
+
+        tr.innerHTML = `
+            <td>
+                <div class="denom-label">
+                    <span style="color: #94a3b8; margin-right: 4px;">$</span>
+                    <input type="number" 
+                           class="denom-input value-input" 
+                           value="${denomVal}"
+                           min="0" 
+                           step="0.1"
+                           placeholder="0.00"
+                           style="text-align: left;"
+                           oninput="calcRow(this)">
+                </div>
+            </td>
+            <td>
+                <input type="number" 
+                       class="denom-input count-input" 
+                       value="${countVal}"
+                       min="0" 
+                       placeholder="0"
+                       oninput="calcRow(this)">
+            </td>
+            <td>
+                <div class="denom-total" id="total-${id}">$0.00</div>
+            </td>
+            <td>
+                <button onclick="removeRow(this)" style="background: none; border: none; color: #ef4444; cursor: pointer; padding: 4px;">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </td>
+        `;
+        denomBody.appendChild(tr);
+
+        // Foco en el nuevo input de denominación si se agregó manualmente
+        if (denomVal === '') {
+            setTimeout(() => tr.querySelector('.value-input').focus(), 50);
+        }
+    };
+
+    window.removeRow = function(btn) {
+        btn.closest('tr').remove();
+        calcGrandTotal();
+    };
+
+    // Calcular fila
+    window.calcRow = function(input) {
+        const row = input.closest('tr');
+        const denomInput = row.querySelector('.value-input');
+        const countInput = row.querySelector('.count-input');
+        const totalEl = row.querySelector('.denom-total');
+
+        const denom = parseFloat(denomInput.value) || 0;
+        const count = parseFloat(countInput.value) || 0;
+
+        // Validar negativos
+        if (denom < 0) denomInput.value = 0;
+        if (count < 0) countInput.value = 0;
+
+        const total = denom * count;
+
+        // Update row total
+        totalEl.textContent = `$${total.toFixed(2).replace(/\d(?=(\d{3})+\.)/g, '$&,')}`;
+        totalEl.dataset.value = total;
+
+        calcGrandTotal();
+    };
+
+    function calcGrandTotal() {
+        let total = 0;
+        const totals = document.querySelectorAll('.denom-total');
+        totals.forEach(el => {
+            total += parseFloat(el.dataset.value) || 0;
+        });
+
+        // Update Grand Total
+        tabTotalEl.textContent = `$${total.toFixed(2).replace(/\d(?=(\d{3})+\.)/g, '$&,')}`;
+
+        // Update Diff
+        const diff = total - targetTotal;
+        const diffFormatted = `$${Math.abs(diff).toFixed(2).replace(/\d(?=(\d{3})+\.)/g, '$&,')}`;
+
+        if (Math.abs(diff) < 0.01) {
+            diffTotalEl.innerHTML = `<i class="fas fa-check-circle"></i> Exacto`;
+            diffTotalEl.className = 'resumen-val diff diff-exact';
+        } else if (diff > 0) {
+            diffTotalEl.innerHTML = `<i class="fas fa-plus-circle"></i> ${diffFormatted} (Sobrante)`;
+            diffTotalEl.className = 'resumen-val diff diff-positive';
+        } else {
+            diffTotalEl.innerHTML = `<i class="fas fa-minus-circle"></i> -${diffFormatted} (Faltante)`;
+            diffTotalEl.className = 'resumen-val diff diff-negative';
+        }
+    }
+
+    // Generar Ticker PDF
+    window.generarTicker = function() {
+        const rows = [];
+        const trs = document.querySelectorAll('.denominacion-row');
+
+        trs.forEach(tr => {
+            const denomInput = tr.querySelector('.value-input');
+            const countInput = tr.querySelector('.count-input');
+
+            const denom = parseFloat(denomInput.value) || 0;
+            const count = parseFloat(countInput.value) || 0;
+
+            if (denom > 0 && count > 0) {
+                rows.push({
+                    denom: denom,
+                    cantidad: count,
+                    total: denom * count
+                });
+            }
+        });
+
+        const totalTabulacion = rows.reduce((acc, curr) => acc + curr.total, 0);
+
+        const data = {
+            fecha: datos.fecha,
+            cargo_total: targetTotal,
+            tabulacion_total: totalTabulacion,
+            diferencia: totalTabulacion - targetTotal,
+            filas: rows
+        };
+
+        const btn = document.getElementById('btnGenerarTicker');
+        const originalText = btn.innerHTML;
+        btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Generando...';
+        btn.disabled = true;
+
+        // Enviar al backend
+        fetch(datos.urlTabulacion, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': datos.csrf
+            },
+            body: JSON.stringify(data)
+        })
+        .then(response => {
+            if (response.ok) {
+                return response.blob();
+            }
+            throw new Error('Error al generar PDF');
+        })
+        .then(blob => {
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `Ticker_${data.fecha}.pdf`;
+            document.body.appendChild(a);
+            a.click();
+            a.remove();
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('No se pudo generar el ticker. Intente nuevamente.');
+        })
+        .finally(() => {
+            btn.innerHTML = originalText;
+            btn.disabled = false;
+        });
+    };
+
+
+});
@@ -0,0 +1,69 @@
+// Actualiza el detalle del día cuando otro usuario (u otra pestaña) cambia
+// algo de esta fecha: totales, estado y monto restante de cada factura y
+// monto de cada venta, sin recargar ni perder la tabulación capturada.
+// Si aparecieron o se quitaron filas se avisa para recargar.
+(function() {
+    if (!window.eventosEnVivo) return;
+    const datos = document.getElementById('detalle-dia-datos').dataset;
+    const centavos = new Intl.NumberFormat('es-MX', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+    const dinero = valor => '$' + centavos.format(parseFloat(valor));
+    const estados = { PENDIENTE: 'Pendiente', PAGADO: 'Pagado', ABONADO: 'Abonado' };
+
+    function filasPorId(bloque) {
+        const filas = new Map();
+        bloque.filas.forEach(fila => {
+            filas.set(String(fila[0]), Object.fromEntries(bloque.campos.map((campo, i) => [campo, fila[i]])));
+        });
+        return filas;
+    }
+
+    function mismosIds(selector, atributo, filas) {
+        const actuales = [...document.querySelectorAll(selector)].map(tr => tr.dataset[atributo]);
+        return actuales.length === filas.size && actuales.every(id => filas.has(id));
+    }
+
+    function avisarRecarga() {
+        if (document.getElementById('aviso-cambios-dia')) return;
+        const aviso = document.createElement('div');
+        aviso.id = 'aviso-cambios-dia';
+        aviso.style.cssText = 'position: fixed; top: 1rem; right: 1rem; z-index: 1000; padding: 0.75rem 1rem;'
+            + ' border-radius: 8px; background: rgba(30, 41, 59, 0.95); color: #e2e8f0;';
+        aviso.innerHTML = '<i class="fas fa-sync-alt"></i> Hay cambios en este día. '
+            + '<a href="" style="color: #60a5fa;">Actualizar</a>';
+        document.body.appendChild(aviso);
+    }
+
+    function pintar(dia) {
+        Object.entries(dia.totales).forEach(([campo, valor]) => {
+            document.querySelectorAll(`[data-total="${campo}"]`).forEach(el => { el.textContent = dinero(valor); });
+        });
+
+        const fechasPago = filasPorId(dia.fechas_pago);
+        const ventas = filasPorId(dia.ventas);
+        if (!mismosIds('tr[data-fecha-pago]', 'fechaPago', fechasPago) || !mismosIds('tr[data-venta]', 'venta', ventas)) {
+            avisarRecarga();
+        }
+
+        document.querySelectorAll('tr[data-fecha-pago]').forEach(tr => {
+            const fila = fechasPago.get(tr.dataset.fechaPago);
+            if (!fila) return;
+            const estado = tr.querySelector('[data-campo="estado"]');
+            estado.className = `status-badge status-${fila.estado.toLowerCase()}`;
+            estado.textContent = estados[fila.estado] || fila.estado;
+            tr.querySelector('[data-campo="monto_restante"]').textContent = dinero(fila.monto_restante);
+        });
+        document.querySelectorAll('tr[data-venta]').forEach(tr => {
+            const fila = ventas.get(tr.dataset.venta);
+            if (fila) tr.querySelector('[data-campo="monto"]').textContent = dinero(fila.monto);
+        });
+    }
+
+    window.eventosEnVivo.escuchar('dia', async cambio => {
+        if (cambio.fechas && !cambio.fechas.includes(datos.fecha)) return;
+        try {
+            pintar(await window.eventosEnVivo.obtenerVigente(datos.api, cambio.version));
+        } catch (error) {
+            avisarRecarga();
+        }
+    });
+})();
@@ -0,0 +1,53 @@
+// Eventos en vivo de la organización (core/eventos/, ver
+// core/services/eventos.py). Abre una sola conexión y reparte cada evento
+// como 'datos:dia' o 'datos:saldo' en el document; cada página escucha los
+// que le tocan y repinta solo lo que cambió.
+(function() {
+    if (window.eventosEnVivo || !window.EventSource) return;
+    const url = document.currentScript.dataset.url;
+
+    // JSON de la API que ya incluya la escritura del evento: si se lee de
+    // una réplica atrasada (X-Version-Datos menor) se reintenta
+    async function obtenerVigente(destino, version, intentos = 5) {
+        for (let i = 0; i < intentos; i++) {
+            const respuesta = await fetch(destino, { credentials: 'same-origin', cache: 'no-cache' });
+            const vista = parseInt(respuesta.headers.get('X-Version-Datos') || '0', 10);
+            if (respuesta.ok && (!version || vista >= version)) return respuesta.json();
+            await new Promise(listo => setTimeout(listo, 300 * (i + 1)));
+        }
+        throw new Error('Los datos no se actualizaron');
+    }
+
+    // Junta ráfagas (p. ej. un pago masivo) en una sola actualización:
+    // fechas unidas (null = todas) y la versión más alta
+    function agrupar(actualizar, espera = 300) {
+        let pendiente = null;
+        let temporizador = null;
+        return detalle => {
+            pendiente = pendiente === null ? { ...detalle } : {
+                version: Math.max(pendiente.version || 0, detalle.version || 0),
+                fechas: pendiente.fechas && detalle.fechas
+                    ? [...new Set([...pendiente.fechas, ...detalle.fechas])]
+                    : null,
+            };
+            clearTimeout(temporizador);
+            temporizador = setTimeout(() => {
+                const juntos = pendiente;
+                pendiente = null;
+                actualizar(juntos);
+            }, espera);
+        };
+    }
+
+    function escuchar(tipo, actualizar) {
+        const agrupado = agrupar(actualizar);
+        document.addEventListener(`datos:${tipo}`, evento => agrupado(evento.detail));
+    }
+
+    const fuente = new EventSource(url);
+    ['dia', 'saldo'].forEach(tipo => fuente.addEventListener(tipo, evento => {
+        document.dispatchEvent(new CustomEvent(`datos:${tipo}`, { detail: JSON.parse(evento.data) }));
+    }));
+
+    window.eventosEnVivo = { escuchar, obtenerVigente };
+})();
@@ -0,0 +1,259 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('facturaForm');
+    const montoInput = document.getElementById(form.dataset.montoId);
+    const fechasContainer = document.getElementById('fechasContainer');
+    const btnAddFecha = document.getElementById('btnAddFecha');
+    const inputFechas = document.getElementById('id_fechas_pago');
+    const inputMontos = document.getElementById('id_montos_pago');
+    const distribucionIgual = document.getElementById('distribucionIgual');
+    const resumenMontos = document.getElementById('resumenMontos');
+
+    let fechasData = [];
+    let montosData = [];
+
+    // Función para formatear fecha a YYYY-MM-DD
+    function formatDate(date) {
+        const d = new Date(date);
+        let month = '' + (d.getMonth() + 1);
+        let day = '' + d.getDate();
+        const year = d.getFullYear();
+
+        if (month.length < 2) month = '0' + month;
+        if (day.length < 2) day = '0' + day;
+
+        return [year, month, day].join('-');
+    }
+
+    // Obtener fecha de mañana como valor por defecto
+    function getTomorrowDate() {
+        const today = new Date();
+        const tomorrow = new Date(today);
+        tomorrow.setDate(tomorrow.getDate() + 1);
+        return formatDate(tomorrow);
+    }
+
+    // Inicializar con la fecha del contexto
+    const fechaInicial = form.dataset.fechaInicial;
+    if (fechaInicial) {
+        agregarFecha(fechaInicial);
+    }
+
+    // Función para agregar una nueva fecha
+    function agregarFecha(fechaValor = null) {
+        const fechaId = Date.now() + Math.random();
+        const fechaDefault = fechaValor || getTomorrowDate();
+
+        const fechaDiv = document.createElement('div');
+        fechaDiv.className = 'fecha-pago-item';
+        fechaDiv.id = `fecha-${fechaId}`;
+
+        fechaDiv.innerHTML = `
+            <div class="fecha-input">
+                <label class="form-label">Fecha de Pago</label>
+                <input type="date" 
+                       class="form-control fecha-input-field" 
+                       value="${fechaDefault}"
+                       min="2020-01-01"
+                       data-fecha-id="${fechaId}">
+            </div>
+            <div class="monto-input">
+                <label class="form-label">Monto para esta fecha</label>
+                <div class="currency-input">
+                    <span class="currency-symbol">$</span>
+                    <input type="number" 
+                           class="form-control monto-input-field"
+                           placeholder="0.00"
+                           step="0.01"
+                           min="0.01"
+                           data-fecha-id="${fechaId}"
+                           value="0.00">
+                </div>
+            </div>
+            <div class="fecha-actions">
+                <button type="button" class="btn-fecha remove" data-action="remove" data-fecha-id="${fechaId}">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        `;
+
+        fechasContainer.appendChild(fechaDiv);
+
+        // Configurar eventos para esta fecha
+        const fechaInput = fechaDiv.querySelector('.fecha-input-field');
+        const montoInputField = fechaDiv.querySelector('.monto-input-field');
+
+        // Agregar a arrays de datos
+        fechasData.push({
+            id: fechaId,
+            fecha: fechaDefault
+        });
+
+        montosData.push({
+            fechaId: fechaId,
+            monto: 0
+        });
+
+        // Configurar eventos
+        fechaInput.addEventListener('change', function() {
+            const fechaId = this.getAttribute('data-fecha-id');
+            const index = fechasData.findIndex(f => f.id == fechaId);
+            if (index !== -1) {
+                fechasData[index].fecha = this.value;
+            }
+            actualizarDatos();
+        });
+
+        montoInputField.addEventListener('input', function() {
+            const fechaId = this.getAttribute('data-fecha-id');
+            const monto = parseFloat(this.value) || 0;
+            const index = montosData.findIndex(m => m.fechaId == fechaId);
+            if (index !== -1) {
+                montosData[index].monto = monto;
+            }
+            actualizarDatos();
+        });
+
+        montoInputField.addEventListener('blur', function() {
+            if (this.value) {
+                this.value = parseFloat(this.value).toFixed(2);
+            }
+            actualizarDatos();
+        });
+
+        // Configurar botón de eliminar
+        const btnRemove = fechaDiv.querySelector('[data-action="remove"]');
+        btnRemove.addEventListener('click', function() {
+            const fechaId = this.getAttribute('data-fecha-id');
+            if (fechasData.length > 1) {
+                fechaDiv.remove();
+                fechasData = fechasData.filter(f => f.id != fechaId);
+                montosData = montosData.filter(m => m.fechaId != fechaId);
+                actualizarDatos();
+            } else {
+                alert('Debe haber al menos una fecha de pago.');
+            }
+        });
+
+        actualizarDatos();
+    }
+
+    // Actualizar datos en inputs hidden
+    function actualizarDatos() {
+        // Actualizar fechas
+        const fechasActuales = [];
+        document.querySelectorAll('.fecha-input-field').forEach(input => {
+            if (input.value) {
+                fechasActuales.push(input.value);
+            }
+        });
+
+        // Si distribución igual está activada, distribuir monto
+        if (distribucionIgual.checked && montoInput.value) {
+            const montoTotal = parseFloat(montoInput.value) || 0;
+            const numFechas = fechasActuales.length;
+
+            if (numFechas > 0) {
+                const montoPorFecha = montoTotal / numFechas;
+
+                // Actualizar inputs de monto visualmente
+                document.querySelectorAll('.monto-input-field').forEach((input, index) => {
+                    const montoFormateado = montoPorFecha.toFixed(2);
+                    input.value = montoFormateado;
+
+                    // Actualizar montosData
+                    const fechaId = input.getAttribute('data-fecha-id');
+                    const dataIndex = montosData.findIndex(m => m.fechaId == fechaId);
+                    if (dataIndex !== -1) {
+                        montosData[dataIndex].monto = parseFloat(montoFormateado);
+                    }
+                });
+            }
+        }
+
+        // Actualizar montos
+        const montosActuales = [];
+        document.querySelectorAll('.monto-input-field').forEach(input => {
+            montosActuales.push(input.value || '0');
+        });
+
+        inputFechas.value = fechasActuales.join(',');
+        inputMontos.value = montosActuales.join(',');
+
+        // Actualizar resumen
+        actualizarResumen();
+    }
+
+    // Actualizar resumen de montos
+    function actualizarResumen() {
+        const montoTotal = parseFloat(montoInput.value) || 0;
+        const totalDistribuido = montosData.reduce((sum, m) => sum + (m.monto || 0), 0);
+        const diferencia = montoTotal - totalDistribuido;
+
+        document.getElementById('totalFactura').textContent = `$${montoTotal.toFixed(2)}`;
+        document.getElementById('totalDistribuido').textContent = `$${totalDistribuido.toFixed(2)}`;
+
+        const diferenciaElement = document.getElementById('diferenciaMonto');
+        diferenciaElement.textContent = `Diferencia: $${diferencia.toFixed(2)}`;
+
+        // Mostrar siempre el resumen
+        resumenMontos.style.display = 'block';
+
+        // Cambiar color según la diferencia
+        if (Math.abs(diferencia) < 0.01) {
+            diferenciaElement.style.color = '#10b981';
+            diferenciaElement.innerHTML = `✓ Coincide: $${diferencia.toFixed(2)}`;
+        } else if (diferencia > 0) {
+            diferenciaElement.style.color = '#f59e0b';
+            diferenciaElement.innerHTML = `⚠ Falta distribuir: $${diferencia.toFixed(2)}`;
+        } else {
+            diferenciaElement.style.color = '#ef4444';
+            diferenciaElement.innerHTML = `✗ Exceso: $${Math.abs(diferencia).toFixed(2)}`;
+        }
+    }
+
+    // Evento para agregar fecha
+    btnAddFecha.addEventListener('click', function() {
+        agregarFecha();
+    });
+
+    // Evento para distribución igual
+    distribucionIgual.addEventListener('change', function() {
+        actualizarDatos();
+    });
+
+    // Validar monto total al cambiar
+    montoInput.addEventListener('input', function() {
+        const originalValue = this.value;
+        const sanitizedValue = originalValue.replace(/[^0-9.]/g, '').replace(/(\..*)\./g, '$1');
+
+        if (originalValue !== sanitizedValue) {
+            this.value = sanitizedValue;
+        }
+        actualizarDatos();
+    });
+
+    montoInput.addEventListener('blur', function() {
+        if (this.value) {
+            this.value = parseFloat(this.value).toFixed(2);
+        }
+        actualizarDatos();
+    });
+
+    // Inicializar datos
+    actualizarDatos();
+
+    // Mostrar indicador de carga al enviar
+    form.addEventListener('submit', function(e) {
+        const montoTotal = parseFloat(montoInput.value) || 0;
+        const totalDistribuido = montosData.reduce((sum, m) => sum + (m.monto || 0), 0);
+        const diferencia = Math.abs(montoTotal - totalDistribuido);
+
+
+
+        const submitBtn = form.querySelector('.btn-submit');
+        if (submitBtn) {
+            submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Procesando...';
+            submitBtn.disabled = true;
+        }
+    });
+});
@@ -0,0 +1,207 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('editarFacturaForm');
+    const montoInput = document.getElementById(form.dataset.montoId);
+    const fechasContainer = document.getElementById('fechasContainer');
+    const btnAddFecha = document.getElementById('btnAddFecha');
+    const inputFechas = document.getElementById('id_fechas_pago');
+    const inputMontos = document.getElementById('id_montos_pago');
+
+    const distribucionIgual = document.getElementById('distribucionIgual');
+    const totalFacturaEl = document.getElementById('totalFactura');
+    const totalDistribuidoEl = document.getElementById('totalDistribuido');
+    const diferenciaMontoEl = document.getElementById('diferenciaMonto');
+
+    let fechasData = [];
+    let montosData = [];
+
+    // Load initial data
+    const initialPayments = JSON.parse(document.getElementById('pagos-data').textContent || '[]');
+
+    function formatDate(date) {
+         const d = new Date(date);
+         let month = '' + (d.getMonth() + 1);
+         let day = '' + d.getDate();
+         const year = d.getFullYear();
+
+         if (month.length < 2) month = '0' + month;
+         if (day.length < 2) day = '0' + day;
+
+         return [year, month, day].join('-');
+     }
+
+    function getTomorrowDate() {
+         const today = new Date();
+         const tomorrow = new Date(today);
+         tomorrow.setDate(tomorrow.getDate() + 1);
+         return formatDate(tomorrow);
+     }
+
+    // Initialize rows
+    if (initialPayments.length > 0) {
+        initialPayments.forEach(p => {
+            agregarFecha(p.fecha, p.monto);
+        });
+        // Don't auto-distribute if we loaded existing custom amounts
+        distribucionIgual.checked = false;
+    } else {
+        // Should usually have payments, but failsafe
+        agregarFecha();
+        distribucionIgual.checked = true;
+    }
+
+    // Trigger updates to calculate totals
+    actualizarDatos();
+
+
+    btnAddFecha.addEventListener('click', function() {
+        agregarFecha();
+        actualizarDatos();
+    });
+
+
+    function agregarFecha(fechaValor = null, montoValor = 0) {
+        const fechaId = Date.now() + Math.random();
+        const fechaDefault = fechaValor || getTomorrowDate();
+
+        const fechaDiv = document.createElement('div');
+        fechaDiv.className = 'fecha-pago-item';
+        fechaDiv.id = `fecha-${fechaId}`;
+
+        fechaDiv.innerHTML = `
+            <div class="fecha-input">
+                <label class="form-label">Fecha de Pago</label>
+                <input type="date" 
+                       class="form-control fecha-input-field" 
+                       value="${fechaDefault}"
+                       min="2020-01-01"
+                       data-fecha-id="${fechaId}">
+            </div>
+            <div class="monto-input">
+                <label class="form-label">Monto para esta fecha</label>
+                <div class="input-with-icon">
+                    <span class="input-icon">$</span>
+                    <input type="number" 
+                           class="form-control monto-input-field"
+                           placeholder="0.00"
+                           step="0.01"
+                           min="0.01"
+                           data-fecha-id="${fechaId}"
+                           value="${parseFloat(montoValor).toFixed(2)}">
+                </div>
+            </div>
+            <div class="fecha-actions">
+                <button type="button" class="btn-fecha remove" data-action="remove" data-fecha-id="${fechaId}">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        `;
+
+        fechasContainer.appendChild(fechaDiv);
+
+        // Add to data arrays
+        fechasData.push({ id: fechaId, fecha: fechaDefault });
+        montosData.push({ fechaId: fechaId, monto: parseFloat(montoValor) });
+
+        // Events
+        const fechaInput = fechaDiv.querySelector('.fecha-input-field');
+        const montoInputField = fechaDiv.querySelector('.monto-input-field');
+        const btnRemove = fechaDiv.querySelector('[data-action="remove"]');
+
+        fechaInput.addEventListener('change', function() {
+            const index = fechasData.findIndex(f => f.id == fechaId);
+            if (index !== -1) fechasData[index].fecha = this.value;
+            actualizarDatos();
+        });
+
+        montoInputField.addEventListener('input', function() {
+            // If user manually edits, disable auto-distribution
+            distribucionIgual.checked = false;
+            const index = montosData.findIndex(m => m.fechaId == fechaId);
+            if (index !== -1) montosData[index].monto = parseFloat(this.value) || 0;
+            actualizarDatos();
+        });
+
+        btnRemove.addEventListener('click', function() {
+             if (fechasData.length > 1) {
+                 fechaDiv.remove();
+                 fechasData = fechasData.filter(f => f.id != fechaId);
+                 montosData = montosData.filter(m => m.fechaId != fechaId);
+                 actualizarDatos();
+             } else {
+                 alert('Debe haber al menos una fecha de pago.');
+             }
+         });
+    }
+
+    function actualizarDatos() {
+        const montoTotal = parseFloat(montoInput.value) || 0;
+
+        // Update UI Totals
+        totalFacturaEl.textContent = '$' + montoTotal.toLocaleString('es-MX', {minimumFractionDigits: 2});
+
+        // If distribution is checked, redistribute
+        if (distribucionIgual.checked) {
+            const numFechas = fechasData.length;
+            if (numFechas > 0) {
+                 const montoPorFecha = montoTotal / numFechas;
+
+                 // Update UI inputs and montosData
+                 document.querySelectorAll('.monto-input-field').forEach((input, index) => {
+                     const val = montoPorFecha.toFixed(2);
+                     input.value = val;
+
+                     const fId = input.getAttribute('data-fecha-id');
+                     const mIndex = montosData.findIndex(m => m.fechaId == fId);
+                     if (mIndex !== -1) montosData[mIndex].monto = parseFloat(val);
+                 });
+            }
+        }
+
+        // Calculate distributed total
+        let totalDist = 0;
+        montosData.forEach(m => totalDist += m.monto);
+
+        totalDistribuidoEl.textContent = '$' + totalDist.toLocaleString('es-MX', {minimumFractionDigits: 2});
+
+        const diff = Math.abs(montoTotal - totalDist);
+        if (diff > 0.01) {
+            diferenciaMontoEl.textContent = `Diferencia: $${diff.toLocaleString('es-MX', {minimumFractionDigits: 2})}`;
+            diferenciaMontoEl.style.color = '#ef4444'; // red
+        } else {
+            diferenciaMontoEl.textContent = 'Montos coinciden';
+            diferenciaMontoEl.style.color = '#22c55e'; // green
+        }
+
+        // Update hidden inputs
+        inputFechas.value = fechasData.map(f => f.fecha).join(',');
+        inputMontos.value = montosData.map(m => m.monto).join(',');
+    }
+
+    // Listen for total amount changes
+    montoInput.addEventListener('input', actualizarDatos);
+
+    // Listen for distribution checkbox
+    distribucionIgual.addEventListener('change', actualizarDatos);
+
+
+    // Form Validation on Submit
+    form.addEventListener('submit', function(e) {
+         const montoTotal = parseFloat(montoInput.value) || 0;
+         let totalDist = 0;
+         montosData.forEach(m => totalDist += m.monto);
+
+         if (Math.abs(montoTotal - totalDist) > 0.01) {
+             e.preventDefault();
+             alert(`La suma de los pagos ($${totalDist.toFixed(2)}) no coincide con el total de la factura ($${montoTotal.toFixed(2)}).`);
+             return false;
+         }
+
+         const proveedorField = document.getElementById(form.dataset.proveedorId);
+         if (!proveedorField.value) {
+            e.preventDefault();
+            alert('El proveedor es obligatorio.');
+            proveedorField.focus();
+            return false;
+        }
+    });
+});
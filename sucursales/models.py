@@ -6,9 +6,13 @@ class Sucursales(models.Model):
     nombre = models.CharField(max_length=200)
     direccion = models.CharField(max_length=300, blank=True, null=True)
     organizacion = models.ForeignKey('users.Organizacion', on_delete=models.CASCADE, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class Ventas(models.Model):
     fecha = models.DateField()
     monto = models.DecimalField(max_digits=15, decimal_places=2)
-    sucursal = models.ForeignKey(Sucursales, on_delete=models.CASCADE)
\ No newline at end of file
+    sucursal = models.ForeignKey(Sucursales, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -1,8 +1,11 @@
 # services.py
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from core.services.cache_calendario import invalidar_calendario_organizacion
+from core.services.cambios_datos import CREAR, EDITAR, ELIMINAR, cambio, cambios_de, registrar_cambios
+from cartera.models import Movimientos_Cartera
 
-from sucursales.models import Sucursales
+from sucursales.models import Sucursales, Ventas
 
 
 def servicio_listar_sucursales(user):
@@ -16,11 +19,13 @@ def servicio_crear_sucursal(data, user):
     if not user.organizacion:
         raise ValidationError("El usuario no pertenece a ninguna organización.")
         
-    return Sucursales.objects.create(
+    sucursal = Sucursales.objects.create(
         nombre=data['nombre'],
         direccion=data.get('direccion', ''),
         organizacion=user.organizacion
     )
+    registrar_cambios(user.organizacion, [cambio('sucursal', sucursal.pk, CREAR)])
+    return sucursal
 
 
 @transaction.atomic
@@ -30,7 +35,8 @@ def servicio_editar_sucursal(sucursal, data, user):
         
     sucursal.nombre = data['nombre']
     sucursal.direccion = data.get('direccion', '')
-    sucursal.save(update_fields=['nombre', 'direccion'])
+    sucursal.save(update_fields=['nombre', 'direccion', 'updated_at'])
+    registrar_cambios(user.organizacion, [cambio('sucursal', sucursal.pk, EDITAR)])
     return sucursal
 
 
@@ -42,4 +48,12 @@ def servicio_eliminar_sucursal(sucursal, user):
     if sucursal.organizacion != user.organizacion:
         raise ValidationError("No tienes permiso para eliminar esta sucursal.")
         
+    # Sus ventas e ingresos se borran en cascada: se anotan antes
+    cambios = (
+        [cambio('sucursal', sucursal.pk, ELIMINAR)]
+        + cambios_de(Ventas.objects.filter(sucursal=sucursal), 'venta', ELIMINAR, 'fecha')
+        + cambios_de(Movimientos_Cartera.objects.filter(venta__sucursal=sucursal), 'movimiento', ELIMINAR, 'fecha')
+    )
     sucursal.delete()
+    invalidar_calendario_organizacion(user.organizacion)  # borra sus ventas en cascada
+    registrar_cambios(user.organizacion, cambios)
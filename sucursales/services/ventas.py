@@ -3,6 +3,9 @@ from django.db import transaction
 from datetime import date
 
 from sucursales.models import Sucursales, Ventas
+from core.services.cache_calendario import invalidar_calendario
+from core.services.cambios_datos import CREAR, EDITAR, ELIMINAR, cambio, cambios_de, registrar_cambios
+from cartera.models import Movimientos_Cartera
 from cartera.services.movimientos_ingreso import (
     servicio_crear_movimiento_ingreso,
     servicio_editar_movimiento_ingreso,
@@ -49,7 +52,12 @@ def servicio_crear_venta(data, user):
         monto=data['monto'],
         sucursal=sucursal
     )
-    servicio_crear_movimiento_ingreso(venta)
+    movimiento = servicio_crear_movimiento_ingreso(venta)
+    invalidar_calendario(user.organizacion, [venta.fecha])
+    registrar_cambios(user.organizacion, [
+        cambio('venta', venta.pk, CREAR, venta.fecha),
+        cambio('movimiento', movimiento.pk, CREAR, movimiento.fecha),
+    ])
     return venta
 
 
@@ -65,12 +73,18 @@ def servicio_editar_venta(venta, data, user):
     if venta.sucursal.organizacion != user.organizacion:
         raise ValidationError('No tienes permiso para editar esta venta.')
 
+    fecha_original = venta.fecha
     venta.fecha = data['fecha']
     venta.monto = data['monto']
     venta.sucursal = sucursal
     venta.save()
 
-    servicio_editar_movimiento_ingreso(venta)
+    movimiento = servicio_editar_movimiento_ingreso(venta)
+    invalidar_calendario(user.organizacion, [fecha_original, venta.fecha])
+    registrar_cambios(user.organizacion, [
+        cambio('venta', venta.pk, EDITAR, venta.fecha, fecha_original),
+        cambio('movimiento', movimiento.pk, EDITAR, movimiento.fecha, fecha_original),
+    ])
     return venta
 
 
@@ -82,6 +96,11 @@ def servicio_eliminar_venta(venta, user):
     if venta.sucursal.organizacion != user.organizacion:
         raise ValidationError('No tienes permiso para eliminar esta venta.')
 
+    cambios = [cambio('venta', venta.pk, ELIMINAR, venta.fecha)] + cambios_de(
+        Movimientos_Cartera.objects.filter(venta=venta), 'movimiento', ELIMINAR, 'fecha'
+    )
     servicio_eliminar_movimiento_ingreso(venta)
+    invalidar_calendario(user.organizacion, [venta.fecha])
+    registrar_cambios(user.organizacion, cambios)
     venta.delete()
     return venta
@@ -1,6 +1,7 @@
 # views.py
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from core.decorators import condicional_por_version
 from django.core.exceptions import ValidationError
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
@@ -45,6 +46,7 @@ def _resolver_next(request, fallback_url):
 # ---------------------------------------------------------------------------
 
 @login_required
+@condicional_por_version
 def lista_sucursales(request):
     sucursales = servicio_listar_sucursales(user=request.user)
     return render(request, 'sucursales/sucursales.html', {
@@ -113,6 +115,7 @@ def eliminar_sucursal(request, sucursal_id):
 # ---------------------------------------------------------------------------
 
 @login_required
+@condicional_por_version
 def lista_ventas(request):
     """
     Lista de ventas con filtros por sucursal y rango de fechas.
@@ -5,6 +5,7 @@ Responsabilidades:
   - Crear la suscripción TRIAL al registrar la org
   - Cancelar la suscripción
   - Helpers de lectura (obtener_suscripcion, seleccionar_plan)
+  - Vencer trials y cancelaciones atrasadas (tarea nocturna)
 
 Nota: Los cobros, renovaciones y cambios de plan los maneja Stripe
       directamente (Checkout + Billing Portal). El webhook en views.py
@@ -18,6 +19,7 @@ from datetime import timedelta
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from ..models import Suscripcion
@@ -129,3 +131,21 @@ def seleccionar_plan(suscripcion, plan):
     suscripcion.save(update_fields=['plan', 'precio_mensual', 'updated_at'])
     logger.info(f"[PLAN] {suscripcion.organizacion.nombre} eligió plan {plan} (${precio}/mes)")
     return suscripcion
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 5. Vencer suscripciones atrasadas (tarea nocturna, ver suscripciones/tareas.py)
+# ─────────────────────────────────────────────────────────────────────────────
+def vencer_suscripciones(ahora=None):
+    """
+    Pasa a VENCIDA, en un solo UPDATE, los TRIAL cuyo trial_fin ya pasó y
+    las CANCELADA sin período pagado vigente (mismo criterio que
+    SuscripcionMiddleware). Retorna cuántas se vencieron.
+    """
+    ahora = ahora or timezone.now()
+    vencidas = Suscripcion.objects.filter(
+        Q(estado='TRIAL', trial_fin__lte=ahora)
+        | Q(estado='CANCELADA') & (Q(proximo_cobro__lte=ahora) | Q(proximo_cobro__isnull=True))
+    ).update(estado='VENCIDA', updated_at=ahora)  # update() no toca auto_now
+    logger.info(f"[SUSCRIPCION] {vencidas} suscripciones vencidas")
+    return vencidas
@@ -0,0 +1,12 @@
+"""Tareas en segundo plano de suscripciones (ver tareas/registro.py)."""
+
+from tareas.registro import tarea
+
+from .services.suscripcion import vencer_suscripciones
+
+
+@tarea('suscripciones.vencer', diaria='03:00')
+def vencer(avance):
+    """Nocturna: TRIAL y CANCELADA atrasadas → VENCIDA en un solo UPDATE."""
+    vencidas = vencer_suscripciones()
+    avance.guardar(hecho=vencidas, total=vencidas)
@@ -1,3 +1,40 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from tareas.services.cola import encolar, tomar_siguiente
+from tareas.services.ejecutar import ejecutar
+from users.models import Organizacion
+from .models import Suscripcion
+
+
+class VencerSuscripcionesTest(TestCase):
+    def _suscripcion(self, nombre, estado, **fechas):
+        org = Organizacion.objects.create(nombre=nombre)
+        Suscripcion.objects.filter(organizacion=org).update(estado=estado, **fechas)
+        return org.suscripcion
+
+    def test_tarea_nocturna_vence_trials_y_cancelaciones_atrasadas(self):
+        ayer = timezone.now() - timedelta(days=1)
+        manana = timezone.now() + timedelta(days=1)
+        suscripciones = {
+            'trial_vencido': self._suscripcion('A', 'TRIAL', trial_fin=ayer),
+            'trial_vigente': self._suscripcion('B', 'TRIAL', trial_fin=manana),
+            'cancelada_sin_credito': self._suscripcion('C', 'CANCELADA', proximo_cobro=ayer),
+            'cancelada_con_credito': self._suscripcion('D', 'CANCELADA', proximo_cobro=manana),
+            'activa': self._suscripcion('E', 'ACTIVA', proximo_cobro=ayer),
+        }
+
+        encolar('suscripciones.vencer')
+        tarea = ejecutar(tomar_siguiente('prueba'))
 
-# Create your tests here.
+        self.assertEqual((tarea.estado, tarea.progreso_hecho), ('COMPLETADA', 2))
+        estados = {clave: Suscripcion.objects.get(pk=s.pk).estado for clave, s in suscripciones.items()}
+        self.assertEqual(estados, {
+            'trial_vencido': 'VENCIDA',
+            'trial_vigente': 'TRIAL',
+            'cancelada_sin_credito': 'VENCIDA',
+            'cancelada_con_credito': 'CANCELADA',
+            'activa': 'ACTIVA',
+        })
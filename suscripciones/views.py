@@ -14,6 +14,8 @@ from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
+from core.decorators import cuota_peticiones
+
 logger = logging.getLogger(__name__)
 
 from .services.suscripcion import (
@@ -372,6 +374,7 @@ def checkout_exitoso(request):
 # Registrar en el Dashboard de Stripe: POST /suscripciones/webhook/
 # ─────────────────────────────────────────────────────────────────────────────
 @csrf_exempt
+@cuota_peticiones('webhook')
 def stripe_webhook(request):
     """
     Endpoint que Stripe llama cada vez que ocurre un evento relevante.
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Tarea
+
+
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ['nombre', 'estado', 'programada_para', 'intentos', 'progreso_hecho', 'progreso_total', 'terminada']
+    list_filter = ['estado', 'nombre']
+    readonly_fields = ['trabajador', 'bloqueada_hasta', 'punto_control', 'iniciada', 'terminada', 'created_at', 'updated_at']
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TareasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tareas'
+    verbose_name = 'Tareas en segundo plano'
+
+    def ready(self):
+        # Registra las funciones @tarea del módulo tareas.py de cada app
+        autodiscover_modules('tareas')
@@ -0,0 +1,22 @@
+"""
+Lado hijo del pool de procesos de tareas (tareas/services/ejecutar.py).
+
+Con spawn, el proceso hijo importa este módulo antes de configurar Django,
+así que no importa nada de Django a nivel de módulo.
+"""
+
+
+def inicializar_proceso():
+    import django
+    django.setup()
+
+
+def ejecutar_lote(nombre, organizacion_ids, parametros):
+    from django.db import close_old_connections
+
+    from tareas.registro import REGISTRO
+
+    try:
+        REGISTRO[nombre].funcion(organizacion_ids, **parametros)
+    finally:
+        close_old_connections()
@@ -0,0 +1,42 @@
+"""
+Encola una tarea registrada a mano (las diarias las encola el trabajador,
+esto las adelanta):
+
+    python manage.py encolar_tarea suscripciones.vencer --unica
+    python manage.py encolar_tarea otra.tarea --param desde=2026-01-01
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from tareas.registro import REGISTRO
+from tareas.services.cola import encolar
+
+
+class Command(BaseCommand):
+    help = 'Encola una tarea en segundo plano (ver tareas/registro.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('nombre', nargs='?')
+        parser.add_argument('--param', action='append', default=[], help='clave=valor, se puede repetir')
+        parser.add_argument('--unica', action='store_true', help='no duplicar si ya hay una pendiente o en curso')
+        parser.add_argument('--lista', action='store_true', help='muestra las tareas registradas')
+
+    def handle(self, *args, **opts):
+        if opts['lista'] or not opts['nombre']:
+            for nombre, definicion in sorted(REGISTRO.items()):
+                self.stdout.write(f"  {nombre}{'  (por organización)' if definicion.por_organizacion else ''}")
+            return
+
+        parametros = {}
+        for par in opts['param']:
+            clave, separador, valor = par.partition('=')
+            if not separador:
+                raise CommandError(f"Parámetro inválido '{par}', se espera clave=valor.")
+            parametros[clave] = valor
+
+        try:
+            tarea = encolar(opts['nombre'], parametros, unica=opts['unica'])
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+        self.stdout.write(f'{tarea} en cola para {tarea.programada_para:%Y-%m-%d %H:%M}')
@@ -0,0 +1,61 @@
+"""
+Trabajador de la cola de tareas (tareas/models.py).
+
+    python manage.py trabajador_tareas              # proceso permanente
+    python manage.py trabajador_tareas --una-vez    # vacía la cola y termina (cron)
+
+Encola también las tareas diarias (@tarea(..., diaria='HH:MM')), revisando
+una vez por minuto. Con SIGTERM/SIGINT termina la tarea en curso y sale.
+"""
+
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tareas.services.cola import programar_diarias, tomar_siguiente
+from tareas.services.ejecutar import ejecutar
+
+
+# Segundos entre revisiones de las tareas diarias
+REVISION_DIARIAS_S = 60
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas en segundo plano encoladas en la BD.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='termina cuando no quedan tareas listas')
+        parser.add_argument('--espera', type=float, default=5, help='segundos entre consultas a la cola vacía')
+
+    def handle(self, *args, **opts):
+        trabajador = f'{socket.gethostname()}:{os.getpid()}'
+        self.detener = False
+        signal.signal(signal.SIGTERM, self._detener)
+        signal.signal(signal.SIGINT, self._detener)
+
+        self.stdout.write(f'Trabajador {trabajador} esperando tareas')
+        revision_diarias = 0
+        while not self.detener:
+            close_old_connections()
+            if time.monotonic() >= revision_diarias:
+                programar_diarias()
+                revision_diarias = time.monotonic() + REVISION_DIARIAS_S
+            tarea = tomar_siguiente(trabajador)
+            if tarea is None:
+                if opts['una_vez']:
+                    break
+                time.sleep(opts['espera'])
+                continue
+
+            self.stdout.write(f'  {tarea.nombre} #{tarea.pk} (intento {tarea.intentos})')
+            ejecutar(tarea)
+            total = f'/{tarea.progreso_total}' if tarea.progreso_total is not None else ''
+            self.stdout.write(f'    {tarea.get_estado_display()}  {tarea.progreso_hecho}{total}  {tarea.error}')
+
+    def _detener(self, signum, frame):
+        self.stdout.write('Deteniendo al terminar la tarea en curso...')
+        self.detener = True
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 06:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_CURSO', 'En curso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20)),
+                ('programada_para', models.DateTimeField(default=django.utils.timezone.now)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('max_intentos', models.PositiveSmallIntegerField(default=3)),
+                ('error', models.TextField(blank=True)),
+                ('trabajador', models.CharField(blank=True, max_length=100)),
+                ('bloqueada_hasta', models.DateTimeField(blank=True, null=True)),
+                ('punto_control', models.JSONField(blank=True, default=dict)),
+                ('progreso_hecho', models.PositiveIntegerField(default=0)),
+                ('progreso_total', models.PositiveIntegerField(blank=True, null=True)),
+                ('iniciada', models.DateTimeField(blank=True, null=True)),
+                ('terminada', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tarea',
+                'verbose_name_plural': 'Tareas',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['estado', 'programada_para'], name='tareas_tare_estado_14ff7d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tarea(models.Model):
+    """
+    Trabajo en segundo plano, encolado en la BD y ejecutado por
+    `manage.py trabajador_tareas`. La función que lo hace se registra con
+    @tarea en el módulo tareas.py de su app (ver tareas/registro.py).
+
+    Ciclo de vida:
+      PENDIENTE → EN_CURSO → COMPLETADA
+                           → PENDIENTE (reintento, programada_para con espera)
+                           → FALLIDA (sin reintentos)
+
+    Mientras corre, el trabajador renueva bloqueada_hasta; si el proceso
+    muere, al vencer otro trabajador la retoma desde punto_control.
+    """
+
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_CURSO', 'En curso'),
+        ('COMPLETADA', 'Completada'),
+        ('FALLIDA', 'Fallida'),
+    ]
+
+    nombre     = models.CharField(max_length=100)
+    parametros = models.JSONField(default=dict, blank=True)
+
+    # ── Estado ──────────────────────────────────────────────────────────────
+    estado          = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+    programada_para = models.DateTimeField(default=timezone.now)
+    intentos        = models.PositiveSmallIntegerField(default=0)
+    max_intentos    = models.PositiveSmallIntegerField(default=3)
+    error           = models.TextField(blank=True)
+
+    # ── Trabajador que la tiene ─────────────────────────────────────────────
+    trabajador      = models.CharField(max_length=100, blank=True)
+    bloqueada_hasta = models.DateTimeField(null=True, blank=True)
+
+    # ── Avance ──────────────────────────────────────────────────────────────
+    punto_control  = models.JSONField(default=dict, blank=True)
+    progreso_hecho = models.PositiveIntegerField(default=0)
+    progreso_total = models.PositiveIntegerField(null=True, blank=True)
+
+    # ── Auditoría ───────────────────────────────────────────────────────────
+    iniciada   = models.DateTimeField(null=True, blank=True)
+    terminada  = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['estado', 'programada_para'])]
+
+    def __str__(self):
+        return f"{self.nombre} #{self.pk} – {self.get_estado_display()}"
+
+    @property
+    def porcentaje(self):
+        if not self.progreso_total:
+            return None
+        return min(100, round(self.progreso_hecho * 100 / self.progreso_total))
@@ -0,0 +1,54 @@
+"""
+Registro de tareas en segundo plano.
+
+Cada app declara las suyas en su módulo tareas.py (se importan al arrancar,
+ver tareas/apps.py):
+
+    @tarea('suscripciones.vencer', diaria='03:00')
+    def vencer(avance, **parametros):
+        ...
+
+    @tarea('reportes.acumular', por_organizacion=True)
+    def acumular(organizacion_ids, **parametros):
+        ...
+
+  - Tarea simple: recibe un `Avance` (tareas/services/ejecutar.py) para
+    reportar progreso y guardar su punto de control, con el que se retoma
+    si el trabajador muere o la tarea se reintenta.
+  - por_organizacion=True: el trabajador reparte las organizaciones en
+    lotes de TAREAS_LOTE_ORGANIZACIONES y los ejecuta en un pool de
+    procesos; la función recibe los ids de un lote. Un lote puede repetirse
+    tras una caída, así que debe ser idempotente.
+  - diaria='HH:MM' (hora local): el trabajador la encola sola para la
+    próxima vez que den esas horas, sin cron (ver programar_diarias en
+    tareas/services/cola.py).
+"""
+
+from django.core.exceptions import ValidationError
+
+REGISTRO = {}
+
+
+class DefinicionTarea:
+    def __init__(self, nombre, funcion, por_organizacion=False, max_intentos=3, diaria=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.por_organizacion = por_organizacion
+        self.max_intentos = max_intentos
+        self.diaria = diaria
+
+
+def tarea(nombre, por_organizacion=False, max_intentos=3, diaria=None):
+    def registrar(funcion):
+        if nombre in REGISTRO and REGISTRO[nombre].funcion is not funcion:
+            raise ValueError(f"Ya existe una tarea registrada como '{nombre}'.")
+        REGISTRO[nombre] = DefinicionTarea(nombre, funcion, por_organizacion, max_intentos, diaria)
+        return funcion
+    return registrar
+
+
+def obtener_definicion(nombre):
+    try:
+        return REGISTRO[nombre]
+    except KeyError:
+        raise ValidationError(f"No existe la tarea '{nombre}'.")
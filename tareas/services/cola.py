@@ -0,0 +1,140 @@
+"""
+Cola de tareas en la BD: encolar, programar las diarias, tomar la
+siguiente y cerrar.
+
+Para tomar una tarea no se usan bloqueos de fila: el trabajador la marca
+con un UPDATE condicionado a que siga como la vio (estado y
+bloqueada_hasta). Si otro trabajador se adelantó, el UPDATE afecta 0 filas
+y prueba con la siguiente. Funciona igual en Postgres y SQLite.
+
+Igual con cada escritura posterior (renovar, completar, fallar): solo se
+aplica si la tarea sigue EN_CURSO del mismo trabajador. Si su bloqueo venció
+y otro la retomó, se lanza TareaPerdida y no se pisa el estado del nuevo
+dueño.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import Tarea
+from ..registro import REGISTRO, obtener_definicion
+
+logger = logging.getLogger(__name__)
+
+
+class TareaPerdida(Exception):
+    """El bloqueo venció y otro trabajador retomó la tarea."""
+
+
+def encolar(nombre, parametros=None, programada_para=None, unica=False):
+    """
+    Crea una tarea PENDIENTE. Con unica=True no duplica: si ya hay una del
+    mismo nombre pendiente o en curso, la retorna.
+    """
+    definicion = obtener_definicion(nombre)
+    if unica:
+        existente = Tarea.objects.filter(nombre=nombre, estado__in=('PENDIENTE', 'EN_CURSO')).first()
+        if existente:
+            return existente
+
+    return Tarea.objects.create(
+        nombre=nombre,
+        parametros=parametros or {},
+        programada_para=programada_para or timezone.now(),
+        max_intentos=definicion.max_intentos,
+    )
+
+
+def _proxima(hora):
+    """Siguiente momento (hora local) en que dan las `hora` ('HH:MM')."""
+    horas, minutos = (int(parte) for parte in hora.split(':'))
+    ahora = timezone.localtime()
+    proxima = ahora.replace(hour=horas, minute=minutos, second=0, microsecond=0)
+    if proxima <= ahora:
+        proxima += timedelta(days=1)
+    return proxima
+
+
+def programar_diarias():
+    """
+    Encola la próxima ejecución de cada tarea con `diaria`, salvo que ya
+    haya una pendiente o en curso. El trabajador lo llama en su ciclo, así
+    que al terminar una queda programada la del día siguiente.
+    """
+    for definicion in REGISTRO.values():
+        if definicion.diaria:
+            encolar(definicion.nombre, programada_para=_proxima(definicion.diaria), unica=True)
+
+
+def _vencimiento():
+    return timezone.now() + timedelta(seconds=settings.TAREAS_BLOQUEO_S)
+
+
+def tomar_siguiente(trabajador):
+    """
+    Marca como EN_CURSO de `trabajador` la siguiente tarea lista (pendiente
+    y ya programada, o en curso con el bloqueo vencido) y la retorna.
+    None si no hay ninguna.
+    """
+    ahora = timezone.now()
+    candidatas = (
+        Tarea.objects
+        .filter(Q(estado='PENDIENTE', programada_para__lte=ahora) | Q(estado='EN_CURSO', bloqueada_hasta__lt=ahora))
+        .order_by('programada_para', 'pk')
+        .values_list('pk', 'estado', 'bloqueada_hasta')[:10]
+    )
+    for pk, estado, bloqueada_hasta in candidatas:
+        tomada = Tarea.objects.filter(pk=pk, estado=estado, bloqueada_hasta=bloqueada_hasta).update(
+            estado='EN_CURSO',
+            trabajador=trabajador,
+            bloqueada_hasta=_vencimiento(),
+            intentos=F('intentos') + 1,
+            iniciada=ahora,
+            updated_at=ahora,
+        )
+        if tomada:
+            if estado == 'EN_CURSO':
+                logger.warning(f"[TAREAS] #{pk} retomada por {trabajador}: el trabajador anterior no respondió")
+            return Tarea.objects.get(pk=pk)
+    return None
+
+
+def _guardar(tarea, **campos):
+    """Aplica `campos` a la tarea solo si sigue EN_CURSO de su trabajador."""
+    for campo, valor in campos.items():
+        setattr(tarea, campo, valor)
+    actualizada = Tarea.objects.filter(pk=tarea.pk, estado='EN_CURSO', trabajador=tarea.trabajador).update(
+        **campos, updated_at=timezone.now(),
+    )
+    if not actualizada:
+        raise TareaPerdida(f"La tarea #{tarea.pk} ya no es de {tarea.trabajador}")
+
+
+def renovar(tarea, **campos):
+    """
+    El trabajador sigue vivo: extiende el bloqueo y guarda `campos` (lo
+    llaman Avance.guardar y el latido mientras corren los lotes).
+    """
+    _guardar(tarea, bloqueada_hasta=_vencimiento(), **campos)
+
+
+def completar(tarea):
+    _guardar(tarea, estado='COMPLETADA', error='', bloqueada_hasta=None, terminada=timezone.now())
+
+
+def fallar(tarea, error):
+    """
+    Reintenta con espera exponencial (TAREAS_REINTENTO_S, 2x, 4x...) hasta
+    max_intentos; después queda FALLIDA. El punto de control se conserva.
+    """
+    campos = {'error': f"{type(error).__name__}: {error}", 'bloqueada_hasta': None}
+    if tarea.intentos < tarea.max_intentos:
+        espera = settings.TAREAS_REINTENTO_S * 2 ** (tarea.intentos - 1)
+        campos.update(estado='PENDIENTE', programada_para=timezone.now() + timedelta(seconds=espera))
+    else:
+        campos.update(estado='FALLIDA', terminada=timezone.now())
+    _guardar(tarea, **campos)
@@ -0,0 +1,144 @@
+"""
+Ejecución de una tarea tomada de la cola.
+
+Las tareas por organización se reparten en lotes y se ejecutan en un
+ProcessPoolExecutor (TAREAS_PROCESOS procesos, 0 = en el mismo proceso).
+El avance se guarda en orden de lote: punto_control['ultima_organizacion']
+es la organización más alta con todos sus lotes anteriores terminados, así
+que al retomar solo se repite el trabajo posterior a ese punto.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as EsperaAgotada
+
+from django.conf import settings
+
+from users.models import Organizacion
+
+from ..lotes import ejecutar_lote, inicializar_proceso
+from ..registro import obtener_definicion
+from .cola import TareaPerdida, completar, fallar, renovar
+
+logger = logging.getLogger(__name__)
+
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+
+
+class Avance:
+    """Progreso y punto de control de la tarea en curso."""
+
+    def __init__(self, tarea):
+        self.tarea = tarea
+
+    @property
+    def punto_control(self):
+        return self.tarea.punto_control
+
+    @property
+    def hecho(self):
+        return self.tarea.progreso_hecho
+
+    def guardar(self, hecho=None, total=None, **punto_control):
+        """Actualiza progreso y punto de control y renueva el bloqueo."""
+        tarea = self.tarea
+        if hecho is not None:
+            tarea.progreso_hecho = hecho
+        if total is not None:
+            tarea.progreso_total = total
+        renovar(
+            tarea,
+            progreso_hecho=tarea.progreso_hecho,
+            progreso_total=tarea.progreso_total,
+            punto_control={**tarea.punto_control, **punto_control},
+        )
+        if tarea.progreso_total:
+            logger.info(f"[TAREAS] {tarea.nombre} #{tarea.pk}: {tarea.progreso_hecho}/{tarea.progreso_total}")
+
+
+# ============================================================
+# POOL
+# ============================================================
+
+def _obtener_ejecutor():
+    global _ejecutor
+    procesos = getattr(settings, 'TAREAS_PROCESOS', 2)
+    if procesos <= 0:
+        return None
+    with _ejecutor_lock:
+        if _ejecutor is None:
+            _ejecutor = ProcessPoolExecutor(
+                max_workers=procesos,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=inicializar_proceso,
+            )
+        return _ejecutor
+
+
+@atexit.register
+def _cerrar_ejecutor():
+    if _ejecutor is not None:
+        _ejecutor.shutdown(wait=False, cancel_futures=True)
+
+
+# ============================================================
+# EJECUCIÓN
+# ============================================================
+
+def _repartir(tarea, definicion, avance):
+    ultima = avance.punto_control.get('ultima_organizacion', 0)
+    ids = list(Organizacion.objects.filter(pk__gt=ultima).order_by('pk').values_list('pk', flat=True))
+    tamano = settings.TAREAS_LOTE_ORGANIZACIONES
+    lotes = [ids[i:i + tamano] for i in range(0, len(ids), tamano)]
+    avance.guardar(total=avance.hecho + len(ids))
+
+    ejecutor = _obtener_ejecutor()
+    if ejecutor is None:
+        for lote in lotes:
+            ejecutar_lote(definicion.nombre, lote, tarea.parametros)
+            avance.guardar(hecho=avance.hecho + len(lote), ultima_organizacion=lote[-1])
+        return
+
+    futuros = [ejecutor.submit(ejecutar_lote, definicion.nombre, lote, tarea.parametros) for lote in lotes]
+    try:
+        for lote, futuro in zip(lotes, futuros):
+            # Latido: un lote largo no debe dejar vencer el bloqueo
+            while True:
+                try:
+                    futuro.result(timeout=settings.TAREAS_BLOQUEO_S / 3)
+                    break
+                except EsperaAgotada:
+                    renovar(tarea)
+            avance.guardar(hecho=avance.hecho + len(lote), ultima_organizacion=lote[-1])
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+
+
+def ejecutar(tarea):
+    """Corre `tarea` (ya EN_CURSO) y la deja completada, reprogramada o fallida."""
+    avance = Avance(tarea)
+    try:
+        try:
+            if tarea.intentos > tarea.max_intentos:
+                raise RuntimeError('Se agotaron los intentos (el trabajador se detuvo a la mitad).')
+            definicion = obtener_definicion(tarea.nombre)
+            if definicion.por_organizacion:
+                _repartir(tarea, definicion, avance)
+            else:
+                definicion.funcion(avance, **tarea.parametros)
+        except TareaPerdida:
+            raise
+        except Exception as e:
+            logger.exception(f"[TAREAS] {tarea.nombre} #{tarea.pk} falló (intento {tarea.intentos})")
+            fallar(tarea, e)
+        else:
+            completar(tarea)
+            logger.info(f"[TAREAS] {tarea.nombre} #{tarea.pk} completada")
+    except TareaPerdida:
+        # Otro trabajador la retomó: su estado no se toca
+        logger.warning(f"[TAREAS] {tarea.nombre} #{tarea.pk}: {tarea.trabajador} perdió el bloqueo, se abandona")
+    return tarea
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from users.models import Organizacion
+from .models import Tarea
+from .registro import tarea
+from .services.cola import encolar, programar_diarias, tomar_siguiente
+from .services.ejecutar import ejecutar
+
+PROCESADAS = []
+FALLAR_EN = set()
+
+
+@tarea('pruebas.contar', por_organizacion=True, max_intentos=2)
+def contar(organizacion_ids, **parametros):
+    if FALLAR_EN & set(organizacion_ids):
+        raise RuntimeError('lote con error')
+    PROCESADAS.extend(organizacion_ids)
+
+
+@override_settings(TAREAS_PROCESOS=0, TAREAS_LOTE_ORGANIZACIONES=2, TAREAS_REINTENTO_S=60)
+class ColaTareasTest(TestCase):
+    def setUp(self):
+        PROCESADAS.clear()
+        FALLAR_EN.clear()
+        self.orgs = [Organizacion.objects.create(nombre=f"Org {i}").pk for i in range(5)]
+
+    def test_tarea_inexistente(self):
+        with self.assertRaises(ValidationError):
+            encolar('no.existe')
+
+    def test_una_tarea_solo_la_toma_un_trabajador(self):
+        creada = encolar('pruebas.contar')
+        self.assertEqual(encolar('pruebas.contar', unica=True), creada)
+
+        self.assertEqual(tomar_siguiente('a').pk, creada.pk)
+        self.assertIsNone(tomar_siguiente('b'))
+
+        # El trabajador 'a' murió: al vencer su bloqueo la retoma otro
+        Tarea.objects.filter(pk=creada.pk).update(bloqueada_hasta=timezone.now() - timedelta(seconds=1))
+        retomada = tomar_siguiente('b')
+        self.assertEqual((retomada.trabajador, retomada.intentos), ('b', 2))
+
+    def test_reparte_por_organizacion_y_reporta_avance(self):
+        encolar('pruebas.contar')
+        terminada = ejecutar(tomar_siguiente('a'))
+
+        self.assertEqual(terminada.estado, 'COMPLETADA')
+        self.assertEqual(sorted(PROCESADAS), self.orgs)
+        self.assertEqual((terminada.progreso_hecho, terminada.progreso_total, terminada.porcentaje), (5, 5, 100))
+
+    def test_reintento_retoma_desde_el_punto_de_control(self):
+        FALLAR_EN.add(self.orgs[2])
+        encolar('pruebas.contar')
+        fallida = ejecutar(tomar_siguiente('a'))
+
+        self.assertEqual(fallida.estado, 'PENDIENTE')
+        self.assertIn('lote con error', fallida.error)
+        self.assertEqual(fallida.punto_control, {'ultima_organizacion': self.orgs[1]})
+        self.assertGreater(fallida.programada_para, timezone.now())
+        # Aún no toca reintentarla
+        self.assertIsNone(tomar_siguiente('a'))
+
+        FALLAR_EN.clear()
+        PROCESADAS.clear()
+        Tarea.objects.filter(pk=fallida.pk).update(programada_para=timezone.now())
+        terminada = ejecutar(tomar_siguiente('a'))
+
+        self.assertEqual(terminada.estado, 'COMPLETADA')
+        self.assertEqual(PROCESADAS, self.orgs[2:])
+        self.assertEqual((terminada.progreso_hecho, terminada.progreso_total), (5, 5))
+
+    def test_falla_al_agotar_intentos(self):
+        FALLAR_EN.add(self.orgs[0])
+        creada = encolar('pruebas.contar')
+        ejecutar(tomar_siguiente('a'))
+        Tarea.objects.filter(pk=creada.pk).update(programada_para=timezone.now())
+        fallida = ejecutar(tomar_siguiente('a'))
+
+        self.assertEqual((fallida.estado, fallida.intentos), ('FALLIDA', 2))
+        self.assertIsNotNone(fallida.terminada)
+
+    def test_tareas_diarias_se_programan_una_vez(self):
+        programar_diarias()
+        programar_diarias()
+
+        diaria = Tarea.objects.get(nombre='suscripciones.vencer', estado='PENDIENTE')
+        programada = timezone.localtime(diaria.programada_para)
+        self.assertEqual(programada.strftime('%H:%M'), '03:00')
+        self.assertGreater(programada, timezone.now())
+        self.assertLessEqual(programada - timezone.now(), timedelta(days=1))
+
+    def test_trabajador_que_perdio_el_bloqueo_no_pisa_al_nuevo(self):
+        encolar('pruebas.contar')
+        de_a = tomar_siguiente('a')
+        Tarea.objects.filter(pk=de_a.pk).update(bloqueada_hasta=timezone.now() - timedelta(seconds=1))
+        tomar_siguiente('b')
+
+        ejecutar(de_a)
+
+        tarea = Tarea.objects.get(pk=de_a.pk)
+        self.assertEqual((tarea.estado, tarea.trabajador, tarea.progreso_total), ('EN_CURSO', 'b', None))
+        self.assertEqual(PROCESADAS, [])
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-19 06:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_add_backup_codes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizacion',
+            name='datos_modificados',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='organizacion',
+            name='version_datos',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
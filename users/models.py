@@ -9,6 +9,11 @@ class Organizacion(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
+    # Versión de los datos de la organización: la incrementa cada servicio de
+    # escritura (ver core/services/version_datos.py)
+    version_datos = models.PositiveBigIntegerField(default=0)
+    datos_modificados = models.DateTimeField(default=timezone.now)
+
     def __str__(self):
         return self.nombre
 
@@ -1,6 +1,7 @@
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from ..models import Organizacion
+from core.services.version_datos import marcar_datos_modificados
 
 
 @transaction.atomic
@@ -25,4 +26,5 @@ def servicio_editar_organizacion(organizacion, data, user):
 
     organizacion.nombre = nuevo_nombre
     organizacion.save(update_fields=['nombre'])
+    marcar_datos_modificados(organizacion)  # el nombre sale en todas las páginas
     return organizacion
@@ -1,5 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from core.decorators import condicional_por_version
 from django.contrib import messages
 from django.db import transaction
 from django.core.exceptions import ValidationError
@@ -242,6 +243,7 @@ def change_password(request):
 # --- VISTA HOME (INDEX) ---
 
 @login_required
+@condicional_por_version
 def index(request):
     # Pasamos request.user para filtrar por organización
     saldo_total = obtener_saldo_global(request.user) 